@@ -17,16 +17,17 @@
 # You should have received a copy of the GNU Lesser Public License
 # along with this program.  If not, see [http://www.gnu.org/licenses/].
 """This module contains an object that represents a Telegram File."""
-import shutil
+import asyncio
 import urllib.parse as urllib_parse
 from base64 import b64decode
+from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import TYPE_CHECKING, BinaryIO, Optional
 
 from telegram._passport.credentials import decrypt
 from telegram._telegramobject import TelegramObject
 from telegram._utils.defaultvalue import DEFAULT_NONE
-from telegram._utils.files import is_local_file
+from telegram._utils.files import copy_local_file, is_local_file, iter_local_file
 from telegram._utils.types import FilePathInput, JSONDict, ODVInput
 
 if TYPE_CHECKING:
@@ -117,9 +118,14 @@ class File(TelegramObject):
     def _prepare_decrypt(self, buf: bytes) -> bytes:
         return decrypt(b64decode(self._credentials.secret), b64decode(self._credentials.hash), buf)
 
+    def _decrypt_local_file(self, source: Path, destination: Path) -> None:
+        destination.write_bytes(self._prepare_decrypt(source.read_bytes()))
+
     async def download_to_drive(
         self,
         custom_path: Optional[FilePathInput] = None,
+        resume: bool = False,
+        hard_link: bool = False,
         *,
         read_timeout: ODVInput[float] = DEFAULT_NONE,
         write_timeout: ODVInput[float] = DEFAULT_NONE,
@@ -134,7 +140,8 @@ class File(TelegramObject):
         Note:
             If :paramref:`custom_path` isn't provided and :attr:`file_path` is the path of a
             local file (which is the case when a Bot API Server is running in local mode), this
-            method will just return the path.
+            method will just return the path, i.e. the file can be used in place without copying
+            it.
 
             The only exception to this are encrypted files (e.g. a passport file). For these, a
             file with the prefix `decrypted_` will be created in the same directory as the
@@ -156,11 +163,40 @@ class File(TelegramObject):
             a :attr:`file_path` could never be downloaded, as this attribute is mandatory for that
             operation.
 
+        .. versionchanged:: NEXT.VERSION
+            The file is written to disk chunk by chunk while it is downloaded instead of being
+            held in memory completely. If the download fails, the partially downloaded file is
+            kept, such that the download can be continued with :paramref:`resume`.
+
+        .. versionchanged:: NEXT.VERSION
+            Local files are copied in a worker thread instead of blocking the event loop. Where
+            the operating system supports it, the data is copied within the kernel or shared by
+            the file system instead of being read and written by Python. See also
+            :paramref:`hard_link`.
+
         Args:
             custom_path (:class:`pathlib.Path` | :obj:`str` , optional): The path where the file
                 will be saved to. If not specified, will be saved in the current working directory
                 with :attr:`file_path` as file name or the :attr:`file_id` if :attr:`file_path`
                 is not set.
+            resume (:obj:`bool`, optional): Pass :obj:`True` to continue an interrupted download:
+                If the target file already exists, only the missing remainder is downloaded and
+                appended to it. Has no effect for encrypted files, which are always downloaded
+                completely. Defaults to :obj:`False`.
+
+                .. versionadded:: NEXT.VERSION
+            hard_link (:obj:`bool`, optional): Pass :obj:`True` to create a hard link at
+                :paramref:`custom_path` instead of copying a local file. This avoids copying the
+                data altogether. If that is not possible, e.g. because :paramref:`custom_path` is
+                on a different file system than the file, the file is copied. Only has an effect
+                if :attr:`file_path` is the path of a local file that is not encrypted. Defaults to
+                :obj:`False`.
+
+                Caution:
+                    Both paths point to the same data afterwards, i.e. changing the content of one
+                    of the files changes the other one as well. Deleting either of them is safe.
+
+                .. versionadded:: NEXT.VERSION
 
         Keyword Args:
             read_timeout (:obj:`float` | :obj:`None`, optional): Value to pass to
@@ -187,21 +223,22 @@ class File(TelegramObject):
             raise RuntimeError("No `file_path` available for this file. Can not download.")
 
         local_file = is_local_file(self.file_path)
-        url = None if local_file else self._get_encoded_url()
 
         # if _credentials exists we want to decrypt the file
         if local_file and self._credentials:
             file_to_decrypt = Path(self.file_path)
-            buf = self._prepare_decrypt(file_to_decrypt.read_bytes())
             if custom_path is not None:
                 path = Path(custom_path)
             else:
                 path = Path(str(file_to_decrypt.parent) + "/decrypted_" + file_to_decrypt.name)
-            path.write_bytes(buf)
+            # Reading, decrypting and writing all block, so do it in one go in a worker thread
+            await asyncio.to_thread(self._decrypt_local_file, file_to_decrypt, path)
             return path
 
         if custom_path is not None and local_file:
-            shutil.copyfile(self.file_path, str(custom_path))
+            await asyncio.to_thread(
+                copy_local_file, Path(self.file_path), Path(custom_path), hard_link
+            )
             return Path(custom_path)
 
         if custom_path:
@@ -211,16 +248,28 @@ class File(TelegramObject):
         else:
             filename = Path(Path(self.file_path).name)
 
-        buf = await self.get_bot().request.retrieve(
-            url,
-            read_timeout=read_timeout,
-            write_timeout=write_timeout,
-            connect_timeout=connect_timeout,
-            pool_timeout=pool_timeout,
-        )
-        if self._credentials:
-            buf = self._prepare_decrypt(buf)
-        filename.write_bytes(buf)
+        offset = 0
+        if resume and not self._credentials and filename.is_file():
+            offset = filename.stat().st_size
+            if self.file_size is not None:
+                if offset == self.file_size:
+                    return filename
+                if offset > self.file_size:
+                    # This is not a partial download of this file, so we start over
+                    offset = 0
+
+        out = await asyncio.to_thread(filename.open, "ab" if offset else "wb")
+        try:
+            async for chunk in self.iter_bytes(
+                offset=offset,
+                read_timeout=read_timeout,
+                write_timeout=write_timeout,
+                connect_timeout=connect_timeout,
+                pool_timeout=pool_timeout,
+            ):
+                await asyncio.to_thread(out.write, chunk)
+        finally:
+            await asyncio.to_thread(out.close)
         return filename
 
     async def download_to_memory(
@@ -274,22 +323,13 @@ class File(TelegramObject):
         if not self.file_path:
             raise RuntimeError("No `file_path` available for this file. Can not download.")
 
-        local_file = is_local_file(self.file_path)
-        url = None if local_file else self._get_encoded_url()
-        path = Path(self.file_path) if local_file else None
-        if local_file:
-            buf = path.read_bytes()
-        else:
-            buf = await self.get_bot().request.retrieve(
-                url,
-                read_timeout=read_timeout,
-                write_timeout=write_timeout,
-                connect_timeout=connect_timeout,
-                pool_timeout=pool_timeout,
-            )
-        if self._credentials:
-            buf = self._prepare_decrypt(buf)
-        out.write(buf)
+        async for chunk in self.iter_bytes(
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+        ):
+            out.write(chunk)
 
     async def download_as_bytearray(
         self,
@@ -346,21 +386,94 @@ class File(TelegramObject):
         if buf is None:
             buf = bytearray()
 
+        async for chunk in self.iter_bytes(
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+        ):
+            buf.extend(chunk)
+        return buf
+
+    async def iter_bytes(
+        self,
+        offset: int = 0,
+        *,
+        read_timeout: ODVInput[float] = DEFAULT_NONE,
+        write_timeout: ODVInput[float] = DEFAULT_NONE,
+        connect_timeout: ODVInput[float] = DEFAULT_NONE,
+        pool_timeout: ODVInput[float] = DEFAULT_NONE,
+    ) -> AsyncIterator[bytes]:
+        """Download this file in chunks. In contrast to the other download methods, the file
+        doesn't have to be held in memory completely. This is useful e.g. for passing the file on
+        to another service.
+
+        Example:
+            .. code-block:: python
+
+                async for chunk in file.iter_bytes():
+                    await websocket.send(chunk)
+
+        If :attr:`file_path` is the path of a local file (which is the case when a Bot API Server
+        is running in local mode), the file is read from disk.
+
+        Note:
+            Encrypted files (e.g. a passport file) can only be decrypted as a whole. Hence, they
+            are downloaded completely before the first chunk is yielded.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            offset (:obj:`int`, optional): The number of bytes at the start of the file to skip,
+                e.g. to resume an interrupted download. Defaults to ``0``.
+
+        Keyword Args:
+            read_timeout (:obj:`float` | :obj:`None`, optional): Value to pass to
+                :paramref:`telegram.request.BaseRequest.retrieve_stream.read_timeout`. Defaults
+                to :attr:`~telegram.request.BaseRequest.DEFAULT_NONE`.
+            write_timeout (:obj:`float` | :obj:`None`, optional): Value to pass to
+                :paramref:`telegram.request.BaseRequest.retrieve_stream.write_timeout`. Defaults
+                to :attr:`~telegram.request.BaseRequest.DEFAULT_NONE`.
+            connect_timeout (:obj:`float` | :obj:`None`, optional): Value to pass to
+                :paramref:`telegram.request.BaseRequest.retrieve_stream.connect_timeout`.
+                Defaults to :attr:`~telegram.request.BaseRequest.DEFAULT_NONE`.
+            pool_timeout (:obj:`float` | :obj:`None`, optional): Value to pass to
+                :paramref:`telegram.request.BaseRequest.retrieve_stream.pool_timeout`. Defaults
+                to :attr:`~telegram.request.BaseRequest.DEFAULT_NONE`.
+
+        Yields:
+            :obj:`bytes`: The next chunk of the file.
+
+        Raises:
+            RuntimeError: If :attr:`file_path` is not set.
+        """
+        if not self.file_path:
+            raise RuntimeError("No `file_path` available for this file. Can not download.")
+
         if is_local_file(self.file_path):
-            bytes_data = Path(self.file_path).read_bytes()
+            chunks = iter_local_file(
+                Path(self.file_path), offset=0 if self._credentials else offset
+            )
         else:
-            bytes_data = await self.get_bot().request.retrieve(
+            chunks = self.get_bot().request.retrieve_stream(
                 self._get_encoded_url(),
+                offset=0 if self._credentials else offset,
                 read_timeout=read_timeout,
                 write_timeout=write_timeout,
                 connect_timeout=connect_timeout,
                 pool_timeout=pool_timeout,
             )
-        if self._credentials:
-            buf.extend(self._prepare_decrypt(bytes_data))
-        else:
-            buf.extend(bytes_data)
-        return buf
+
+        if not self._credentials:
+            async for chunk in chunks:
+                yield chunk
+            return
+
+        # Decryption needs the complete file
+        buf = bytearray()
+        async for chunk in chunks:
+            buf.extend(chunk)
+        yield self._prepare_decrypt(bytes(buf))[offset:]
 
     def set_credentials(self, credentials: "FileCredentials") -> None:
         """Sets the passport credentials for the file.
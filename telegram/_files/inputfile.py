@@ -19,12 +19,14 @@
 """This module contains an object that represents a Telegram InputFile."""
 
 import mimetypes
-from typing import IO, Optional, Union
+from collections.abc import AsyncIterable
+from pathlib import Path
+from typing import IO, Optional, Union, cast
 from uuid import uuid4
 
-from telegram._utils.files import guess_file_name, load_file
+from telegram._utils.files import LazyFile, guess_file_name, load_file
 from telegram._utils.strings import TextEncoding
-from telegram._utils.types import FieldTuple
+from telegram._utils.types import FieldTuple, FileContent
 
 _DEFAULT_MIME_TYPE = "application/octet-stream"
 
@@ -40,15 +42,27 @@ class InputFile:
           in addition.
 
     Args:
-        obj (:term:`file object` | :obj:`bytes` | :obj:`str`): An open file descriptor or the files
-            content as bytes or string.
+        obj (:term:`file object` | :obj:`bytes` | :obj:`str` | :class:`pathlib.Path` | \
+            :term:`asynchronous iterable` of :obj:`bytes`): An open file descriptor, the files
+            content as bytes or string, the path of a local file or an asynchronous iterable that
+            yields the content of the file in chunks.
 
             Note:
                 If :paramref:`obj` is a string, it will be encoded as bytes via
                 :external:obj:`obj.encode('utf-8') <str.encode>`.
 
+            Tip:
+                Local files passed as :class:`pathlib.Path` and asynchronous iterables are not
+                read into memory. Instead, the networking backend streams them in chunks when the
+                request is made. Note that an asynchronous iterable can usually be consumed only
+                once, i.e. the request can't be repeated. Moreover, custom networking backends
+                only support asynchronous iterables if they use
+                :meth:`telegram.request.RequestData.multipart_stream`.
+
             .. versionchanged:: 20.0
                 Accept string input.
+            .. versionchanged:: NEXT.VERSION
+                Accept :class:`pathlib.Path` and asynchronous iterables.
         filename (:obj:`str`, optional): Filename for this InputFile.
         attach (:obj:`bool`, optional): Pass :obj:`True` if the parameter this file belongs to in
             the request to Telegram should point to the multipart data via an ``attach://`` URI.
@@ -82,7 +96,12 @@ class InputFile:
 
 
     Attributes:
-        input_file_content (:obj:`bytes` | :class:`IO`): The binary content of the file to send.
+        input_file_content (:obj:`bytes` | :class:`IO` | :class:`pathlib.Path` | \
+            :term:`asynchronous iterable` of :obj:`bytes`): The binary content of the file to
+            send, or the source to read it from when the request is made.
+
+            .. versionchanged:: NEXT.VERSION
+                May now be a :class:`pathlib.Path` or an asynchronous iterable.
         attach_name (:obj:`str`): Optional. If present, the parameter this file belongs to in
             the request to Telegram should point to the multipart data via a an URI of the form
             ``attach://<attach_name>`` URI.
@@ -95,17 +114,22 @@ class InputFile:
 
     def __init__(
         self,
-        obj: Union[IO[bytes], bytes, str],
+        obj: Union[IO[bytes], bytes, str, Path, AsyncIterable[bytes]],
         filename: Optional[str] = None,
         attach: bool = False,
         read_file_handle: bool = True,
     ):
         if isinstance(obj, bytes):
-            self.input_file_content: Union[bytes, IO[bytes]] = obj
+            self.input_file_content: FileContent = obj
         elif isinstance(obj, str):
             self.input_file_content = obj.encode(TextEncoding.UTF_8)
+        elif isinstance(obj, Path):
+            self.input_file_content = obj
+            filename = filename or obj.name
+        elif isinstance(obj, AsyncIterable):
+            self.input_file_content = obj
         elif read_file_handle:
-            reported_filename, self.input_file_content = load_file(obj)
+            reported_filename, self.input_file_content = load_file(cast(IO[bytes], obj))
             filename = filename or reported_filename
         else:
             self.input_file_content = obj
@@ -128,10 +152,17 @@ class InputFile:
 
         .. versionchanged:: 21.5
             Content may now be a file handle.
+        .. versionchanged:: NEXT.VERSION
+            Content may now be an asynchronous iterable. Local files passed as
+            :class:`pathlib.Path` are given as file handle that opens the file only when it is
+            first read.
 
         Returns:
-            tuple[:obj:`str`, :obj:`bytes` | :class:`IO`, :obj:`str`]:
+            tuple[:obj:`str`, :obj:`bytes` | :class:`IO` | :term:`asynchronous iterable`, \
+            :obj:`str`]:
         """
+        if isinstance(self.input_file_content, Path):
+            return self.filename, cast(IO[bytes], LazyFile(self.input_file_content)), self.mimetype
         return self.filename, self.input_file_content, self.mimetype
 
     @property
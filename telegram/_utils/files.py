@@ -28,10 +28,15 @@ Warning:
     the changelog.
 """
 
+import asyncio
+import os
+import secrets
+import shutil
+from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import IO, TYPE_CHECKING, Any, Optional, TypeVar, Union, cast, overload
 
-from telegram._utils.types import FileInput, FilePathInput
+from telegram._utils.types import FileContent, FileInput, FilePathInput
 
 if TYPE_CHECKING:
     from telegram import InputFile, TelegramObject
@@ -76,6 +81,167 @@ def guess_file_name(obj: FileInput) -> Optional[str]:
     return None
 
 
+class LazyFile:
+    """A binary file handle for a local file that opens the file only when it is first used.
+    :attr:`telegram.InputFile.field_tuple` uses this for files passed as :class:`pathlib.Path`,
+    such that networking backends can treat them like any other file handle.
+    """
+
+    __slots__ = ("_file", "path")
+
+    def __init__(self, path: Path):
+        self.path: Path = path
+        self._file: Optional[IO[bytes]] = None
+
+    def _get_file(self) -> IO[bytes]:
+        if self._file is None:
+            self._file = self.path.open("rb")
+        return self._file
+
+    @property
+    def name(self) -> str:
+        return str(self.path)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._get_file().read(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._get_file().seek(offset, whence)
+
+    def tell(self) -> int:
+        return 0 if self._file is None else self._file.tell()
+
+    def seekable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+    def fileno(self) -> int:
+        return self._get_file().fileno()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def get_content_length(content: FileContent) -> Optional[int]:
+    """Returns the number of bytes that :func:`iter_file_content` will yield for the content or
+    :obj:`None`, if that can't be determined without reading the content.
+    """
+    if isinstance(content, bytes):
+        return len(content)
+    if isinstance(content, LazyFile):
+        content = content.path
+    if isinstance(content, Path):
+        return content.stat().st_size
+
+    try:
+        if content.seekable():  # type: ignore[union-attr]
+            file_handle = cast(IO[bytes], content)
+            position = file_handle.tell()
+            size = file_handle.seek(0, os.SEEK_END)
+            file_handle.seek(position)
+            return size
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+async def iter_local_file(
+    path: Path, offset: int = 0, chunk_size: int = 64 * 1024
+) -> AsyncIterator[bytes]:
+    """Yields the content of a local file from :paramref:`offset` on in chunks of at most
+    :paramref:`chunk_size` bytes. The file is read in a worker thread, so that reading large files
+    doesn't block the event loop.
+    """
+    file_handle: IO[bytes] = await asyncio.to_thread(path.open, "rb")
+    try:
+        if offset:
+            file_handle.seek(offset)
+        while chunk := await asyncio.to_thread(file_handle.read, chunk_size):
+            yield chunk
+    finally:
+        file_handle.close()
+
+
+def copy_local_file(source: Path, destination: Path, hard_link: bool = False) -> None:
+    """Copies the local file :paramref:`source` to :paramref:`destination`, overwriting it if it
+    exists. This blocks, so call it in a worker thread.
+
+    The data is copied within the kernel where possible: :func:`os.copy_file_range` lets the file
+    system share the data blocks instead of duplicating them (reflinks), and
+    :func:`shutil.copyfile` uses e.g. :func:`os.sendfile` as fallback. If :paramref:`hard_link`
+    is :obj:`True`, a hard link to :paramref:`source` is created instead, if both are on the same
+    file system.
+
+    Raises:
+        :exc:`shutil.SameFileError`: If :paramref:`source` and :paramref:`destination` are the same
+            file.
+    """
+    if destination.exists() and source.samefile(destination):
+        raise shutil.SameFileError(f"{source!s} and {destination!s} are the same file")
+
+    if hard_link:
+        # Link to a temporary name first, such that an existing destination is replaced
+        # atomically
+        temporary = destination.with_name(f".{destination.name}.{secrets.token_hex(8)}")
+        try:
+            os.link(source, temporary)
+        except OSError:
+            pass
+        else:
+            temporary.replace(destination)
+            return
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            with source.open("rb") as src, destination.open("wb") as dst:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0 and (
+                    copied := os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                ):
+                    remaining -= copied
+            if remaining <= 0:
+                return
+        except OSError:
+            # e.g. not supported by the file system or across file systems
+            pass
+
+    shutil.copyfile(source, destination)
+
+
+async def iter_file_content(content: FileContent, chunk_size: int) -> AsyncIterator[bytes]:
+    """Yields the content of a file to be uploaded in chunks of at most :paramref:`chunk_size`
+    bytes, except for :obj:`bytes` input, which is yielded as is. Files are read in a worker
+    thread, so that reading large files doesn't block the event loop.
+    """
+    if isinstance(content, bytes):
+        yield content
+        return
+
+    if isinstance(content, LazyFile):
+        # Opening and reading the file in a worker thread is preferable to the file handle
+        content = content.path
+    if isinstance(content, Path):
+        async for chunk in iter_local_file(content, chunk_size=chunk_size):
+            yield chunk
+        return
+
+    if hasattr(content, "read"):
+        file_handle = cast(IO[bytes], content)
+        # Like httpx, we upload file handles from the start. This way, the complete file is sent
+        # again if the request is retried.
+        if hasattr(file_handle, "seekable") and file_handle.seekable():
+            file_handle.seek(0)
+        while chunk := await asyncio.to_thread(file_handle.read, chunk_size):
+            yield chunk
+        return
+
+    async for chunk in content:
+        yield chunk
+
+
 def is_local_file(obj: Optional[FilePathInput]) -> bool:
     """
     Checks if a given string is a file on local system.
@@ -107,8 +273,8 @@ def parse_file_input(  # pylint: disable=too-many-return-statements
 
         * if ``local_mode`` is ``True``, adds the ``file://`` prefix. If the input is a relative
         path of a local file, computes the absolute path and adds the ``file://`` prefix.
-        * if ``local_mode`` is ``False``, loads the file as binary data and builds an
-          :class:`InputFile` from that
+        * if ``local_mode`` is ``False``, builds an :class:`InputFile` that reads the file only
+          when it is uploaded
 
       Returns the input unchanged, otherwise.
     * :class:`pathlib.Path` objects are treated the same way as strings.
@@ -145,7 +311,7 @@ def parse_file_input(  # pylint: disable=too-many-return-statements
             path = Path(file_input)
             if local_mode:
                 return path.absolute().as_uri()
-            return InputFile(path.open(mode="rb"), filename=filename, attach=attach)
+            return InputFile(path, filename=filename, attach=attach)
 
         return file_input
     if isinstance(file_input, bytes):
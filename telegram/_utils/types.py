@@ -23,7 +23,7 @@ Warning:
     user. Changes to this module are not considered breaking changes and may not be documented in
     the changelog.
 """
-from collections.abc import Collection
+from collections.abc import AsyncIterable, Collection
 from pathlib import Path
 from typing import IO, TYPE_CHECKING, Any, Literal, Optional, TypeVar, Union
 
@@ -72,7 +72,10 @@ ReplyMarkup = Union[
 .. versionadded:: 20.0
 """
 
-FieldTuple = tuple[str, Union[bytes, IO[bytes]], str]
+FileContent = Union[bytes, IO[bytes], Path, AsyncIterable[bytes]]
+"""Content of a file to be uploaded: Either the data itself, a file handle, the path of a local
+file or an async iterable of chunks of data."""
+FieldTuple = tuple[str, FileContent, str]
 """Alias for return type of `InputFile.field_tuple`."""
 UploadFileDict = dict[str, FieldTuple]
 """Dictionary containing file data to be uploaded to the API."""
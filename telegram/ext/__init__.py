@@ -23,14 +23,18 @@ __all__ = (
     "Application",
     "ApplicationBuilder",
     "ApplicationHandlerStop",
+    "BaseCallbackDataStore",
     "BaseHandler",
+    "BaseKeyValueClient",
     "BasePersistence",
     "BaseRateLimiter",
     "BaseUpdateProcessor",
+    "BulkJob",
     "BusinessConnectionHandler",
     "BusinessMessagesDeletedHandler",
     "CallbackContext",
     "CallbackDataCache",
+    "CallbackDataCodec",
     "CallbackQueryHandler",
     "ChatBoostHandler",
     "ChatJoinRequestHandler",
@@ -41,20 +45,32 @@ __all__ = (
     "ConversationHandler",
     "Defaults",
     "DictPersistence",
+    "EditCoalescer",
+    "EntityStore",
     "ExtBot",
+    "FileIdCache",
+    "HeapJobQueue",
+    "InMemoryCallbackDataStore",
+    "InMemoryKeyValueClient",
     "InlineQueryHandler",
     "InvalidCallbackData",
     "Job",
     "JobQueue",
+    "KeyValuePersistence",
     "MessageHandler",
     "MessageReactionHandler",
+    "MessageTemplate",
     "PaidMediaPurchasedHandler",
     "PersistenceInput",
+    "PersistentJobQueue",
     "PicklePersistence",
     "PollAnswerHandler",
     "PollHandler",
     "PreCheckoutQueryHandler",
     "PrefixHandler",
+    "RequestCoalescer",
+    "ResponseCache",
+    "SQLiteCallbackDataStore",
     "ShippingQueryHandler",
     "SimpleUpdateProcessor",
     "StringCommandHandler",
@@ -68,15 +84,20 @@ from . import filters
 from ._aioratelimiter import AIORateLimiter
 from ._application import Application, ApplicationHandlerStop
 from ._applicationbuilder import ApplicationBuilder
+from ._basecallbackdatastore import BaseCallbackDataStore
 from ._basepersistence import BasePersistence, PersistenceInput
 from ._baseratelimiter import BaseRateLimiter
 from ._baseupdateprocessor import BaseUpdateProcessor, SimpleUpdateProcessor
 from ._callbackcontext import CallbackContext
 from ._callbackdatacache import CallbackDataCache, InvalidCallbackData
+from ._callbackdatacodec import CallbackDataCodec
 from ._contexttypes import ContextTypes
 from ._defaults import Defaults
 from ._dictpersistence import DictPersistence
+from ._editcoalescer import EditCoalescer
+from ._entitystore import EntityStore
 from ._extbot import ExtBot
+from ._fileidcache import FileIdCache
 from ._handlers.basehandler import BaseHandler
 from ._handlers.businessconnectionhandler import BusinessConnectionHandler
 from ._handlers.businessmessagesdeletedhandler import BusinessMessagesDeletedHandler
@@ -99,6 +120,14 @@ from ._handlers.shippingqueryhandler import ShippingQueryHandler
 from ._handlers.stringcommandhandler import StringCommandHandler
 from ._handlers.stringregexhandler import StringRegexHandler
 from ._handlers.typehandler import TypeHandler
-from ._jobqueue import Job, JobQueue
+from ._heapjobqueue import HeapJobQueue
+from ._inmemorycallbackdatastore import InMemoryCallbackDataStore
+from ._jobqueue import BulkJob, Job, JobQueue
+from ._keyvaluepersistence import BaseKeyValueClient, InMemoryKeyValueClient, KeyValuePersistence
+from ._messagetemplate import MessageTemplate
+from ._persistentjobqueue import PersistentJobQueue
 from ._picklepersistence import PicklePersistence
+from ._requestcoalescer import RequestCoalescer
+from ._responsecache import ResponseCache
+from ._sqlitecallbackdatastore import SQLiteCallbackDataStore
 from ._updater import Updater
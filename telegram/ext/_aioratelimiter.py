@@ -23,7 +23,7 @@ import asyncio
 import contextlib
 import sys
 from collections.abc import AsyncIterator, Coroutine
-from typing import Any, Callable, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
 
 try:
     from aiolimiter import AsyncLimiter
@@ -37,6 +37,9 @@ from telegram._utils.types import JSONDict
 from telegram.error import RetryAfter
 from telegram.ext._baseratelimiter import BaseRateLimiter
 
+if TYPE_CHECKING:
+    from telegram.ext import EntityStore
+
 # Useful for something like:
 #    async with group_limiter if group else null_context():
 # so we don't have to differentiate between "I'm using a context manager" and "I'm not"
@@ -78,9 +81,9 @@ class AIORateLimiter(BaseRateLimiter[int]):
 
     Attention:
         * Some bot methods accept a ``chat_id`` parameter in form of a ``@username`` for
-          supergroups and channels. As we can't know which ``@username`` corresponds to which
-          integer ``chat_id``, these will be treated as different groups, which may lead to
-          exceeding the rate limit.
+          supergroups and channels. Unless :paramref:`entity_store` knows which ``@username``
+          corresponds to which integer ``chat_id``, these will be treated as different groups,
+          which may lead to exceeding the rate limit.
         * As channels can't be differentiated from supergroups by the ``@username`` or integer
           ``chat_id``, this also applies the group related rate limits to channels.
         * A :exc:`~telegram.error.RetryAfter` exception will halt *all* requests for
@@ -114,11 +117,19 @@ class AIORateLimiter(BaseRateLimiter[int]):
         max_retries (:obj:`int`): The maximum number of retries to be made in case of a
             :exc:`~telegram.error.RetryAfter` exception.
             If set to 0, no retries will be made. Defaults to ``0``.
+        entity_store (:class:`telegram.ext.EntityStore`, optional): If passed, ``@username``
+            chat ids are resolved to integer chat ids with
+            :meth:`~telegram.ext.EntityStore.resolve_username`, such that requests addressing
+            the same chat by username and by id share the same group limit. Pass the instance
+            that is also set as :attr:`telegram.ext.Application.entity_store`.
+
+            .. versionadded:: NEXT.VERSION
 
     """
 
     __slots__ = (
         "_base_limiter",
+        "_entity_store",
         "_group_limiters",
         "_group_max_rate",
         "_group_time_period",
@@ -133,6 +144,7 @@ class AIORateLimiter(BaseRateLimiter[int]):
         group_max_rate: float = 20,
         group_time_period: float = 60,
         max_retries: int = 0,
+        entity_store: Optional["EntityStore"] = None,
     ) -> None:
         if not AIO_LIMITER_AVAILABLE:
             raise RuntimeError(
@@ -155,6 +167,7 @@ class AIORateLimiter(BaseRateLimiter[int]):
 
         self._group_limiters: dict[Union[str, int], AsyncLimiter] = {}
         self._max_retries: int = max_retries
+        self._entity_store: Optional[EntityStore] = entity_store
         self._retry_after_event = asyncio.Event()
         self._retry_after_event.set()
 
@@ -236,6 +249,9 @@ class AIORateLimiter(BaseRateLimiter[int]):
         with contextlib.suppress(ValueError, TypeError):
             chat_id = int(chat_id)
 
+        if isinstance(chat_id, str) and self._entity_store is not None:
+            chat_id = self._entity_store.resolve_username(chat_id) or chat_id
+
         if (isinstance(chat_id, int) and chat_id < 0) or isinstance(chat_id, str):
             # string chat_id only works for channels and supergroups
             # We can't really tell channels from groups though ...
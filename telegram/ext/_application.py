@@ -45,13 +45,13 @@ from telegram._utils.repr import build_repr_with_selected_attrs
 from telegram._utils.types import SCT, DVType, ODVInput
 from telegram._utils.warnings import warn
 from telegram.error import TelegramError
-from telegram.ext._basepersistence import BasePersistence
+from telegram.ext._basepersistence import BasePersistence, _PersistenceErrors
 from telegram.ext._contexttypes import ContextTypes
 from telegram.ext._extbot import ExtBot
 from telegram.ext._handlers.basehandler import BaseHandler
 from telegram.ext._updater import Updater
+from telegram.ext._utils.conversationstore import ConversationStateStore
 from telegram.ext._utils.stack import was_called_by
-from telegram.ext._utils.trackingdict import TrackingDict
 from telegram.ext._utils.types import BD, BT, CCT, CD, JQ, RT, UD, ConversationKey, HandlerCallback
 from telegram.warnings import PTBDeprecationWarning
 
@@ -62,6 +62,7 @@ if TYPE_CHECKING:
     from telegram.ext import ConversationHandler, JobQueue
     from telegram.ext._applicationbuilder import InitApplicationBuilder
     from telegram.ext._baseupdateprocessor import BaseUpdateProcessor
+    from telegram.ext._entitystore import EntityStore
     from telegram.ext._jobqueue import Job
 
 DEFAULT_GROUP: int = 0
@@ -231,6 +232,11 @@ class Application(
             the application via :meth:`stop`.
 
             .. versionadded:: 20.1
+        entity_store (:class:`telegram.ext.EntityStore`): Optional. Keeps the latest users and
+            chats seen in incoming updates. Set via
+            :meth:`telegram.ext.ApplicationBuilder.entity_store`.
+
+            .. versionadded:: NEXT.VERSION
 
     """
 
@@ -257,6 +263,7 @@ class Application(
             "bot_data",
             "chat_data",
             "context_types",
+            "entity_store",
             "error_handlers",
             "handlers",
             "persistence",
@@ -294,6 +301,7 @@ class Application(
         post_stop: Optional[
             Callable[["Application[BT, CCT, UD, CD, BD, JQ]"], Coroutine[Any, Any, None]]
         ],
+        entity_store: Optional["EntityStore"] = None,
     ):
         if not was_called_by(
             inspect.currentframe(), Path(__file__).parent.resolve() / "_applicationbuilder.py"
@@ -332,6 +340,7 @@ class Application(
         if persistence and not isinstance(persistence, BasePersistence):
             raise TypeError("persistence must be based on telegram.ext.BasePersistence")
         self.persistence = persistence
+        self.entity_store: Optional[EntityStore] = entity_store
 
         # Some bookkeeping for persistence logic
         self._chat_ids_to_be_updated_in_persistence: set[int] = set()
@@ -341,9 +350,7 @@ class Application(
 
         # This attribute will hold references to the conversation dicts of all conversation
         # handlers so that we can extract the changed states during `update_persistence`
-        self._conversation_handler_conversations: dict[
-            str, TrackingDict[ConversationKey, object]
-        ] = {}
+        self._conversation_handler_conversations: dict[str, ConversationStateStore] = {}
 
         # A number of low-level helpers for the internal logic
         self._initialized = False
@@ -570,8 +577,10 @@ class Application(
 
         # Mypy doesn't know that persistence.set_bot (see above) already checks that
         # self.bot is an instance of ExtBot if callback_data should be stored ...
+        # Stores that are persistent by themselves don't need to be loaded from the persistence
         if self.persistence.store_data.callback_data and (
             self.bot.callback_data_cache is not None  # type: ignore[attr-defined]
+            and not self.bot.callback_data_cache.store.is_persistent  # type: ignore[attr-defined]
         ):
             persistent_data = await self.persistence.get_callback_data()
             if persistent_data is not None:
@@ -581,6 +590,17 @@ class Application(
                     persistent_data
                 )
 
+        if (
+            self.persistence.store_data.file_id_cache
+            and isinstance(self.bot, ExtBot)
+            and self.bot.file_id_cache is not None
+        ):
+            file_ids = await self.persistence.get_file_id_cache()
+            if file_ids is not None:
+                if not isinstance(file_ids, dict):
+                    raise ValueError("file_id_cache must be a dict")
+                self.bot.file_id_cache.load_persistence_data(file_ids)
+
     async def start(self) -> None:
         """Starts
 
@@ -1264,6 +1284,12 @@ class Application(
             Persistence is now updated in an interval set by
             :attr:`telegram.ext.BasePersistence.update_interval`.
 
+        .. versionchanged:: NEXT.VERSION
+            Passes the update to :meth:`telegram.ext.ResponseCache.process_update` and
+            :meth:`telegram.ext.EntityStore.process_update` before the handlers, if
+            :attr:`telegram.ext.ExtBot.response_cache` and :attr:`entity_store` are set,
+            respectively.
+
         Args:
             update (:class:`telegram.Update` | :obj:`object` | \
                 :class:`telegram.error.TelegramError`): The update to process.
@@ -1274,6 +1300,16 @@ class Application(
         # Processing updates before initialize() is a problem e.g. if persistence is used
         self._check_initialized()
 
+        # Drop cached results that are outdated by the update before handlers can request them
+        if (
+            isinstance(update, Update)
+            and isinstance(self.bot, ExtBot)
+            and self.bot.response_cache is not None
+        ):
+            self.bot.response_cache.process_update(update)
+        if isinstance(update, Update) and self.entity_store is not None:
+            self.entity_store.process_update(update)
+
         context = None
         any_blocking = False  # Flag which is set to True if any handler specifies block=True
 
@@ -1657,6 +1693,23 @@ class Application(
         were used or have been manually marked via :meth:`mark_data_for_update_persistence` since
         the last run of this method.
 
+        All changed entries of :attr:`user_data`, :attr:`chat_data` and of each conversation
+        handler are handed over in one go via the batch methods of
+        :class:`~telegram.ext.BasePersistence`, e.g.
+        :meth:`~telegram.ext.BasePersistence.update_user_data_many`.
+
+        Changes of :attr:`~telegram.ext.ExtBot.callback_data_cache` are handed over via
+        :meth:`~telegram.ext.BasePersistence.update_callback_data_delta`, if possible. If handing
+        them over fails, the complete data is handed over on the next run. Changes of
+        :attr:`~telegram.ext.ExtBot.file_id_cache` are handed over via
+        :meth:`~telegram.ext.BasePersistence.update_file_id_cache`, if
+        :attr:`~telegram.ext.PersistenceInput.file_id_cache` is :obj:`True`. If that fails, they
+        are handed over again on the next run.
+
+        .. versionchanged:: NEXT.VERSION
+            Uses the batch methods of :class:`~telegram.ext.BasePersistence` and also updates
+            :attr:`~telegram.ext.ExtBot.file_id_cache`.
+
         Tip:
             This method will be called in regular intervals by the application. There is usually
             no need to call it manually.
@@ -1683,12 +1736,39 @@ class Application(
         # self.bot is an instance of ExtBot if callback_data should be stored ...
         if self.persistence.store_data.callback_data and (
             self.bot.callback_data_cache is not None  # type: ignore[attr-defined]
+            and not self.bot.callback_data_cache.store.is_persistent  # type: ignore[attr-defined]
         ):
-            coroutines.add(
-                self.persistence.update_callback_data(
-                    deepcopy(
-                        self.bot.callback_data_cache.persistence_data  # type: ignore[attr-defined]
+            cache = self.bot.callback_data_cache  # type: ignore[attr-defined]
+            delta = cache.pop_persistence_delta()
+            if delta is None:
+                coroutines.add(
+                    self.__persist(
+                        self.persistence.update_callback_data(deepcopy(cache.persistence_data)),
+                        cache.discard_persistence_delta,
+                    )
+                )
+            else:
+                data, dropped_keyboards, dropped_callback_queries = delta
+                if data[0] or data[1] or dropped_keyboards or dropped_callback_queries:
+                    coroutines.add(
+                        self.__persist(
+                            self.persistence.update_callback_data_delta(
+                                deepcopy(data), dropped_keyboards, dropped_callback_queries
+                            ),
+                            cache.discard_persistence_delta,
+                        )
                     )
+
+        if (
+            self.persistence.store_data.file_id_cache
+            and isinstance(self.bot, ExtBot)
+            and self.bot.file_id_cache is not None
+            and self.bot.file_id_cache.pop_changed()
+        ):
+            coroutines.add(
+                self.__persist(
+                    self.persistence.update_file_id_cache(self.bot.file_id_cache.persistence_data),
+                    self.bot.file_id_cache.mark_changed,
                 )
             )
 
@@ -1704,12 +1784,14 @@ class Application(
             # We don't want to update any data that has been deleted!
             update_ids -= delete_ids
 
-            for chat_id in update_ids:
+            if update_ids:
                 coroutines.add(
-                    self.persistence.update_chat_data(chat_id, deepcopy(self.chat_data[chat_id]))
+                    self.persistence.update_chat_data_many(
+                        {chat_id: deepcopy(self.chat_data[chat_id]) for chat_id in update_ids}
+                    )
                 )
-            for chat_id in delete_ids:
-                coroutines.add(self.persistence.drop_chat_data(chat_id))
+            if delete_ids:
+                coroutines.add(self.persistence.drop_chat_data_many(delete_ids))
 
         if self.persistence.store_data.user_data:
             update_ids = self._user_ids_to_be_updated_in_persistence
@@ -1720,17 +1802,20 @@ class Application(
             # We don't want to update any data that has been deleted!
             update_ids -= delete_ids
 
-            for user_id in update_ids:
+            if update_ids:
                 coroutines.add(
-                    self.persistence.update_user_data(user_id, deepcopy(self.user_data[user_id]))
+                    self.persistence.update_user_data_many(
+                        {user_id: deepcopy(self.user_data[user_id]) for user_id in update_ids}
+                    )
                 )
-            for user_id in delete_ids:
-                coroutines.add(self.persistence.drop_user_data(user_id))
+            if delete_ids:
+                coroutines.add(self.persistence.drop_user_data_many(delete_ids))
 
         # Unfortunately due to circular imports this has to be here
         # pylint: disable=import-outside-toplevel
         from telegram.ext._handlers.conversationhandler import PendingState
 
+        conversation_states: dict[str, dict[ConversationKey, Optional[object]]] = {}
         for name, (key, new_state) in itertools.chain.from_iterable(
             zip(itertools.repeat(name), states_dict.pop_accessed_write_items())
             for name, states_dict in self._conversation_handler_conversations.items()
@@ -1761,24 +1846,34 @@ class Application(
             else:
                 result = new_state
 
-            effective_new_state = None if result is TrackingDict.DELETED else result
-            coroutines.add(
-                self.persistence.update_conversation(
-                    name=name, key=key, new_state=effective_new_state
-                )
-            )
+            effective_new_state = None if result is ConversationStateStore.DELETED else result
+            conversation_states.setdefault(name, {})[key] = effective_new_state
+
+        for name, states in conversation_states.items():
+            coroutines.add(self.persistence.update_conversations_many(name=name, states=states))
 
         results = await asyncio.gather(*coroutines, return_exceptions=True)
         _LOGGER.debug("Finished updating persistence.")
 
-        # dispatch any errors
-        await asyncio.gather(
-            *(
-                self.process_error(error=result, update=None)
-                for result in results
-                if isinstance(result, Exception)
-            )
-        )
+        # dispatch any errors, those of the single-key calls of the batch methods one by one
+        errors: list[Exception] = []
+        for result in results:
+            if isinstance(result, _PersistenceErrors):
+                errors.extend(result.errors)
+            elif isinstance(result, Exception):
+                errors.append(result)
+        await asyncio.gather(*(self.process_error(error=error, update=None) for error in errors))
+
+    @staticmethod
+    async def __persist(coroutine: Awaitable[None], on_error: Callable[[], None]) -> None:
+        """Awaits a write to the persistence. If it fails, calls :paramref:`on_error`, such that
+        the changes that were already popped from a cache are handed over again on the next run.
+        """
+        try:
+            await coroutine
+        except Exception:
+            on_error()
+            raise
 
     def add_error_handler(
         self,
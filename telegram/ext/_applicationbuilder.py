@@ -18,7 +18,7 @@
 # along with this program.  If not, see [http://www.gnu.org/licenses/].
 """This module contains the Builder classes for the telegram.ext module."""
 from asyncio import Queue
-from collections.abc import Collection, Coroutine
+from collections.abc import Collection, Coroutine, Mapping
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable, Generic, Optional, TypeVar, Union
 
@@ -31,17 +31,30 @@ from telegram._utils.warnings import warn
 from telegram.ext._application import Application
 from telegram.ext._baseupdateprocessor import BaseUpdateProcessor, SimpleUpdateProcessor
 from telegram.ext._contexttypes import ContextTypes
+from telegram.ext._entitystore import EntityStore
 from telegram.ext._extbot import ExtBot
 from telegram.ext._jobqueue import JobQueue
 from telegram.ext._updater import Updater
 from telegram.ext._utils.types import BD, BT, CCT, CD, JQ, UD
 from telegram.request import BaseRequest
 from telegram.request._httpxrequest import HTTPXRequest
+from telegram.request._trafficclassrequest import TrafficClassRequest
 from telegram.warnings import PTBDeprecationWarning
 
 if TYPE_CHECKING:
     from telegram import Update
-    from telegram.ext import BasePersistence, BaseRateLimiter, CallbackContext, Defaults
+    from telegram.ext import (
+        BaseCallbackDataStore,
+        BasePersistence,
+        BaseRateLimiter,
+        CallbackContext,
+        CallbackDataCodec,
+        Defaults,
+        EditCoalescer,
+        FileIdCache,
+        RequestCoalescer,
+        ResponseCache,
+    )
     from telegram.ext._utils.types import RLARGS
 
 # Type hinting is a bit complicated here because we try to get to a sane level of
@@ -69,6 +82,7 @@ _BOT_CHECKS = [
     ("write_timeout", "write_timeout"),
     ("media_write_timeout", "media_write_timeout"),
     ("http_version", "http_version"),
+    ("traffic_classes", "traffic_classes"),
     ("get_updates_connection_pool_size", "get_updates_connection_pool_size"),
     ("get_updates_proxy", "get_updates_proxy"),
     ("get_updates_socket_options", "get_updates_socket_options"),
@@ -82,6 +96,10 @@ _BOT_CHECKS = [
     ("token", "token"),
     ("defaults", "defaults"),
     ("arbitrary_callback_data", "arbitrary_callback_data"),
+    ("file_id_cache", "file_id_cache"),
+    ("response_cache", "response_cache"),
+    ("request_coalescer", "request_coalescer"),
+    ("edit_coalescer", "edit_coalescer"),
     ("private_key", "private_key"),
     ("rate_limiter", "rate_limiter instance"),
     ("local_mode", "local_mode setting"),
@@ -130,6 +148,10 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
         "_connection_pool_size",
         "_context_types",
         "_defaults",
+        "_edit_coalescer",
+        "_endpoint_classes",
+        "_entity_store",
+        "_file_id_cache",
         "_get_updates_connect_timeout",
         "_get_updates_connection_pool_size",
         "_get_updates_http_version",
@@ -154,8 +176,11 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
         "_rate_limiter",
         "_read_timeout",
         "_request",
+        "_request_coalescer",
+        "_response_cache",
         "_socket_options",
         "_token",
+        "_traffic_classes",
         "_update_processor",
         "_update_queue",
         "_updater",
@@ -175,6 +200,8 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
         self._media_write_timeout: ODVInput[float] = DEFAULT_NONE
         self._pool_timeout: ODVInput[float] = DEFAULT_NONE
         self._request: DVInput[BaseRequest] = DEFAULT_NONE
+        self._traffic_classes: DVInput[Mapping[str, BaseRequest]] = DEFAULT_NONE
+        self._endpoint_classes: Optional[Mapping[str, str]] = None
         self._get_updates_connection_pool_size: DVInput[int] = DEFAULT_NONE
         self._get_updates_proxy: DVInput[Union[str, httpx.Proxy, httpx.URL]] = DEFAULT_NONE
         self._get_updates_socket_options: DVInput[Collection[SocketOpt]] = DEFAULT_NONE
@@ -187,8 +214,15 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
         self._private_key: ODVInput[bytes] = DEFAULT_NONE
         self._private_key_password: ODVInput[bytes] = DEFAULT_NONE
         self._defaults: ODVInput[Defaults] = DEFAULT_NONE
-        self._arbitrary_callback_data: Union[DefaultValue[bool], int] = DEFAULT_FALSE
+        self._arbitrary_callback_data: Union[
+            DefaultValue[bool], int, BaseCallbackDataStore, CallbackDataCodec
+        ] = DEFAULT_FALSE
         self._local_mode: DVType[bool] = DEFAULT_FALSE
+        self._file_id_cache: Union[DefaultValue[bool], int, FileIdCache] = DEFAULT_FALSE
+        self._response_cache: Union[DVType[bool], ResponseCache] = DEFAULT_FALSE
+        self._request_coalescer: Union[DVType[bool], RequestCoalescer] = DEFAULT_FALSE
+        self._edit_coalescer: Union[DVType[bool], EditCoalescer] = DEFAULT_FALSE
+        self._entity_store: Union[DVType[bool], EntityStore] = DEFAULT_FALSE
         self._bot: DVInput[Bot] = DEFAULT_NONE
         self._update_queue: DVType[Queue[Union[Update, object]]] = DefaultValue(Queue())
 
@@ -218,6 +252,19 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
         if not isinstance(getattr(self, f"{prefix}request"), DefaultValue):
             return getattr(self, f"{prefix}request")
 
+        if not get_updates and not isinstance(self._traffic_classes, DefaultValue):
+            requests = dict(self._traffic_classes)
+            if TrafficClassRequest.INTERACTIVE not in requests:
+                # The request built from the other arguments is used for all remaining traffic
+                requests[TrafficClassRequest.INTERACTIVE] = self._build_httpx_request(
+                    get_updates=False
+                )
+            return TrafficClassRequest(requests, endpoint_classes=self._endpoint_classes)
+
+        return self._build_httpx_request(get_updates)
+
+    def _build_httpx_request(self, get_updates: bool) -> HTTPXRequest:
+        prefix = "_get_updates_" if get_updates else "_"
         proxy = DefaultValue.get_value(getattr(self, f"{prefix}proxy"))
         socket_options = DefaultValue.get_value(getattr(self, f"{prefix}socket_options"))
         if get_updates:
@@ -270,8 +317,20 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
             get_updates_request=self._build_request(get_updates=True),
             rate_limiter=DefaultValue.get_value(self._rate_limiter),
             local_mode=DefaultValue.get_value(self._local_mode),
+            file_id_cache=DefaultValue.get_value(self._file_id_cache),
+            response_cache=DefaultValue.get_value(self._response_cache),
+            request_coalescer=DefaultValue.get_value(self._request_coalescer),
+            edit_coalescer=DefaultValue.get_value(self._edit_coalescer),
         )
 
+    def _build_entity_store(self) -> Optional[EntityStore]:
+        entity_store = DefaultValue.get_value(self._entity_store)
+        if entity_store is False:
+            return None
+        if entity_store is True:
+            return EntityStore()
+        return entity_store
+
     def _bot_check(self, name: str) -> None:
         if self._bot is not DEFAULT_NONE:
             raise RuntimeError(_TWO_ARGS_REQ.format(name, "bot instance"))
@@ -324,6 +383,7 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
             post_init=self._post_init,
             post_shutdown=self._post_shutdown,
             post_stop=self._post_stop,
+            entity_store=self._build_entity_store(),
             **self._application_kwargs,  # For custom Application subclasses
         )
 
@@ -440,6 +500,9 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
         if not isinstance(getattr(self, f"_{prefix}http_version"), DefaultValue):
             raise RuntimeError(_TWO_ARGS_REQ.format(name, "http_version"))
 
+        if not get_updates and not isinstance(self._traffic_classes, DefaultValue):
+            raise RuntimeError(_TWO_ARGS_REQ.format(name, "traffic_classes"))
+
         self._bot_check(name)
 
         if self._updater not in (DEFAULT_NONE, None):
@@ -698,6 +761,54 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
         self._http_version = http_version
         return self
 
+    def traffic_classes(
+        self: BuilderType,
+        requests: Mapping[str, BaseRequest],
+        endpoint_classes: Optional[Mapping[str, str]] = None,
+    ) -> BuilderType:
+        """Distributes the requests of :attr:`telegram.Bot.request` over several request objects
+        by their traffic class, such that e.g. uploading many large files doesn't delay answering
+        callback queries. See :class:`telegram.request.TrafficClassRequest` for how the traffic
+        class of a request is determined.
+
+        The request object built from the other arguments of this builder, e.g.
+        :meth:`connection_pool_size`, is used for
+        :attr:`~telegram.request.TrafficClassRequest.INTERACTIVE` and all classes that are not in
+        :paramref:`requests`.
+
+        Example:
+            .. code:: python
+
+                application = (
+                    ApplicationBuilder()
+                    .token("TOKEN")
+                    .traffic_classes(
+                        {
+                            TrafficClassRequest.MEDIA_UPLOAD: HTTPXRequest(
+                                connection_pool_size=8, pool_timeout=None
+                            ),
+                            TrafficClassRequest.DOWNLOAD: HTTPXRequest(connection_pool_size=8),
+                        }
+                    )
+                    .build()
+                )
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            requests (Mapping[:obj:`str`, :class:`telegram.request.BaseRequest`]): See
+                :paramref:`telegram.request.TrafficClassRequest.requests`.
+            endpoint_classes (Mapping[:obj:`str`, :obj:`str`], optional): See
+                :paramref:`telegram.request.TrafficClassRequest.endpoint_classes`.
+
+        Returns:
+            :class:`ApplicationBuilder`: The same builder with the updated argument.
+        """
+        self._request_param_check(name="traffic_classes", get_updates=False)
+        self._traffic_classes = requests
+        self._endpoint_classes = endpoint_classes
+        return self
+
     def get_updates_request(self: BuilderType, get_updates_request: BaseRequest) -> BuilderType:
         """Sets a :class:`telegram.request.BaseRequest` instance for the
         :paramref:`~telegram.Bot.get_updates_request` parameter of
@@ -978,7 +1089,8 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
         return self
 
     def arbitrary_callback_data(
-        self: BuilderType, arbitrary_callback_data: Union[bool, int]
+        self: BuilderType,
+        arbitrary_callback_data: Union[bool, int, "BaseCallbackDataStore", "CallbackDataCodec"],
     ) -> BuilderType:
         """Specifies whether :attr:`telegram.ext.Application.bot` should allow arbitrary objects as
         callback data for :class:`telegram.InlineKeyboardButton` and how many keyboards should be
@@ -986,8 +1098,8 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
         be stored in memory.
 
         Important:
-            If you want to use this feature, you must install PTB with the optional requirement
-            ``callback-data``, i.e.
+            If you want to use this feature with the default in-memory cache, you must install PTB
+            with the optional requirement ``callback-data``, i.e.
 
             .. code-block:: bash
 
@@ -998,10 +1110,19 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
 
         .. seealso:: :wiki:`Arbitrary callback_data <Arbitrary-callback_data>`
 
+        .. versionchanged:: NEXT.VERSION
+            Accepts a :class:`telegram.ext.BaseCallbackDataStore` or a
+            :class:`telegram.ext.CallbackDataCodec`.
+
         Args:
-            arbitrary_callback_data (:obj:`bool` | :obj:`int`): If :obj:`True` is passed, the
+            arbitrary_callback_data (:obj:`bool` | :obj:`int` | \
+                :class:`telegram.ext.BaseCallbackDataStore` | \
+                :class:`telegram.ext.CallbackDataCodec`): If :obj:`True` is passed, the
                 default cache size of ``1024`` will be used. Pass an integer to specify a different
-                cache size.
+                cache size. Pass a :class:`telegram.ext.BaseCallbackDataStore`, e.g. a
+                :class:`telegram.ext.SQLiteCallbackDataStore`, to use a different storage backend.
+                Pass a :class:`telegram.ext.CallbackDataCodec` to encode the data into the buttons
+                instead of storing it.
 
         Returns:
             :class:`ApplicationBuilder`: The same builder with the updated argument.
@@ -1011,6 +1132,105 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
         self._arbitrary_callback_data = arbitrary_callback_data
         return self
 
+    def file_id_cache(
+        self: BuilderType, file_id_cache: Union[bool, int, "FileIdCache"]
+    ) -> BuilderType:
+        """Sets the :paramref:`~telegram.ext.ExtBot.file_id_cache` parameter of
+        :attr:`telegram.ext.Application.bot`. If set, sending the same file content again reuses
+        the file id of the first upload instead of uploading the file again. If a
+        :attr:`persistence` is set, the cache is stored there, see
+        :meth:`telegram.ext.BasePersistence.get_file_id_cache`.
+
+        .. seealso:: :class:`telegram.ext.FileIdCache`
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            file_id_cache (:obj:`bool` | :obj:`int` | :class:`telegram.ext.FileIdCache`): If
+                :obj:`True` is passed, the default cache size of ``1024`` will be used. Pass an
+                integer to specify a different cache size.
+
+        Returns:
+            :class:`ApplicationBuilder`: The same builder with the updated argument.
+        """
+        self._bot_check("file_id_cache")
+        self._updater_check("file_id_cache")
+        self._file_id_cache = file_id_cache
+        return self
+
+    def response_cache(
+        self: BuilderType, response_cache: Union[bool, "ResponseCache"]
+    ) -> BuilderType:
+        """Sets the :paramref:`~telegram.ext.ExtBot.response_cache` parameter of
+        :attr:`telegram.ext.Application.bot`. If set, the results of Bot API methods that only
+        read data, e.g. :meth:`~telegram.Bot.get_chat`, are cached for a short time. The
+        application drops outdated results when processing updates, see
+        :meth:`telegram.ext.ResponseCache.process_update`.
+
+        .. seealso:: :class:`telegram.ext.ResponseCache`
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            response_cache (:obj:`bool` | :class:`telegram.ext.ResponseCache`): If :obj:`True` is
+                passed, a cache with the default settings will be used.
+
+        Returns:
+            :class:`ApplicationBuilder`: The same builder with the updated argument.
+        """
+        self._bot_check("response_cache")
+        self._updater_check("response_cache")
+        self._response_cache = response_cache
+        return self
+
+    def request_coalescer(
+        self: BuilderType, request_coalescer: Union[bool, "RequestCoalescer"]
+    ) -> BuilderType:
+        """Sets the :paramref:`~telegram.ext.ExtBot.request_coalescer` parameter of
+        :attr:`telegram.ext.Application.bot`. If set, concurrent calls of e.g.
+        :meth:`~telegram.Bot.delete_message` for the same chat are combined into one call of
+        :meth:`~telegram.Bot.delete_messages`.
+
+        .. seealso:: :class:`telegram.ext.RequestCoalescer`
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            request_coalescer (:obj:`bool` | :class:`telegram.ext.RequestCoalescer`): If
+                :obj:`True` is passed, a coalescer with the default settings will be used.
+
+        Returns:
+            :class:`ApplicationBuilder`: The same builder with the updated argument.
+        """
+        self._bot_check("request_coalescer")
+        self._updater_check("request_coalescer")
+        self._request_coalescer = request_coalescer
+        return self
+
+    def edit_coalescer(
+        self: BuilderType, edit_coalescer: Union[bool, "EditCoalescer"]
+    ) -> BuilderType:
+        """Sets the :paramref:`~telegram.ext.ExtBot.edit_coalescer` parameter of
+        :attr:`telegram.ext.Application.bot`. If set, repeated edits of the same message, e.g.
+        when streaming text with :meth:`~telegram.Bot.edit_message_text`, are sent at most once
+        per interval and edits that are superseded before they are sent are dropped.
+
+        .. seealso:: :class:`telegram.ext.EditCoalescer`
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            edit_coalescer (:obj:`bool` | :class:`telegram.ext.EditCoalescer`): If :obj:`True` is
+                passed, a coalescer with the default settings will be used.
+
+        Returns:
+            :class:`ApplicationBuilder`: The same builder with the updated argument.
+        """
+        self._bot_check("edit_coalescer")
+        self._updater_check("edit_coalescer")
+        self._edit_coalescer = edit_coalescer
+        return self
+
     def local_mode(self: BuilderType, local_mode: bool) -> BuilderType:
         """Specifies the value for :paramref:`~telegram.Bot.local_mode` for the
         :attr:`telegram.ext.Application.bot`.
@@ -1138,6 +1358,9 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
             * When passing :obj:`None` or when the requirements of :class:`telegram.ext.JobQueue`
               are not installed, :attr:`telegram.ext.ConversationHandler.conversation_timeout`
               can not be used, as this uses :attr:`telegram.ext.Application.job_queue` internally.
+            * For bots that schedule large numbers of jobs, consider passing a
+              :class:`telegram.ext.HeapJobQueue`. To keep the jobs across restarts, pass a
+              :class:`telegram.ext.PersistentJobQueue`.
 
         Args:
             job_queue (:class:`telegram.ext.JobQueue`): The job queue. Pass :obj:`None` if you
@@ -1149,6 +1372,24 @@ class ApplicationBuilder(Generic[BT, CCT, UD, CD, BD, JQ]):
         self._job_queue = job_queue
         return self  # type: ignore[return-value]
 
+    def entity_store(self: BuilderType, entity_store: Union[bool, EntityStore]) -> BuilderType:
+        """Sets a :class:`telegram.ext.EntityStore` instance for
+        :attr:`telegram.ext.Application.entity_store`. The application stores the users and chats
+        of every incoming update there, such that handlers can look them up without making
+        requests.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            entity_store (:obj:`bool` | :class:`telegram.ext.EntityStore`): If :obj:`True` is
+                passed, a store with the default size will be used.
+
+        Returns:
+            :class:`ApplicationBuilder`: The same builder with the updated argument.
+        """
+        self._entity_store = entity_store
+        return self
+
     def persistence(
         self: BuilderType, persistence: "BasePersistence[Any, Any, Any]"
     ) -> BuilderType:
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the BaseCallbackDataStore class."""
+from abc import ABC, abstractmethod
+from collections.abc import Collection
+from typing import TYPE_CHECKING, Any, Optional
+
+from telegram.ext._utils.types import CDCData
+
+if TYPE_CHECKING:
+    from telegram.ext import ExtBot
+
+
+class BaseCallbackDataStore(ABC):
+    """Abstract interface class for the storage backend of
+    :class:`telegram.ext.CallbackDataCache`. The store holds two mappings:
+
+    * One for mapping the UUIDs of the keyboards to the data of their buttons, where the data of
+      each keyboard is a :obj:`dict` mapping the UUIDs of the buttons to the callback data.
+    * One for mapping the IDs of received callback queries to the UUIDs of the keyboards.
+
+    An implementation of this class must implement all abstract methods and properties.
+
+    .. seealso:: :wiki:`Arbitrary callback_data <Arbitrary-callback_data>`
+
+    .. versionadded:: NEXT.VERSION
+
+    Attributes:
+        bot (:class:`telegram.ext.ExtBot`): Optional. The bot the store is used for. Set by
+            :class:`telegram.ext.CallbackDataCache` via :meth:`set_bot`.
+    """
+
+    __slots__ = ("bot",)
+
+    def __init__(self) -> None:
+        self.bot: Optional[ExtBot[Any]] = None
+
+    def set_bot(self, bot: "ExtBot[Any]") -> None:
+        """Set the bot the store is used for. Called by :class:`telegram.ext.CallbackDataCache`.
+
+        Args:
+            bot (:class:`telegram.ext.ExtBot`): The bot.
+        """
+        self.bot = bot
+
+    @property
+    @abstractmethod
+    def maxsize(self) -> Optional[int]:
+        """:obj:`int`: The maximum number of entries in each of the mappings or :obj:`None`, if
+        the number of entries is not limited. Must be implemented by a subclass.
+        """
+
+    @property
+    def is_persistent(self) -> bool:
+        """:obj:`bool`: Whether the store keeps its data across restarts of the bot by itself.
+        If so, the data is neither loaded from nor written to
+        :attr:`telegram.ext.Application.persistence`. Defaults to :obj:`False`.
+        """
+        return False
+
+    @abstractmethod
+    async def shutdown(self) -> None:
+        """Stop & clear resources used by this class. Called by
+        :meth:`telegram.ext.ExtBot.shutdown`. Must be implemented by a subclass.
+        """
+
+    @abstractmethod
+    def get_keyboard(self, keyboard_uuid: str) -> dict[str, object]:
+        """Returns the data of the buttons of a keyboard and marks the keyboard as accessed.
+        Must be implemented by a subclass.
+
+        Args:
+            keyboard_uuid (:obj:`str`): The UUID of the keyboard.
+
+        Returns:
+            dict[:obj:`str`, :class:`object`]: The data of the buttons by their UUIDs.
+
+        Raises:
+            KeyError: If the keyboard is not in the store.
+        """
+
+    @abstractmethod
+    def put_keyboard(self, keyboard_uuid: str, button_data: dict[str, object]) -> None:
+        """Stores the data of the buttons of a new keyboard. Must be implemented by a subclass.
+
+        Args:
+            keyboard_uuid (:obj:`str`): The UUID of the keyboard.
+            button_data (dict[:obj:`str`, :class:`object`]): The data of the buttons by their
+                UUIDs.
+        """
+
+    @abstractmethod
+    def drop_keyboard(self, keyboard_uuid: str) -> None:
+        """Deletes the data of a keyboard. Does nothing, if the keyboard is not in the store.
+        Must be implemented by a subclass.
+
+        Args:
+            keyboard_uuid (:obj:`str`): The UUID of the keyboard.
+        """
+
+    @abstractmethod
+    def clear_keyboards(self, time_cutoff: Optional[float] = None) -> None:
+        """Deletes the data of the keyboards. Must be implemented by a subclass.
+
+        Args:
+            time_cutoff (:obj:`float`, optional): A UNIX timestamp. If passed, only the keyboards
+                that were last accessed before this time are deleted.
+        """
+
+    @abstractmethod
+    def put_callback_query(self, callback_query_id: str, keyboard_uuid: str) -> None:
+        """Stores the UUID of the keyboard that a callback query belongs to. Must be implemented
+        by a subclass.
+
+        Args:
+            callback_query_id (:obj:`str`): The ID of the callback query.
+            keyboard_uuid (:obj:`str`): The UUID of the keyboard.
+        """
+
+    @abstractmethod
+    def pop_callback_query(self, callback_query_id: str) -> str:
+        """Deletes a callback query and returns the UUID of the keyboard that it belongs to.
+        Must be implemented by a subclass.
+
+        Args:
+            callback_query_id (:obj:`str`): The ID of the callback query.
+
+        Returns:
+            :obj:`str`: The UUID of the keyboard.
+
+        Raises:
+            KeyError: If the callback query is not in the store.
+        """
+
+    @abstractmethod
+    def clear_callback_queries(self) -> None:
+        """Deletes all callback queries. Must be implemented by a subclass."""
+
+    @property
+    @abstractmethod
+    def persistence_data(self) -> CDCData:
+        """tuple[list[tuple[:obj:`str`, :obj:`float`, dict[:obj:`str`, :class:`object`]]],
+        dict[:obj:`str`, :obj:`str`]]: All data of the store in the format of
+        :attr:`telegram.ext.CallbackDataCache.persistence_data`. Must be implemented by a
+        subclass.
+        """
+
+    def peek_persistence_data(
+        self, keyboard_uuids: Collection[str], callback_query_ids: Collection[str]
+    ) -> CDCData:
+        """Returns the data of the given keyboards and callback queries in the format of
+        :attr:`persistence_data` without marking the keyboards as accessed. Keyboards and callback
+        queries that are not in the store are skipped.
+
+        The default implementation filters :attr:`persistence_data`. Override this method if the
+        store can look up the entries more efficiently.
+
+        Args:
+            keyboard_uuids (Collection[:obj:`str`]): The UUIDs of the keyboards.
+            callback_query_ids (Collection[:obj:`str`]): The IDs of the callback queries.
+
+        Returns:
+            tuple[list[tuple[:obj:`str`, :obj:`float`, dict[:obj:`str`, :class:`object`]]], \
+            dict[:obj:`str`, :obj:`str`]]: The data of the keyboards and callback queries.
+        """
+        keyboard_data, callback_queries = self.persistence_data
+        return [entry for entry in keyboard_data if entry[0] in keyboard_uuids], {
+            key: value for key, value in callback_queries.items() if key in callback_query_ids
+        }
+
+    def pop_evicted(self) -> tuple[set[str], set[str]]:
+        """Returns the UUIDs of the keyboards and the IDs of the callback queries that the store
+        dropped by itself since the last call of this method, e.g. because it was full. Stores
+        are only required to keep track of these entries after this method was called for the
+        first time.
+
+        The default implementation returns empty sets, which is suitable for stores that never
+        drop entries by themselves or that are :attr:`persistent <is_persistent>`.
+
+        Returns:
+            tuple[set[:obj:`str`], set[:obj:`str`]]: The UUIDs of the keyboards and the IDs of the
+            callback queries.
+        """
+        return set(), set()
+
+    @abstractmethod
+    def load_persistence_data(self, persistent_data: CDCData) -> None:
+        """Loads data into the store. Must be implemented by a subclass.
+
+        Args:
+            persistent_data (tuple[list[tuple[:obj:`str`, :obj:`float`, \
+            dict[:obj:`str`, :class:`object`]]], dict[:obj:`str`, :obj:`str`]]): \
+            Data to load, as returned by :attr:`persistence_data`.
+        """
@@ -17,7 +17,10 @@
 # You should have received a copy of the GNU Lesser Public License
 # along with this program.  If not, see [http://www.gnu.org/licenses/].
 """This module contains the BasePersistence class."""
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Collection, Iterable, Mapping, Sequence
+from copy import deepcopy
 from typing import Generic, NamedTuple, NoReturn, Optional
 
 from telegram._bot import Bot
@@ -25,6 +28,30 @@ from telegram.ext._extbot import ExtBot
 from telegram.ext._utils.types import BD, CD, UD, CDCData, ConversationDict, ConversationKey
 
 
+class _PersistenceErrors(Exception):
+    """Raised by the default implementations of the batch methods of :class:`BasePersistence`
+    if more than one of the calls of the single-key method failed.
+    :meth:`telegram.ext.Application.update_persistence` passes each of the errors to the error
+    handlers separately.
+    """
+
+    __slots__ = ("errors",)
+
+    def __init__(self, errors: Sequence[Exception]):
+        super().__init__(f"{len(errors)} errors were raised while updating the persistence.")
+        self.errors: Sequence[Exception] = errors
+
+
+async def _gather_all(coroutines: Iterable[Awaitable[None]]) -> None:
+    """Awaits all coroutines, even if some of them fail, and raises the errors afterwards."""
+    results = await asyncio.gather(*coroutines, return_exceptions=True)
+    errors = [result for result in results if isinstance(result, Exception)]
+    if len(errors) == 1:
+        raise errors[0]
+    if errors:
+        raise _PersistenceErrors(errors)
+
+
 class PersistenceInput(NamedTuple):
     """Convenience wrapper to group boolean input for the :paramref:`~BasePersistence.store_data`
     parameter for :class:`BasePersistence`.
@@ -38,12 +65,20 @@ class PersistenceInput(NamedTuple):
             Defaults to :obj:`True`.
         callback_data (:obj:`bool`, optional): Whether the setting should be applied for
             ``callback_data``. Defaults to :obj:`True`.
+        file_id_cache (:obj:`bool`, optional): Whether the setting should be applied for the
+            :attr:`~telegram.ext.ExtBot.file_id_cache`. Defaults to :obj:`True`.
+
+            .. versionadded:: NEXT.VERSION
 
     Attributes:
         bot_data (:obj:`bool`): Whether the setting should be applied for ``bot_data``.
         chat_data (:obj:`bool`): Whether the setting should be applied for ``chat_data``.
         user_data (:obj:`bool`): Whether the setting should be applied for ``user_data``.
         callback_data (:obj:`bool`): Whether the setting should be applied for ``callback_data``.
+        file_id_cache (:obj:`bool`): Whether the setting should be applied for the
+            :attr:`~telegram.ext.ExtBot.file_id_cache`.
+
+            .. versionadded:: NEXT.VERSION
 
     """
 
@@ -51,6 +86,7 @@ class PersistenceInput(NamedTuple):
     chat_data: bool = True
     user_data: bool = True
     callback_data: bool = True
+    file_id_cache: bool = True
 
 
 class BasePersistence(Generic[UD, CD, BD], ABC):
@@ -85,6 +121,24 @@ class BasePersistence(Generic[UD, CD, BD], ABC):
     For example, if you don't store ``bot_data``, you don't need :meth:`get_bot_data`,
     :meth:`update_bot_data` or :meth:`refresh_bot_data`.
 
+    In addition, :class:`~telegram.ext.Application` hands over all changes of a single run of
+    :meth:`~telegram.ext.Application.update_persistence` via the batch methods
+
+    * :meth:`update_user_data_many`
+    * :meth:`update_chat_data_many`
+    * :meth:`drop_user_data_many`
+    * :meth:`drop_chat_data_many`
+    * :meth:`update_conversations_many`
+    * :meth:`update_callback_data_delta`
+
+    By default, these delegate to the corresponding single-key methods or to
+    :meth:`update_callback_data`, respectively. If several of the single-key calls fail, the
+    application passes each of the errors to its error handlers. Overriding the batch methods is
+    optional, but allows e.g. to write all changes within a single database transaction.
+
+    Storing the :class:`~telegram.ext.FileIdCache` of the bot is optional and can be implemented
+    by overriding :meth:`get_file_id_cache` and :meth:`update_file_id_cache`.
+
     Note:
        You should avoid saving :class:`telegram.Bot` instances. This is because if you change e.g.
        the bots token, this won't propagate to the serialized instances and may lead to exceptions.
@@ -351,6 +405,157 @@ class BasePersistence(Generic[UD, CD, BD], ABC):
             user_id (:obj:`int`): The user id to delete from the persistence.
         """
 
+    async def update_user_data_many(self, data: Mapping[int, UD]) -> None:
+        """Will be called by the :class:`telegram.ext.Application` once per run of
+        :meth:`~telegram.ext.Application.update_persistence` with all ``user_data`` entries that
+        might have been changed since the last run.
+
+        The default implementation calls :meth:`update_user_data` for each entry concurrently.
+        Override this method if your storage can write multiple entries more efficiently.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            data (Mapping[:obj:`int`, :obj:`dict` | :attr:`telegram.ext.ContextTypes.user_data`]):
+                Mapping of user IDs to the corresponding
+                :attr:`telegram.ext.Application.user_data` ``[user_id]``.
+        """
+        await _gather_all(
+            self.update_user_data(user_id, user_data) for user_id, user_data in data.items()
+        )
+
+    async def update_chat_data_many(self, data: Mapping[int, CD]) -> None:
+        """Will be called by the :class:`telegram.ext.Application` once per run of
+        :meth:`~telegram.ext.Application.update_persistence` with all ``chat_data`` entries that
+        might have been changed since the last run.
+
+        The default implementation calls :meth:`update_chat_data` for each entry concurrently.
+        Override this method if your storage can write multiple entries more efficiently.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            data (Mapping[:obj:`int`, :obj:`dict` | :attr:`telegram.ext.ContextTypes.chat_data`]):
+                Mapping of chat IDs to the corresponding
+                :attr:`telegram.ext.Application.chat_data` ``[chat_id]``.
+        """
+        await _gather_all(
+            self.update_chat_data(chat_id, chat_data) for chat_id, chat_data in data.items()
+        )
+
+    async def drop_user_data_many(self, user_ids: Collection[int]) -> None:
+        """Will be called by the :class:`telegram.ext.Application` once per run of
+        :meth:`~telegram.ext.Application.update_persistence` with all user IDs that were passed to
+        :meth:`~telegram.ext.Application.drop_user_data` since the last run.
+
+        The default implementation calls :meth:`drop_user_data` for each user ID concurrently.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            user_ids (Collection[:obj:`int`]): The user ids to delete from the persistence.
+        """
+        await _gather_all(self.drop_user_data(user_id) for user_id in user_ids)
+
+    async def drop_chat_data_many(self, chat_ids: Collection[int]) -> None:
+        """Will be called by the :class:`telegram.ext.Application` once per run of
+        :meth:`~telegram.ext.Application.update_persistence` with all chat IDs that were passed to
+        :meth:`~telegram.ext.Application.drop_chat_data` since the last run.
+
+        The default implementation calls :meth:`drop_chat_data` for each chat ID concurrently.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            chat_ids (Collection[:obj:`int`]): The chat ids to delete from the persistence.
+        """
+        await _gather_all(self.drop_chat_data(chat_id) for chat_id in chat_ids)
+
+    async def update_conversations_many(
+        self, name: str, states: Mapping[ConversationKey, Optional[object]]
+    ) -> None:
+        """Will be called by the :class:`telegram.ext.Application` once per run of
+        :meth:`~telegram.ext.Application.update_persistence` and per persistent
+        :class:`telegram.ext.ConversationHandler` with all states that have changed since the
+        last run.
+
+        The default implementation calls :meth:`update_conversation` for each key concurrently.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            name (:obj:`str`): The handler's name.
+            states (Mapping[:obj:`tuple`, :class:`object`]): Mapping of the keys the state is
+                changed for to the new state. A value of :obj:`None` means that the conversation
+                has ended for this key.
+        """
+        await _gather_all(
+            self.update_conversation(name=name, key=key, new_state=new_state)
+            for key, new_state in states.items()
+        )
+
+    async def update_callback_data_delta(
+        self,
+        data: CDCData,  # noqa: ARG002
+        dropped_keyboards: Collection[str],  # noqa: ARG002
+        dropped_callback_queries: Collection[str],  # noqa: ARG002
+    ) -> None:
+        """Will be called by the :class:`telegram.ext.Application` once per run of
+        :meth:`~telegram.ext.Application.update_persistence` with the entries of
+        :attr:`telegram.ext.CallbackDataCache.persistence_data` that have changed since the last
+        run, if the changes can be described by single entries. Otherwise,
+        :meth:`update_callback_data` is called with the complete data.
+
+        The default implementation calls :meth:`update_callback_data` with the complete data.
+        Override this method if your storage can write single entries more efficiently.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            data (tuple[list[tuple[:obj:`str`, :obj:`float`, \
+                dict[:obj:`str`, :obj:`Any`]]], dict[:obj:`str`, :obj:`str`]]):
+                The keyboards and callback queries that were added or changed, in the format of
+                :attr:`telegram.ext.CallbackDataCache.persistence_data`.
+            dropped_keyboards (Collection[:obj:`str`]): The UUIDs of the keyboards to delete from
+                the persistence.
+            dropped_callback_queries (Collection[:obj:`str`]): The IDs of the callback queries to
+                delete from the persistence.
+        """
+        if not isinstance(self.bot, ExtBot) or not self.bot.callback_data_cache:
+            return
+        await self.update_callback_data(deepcopy(self.bot.callback_data_cache.persistence_data))
+
+    async def get_file_id_cache(self) -> Optional[dict[str, str]]:
+        """Will be called by :class:`telegram.ext.Application` upon initialization, if the bot
+        has a :attr:`~telegram.ext.ExtBot.file_id_cache` and
+        :attr:`PersistenceInput.file_id_cache` is :obj:`True`. If file ids were stored, they
+        should be returned.
+
+        The default implementation returns :obj:`None`, i.e. the cache is not persisted.
+
+        .. versionadded:: NEXT.VERSION
+
+        Returns:
+            dict[:obj:`str`, :obj:`str`] | :obj:`None`: The restored
+            :attr:`telegram.ext.FileIdCache.persistence_data` or :obj:`None`, if no data was
+            stored.
+        """
+        return None
+
+    async def update_file_id_cache(self, data: dict[str, str]) -> None:
+        """Will be called by the :class:`telegram.ext.Application` after a file id was added to
+        or dropped from the :attr:`~telegram.ext.ExtBot.file_id_cache` of the bot, if
+        :attr:`PersistenceInput.file_id_cache` is :obj:`True`.
+
+        The default implementation does nothing.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            data (dict[:obj:`str`, :obj:`str`]): The complete
+                :attr:`telegram.ext.FileIdCache.persistence_data`.
+        """
+
     @abstractmethod
     async def refresh_user_data(self, user_id: int, user_data: UD) -> None:
         """Will be called by the :class:`telegram.ext.Application` before passing the
@@ -250,6 +250,10 @@ class CallbackContext(Generic[BT, UD, CD, BD]):
 
         .. seealso:: :wiki:`Arbitrary callback_data <Arbitrary-callback_data>`
 
+        .. versionchanged:: NEXT.VERSION
+            Does nothing, if the bot uses a :class:`telegram.ext.CallbackDataCodec`, as no data is
+            cached in that case.
+
         Args:
             callback_query (:class:`telegram.CallbackQuery`): The callback query.
 
@@ -259,6 +263,8 @@ class CallbackContext(Generic[BT, UD, CD, BD]):
                 callback data.
         """
         if isinstance(self.bot, ExtBot):
+            if self.bot.callback_data_codec is not None:
+                return
             if self.bot.callback_data_cache is None:
                 raise RuntimeError(
                     "This telegram.ext.ExtBot instance does not use arbitrary callback data."
@@ -17,30 +17,44 @@
 #  You should have received a copy of the GNU Lesser Public License
 #  along with this program.  If not, see [http://www.gnu.org/licenses/].
 """This module contains the CallbackDataCache class."""
-import time
-from collections.abc import MutableMapping
+import secrets
+from collections import OrderedDict
+from collections.abc import Collection, Hashable
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Optional, Union, cast
-from uuid import uuid4
-
-try:
-    from cachetools import LRUCache
-
-    CACHE_TOOLS_AVAILABLE = True
-except ImportError:
-    CACHE_TOOLS_AVAILABLE = False
-
-
-import contextlib
 
 from telegram import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message, User
 from telegram._utils.datetime import to_float_timestamp
 from telegram.error import TelegramError
+from telegram.ext._basecallbackdatastore import BaseCallbackDataStore
+from telegram.ext._inmemorycallbackdatastore import (
+    CACHE_TOOLS_AVAILABLE,
+    InMemoryCallbackDataStore,
+)
 from telegram.ext._utils.types import CDCData
 
 if TYPE_CHECKING:
     from telegram.ext import ExtBot
 
+# Maximum number of distinct keyboards that are remembered for deduplication
+_MAX_DEDUPLICATED_KEYBOARDS = 1024
+
+# Key in the button data of a shared keyboard that holds how often the keyboard was sent. It's
+# stored along with the button data, such that it survives restarts. Button IDs are hexadecimal,
+# so they never collide with it.
+_SENDS_KEY = "sends"
+
+
+def _typed_key(obj: object) -> Hashable:
+    """Returns a key for the callback data that includes the types of the data, as e.g.
+    ``1 == True``, but the data must not be mixed up.
+    """
+    if type(obj) is tuple:  # pylint: disable=unidiomatic-typecheck
+        return tuple(_typed_key(item) for item in obj)
+    if type(obj) is frozenset:  # pylint: disable=unidiomatic-typecheck
+        return frozenset(_typed_key(item) for item in obj)
+    return type(obj), obj
+
 
 class InvalidCallbackData(TelegramError):
     """
@@ -81,39 +95,87 @@ class InvalidCallbackData(TelegramError):
         return self.__class__, (self.callback_data,)
 
 
-class _KeyboardData:
-    __slots__ = ("access_time", "button_data", "keyboard_uuid")
+def apply_persistence_delta(
+    persistent_data: Optional[CDCData],
+    data: CDCData,
+    dropped_keyboards: Collection[str],
+    dropped_callback_queries: Collection[str],
+) -> CDCData:
+    """Applies the changes as returned by CallbackDataCache.pop_persistence_delta to data in the
+    format of CallbackDataCache.persistence_data and returns the result. The order of the
+    keyboards is kept such that changed keyboards are the most recently used ones.
+    """
+    keyboards = {entry[0]: entry for entry in persistent_data[0]} if persistent_data else {}
+    callback_queries = dict(persistent_data[1]) if persistent_data else {}
 
-    def __init__(
-        self,
-        keyboard_uuid: str,
-        access_time: Optional[float] = None,
-        button_data: Optional[dict[str, object]] = None,
-    ):
-        self.keyboard_uuid = keyboard_uuid
-        self.button_data = button_data or {}
-        self.access_time = access_time or time.time()
+    for keyboard_uuid in dropped_keyboards:
+        keyboards.pop(keyboard_uuid, None)
+    for entry in data[0]:
+        keyboards.pop(entry[0], None)
+        keyboards[entry[0]] = entry
 
-    def update_access_time(self) -> None:
-        """Updates the access time with the current time."""
-        self.access_time = time.time()
+    for callback_query_id in dropped_callback_queries:
+        callback_queries.pop(callback_query_id, None)
+    for callback_query_id, keyboard_uuid in data[1].items():
+        callback_queries.pop(callback_query_id, None)
+        callback_queries[callback_query_id] = keyboard_uuid
 
-    def to_tuple(self) -> tuple[str, float, dict[str, object]]:
-        """Gives a tuple representation consisting of the keyboard uuid, the access time and the
-        button data.
-        """
-        return self.keyboard_uuid, self.access_time, self.button_data
+    return list(keyboards.values()), callback_queries
+
+
+class _CacheChanges:
+    """Keeps track of the entries of a CallbackDataCache that changed since the last call of
+    CallbackDataCache.pop_persistence_delta.
+    """
+
+    __slots__ = (
+        "callback_queries",
+        "dropped_callback_queries",
+        "dropped_keyboards",
+        "full",
+        "keyboards",
+    )
+
+    def __init__(self) -> None:
+        self.keyboards: set[str] = set()
+        self.dropped_keyboards: set[str] = set()
+        self.callback_queries: set[str] = set()
+        self.dropped_callback_queries: set[str] = set()
+        # Set if the changes can't be described by single entries, e.g. after clearing the cache
+        self.full: bool = False
+
+    def put_keyboard(self, keyboard_uuid: str) -> None:
+        self.keyboards.add(keyboard_uuid)
+        self.dropped_keyboards.discard(keyboard_uuid)
+
+    def drop_keyboard(self, keyboard_uuid: str) -> None:
+        self.dropped_keyboards.add(keyboard_uuid)
+        self.keyboards.discard(keyboard_uuid)
+
+    def put_callback_query(self, callback_query_id: str) -> None:
+        self.callback_queries.add(callback_query_id)
+        self.dropped_callback_queries.discard(callback_query_id)
+
+    def drop_callback_query(self, callback_query_id: str) -> None:
+        self.dropped_callback_queries.add(callback_query_id)
+        self.callback_queries.discard(callback_query_id)
 
 
 class CallbackDataCache:
     """A custom cache for storing the callback data of a :class:`telegram.ext.ExtBot`. Internally,
-    it keeps two mappings with fixed maximum size:
+    it keeps two mappings:
 
     * One for mapping the data received in callback queries to the cached objects
     * One for mapping the IDs of received callback queries to the cached objects
 
     The second mapping allows to manually drop data that has been cached for keyboards of messages
     sent via inline mode.
+    Sending the same keyboard multiple times, e.g. to many users, creates only a single entry and
+    returns the same processed keyboard, if all of its callback data is hashable. Such a shared
+    entry is only dropped by :meth:`drop_data` once it was called for each time the keyboard was
+    sent.
+    The mappings are kept in a :class:`telegram.ext.BaseCallbackDataStore`. By default, they are
+    kept in memory with fixed maximum size, see :class:`telegram.ext.InMemoryCallbackDataStore`.
     If necessary, will drop the least recently used items.
 
     Important:
@@ -136,39 +198,57 @@ class CallbackDataCache:
         To use this class, PTB must be installed via
         ``pip install "python-telegram-bot[callback-data]"``.
 
+    .. versionchanged:: NEXT.VERSION
+        * Added the parameter :paramref:`store`. The optional requirement ``callback-data`` is
+          only needed for the default store.
+        * Identical keyboards share a single entry.
+
     Args:
         bot (:class:`telegram.ext.ExtBot`): The bot this cache is for.
         maxsize (:obj:`int`, optional): Maximum number of items in each of the internal mappings.
-            Defaults to ``1024``.
+            Defaults to ``1024``. Ignored, if :paramref:`store` is passed.
 
         persistent_data (tuple[list[tuple[:obj:`str`, :obj:`float`, \
         dict[:obj:`str`, :class:`object`]]], dict[:obj:`str`, :obj:`str`]], optional): \
         Data to initialize the cache with, as returned by \
         :meth:`telegram.ext.BasePersistence.get_callback_data`.
+        store (:class:`telegram.ext.BaseCallbackDataStore`, optional): The storage backend.
+            Defaults to a :class:`telegram.ext.InMemoryCallbackDataStore` with
+            :paramref:`maxsize`.
+
+            .. versionadded:: NEXT.VERSION
 
     Attributes:
         bot (:class:`telegram.ext.ExtBot`): The bot this cache is for.
 
     """
 
-    __slots__ = ("_callback_queries", "_keyboard_data", "_maxsize", "bot")
+    __slots__ = ("_changes", "_keyboards_by_content", "_store", "bot")
 
     def __init__(
         self,
         bot: "ExtBot[Any]",
         maxsize: int = 1024,
         persistent_data: Optional[CDCData] = None,
+        store: Optional[BaseCallbackDataStore] = None,
     ):
-        if not CACHE_TOOLS_AVAILABLE:
-            raise RuntimeError(
-                "To use `CallbackDataCache`, PTB must be installed via `pip install "
-                '"python-telegram-bot[callback-data]"`.'
-            )
+        if store is None:
+            if not CACHE_TOOLS_AVAILABLE:
+                raise RuntimeError(
+                    "To use `CallbackDataCache`, PTB must be installed via `pip install "
+                    '"python-telegram-bot[callback-data]"`.'
+                )
+            store = InMemoryCallbackDataStore(maxsize=maxsize)
 
         self.bot: ExtBot[Any] = bot
-        self._maxsize: int = maxsize
-        self._keyboard_data: MutableMapping[str, _KeyboardData] = LRUCache(maxsize=maxsize)
-        self._callback_queries: MutableMapping[str, str] = LRUCache(maxsize=maxsize)
+        self._store: BaseCallbackDataStore = store
+        self._store.set_bot(bot)
+        # Only tracked once pop_persistence_delta was called for the first time
+        self._changes: Optional[_CacheChanges] = None
+        # Maps the content of keyboards to the UUID and the processed keyboard of the entry
+        self._keyboards_by_content: OrderedDict[Hashable, tuple[str, InlineKeyboardMarkup]] = (
+            OrderedDict()
+        )
 
         if persistent_data:
             self.load_persistence_data(persistent_data)
@@ -187,22 +267,30 @@ class CallbackDataCache:
             Data to load, as returned by \
             :meth:`telegram.ext.BasePersistence.get_callback_data`.
         """
-        keyboard_data, callback_queries = persistent_data
-        for key, value in callback_queries.items():
-            self._callback_queries[key] = value
-        for uuid, access_time, data in keyboard_data:
-            self._keyboard_data[uuid] = _KeyboardData(
-                keyboard_uuid=uuid, access_time=access_time, button_data=data
-            )
+        self._store.load_persistence_data(persistent_data)
+        if self._changes is not None:
+            self._changes.full = True
+
+    @property
+    def store(self) -> BaseCallbackDataStore:
+        """:class:`telegram.ext.BaseCallbackDataStore`: The storage backend of the cache.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return self._store
 
     @property
-    def maxsize(self) -> int:
-        """:obj:`int`: The maximum size of the cache.
+    def maxsize(self) -> Optional[int]:
+        """:obj:`int`: The maximum size of the cache. :obj:`None`, if the size of the
+        :attr:`store` is not limited.
 
         .. versionchanged:: 20.0
            This property is now read-only.
+
+        .. versionchanged:: NEXT.VERSION
+           Returns :attr:`telegram.ext.BaseCallbackDataStore.maxsize`.
         """
-        return self._maxsize
+        return self._store.maxsize
 
     @property
     def persistence_data(self) -> CDCData:
@@ -210,12 +298,59 @@ class CallbackDataCache:
         dict[:obj:`str`, :obj:`str`]]: The data that needs to be persisted to allow
         caching callback data across bot reboots.
         """
-        # While building a list/dict from the LRUCaches has linear runtime (in the number of
-        # entries), the runtime is bounded by maxsize and it has the big upside of not throwing a
-        # highly customized data structure at users trying to implement a custom persistence class
-        return [data.to_tuple() for data in self._keyboard_data.values()], dict(
-            self._callback_queries.items()
+        return self._store.persistence_data
+
+    def pop_persistence_delta(self) -> Optional[tuple[CDCData, set[str], set[str]]]:
+        """Returns the changes of :attr:`persistence_data` since the last call of this method and
+        resets the tracked changes.
+
+        Warning:
+            This method is not intended to be called by users directly.
+
+        .. versionadded:: NEXT.VERSION
+
+        Returns:
+            tuple[tuple[list[tuple[:obj:`str`, :obj:`float`, dict[:obj:`str`, :class:`object`]]], \
+            dict[:obj:`str`, :obj:`str`]], set[:obj:`str`], set[:obj:`str`]] | :obj:`None`: A tuple
+            of
+
+            * the keyboards and callback queries that were added or changed, in the format of
+              :attr:`persistence_data`
+            * the UUIDs of the keyboards that were dropped
+            * the IDs of the callback queries that were dropped
+
+            :obj:`None`, if the changes can not be described by single entries, e.g. on the first
+            call or after the cache was cleared. In that case, :attr:`persistence_data` needs to be
+            persisted as a whole.
+        """
+        changes = self._changes
+        self._changes = _CacheChanges()
+        evicted_keyboards, evicted_callback_queries = self._store.pop_evicted()
+        if changes is None or changes.full:
+            return None
+
+        data = self._store.peek_persistence_data(changes.keyboards, changes.callback_queries)
+        # Entries that are present in the data were added again after they were dropped
+        dropped_keyboards = (changes.dropped_keyboards | evicted_keyboards).difference(
+            entry[0] for entry in data[0]
         )
+        dropped_callback_queries = (
+            changes.dropped_callback_queries | evicted_callback_queries
+        ).difference(data[1])
+        return data, dropped_keyboards, dropped_callback_queries
+
+    def discard_persistence_delta(self) -> None:
+        """Makes the next call of :meth:`pop_persistence_delta` return :obj:`None`, such that
+        :attr:`persistence_data` is persisted as a whole. Used if the changes returned by the
+        last call of :meth:`pop_persistence_delta` could not be persisted.
+
+        Warning:
+            This method is not intended to be called by users directly.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        if self._changes is not None:
+            self._changes.full = True
 
     def process_keyboard(self, reply_markup: InlineKeyboardMarkup) -> InlineKeyboardMarkup:
         """Registers the reply markup to the cache. If any of the buttons have
@@ -223,6 +358,12 @@ class CallbackDataCache:
         keyboard with the correspondingly replaced buttons. Otherwise, does nothing and returns
         the original reply markup.
 
+        If an identical keyboard is still stored, its entry is shared and the same keyboard as
+        before is returned.
+
+        .. versionchanged:: NEXT.VERSION
+            Identical keyboards share a single entry.
+
         Args:
             reply_markup (:class:`telegram.InlineKeyboardMarkup`): The keyboard.
 
@@ -230,8 +371,14 @@ class CallbackDataCache:
             :class:`telegram.InlineKeyboardMarkup`: The keyboard to be passed to Telegram.
 
         """
-        keyboard_uuid = uuid4().hex
-        keyboard_data = _KeyboardData(keyboard_uuid)
+        content_key = self.__content_key(reply_markup)
+        if content_key is not None:
+            shared = self.__get_shared_keyboard(content_key)
+            if shared is not None:
+                return shared
+
+        keyboard_uuid = secrets.token_hex(16)
+        button_data: dict[str, object] = {}
 
         # Built a new nested list of buttons by replacing the callback data if needed
         buttons = [
@@ -241,7 +388,9 @@ class CallbackDataCache:
                     # same object is used elsewhere
                     InlineKeyboardButton(
                         btn.text,
-                        callback_data=self.__put_button(btn.callback_data, keyboard_data),
+                        callback_data=self.__put_button(
+                            btn.callback_data, keyboard_uuid, button_data
+                        ),
                     )
                     if btn.callback_data
                     else btn
@@ -251,37 +400,99 @@ class CallbackDataCache:
             for column in reply_markup.inline_keyboard
         ]
 
-        if not keyboard_data.button_data:
+        if not button_data:
             # If we arrive here, no data had to be replaced and we can return the input
             return reply_markup
 
-        self._keyboard_data[keyboard_uuid] = keyboard_data
-        return InlineKeyboardMarkup(buttons)
+        self.__put_keyboard(keyboard_uuid, button_data)
+
+        markup = InlineKeyboardMarkup(buttons)
+        if content_key is not None:
+            self._keyboards_by_content[content_key] = (keyboard_uuid, markup)
+            if len(self._keyboards_by_content) > _MAX_DEDUPLICATED_KEYBOARDS:
+                self._keyboards_by_content.popitem(last=False)
+        return markup
+
+    def __put_keyboard(self, keyboard_uuid: str, button_data: dict[str, object]) -> None:
+        self._store.put_keyboard(keyboard_uuid, button_data)
+        if self._changes is not None:
+            self._changes.put_keyboard(keyboard_uuid)
 
     @staticmethod
-    def __put_button(callback_data: object, keyboard_data: _KeyboardData) -> str:
-        """Stores the data for a single button in :attr:`keyboard_data`.
+    def __content_key(reply_markup: InlineKeyboardMarkup) -> Optional[Hashable]:
+        """Returns a hashable representation of the content of the keyboard or None, if some of
+        the callback data is not hashable.
+        """
+        key = tuple(
+            tuple(
+                (btn.text, _typed_key(btn.callback_data)) if btn.callback_data else btn
+                for btn in row
+            )
+            for row in reply_markup.inline_keyboard
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def __get_shared_keyboard(self, content_key: Hashable) -> Optional[InlineKeyboardMarkup]:
+        """Returns the processed keyboard for an identical keyboard that is still stored, if
+        any, and counts the additional send.
+        """
+        entry = self._keyboards_by_content.get(content_key)
+        if entry is None:
+            return None
+
+        keyboard_uuid, markup = entry
+        try:
+            # Also updates the timestamp for the LRU
+            button_data = self._store.get_keyboard(keyboard_uuid)
+        except KeyError:
+            del self._keyboards_by_content[content_key]
+            return None
+
+        self._keyboards_by_content.move_to_end(content_key)
+        sends = cast(int, button_data.get(_SENDS_KEY, 1))
+        self.__put_keyboard(keyboard_uuid, {**button_data, _SENDS_KEY: sends + 1})
+        return markup
+
+    @staticmethod
+    def __put_button(callback_data: object, keyboard_uuid: str, button_data: dict) -> str:
+        """Stores the data for a single button in :attr:`button_data`.
         Returns the string that should be passed instead of the callback_data, which is
-        ``keyboard_uuid + button_uuids``.
+        ``keyboard_uuid + button_id``. As the keyboard UUID is random, the button ID only needs to
+        be unique within the keyboard.
         """
-        uuid = uuid4().hex
-        keyboard_data.button_data[uuid] = callback_data
-        return f"{keyboard_data.keyboard_uuid}{uuid}"
+        button_id = format(len(button_data), "x")
+        button_data[button_id] = callback_data
+        return f"{keyboard_uuid}{button_id}"
 
     def __get_keyboard_uuid_and_button_data(
-        self, callback_data: str
+        self, callback_data: str, keyboards: Optional[dict[str, Optional[dict]]] = None
     ) -> Union[tuple[str, object], tuple[None, InvalidCallbackData]]:
+        """Looks up the data of a button. :paramref:`keyboards` may be passed to look up each
+        keyboard only once when processing several buttons.
+        """
         keyboard, button = self.extract_uuids(callback_data)
-        try:
-            # we get the values before calling update() in case KeyErrors are raised
-            # we don't want to update in that case
-            keyboard_data = self._keyboard_data[keyboard]
-            button_data = keyboard_data.button_data[button]
-            # Update the timestamp for the LRU
-            keyboard_data.update_access_time()
-        except KeyError:
+        if keyboards is None or keyboard not in keyboards:
+            try:
+                # Also updates the timestamp for the LRU
+                button_data: Optional[dict] = self._store.get_keyboard(keyboard)
+            except KeyError:
+                button_data = None
+            else:
+                if self._changes is not None:
+                    # The access time of the keyboard has changed
+                    self._changes.put_keyboard(keyboard)
+            if keyboards is not None:
+                keyboards[keyboard] = button_data
+        else:
+            button_data = keyboards[keyboard]
+
+        if button_data is None or button == _SENDS_KEY or button not in button_data:
             return None, InvalidCallbackData(callback_data)
-        return keyboard, button_data
+        return keyboard, button_data[button]
 
     @staticmethod
     def extract_uuids(callback_data: str) -> tuple[str, str]:
@@ -343,13 +554,14 @@ class CallbackDataCache:
             return None
 
         keyboard_uuid = None
+        keyboards: dict[str, Optional[dict]] = {}
 
         for row in message.reply_markup.inline_keyboard:
             for button in row:
                 if button.callback_data:
                     button_data = cast(str, button.callback_data)
                     keyboard_id, callback_data = self.__get_keyboard_uuid_and_button_data(
-                        button_data
+                        button_data, keyboards
                     )
                     # update_callback_data makes sure that the _id_attrs are updated
                     button.update_callback_data(callback_data)
@@ -393,7 +605,11 @@ class CallbackDataCache:
 
             # Map the callback queries ID to the keyboards UUID for later use
             if not mapped and not isinstance(button_data, InvalidCallbackData):
-                self._callback_queries[callback_query.id] = keyboard_uuid  # type: ignore
+                self._store.put_callback_query(
+                    callback_query.id, keyboard_uuid  # type: ignore[arg-type]
+                )
+                if self._changes is not None:
+                    self._changes.put_callback_query(callback_query.id)
                 mapped = True
 
         # Get the cached callback data for the inline keyboard attached to the
@@ -415,6 +631,10 @@ class CallbackDataCache:
             *Will* raise :exc:`KeyError` in case the callback query can not be found in the
             cache.
 
+        .. versionchanged:: NEXT.VERSION
+            If the keyboard was sent multiple times and shares a single entry, the entry is only
+            deleted once this method was called for each time the keyboard was sent.
+
         Args:
             callback_query (:class:`telegram.CallbackQuery`): The callback query.
 
@@ -422,14 +642,28 @@ class CallbackDataCache:
             KeyError: If the callback query can not be found in the cache
         """
         try:
-            keyboard_uuid = self._callback_queries.pop(callback_query.id)
-            self.__drop_keyboard(keyboard_uuid)
+            keyboard_uuid = self._store.pop_callback_query(callback_query.id)
         except KeyError as exc:
             raise KeyError("CallbackQuery was not found in cache.") from exc
+        if self._changes is not None:
+            self._changes.drop_callback_query(callback_query.id)
+
+        try:
+            button_data = self._store.get_keyboard(keyboard_uuid)
+        except KeyError:
+            button_data = {}
+        sends = cast(int, button_data.get(_SENDS_KEY, 1))
+        if sends > 1:
+            # Other messages still show this keyboard
+            remaining = {key: value for key, value in button_data.items() if key != _SENDS_KEY}
+            if sends > 2:
+                remaining[_SENDS_KEY] = sends - 1
+            self.__put_keyboard(keyboard_uuid, remaining)
+            return
 
-    def __drop_keyboard(self, keyboard_uuid: str) -> None:
-        with contextlib.suppress(KeyError):
-            self._keyboard_data.pop(keyboard_uuid)
+        self._store.drop_keyboard(keyboard_uuid)
+        if self._changes is not None:
+            self._changes.drop_keyboard(keyboard_uuid)
 
     def clear_callback_data(self, time_cutoff: Optional[Union[float, datetime]] = None) -> None:
         """Clears the stored callback data.
@@ -442,17 +676,12 @@ class CallbackDataCache:
                 used.
 
         """
-        self.__clear(self._keyboard_data, time_cutoff=time_cutoff)
+        if self._changes is not None:
+            self._changes.full = True
 
-    def clear_callback_queries(self) -> None:
-        """Clears the stored callback query IDs."""
-        self.__clear(self._callback_queries)
-
-    def __clear(
-        self, mapping: MutableMapping, time_cutoff: Optional[Union[float, datetime]] = None
-    ) -> None:
         if not time_cutoff:
-            mapping.clear()
+            self._store.clear_keyboards()
+            self._keyboards_by_content.clear()
             return
 
         if isinstance(time_cutoff, datetime):
@@ -461,9 +690,10 @@ class CallbackDataCache:
             )
         else:
             effective_cutoff = time_cutoff
+        self._store.clear_keyboards(time_cutoff=effective_cutoff)
 
-        # We need a list instead of a generator here, as the list doesn't change it's size
-        # during the iteration
-        to_drop = [key for key, data in mapping.items() if data.access_time < effective_cutoff]
-        for key in to_drop:
-            mapping.pop(key)
+    def clear_callback_queries(self) -> None:
+        """Clears the stored callback query IDs."""
+        self._store.clear_callback_queries()
+        if self._changes is not None:
+            self._changes.full = True
@@ -0,0 +1,396 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the CallbackDataCodec class."""
+import base64
+import binascii
+import hashlib
+import hmac
+from collections.abc import Sequence
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Optional, Union, cast
+
+from telegram import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message, User
+from telegram.constants import InlineKeyboardButtonLimit
+from telegram.ext._callbackdatacache import InvalidCallbackData
+
+if TYPE_CHECKING:
+    from telegram.ext import ExtBot
+
+# Each value starts with a tag byte. The upper four bits give the type of the value, the lower four
+# bits carry a small payload, e.g. the length of a string. _LONG in the lower bits means that the
+# payload doesn't fit and follows as varint instead.
+_NONE = 0x00
+_BOOL = 0x10  # the value is in the lower bits
+_SMALL_INT = 0x20  # non-negative integers < 15, the value is in the lower bits
+_INT = 0x30  # zigzag encoded varint follows
+_STR = 0x40  # length in the lower bits, followed by the UTF-8 encoded string
+_ENUM = 0x50  # index of the enum class in the lower bits, followed by the index of the member
+_TUPLE = 0x60  # length in the lower bits, followed by the items
+_LONG = 0x0F
+_TYPE_MASK = 0xF0
+_MAX_ENUMS = 15
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_tag(buffer: bytearray, tag: int, payload: int) -> None:
+    if payload < _LONG:
+        buffer.append(tag | payload)
+    else:
+        buffer.append(tag | _LONG)
+        _write_varint(buffer, payload)
+
+
+def _read_tag_payload(data: bytes, pos: int, payload: int) -> tuple[int, int]:
+    if payload < _LONG:
+        return payload, pos
+    return _read_varint(data, pos)
+
+
+class CallbackDataCodec:
+    """A stateless alternative to :class:`telegram.ext.CallbackDataCache`. Instead of storing the
+    callback data of :class:`telegram.InlineKeyboardButton` on the side of the bot, it is encoded
+    into :paramref:`~telegram.InlineKeyboardButton.callback_data` itself along with a short
+    signature. When receiving the data again, the signature is verified and the data is decoded
+    without any lookup.
+
+    Because nothing is stored, the data is neither lost when the bot restarts nor does it need to
+    be persisted. In return, only small objects can be used as callback data, as the encoded data
+    must fit into the
+    :tg-const:`telegram.constants.InlineKeyboardButtonLimit.MAX_CALLBACK_DATA` bytes allowed by
+    Telegram. Supported are
+
+    * :obj:`None`, :obj:`bool`, :obj:`int` and :obj:`str`
+    * members of the enums passed as :paramref:`enums`
+    * tuples of the above, which may also be nested. Lists are decoded as tuples.
+
+    Use an instance of this class by passing it as
+    :paramref:`~telegram.ext.ExtBot.arbitrary_callback_data` to :class:`telegram.ext.ExtBot` or
+    to :meth:`telegram.ext.ApplicationBuilder.arbitrary_callback_data`.
+
+    Example:
+        .. code:: python
+
+            codec = CallbackDataCodec(secret="some secret", enums=[Action])
+            application = (
+                ApplicationBuilder().token("TOKEN").arbitrary_callback_data(codec).build()
+            )
+            ...
+            InlineKeyboardButton("Delete", callback_data=(Action.DELETE, item_id))
+
+    Note:
+        The data is only signed, not encrypted, i.e. users can read it but not alter it. Don't
+        put secrets into the callback data.
+
+    Warning:
+        Changing :paramref:`secret` or the order of :paramref:`enums` or of the members of the
+        enums invalidates the buttons that were sent before. Append new enums and members at the
+        end instead.
+
+    .. seealso:: :wiki:`Arbitrary callback_data <Arbitrary-callback_data>`
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        secret (:obj:`str` | :obj:`bytes`): The key used to sign the data.
+        enums (Sequence[type[:class:`enum.Enum`]], optional): The enums whose members may be used
+            in the callback data. At most ``15`` enums are supported.
+        signature_size (:obj:`int`, optional): The number of bytes of the signature. Must be
+            between ``1`` and ``32``. Defaults to ``4``. Smaller values leave more room for the
+            data but make it easier to guess valid signatures.
+
+    Attributes:
+        bot (:class:`telegram.ext.ExtBot`): Optional. The bot this codec is used for. Set by
+            :class:`telegram.ext.ExtBot` via :meth:`set_bot`.
+        signature_size (:obj:`int`): The number of bytes of the signature.
+    """
+
+    __slots__ = ("_enum_members", "_enum_positions", "_secret", "bot", "signature_size")
+
+    def __init__(
+        self,
+        secret: Union[str, bytes],
+        enums: Sequence[type[Enum]] = (),
+        signature_size: int = 4,
+    ):
+        if not secret:
+            raise ValueError("`secret` must not be empty.")
+        if not 1 <= signature_size <= hashlib.sha256().digest_size:
+            raise ValueError("`signature_size` must be between 1 and 32.")
+        if len(enums) > _MAX_ENUMS:
+            raise ValueError(f"At most {_MAX_ENUMS} enums are supported.")
+
+        self._secret: bytes = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.signature_size: int = signature_size
+        self.bot: Optional[ExtBot[Any]] = None
+        self._enum_members: list[list[Enum]] = [list(enum) for enum in enums]
+        # Keyed by class and name, as e.g. members of different IntEnums may be equal
+        self._enum_positions: dict[tuple[type[Enum], str], tuple[int, int]] = {
+            (type(member), member.name): (enum_index, member_index)
+            for enum_index, members in enumerate(self._enum_members)
+            for member_index, member in enumerate(members)
+        }
+
+    def set_bot(self, bot: "ExtBot[Any]") -> None:
+        """Set the bot this codec is used for. Called by :class:`telegram.ext.ExtBot`.
+
+        Args:
+            bot (:class:`telegram.ext.ExtBot`): The bot.
+        """
+        self.bot = bot
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()[: self.signature_size]
+
+    def _write_value(self, buffer: bytearray, value: object) -> None:
+        # Enum and bool have to be checked before int and str, as e.g. members of IntEnum are
+        # instances of int
+        if value is None:
+            buffer.append(_NONE)
+        elif isinstance(value, Enum):
+            try:
+                enum_index, member_index = self._enum_positions[(type(value), value.name)]
+            except KeyError as exc:
+                raise TypeError(f"The enum {type(value).__name__} was not registered.") from exc
+            buffer.append(_ENUM | enum_index)
+            _write_varint(buffer, member_index)
+        elif isinstance(value, bool):
+            buffer.append(_BOOL | int(value))
+        elif isinstance(value, int):
+            if 0 <= value < _LONG:
+                buffer.append(_SMALL_INT | value)
+            else:
+                buffer.append(_INT)
+                _write_varint(buffer, value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, str):
+            encoded = value.encode("utf-8")
+            _write_tag(buffer, _STR, len(encoded))
+            buffer.extend(encoded)
+        elif isinstance(value, (tuple, list)):
+            _write_tag(buffer, _TUPLE, len(value))
+            for item in value:
+                self._write_value(buffer, item)
+        else:
+            raise TypeError(f"Objects of type {type(value).__name__} can not be encoded.")
+
+    def _read_value(self, data: bytes, pos: int) -> tuple[object, int]:
+        tag = data[pos]
+        pos += 1
+        kind, payload = tag & _TYPE_MASK, tag & _LONG
+        if tag == _NONE:
+            return None, pos
+        if kind == _BOOL and payload <= 1:
+            return bool(payload), pos
+        if kind == _SMALL_INT and payload < _LONG:
+            return payload, pos
+        if tag == _INT:
+            value, pos = _read_varint(data, pos)
+            return (value >> 1 if not value & 1 else -((value + 1) >> 1)), pos
+        if kind == _STR:
+            length, pos = _read_tag_payload(data, pos, payload)
+            if pos + length > len(data):
+                raise ValueError("Unexpected end of data")
+            return data[pos : pos + length].decode("utf-8"), pos + length
+        if kind == _ENUM and payload < len(self._enum_members):
+            member_index, pos = _read_varint(data, pos)
+            return self._enum_members[payload][member_index], pos
+        if kind == _TUPLE:
+            length, pos = _read_tag_payload(data, pos, payload)
+            items = []
+            for _ in range(length):
+                item, pos = self._read_value(data, pos)
+                items.append(item)
+            return tuple(items), pos
+        raise ValueError(f"Invalid tag {tag}")
+
+    def encode(self, data: object) -> str:
+        """Encodes and signs the data.
+
+        Args:
+            data (:obj:`object`): The data. See above for the supported types.
+
+        Returns:
+            :obj:`str`: The string to be passed to Telegram as callback data.
+
+        Raises:
+            TypeError: If the data contains objects of unsupported types.
+            ValueError: If the encoded data is longer than
+                :tg-const:`telegram.constants.InlineKeyboardButtonLimit.MAX_CALLBACK_DATA` bytes.
+        """
+        buffer = bytearray()
+        self._write_value(buffer, data)
+        payload = bytes(buffer)
+        # base85 is the most compact of the binary-to-text encodings in the standard library
+        encoded = base64.b85encode(payload + self._sign(payload)).decode("ascii")
+        if len(encoded) > InlineKeyboardButtonLimit.MAX_CALLBACK_DATA:
+            raise ValueError(
+                f"The encoded callback data {data!r} is {len(encoded)} bytes long, but Telegram "
+                f"allows at most {InlineKeyboardButtonLimit.MAX_CALLBACK_DATA} bytes."
+            )
+        return encoded
+
+    def decode(self, callback_data: str) -> object:
+        """Verifies the signature of the data and decodes it.
+
+        Args:
+            callback_data (:obj:`str`): The callback data as returned by :meth:`encode`.
+
+        Returns:
+            :obj:`object`: The decoded data.
+
+        Raises:
+            telegram.ext.InvalidCallbackData: If the signature is invalid or the data can not be
+                decoded.
+        """
+        try:
+            raw = base64.b85decode(callback_data)
+        except (ValueError, binascii.Error) as exc:
+            raise InvalidCallbackData(callback_data) from exc
+
+        payload, signature = raw[: -self.signature_size], raw[-self.signature_size :]
+        if not payload or not hmac.compare_digest(signature, self._sign(payload)):
+            raise InvalidCallbackData(callback_data)
+
+        try:
+            data, pos = self._read_value(payload, 0)
+        except (IndexError, ValueError) as exc:
+            raise InvalidCallbackData(callback_data) from exc
+        if pos != len(payload):
+            raise InvalidCallbackData(callback_data)
+        return data
+
+    def _decode_or_invalid(self, callback_data: str) -> object:
+        try:
+            return self.decode(callback_data)
+        except InvalidCallbackData as exc:
+            return exc
+
+    def process_keyboard(self, reply_markup: InlineKeyboardMarkup) -> InlineKeyboardMarkup:
+        """Builds a new keyboard where the
+        :attr:`~telegram.InlineKeyboardButton.callback_data` of all buttons is encoded. Returns
+        the original reply markup, if none of the buttons have callback data.
+
+        Args:
+            reply_markup (:class:`telegram.InlineKeyboardMarkup`): The keyboard.
+
+        Returns:
+            :class:`telegram.InlineKeyboardMarkup`: The keyboard to be passed to Telegram.
+        """
+        if not any(btn.callback_data for row in reply_markup.inline_keyboard for btn in row):
+            return reply_markup
+
+        return InlineKeyboardMarkup(
+            [
+                [
+                    (
+                        # We create a new button instead of replacing callback_data in case the
+                        # same object is used elsewhere
+                        InlineKeyboardButton(
+                            btn.text, callback_data=self.encode(btn.callback_data)
+                        )
+                        if btn.callback_data
+                        else btn
+                    )
+                    for btn in row
+                ]
+                for row in reply_markup.inline_keyboard
+            ]
+        )
+
+    def process_message(self, message: Message) -> None:
+        """Decodes the callback data of the inline keyboard attached to the message, if it was
+        sent by the bot of this codec. If the data is invalid,
+        :class:`telegram.ext.InvalidCallbackData` will be inserted.
+
+        Note:
+            Checks :attr:`telegram.Message.via_bot` and :attr:`telegram.Message.from_user` in the
+            same way as :meth:`telegram.ext.CallbackDataCache.process_message`.
+
+        Warning:
+            *In place*, i.e. the passed :class:`telegram.Message` will be changed!
+
+        Args:
+            message (:class:`telegram.Message`): The message.
+        """
+        if not message.reply_markup:
+            return
+
+        if message.via_bot:
+            sender: Optional[User] = message.via_bot
+        elif message.from_user:
+            sender = message.from_user
+        else:
+            sender = None
+
+        if sender is not None and self.bot is not None and sender != self.bot.bot:
+            return
+
+        for row in message.reply_markup.inline_keyboard:
+            for button in row:
+                if button.callback_data:
+                    button.update_callback_data(
+                        self._decode_or_invalid(cast(str, button.callback_data))
+                    )
+
+    def process_callback_query(self, callback_query: CallbackQuery) -> None:
+        """Decodes the data of the callback query and of the attached messages keyboard, if
+        necessary. If the data is invalid, :class:`telegram.ext.InvalidCallbackData` will be
+        inserted.
+
+        Note:
+            Also considers :attr:`telegram.Message.reply_to_message` and
+            :attr:`telegram.Message.pinned_message`.
+
+        Warning:
+            *In place*, i.e. the passed :class:`telegram.CallbackQuery` will be changed!
+
+        Args:
+            callback_query (:class:`telegram.CallbackQuery`): The callback query.
+        """
+        if callback_query.data:
+            with callback_query._unfrozen():
+                callback_query.data = self._decode_or_invalid(  # type: ignore[assignment]
+                    callback_query.data
+                )
+
+        if isinstance(callback_query.message, Message):
+            self.process_message(callback_query.message)
+            for maybe_message in (
+                callback_query.message.pinned_message,
+                callback_query.message.reply_to_message,
+            ):
+                if isinstance(maybe_message, Message):
+                    self.process_message(maybe_message)
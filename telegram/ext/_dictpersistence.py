@@ -18,16 +18,76 @@
 # along with this program.  If not, see [http://www.gnu.org/licenses/].
 """This module contains the DictPersistence class."""
 import json
+from collections.abc import Collection, Hashable, Iterable, Mapping
 from copy import deepcopy
 from typing import TYPE_CHECKING, Any, Optional, cast
 
 from telegram.ext import BasePersistence, PersistenceInput
+from telegram.ext._callbackdatacache import apply_persistence_delta
 from telegram.ext._utils.types import CDCData, ConversationDict, ConversationKey
 
 if TYPE_CHECKING:
     from telegram._utils.types import JSONDict
 
 
+def _encode_key(key: object) -> str:
+    """Encodes a dictionary key exactly like :func:`json.dumps` does."""
+    if isinstance(key, str):
+        return json.dumps(key)
+    if type(key) is int:
+        return f'"{key}"'
+    # e.g. floats, booleans and None are converted to their JSON representation
+    return json.dumps({key: None})[1 : -len(": null}")]
+
+
+def _assemble_json(items: Iterable[tuple[str, str]]) -> str:
+    """Assembles a JSON object from already encoded keys and values. The output is identical to
+    the one of :func:`json.dumps` with default separators.
+    """
+    return "{" + ", ".join(f"{key}: {value}" for key, value in items) + "}"
+
+
+def _mark_changed(
+    versions: dict[Any, int], dropped: dict[Any, int], key: Hashable, version: int
+) -> None:
+    # Re-inserting keeps ``versions`` sorted by version, so that the changes since a given version
+    # can be found by iterating from the end
+    dropped.pop(key, None)
+    versions.pop(key, None)
+    versions[key] = version
+
+
+def _mark_dropped(
+    versions: dict[Any, int], dropped: dict[Any, int], key: Hashable, version: int
+) -> None:
+    # Dropped entries are kept apart, such that they can be forgotten once reported
+    versions.pop(key, None)
+    dropped.pop(key, None)
+    dropped[key] = version
+
+
+def _keys_changed_since(
+    versions: dict[Any, int], dropped: dict[Any, int], version: int
+) -> list[tuple[Any, bool]]:
+    """Returns the keys changed or dropped after ``version``, sorted by version, along with
+    whether they were dropped. Drops up to ``version`` are already known to the caller and are
+    forgotten.
+    """
+    while dropped:
+        key, key_version = next(iter(dropped.items()))
+        if key_version > version:
+            break
+        del dropped[key]
+
+    changes = [(key_version, key, True) for key, key_version in dropped.items()]
+    for key, key_version in reversed(versions.items()):
+        if key_version <= version:
+            break
+        changes.append((key_version, key, False))
+    changes.sort(key=lambda change: change[0])
+    return [(key, is_dropped) for _, key, is_dropped in changes]
+
+
 class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any, Any]]):
     """Using Python's :obj:`dict` and :mod:`json` for making your bot persistent.
 
@@ -45,6 +105,11 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
         * This implementation of :class:`BasePersistence` does not handle data that cannot be
           serialized by :func:`json.dumps`.
 
+        * The JSON representation of every single entry of :attr:`user_data`, :attr:`chat_data`
+          and :attr:`conversations` is cached. When accessing e.g. :attr:`user_data_json`, only
+          entries that changed since the last access are encoded again. Use :attr:`version` and
+          e.g. :meth:`user_data_changes_since` to export only the changed entries.
+
     .. seealso:: :wiki:`Making Your Bot Persistent <Making-your-bot-persistent>`
 
     .. versionchanged:: 20.0
@@ -83,11 +148,21 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
         "_callback_data",
         "_callback_data_json",
         "_chat_data",
+        "_chat_data_dropped",
+        "_chat_data_fragments",
         "_chat_data_json",
+        "_chat_data_versions",
         "_conversations",
+        "_conversations_dropped",
+        "_conversations_fragments",
         "_conversations_json",
+        "_conversations_versions",
         "_user_data",
+        "_user_data_dropped",
+        "_user_data_fragments",
         "_user_data_json",
+        "_user_data_versions",
+        "_version",
     )
 
     def __init__(
@@ -111,6 +186,20 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
         self._bot_data_json: Optional[str] = None
         self._callback_data_json: Optional[str] = None
         self._conversations_json: Optional[str] = None
+        # JSON encoded values of the single entries. Missing entries are encoded on demand.
+        self._user_data_fragments: dict[int, str] = {}
+        self._chat_data_fragments: dict[int, str] = {}
+        self._conversations_fragments: dict[str, dict[ConversationKey, str]] = {}
+        # The version at which each entry was last changed
+        self._version: int = 0
+        self._user_data_versions: dict[int, int] = {}
+        self._chat_data_versions: dict[int, int] = {}
+        self._conversations_versions: dict[tuple[str, ConversationKey], int] = {}
+        # The version at which entries were dropped or conversations ended. These are forgotten
+        # once a later version is passed to e.g. user_data_changes_since.
+        self._user_data_dropped: dict[int, int] = {}
+        self._chat_data_dropped: dict[int, int] = {}
+        self._conversations_dropped: dict[tuple[str, ConversationKey], int] = {}
         if user_data_json:
             try:
                 self._user_data = self._decode_user_chat_data_from_json(user_data_json)
@@ -176,10 +265,17 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
 
     @property
     def user_data_json(self) -> str:
-        """:obj:`str`: The user_data serialized as a JSON-string."""
+        """:obj:`str`: The user_data serialized as a JSON-string.
+
+        .. versionchanged:: NEXT.VERSION
+            Only entries that changed since the last access are encoded again.
+        """
         if self._user_data_json:
             return self._user_data_json
-        return json.dumps(self.user_data)
+        if self._user_data is None:
+            return json.dumps(self._user_data)
+        self._user_data_json = self._encode_id_mapping(self._user_data, self._user_data_fragments)
+        return self._user_data_json
 
     @property
     def chat_data(self) -> Optional[dict[int, dict[Any, Any]]]:
@@ -188,10 +284,17 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
 
     @property
     def chat_data_json(self) -> str:
-        """:obj:`str`: The chat_data serialized as a JSON-string."""
+        """:obj:`str`: The chat_data serialized as a JSON-string.
+
+        .. versionchanged:: NEXT.VERSION
+            Only entries that changed since the last access are encoded again.
+        """
         if self._chat_data_json:
             return self._chat_data_json
-        return json.dumps(self.chat_data)
+        if self._chat_data is None:
+            return json.dumps(self._chat_data)
+        self._chat_data_json = self._encode_id_mapping(self._chat_data, self._chat_data_fragments)
+        return self._chat_data_json
 
     @property
     def bot_data(self) -> Optional[dict[Any, Any]]:
@@ -231,12 +334,139 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
 
     @property
     def conversations_json(self) -> str:
-        """:obj:`str`: The conversations serialized as a JSON-string."""
+        """:obj:`str`: The conversations serialized as a JSON-string.
+
+        .. versionchanged:: NEXT.VERSION
+            Only states that changed since the last access are encoded again.
+        """
         if self._conversations_json:
             return self._conversations_json
-        if self.conversations:
-            return self._encode_conversations_to_json(self.conversations)
-        return json.dumps(self.conversations)
+        if not self._conversations:
+            return json.dumps(self._conversations)
+        self._conversations_json = _assemble_json(
+            (json.dumps(name), self._encode_conversation_states(name, states))
+            for name, states in self._conversations.items()
+        )
+        return self._conversations_json
+
+    @property
+    def version(self) -> int:
+        """:obj:`int`: Counter that is increased on every change of :attr:`user_data`,
+        :attr:`chat_data` and :attr:`conversations`. Pass a value read from this property to e.g.
+        :meth:`user_data_changes_since` to get the entries that changed in the meantime.
+
+        Note:
+            To keep memory bounded, dropped entries and ended conversations are only remembered
+            until a later version is passed to the corresponding ``*_changes_since`` method.
+            Always pass the version of the last successful export.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return self._version
+
+    def user_data_changes_since(self, version: int) -> dict[int, Optional[str]]:
+        """Returns the entries of :attr:`user_data` that changed after :paramref:`version`.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            version (:obj:`int`): A value previously read from :attr:`version`.
+
+        Returns:
+            dict[:obj:`int`, :obj:`str` | :obj:`None`]: Mapping of the user IDs to the
+            JSON-serialized data of the user. The value is :obj:`None` if the data was dropped.
+        """
+        return self._id_mapping_changes_since(
+            version,
+            self._user_data or {},
+            self._user_data_fragments,
+            self._user_data_versions,
+            self._user_data_dropped,
+        )
+
+    def chat_data_changes_since(self, version: int) -> dict[int, Optional[str]]:
+        """Returns the entries of :attr:`chat_data` that changed after :paramref:`version`.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            version (:obj:`int`): A value previously read from :attr:`version`.
+
+        Returns:
+            dict[:obj:`int`, :obj:`str` | :obj:`None`]: Mapping of the chat IDs to the
+            JSON-serialized data of the chat. The value is :obj:`None` if the data was dropped.
+        """
+        return self._id_mapping_changes_since(
+            version,
+            self._chat_data or {},
+            self._chat_data_fragments,
+            self._chat_data_versions,
+            self._chat_data_dropped,
+        )
+
+    def conversations_changes_since(self, version: int) -> dict[str, dict[ConversationKey, str]]:
+        """Returns the states in :attr:`conversations` that changed after :paramref:`version`.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            version (:obj:`int`): A value previously read from :attr:`version`.
+
+        Returns:
+            dict[:obj:`str`, dict[:obj:`tuple`, :obj:`str`]]: Mapping of the handler names to
+            the changed keys and their JSON-serialized new states.
+        """
+        out: dict[str, dict[ConversationKey, str]] = {}
+        conversations = self._conversations or {}
+        for (name, key), _ in _keys_changed_since(
+            self._conversations_versions, self._conversations_dropped, version
+        ):
+            out.setdefault(name, {})[key] = self._encode_conversation_state(
+                name, key, conversations[name][key]
+            )
+        return out
+
+    @staticmethod
+    def _encode_id_mapping(data: Mapping[int, object], fragments: dict[int, str]) -> str:
+        items = []
+        for key, value in data.items():
+            fragment = fragments.get(key)
+            if fragment is None:
+                fragment = fragments[key] = json.dumps(value)
+            items.append((_encode_key(key), fragment))
+        return _assemble_json(items)
+
+    @staticmethod
+    def _id_mapping_changes_since(
+        version: int,
+        data: Mapping[int, object],
+        fragments: dict[int, str],
+        versions: dict[int, int],
+        dropped: dict[int, int],
+    ) -> dict[int, Optional[str]]:
+        out: dict[int, Optional[str]] = {}
+        for key, is_dropped in _keys_changed_since(versions, dropped, version):
+            if is_dropped:
+                out[key] = None
+                continue
+            fragment = fragments.get(key)
+            if fragment is None:
+                fragment = fragments[key] = json.dumps(data[key])
+            out[key] = fragment
+        return out
+
+    def _encode_conversation_state(self, name: str, key: ConversationKey, state: object) -> str:
+        fragments = self._conversations_fragments.setdefault(name, {})
+        fragment = fragments.get(key)
+        if fragment is None:
+            fragment = fragments[key] = json.dumps(state)
+        return fragment
+
+    def _encode_conversation_states(self, name: str, states: ConversationDict) -> str:
+        return _assemble_json(
+            (json.dumps(json.dumps(key)), self._encode_conversation_state(name, key, state))
+            for key, state in states.items()
+        )
 
     async def get_user_data(self) -> dict[int, dict[object, object]]:
         """Returns the user_data created from the ``user_data_json`` or an empty :obj:`dict`.
@@ -309,6 +539,22 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
         if self._conversations.setdefault(name, {}).get(key) == new_state:
             return
         self._conversations[name][key] = new_state
+        self._conversations_fragments.get(name, {}).pop(key, None)
+        self._version += 1
+        if new_state is None:
+            _mark_dropped(
+                self._conversations_versions,
+                self._conversations_dropped,
+                (name, key),
+                self._version,
+            )
+        else:
+            _mark_changed(
+                self._conversations_versions,
+                self._conversations_dropped,
+                (name, key),
+                self._version,
+            )
         self._conversations_json = None
 
     async def update_user_data(self, user_id: int, data: dict[Any, Any]) -> None:
@@ -323,6 +569,9 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
         if self._user_data.get(user_id) == data:
             return
         self._user_data[user_id] = data
+        self._user_data_fragments.pop(user_id, None)
+        self._version += 1
+        _mark_changed(self._user_data_versions, self._user_data_dropped, user_id, self._version)
         self._user_data_json = None
 
     async def update_chat_data(self, chat_id: int, data: dict[Any, Any]) -> None:
@@ -337,6 +586,9 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
         if self._chat_data.get(chat_id) == data:
             return
         self._chat_data[chat_id] = data
+        self._chat_data_fragments.pop(chat_id, None)
+        self._version += 1
+        _mark_changed(self._chat_data_versions, self._chat_data_dropped, chat_id, self._version)
         self._chat_data_json = None
 
     async def update_bot_data(self, data: dict[Any, Any]) -> None:
@@ -365,6 +617,29 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
         self._callback_data = data
         self._callback_data_json = None
 
+    async def update_callback_data_delta(
+        self,
+        data: CDCData,
+        dropped_keyboards: Collection[str],
+        dropped_callback_queries: Collection[str],
+    ) -> None:
+        """Will apply the changes to the callback_data.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            data (tuple[list[tuple[:obj:`str`, :obj:`float`, dict[:obj:`str`, :class:`object`]]], \
+                dict[:obj:`str`, :obj:`str`]]): The keyboards and callback queries that were added
+                or changed.
+            dropped_keyboards (Collection[:obj:`str`]): The UUIDs of the keyboards to delete.
+            dropped_callback_queries (Collection[:obj:`str`]): The IDs of the callback queries to
+                delete.
+        """
+        self._callback_data = apply_persistence_delta(
+            self._callback_data, data, dropped_keyboards, dropped_callback_queries
+        )
+        self._callback_data_json = None
+
     async def drop_chat_data(self, chat_id: int) -> None:
         """Will delete the specified key from the :attr:`chat_data`.
 
@@ -375,7 +650,12 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
         """
         if self._chat_data is None:
             return
-        self._chat_data.pop(chat_id, None)
+        if chat_id not in self._chat_data:
+            return
+        del self._chat_data[chat_id]
+        self._chat_data_fragments.pop(chat_id, None)
+        self._version += 1
+        _mark_dropped(self._chat_data_versions, self._chat_data_dropped, chat_id, self._version)
         self._chat_data_json = None
 
     async def drop_user_data(self, user_id: int) -> None:
@@ -388,7 +668,12 @@ class DictPersistence(BasePersistence[dict[Any, Any], dict[Any, Any], dict[Any,
         """
         if self._user_data is None:
             return
-        self._user_data.pop(user_id, None)
+        if user_id not in self._user_data:
+            return
+        del self._user_data[user_id]
+        self._user_data_fragments.pop(user_id, None)
+        self._version += 1
+        _mark_dropped(self._user_data_versions, self._user_data_dropped, user_id, self._version)
         self._user_data_json = None
 
     async def refresh_user_data(self, user_id: int, user_data: dict[Any, Any]) -> None:
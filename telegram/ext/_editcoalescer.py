@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the EditCoalescer class."""
+import asyncio
+import contextlib
+from collections import deque
+from collections.abc import Awaitable
+from typing import Callable, Final, Optional, Union
+
+from telegram._utils.logging import get_logger
+from telegram._utils.types import JSONDict
+
+_LOGGER = get_logger(__name__, class_name="EditCoalescer")
+
+_Result = Union[bool, JSONDict, list[JSONDict]]
+_Callback = Callable[[str, JSONDict], Awaitable[_Result]]
+_Key = tuple[str, str, str]
+
+
+class _PendingEdit:
+    """A run of calls of the same method for one message, of which only the most recent one is
+    sent."""
+
+    __slots__ = ("callback", "data", "endpoint", "futures")
+
+    def __init__(self, endpoint: str, data: JSONDict, callback: _Callback) -> None:
+        self.endpoint: str = endpoint
+        self.data: JSONDict = data
+        self.callback: _Callback = callback
+        self.futures: list[asyncio.Future[_Result]] = []
+
+
+class _EditState:
+    """The edits of one message that are waiting to be sent, in the order they were made."""
+
+    __slots__ = ("next_time", "pending", "task")
+
+    def __init__(self) -> None:
+        self.pending: deque[_PendingEdit] = deque()
+        # The time of the event loop at which the next edit may be sent
+        self.next_time: float = 0
+        self.task: Optional[asyncio.Task] = None
+
+
+class EditCoalescer:
+    """Limits how often a message is edited and drops edits that are superseded before they are
+    sent. This is useful e.g. for streaming text into a message by repeatedly calling
+    :meth:`~telegram.Bot.edit_message_text`.
+
+    If the :class:`~telegram.ext.ExtBot` uses a coalescer, the first call of one of the methods in
+    :attr:`ENDPOINTS` for a message is made right away. Further calls for the same message are
+    made at most once every :attr:`min_interval` seconds and in the order in which they were made.
+    If several calls of the same method follow each other in the meantime, only the most recent
+    one is sent, i.e. the last write wins. All callers whose edits were superseded get the result
+    of the edit that is actually sent. The most recent edit is always sent eventually, also when
+    :meth:`telegram.ext.ExtBot.shutdown` is called.
+
+    Messages are identified by :paramref:`~telegram.Bot.edit_message_text.chat_id` and
+    :paramref:`~telegram.Bot.edit_message_text.message_id` or by
+    :paramref:`~telegram.Bot.edit_message_text.inline_message_id`.
+
+    Examples:
+        .. code-block:: python
+
+            application = (
+                ApplicationBuilder()
+                .token("TOKEN")
+                .edit_coalescer(EditCoalescer(min_interval=2))
+                .build()
+            )
+
+            async def stream(message, chunks):
+                text = ""
+                async for chunk in chunks:
+                    text += chunk
+                    # No need to throttle here, superseded edits are dropped
+                    await message.edit_text(text)
+
+    Note:
+        * Calls of different methods for the same message, e.g.
+          :meth:`~telegram.Bot.edit_message_text` and
+          :meth:`~telegram.Bot.edit_message_reply_markup`, are not combined with each other.
+          Instead, they are sent one after the other, such that e.g. a reply markup set by an
+          earlier call of :meth:`~telegram.Bot.edit_message_text` can't overwrite the one set
+          by a later call of :meth:`~telegram.Bot.edit_message_reply_markup`.
+        * As callers wait until their edit or a more recent one is sent, a call may take up to
+          :attr:`min_interval` seconds.
+
+    .. seealso:: :meth:`telegram.ext.ApplicationBuilder.edit_coalescer`
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        min_interval (:obj:`float`, optional): The minimum number of seconds between two edits
+            of the same message. Defaults to ``1``.
+
+    Attributes:
+        min_interval (:obj:`float`): The minimum number of seconds between two edits of the same
+            message.
+    """
+
+    __slots__ = ("_flush_event", "_states", "min_interval")
+
+    ENDPOINTS: Final[frozenset[str]] = frozenset(
+        {
+            "editMessageCaption",
+            "editMessageLiveLocation",
+            "editMessageReplyMarkup",
+            "editMessageText",
+        }
+    )
+    """frozenset[:obj:`str`]: The endpoints whose requests are coalesced."""
+
+    def __init__(self, min_interval: float = 1):
+        if min_interval < 0:
+            raise ValueError("`min_interval` must not be negative.")
+        self.min_interval: float = min_interval
+        self._states: dict[_Key, _EditState] = {}
+        # Created lazily, such that the event is bound to the loop the coalescer is used in
+        self._flush_event: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    @classmethod
+    def _get_key(cls, endpoint: str, data: JSONDict) -> Optional[_Key]:
+        if endpoint not in cls.ENDPOINTS:
+            return None
+        business_connection_id = str(data.get("business_connection_id"))
+        if (inline_message_id := data.get("inline_message_id")) is not None:
+            return business_connection_id, "", str(inline_message_id)
+        if data.get("chat_id") is None or data.get("message_id") is None:
+            return None
+        return business_connection_id, str(data["chat_id"]), str(data["message_id"])
+
+    @classmethod
+    def can_coalesce(cls, endpoint: str, data: JSONDict) -> bool:
+        """Checks whether a request can be combined with others.
+
+        Args:
+            endpoint (:obj:`str`): The Bot API endpoint, e.g. ``"editMessageText"``.
+            data (:obj:`dict`): The parameters of the request.
+
+        Returns:
+            :obj:`bool`
+        """
+        return cls._get_key(endpoint, data) is not None
+
+    async def process_request(self, endpoint: str, data: JSONDict, callback: _Callback) -> _Result:
+        """Buffers the edit and returns the result once it or a more recent edit of the same
+        message with the same method was sent.
+
+        Args:
+            endpoint (:obj:`str`): The Bot API endpoint. :meth:`can_coalesce` must return
+                :obj:`True` for the request.
+            data (:obj:`dict`): The parameters of the request.
+            callback (Callable[[:obj:`str`, :obj:`dict`], Awaitable[:obj:`bool` | :obj:`dict` | \
+                :obj:`list`]]): Makes a request to the passed endpoint with the passed parameters.
+
+        Returns:
+            :obj:`bool` | :obj:`dict` | :obj:`list`: The result of the request.
+        """
+        key = self._get_key(endpoint, data)
+        if key is None:
+            raise ValueError(f"Can't coalesce requests to {endpoint} with the given parameters.")
+
+        future: asyncio.Future[_Result] = asyncio.get_running_loop().create_future()
+        if self._flush_event is None:
+            self._flush_event = asyncio.Event()
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _EditState()
+        # Only the most recent call of a run of calls of the same method is sent. Runs of
+        # different methods are sent in order, such that they don't overwrite each other.
+        if state.pending and state.pending[-1].endpoint == endpoint:
+            _LOGGER.debug("Dropping superseded %s request", endpoint)
+            edit = state.pending[-1]
+            edit.data = data
+            edit.callback = callback
+        else:
+            edit = _PendingEdit(endpoint, data, callback)
+            state.pending.append(edit)
+        edit.futures.append(future)
+        if state.task is None:
+            state.task = asyncio.create_task(self._run(key, state))
+
+        return await future
+
+    async def flush(self) -> None:
+        """Sends the pending edits of every message right away, ignoring :attr:`min_interval`,
+        and waits until all edits are done. Called by :meth:`telegram.ext.ExtBot.shutdown`.
+        """
+        tasks = [state.task for state in self._states.values() if state.task is not None]
+        if not tasks or self._flush_event is None:
+            return
+        self._flush_event.set()
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._flush_event.clear()
+
+    async def _wait_until(self, when: float) -> None:
+        delay = when - asyncio.get_running_loop().time()
+        if delay > 0 and self._flush_event and not self._flush_event.is_set():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._flush_event.wait(), delay)
+
+    async def _run(self, key: _Key, state: _EditState) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await self._wait_until(state.next_time)
+                if not state.pending:
+                    # Nothing was edited within min_interval, so the next edit can be sent
+                    # right away
+                    return
+
+                edit = state.pending.popleft()
+                # Callers that were cancelled meanwhile don't need a result anymore. The most
+                # recent edit is still sent, if anyone else waits for it.
+                futures = [future for future in edit.futures if not future.done()]
+                if not futures:
+                    continue
+
+                state.next_time = loop.time() + self.min_interval
+                try:
+                    result = await edit.callback(edit.endpoint, edit.data)
+                except asyncio.CancelledError:
+                    for future in futures:
+                        future.cancel()
+                    raise
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(exc)
+                else:
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(result)
+        finally:
+            for edit in state.pending:
+                for future in edit.futures:
+                    future.cancel()
+            del self._states[key]
@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the EntityStore class."""
+from collections import OrderedDict
+from collections.abc import Iterator
+from typing import Optional, Union
+
+from telegram import (
+    Chat,
+    Giveaway,
+    GiveawayWinners,
+    MaybeInaccessibleMessage,
+    Message,
+    MessageOrigin,
+    MessageOriginChannel,
+    MessageOriginChat,
+    MessageOriginUser,
+    Story,
+    Update,
+    User,
+)
+
+_Entity = Optional[Union[User, Chat]]
+
+
+def _origin_entity(origin: Optional[MessageOrigin]) -> _Entity:
+    if isinstance(origin, MessageOriginUser):
+        return origin.sender_user
+    if isinstance(origin, MessageOriginChat):
+        return origin.sender_chat
+    if isinstance(origin, MessageOriginChannel):
+        return origin.chat
+    return None
+
+
+def _iter_shared_entities(
+    story: Optional[Story],
+    giveaway: Optional[Giveaway],
+    giveaway_winners: Optional[GiveawayWinners],
+) -> Iterator[_Entity]:
+    # The parts that messages and external replies have in common
+    if story is not None:
+        yield story.chat
+    if giveaway is not None:
+        yield from giveaway.chats
+    if giveaway_winners is not None:
+        yield giveaway_winners.chat
+        yield from giveaway_winners.winners
+
+
+def _iter_message_entities(message: MaybeInaccessibleMessage) -> Iterator[_Entity]:
+    """Yields the users and chats of the message. Those of the messages contained in it, e.g. the
+    message it replies to, are yielded afterwards, such that the sender of a message is yielded
+    before the sender of the message it replies to.
+    """
+    messages = [message]
+    for current in messages:
+        yield current.chat
+        if not isinstance(current, Message):
+            continue
+
+        yield current.from_user
+        yield current.sender_chat
+        yield current.via_bot
+        yield current.sender_business_bot
+        yield _origin_entity(current.forward_origin)
+        yield current.left_chat_member
+        yield from current.new_chat_members
+        if (alert := current.proximity_alert_triggered) is not None:
+            yield alert.traveler
+            yield alert.watcher
+        if (invited := current.video_chat_participants_invited) is not None:
+            yield from invited.users
+        if current.reply_to_story is not None:
+            yield current.reply_to_story.chat
+        yield from _iter_shared_entities(current.story, current.giveaway, current.giveaway_winners)
+        if (external_reply := current.external_reply) is not None:
+            yield _origin_entity(external_reply.origin)
+            yield external_reply.chat
+            yield from _iter_shared_entities(
+                external_reply.story, external_reply.giveaway, external_reply.giveaway_winners
+            )
+
+        if current.reply_to_message is not None:
+            messages.append(current.reply_to_message)
+        if current.pinned_message is not None:
+            messages.append(current.pinned_message)
+        if current.giveaway_completed and current.giveaway_completed.giveaway_message:
+            messages.append(current.giveaway_completed.giveaway_message)
+
+
+def _iter_entities(update: Update) -> Iterator[_Entity]:
+    """Yields the users and chats contained in the update, or :obj:`None` for the places where the
+    update has none. Only the places where the Bot API sends users and chats are visited, which is
+    a lot cheaper than visiting all attributes of all objects contained in the update.
+    """
+    message = (
+        update.message
+        or update.edited_message
+        or update.channel_post
+        or update.edited_channel_post
+        or update.business_message
+        or update.edited_business_message
+    )
+    if message is not None:
+        yield from _iter_message_entities(message)
+    elif (callback_query := update.callback_query) is not None:
+        yield callback_query.from_user
+        if callback_query.message is not None:
+            yield from _iter_message_entities(callback_query.message)
+    elif (chat_member := update.my_chat_member or update.chat_member) is not None:
+        yield chat_member.from_user
+        yield chat_member.chat
+        yield chat_member.new_chat_member.user
+        yield chat_member.old_chat_member.user
+    elif (
+        query := update.inline_query
+        or update.chosen_inline_result
+        or update.shipping_query
+        or update.pre_checkout_query
+        or update.purchased_paid_media
+    ) is not None:
+        yield query.from_user
+    elif (chat_join_request := update.chat_join_request) is not None:
+        yield chat_join_request.from_user
+        yield chat_join_request.chat
+    elif (poll_answer := update.poll_answer) is not None:
+        yield poll_answer.user
+        yield poll_answer.voter_chat
+    elif (reaction := update.message_reaction) is not None:
+        yield reaction.user
+        yield reaction.actor_chat
+        yield reaction.chat
+    elif update.message_reaction_count is not None:
+        yield update.message_reaction_count.chat
+    elif update.business_connection is not None:
+        yield update.business_connection.user
+    elif update.deleted_business_messages is not None:
+        yield update.deleted_business_messages.chat
+    elif update.chat_boost is not None:
+        yield update.chat_boost.chat
+        yield getattr(update.chat_boost.boost.source, "user", None)
+    elif update.removed_chat_boost is not None:
+        yield update.removed_chat_boost.chat
+        yield getattr(update.removed_chat_boost.source, "user", None)
+
+
+class EntityStore:
+    """Keeps the latest :class:`telegram.User` and :class:`telegram.Chat` objects seen in incoming
+    updates, such that handlers can look up users and chats by id or username without calling
+    :meth:`~telegram.Bot.get_chat`.
+
+    :class:`telegram.ext.Application` passes every update to :meth:`process_update` before
+    passing it to the handlers. The users and chats at all places of the update where the Bot API
+    sends them are stored, e.g. the senders of messages, the chats they were sent in, the origins
+    of forwarded messages and the members in :class:`telegram.ChatMemberUpdated`. For every id,
+    only the most recent object is kept. If more than :attr:`maxsize` users or chats are stored,
+    the least recently seen ones are dropped.
+
+    Examples:
+        .. code-block:: python
+
+            application = ApplicationBuilder().token("TOKEN").entity_store(True).build()
+
+            async def callback(update, context):
+                chat_id = context.application.entity_store.resolve_username("@some_channel")
+                if chat_id is not None:
+                    title = context.application.entity_store.get_chat(chat_id).title
+
+        Pass the same instance to :class:`telegram.ext.AIORateLimiter` to apply the rate limits of
+        a chat to requests that address the chat by its username:
+
+        .. code-block:: python
+
+            entity_store = EntityStore()
+            application = (
+                ApplicationBuilder()
+                .token("TOKEN")
+                .entity_store(entity_store)
+                .rate_limiter(AIORateLimiter(entity_store=entity_store))
+                .build()
+            )
+
+    Note:
+        The stored objects are the ones contained in the updates. In particular, chats are
+        :class:`telegram.Chat` objects with only the basic information, not
+        :class:`telegram.ChatFullInfo` objects.
+
+    .. seealso:: :meth:`telegram.ext.ApplicationBuilder.entity_store`
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        maxsize (:obj:`int`, optional): Maximum number of users and maximum number of chats to
+            store. Defaults to ``4096``.
+
+    Attributes:
+        maxsize (:obj:`int`): Maximum number of users and maximum number of chats to store.
+    """
+
+    __slots__ = ("_chats", "_ids_by_username", "_users", "maxsize")
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError("`maxsize` must be a positive integer.")
+        self.maxsize: int = maxsize
+        self._users: OrderedDict[int, User] = OrderedDict()
+        self._chats: OrderedDict[int, Chat] = OrderedDict()
+        self._ids_by_username: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._users) + len(self._chats)
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        """
+        Args:
+            user_id (:obj:`int`): The id of the user.
+
+        Returns:
+            :class:`telegram.User` | :obj:`None`: The latest stored user with this id, if any.
+        """
+        return self._users.get(user_id)
+
+    def get_chat(self, chat_id: int) -> Optional[Chat]:
+        """
+        Args:
+            chat_id (:obj:`int`): The id of the chat.
+
+        Returns:
+            :class:`telegram.Chat` | :obj:`None`: The latest stored chat with this id, if any.
+        """
+        return self._chats.get(chat_id)
+
+    def resolve_username(self, username: str) -> Optional[int]:
+        """Looks up the id of the user or chat that had this username when it was last seen.
+
+        Args:
+            username (:obj:`str`): The username, with or without leading ``@``. The case is
+                ignored.
+
+        Returns:
+            :obj:`int` | :obj:`None`: The id of the user or chat, if known.
+        """
+        return self._ids_by_username.get(username.removeprefix("@").lower())
+
+    def clear(self) -> None:
+        """Drops all stored users and chats."""
+        self._users.clear()
+        self._chats.clear()
+        self._ids_by_username.clear()
+
+    def process_update(self, update: Update) -> None:
+        """Stores all users and chats contained in the update.
+        :class:`telegram.ext.Application` calls this method for every update. If you use the bot
+        without an application, call it for every incoming update.
+
+        Args:
+            update (:class:`telegram.Update`): The update.
+        """
+        seen: set[tuple[type, int]] = set()
+        for entity in _iter_entities(update):
+            if entity is None:
+                continue
+            # The same user or chat may appear multiple times, e.g. in a message and the message
+            # it replies to. The first occurrence is the most relevant one.
+            kind = User if isinstance(entity, User) else Chat
+            if (kind, entity.id) in seen:
+                continue
+            seen.add((kind, entity.id))
+            if isinstance(entity, User):
+                self._store(self._users, entity)
+            else:
+                self._store(self._chats, entity)
+
+    def _store(
+        self,
+        entities: Union["OrderedDict[int, User]", "OrderedDict[int, Chat]"],
+        entity: Union[User, Chat],
+    ) -> None:
+        old = entities.get(entity.id)
+        if old is not None and old.username != entity.username:
+            self._unlink_username(old)
+        entities[entity.id] = entity  # type: ignore[assignment]
+        entities.move_to_end(entity.id)
+        if entity.username:
+            self._ids_by_username[entity.username.lower()] = entity.id
+
+        if len(entities) > self.maxsize:
+            _, dropped = entities.popitem(last=False)
+            self._unlink_username(dropped)
+
+    def _unlink_username(self, entity: Union[User, Chat]) -> None:
+        if not entity.username:
+            return
+        username = entity.username.lower()
+        if self._ids_by_username.get(username) != entity.id:
+            return
+        # A user and their private chat share id and username
+        for other in (self._users.get(entity.id), self._chats.get(entity.id)):
+            if other is not None and other is not entity and other.username == entity.username:
+                return
+        del self._ids_by_username[username]
@@ -59,6 +59,7 @@ from telegram import (
     GameHighScore,
     InlineKeyboardMarkup,
     InlineQueryResultsButton,
+    InputFile,
     InputMedia,
     InputPollOption,
     LinkPreviewOptions,
@@ -91,7 +92,14 @@ from telegram._utils.defaultvalue import DEFAULT_NONE, DefaultValue
 from telegram._utils.logging import get_logger
 from telegram._utils.repr import build_repr_with_selected_attrs
 from telegram._utils.types import CorrectOptionID, FileInput, JSONDict, ODVInput, ReplyMarkup
+from telegram.error import BadRequest
+from telegram.ext._basecallbackdatastore import BaseCallbackDataStore
 from telegram.ext._callbackdatacache import CallbackDataCache
+from telegram.ext._callbackdatacodec import CallbackDataCodec
+from telegram.ext._editcoalescer import EditCoalescer
+from telegram.ext._fileidcache import FileIdCache
+from telegram.ext._requestcoalescer import RequestCoalescer
+from telegram.ext._responsecache import ResponseCache
 from telegram.ext._utils.types import RLARGS
 from telegram.request import BaseRequest
 from telegram.warnings import PTBUserWarning
@@ -157,20 +165,63 @@ class ExtBot(Bot, Generic[RLARGS]):
     Args:
         defaults (:class:`telegram.ext.Defaults`, optional): An object containing default values to
             be used if not set explicitly in the bot methods.
-        arbitrary_callback_data (:obj:`bool` | :obj:`int`, optional): Whether to
+        arbitrary_callback_data (:obj:`bool` | :obj:`int` | \
+            :class:`telegram.ext.BaseCallbackDataStore` | \
+            :class:`telegram.ext.CallbackDataCodec`, optional): Whether to
             allow arbitrary objects as callback data for :class:`telegram.InlineKeyboardButton`.
             Pass an integer to specify the maximum number of objects cached in memory.
-            Defaults to :obj:`False`.
+            Pass a :class:`telegram.ext.BaseCallbackDataStore` to use a different storage backend
+            for :attr:`callback_data_cache`. Pass a :class:`telegram.ext.CallbackDataCodec` to
+            encode the data into the buttons instead of caching it, see
+            :attr:`callback_data_codec`. Defaults to :obj:`False`.
 
             .. seealso:: :wiki:`Arbitrary callback_data <Arbitrary-callback_data>`
+
+            .. versionchanged:: NEXT.VERSION
+                Accepts a :class:`telegram.ext.BaseCallbackDataStore` or a
+                :class:`telegram.ext.CallbackDataCodec`.
         rate_limiter (:class:`telegram.ext.BaseRateLimiter`, optional): A rate limiter to use for
             limiting the number of requests made by the bot per time interval.
 
             .. versionadded:: 20.0
+        file_id_cache (:obj:`bool` | :obj:`int` | :class:`telegram.ext.FileIdCache`, optional):
+            Whether to reuse the file ids of uploaded files when sending the same content again,
+            see :class:`telegram.ext.FileIdCache`. Pass an integer to specify the maximum number
+            of file ids to store. Defaults to :obj:`False`.
+
+            .. versionadded:: NEXT.VERSION
+        response_cache (:obj:`bool` | :class:`telegram.ext.ResponseCache`, optional): Whether to
+            cache the results of Bot API methods that only read data, e.g.
+            :meth:`~telegram.Bot.get_chat`, see :class:`telegram.ext.ResponseCache`. Pass an
+            instance to customize the cache. Defaults to :obj:`False`.
+
+            .. versionadded:: NEXT.VERSION
+        request_coalescer (:obj:`bool` | :class:`telegram.ext.RequestCoalescer`, optional):
+            Whether to combine concurrent calls of e.g. :meth:`~telegram.Bot.delete_message` for
+            the same chat into one call of the corresponding bulk method, see
+            :class:`telegram.ext.RequestCoalescer`. Pass an instance to customize the coalescer.
+            Defaults to :obj:`False`.
+
+            .. versionadded:: NEXT.VERSION
+        edit_coalescer (:obj:`bool` | :class:`telegram.ext.EditCoalescer`, optional): Whether to
+            limit how often a message is edited and to drop edits that are superseded before they
+            are sent, see :class:`telegram.ext.EditCoalescer`. Pass an instance to customize the
+            coalescer. Defaults to :obj:`False`.
+
+            .. versionadded:: NEXT.VERSION
 
     """
 
-    __slots__ = ("_callback_data_cache", "_defaults", "_rate_limiter")
+    __slots__ = (
+        "_callback_data_cache",
+        "_callback_data_codec",
+        "_defaults",
+        "_edit_coalescer",
+        "_file_id_cache",
+        "_rate_limiter",
+        "_request_coalescer",
+        "_response_cache",
+    )
 
     _LOGGER = get_logger(__name__, class_name="ExtBot")
 
@@ -188,8 +239,15 @@ class ExtBot(Bot, Generic[RLARGS]):
         private_key: Optional[bytes] = None,
         private_key_password: Optional[bytes] = None,
         defaults: Optional["Defaults"] = None,
-        arbitrary_callback_data: Union[bool, int] = False,
+        arbitrary_callback_data: Union[
+            bool, int, BaseCallbackDataStore, CallbackDataCodec
+        ] = False,
         local_mode: bool = False,
+        *,
+        file_id_cache: Union[bool, int, FileIdCache] = False,
+        response_cache: Union[bool, ResponseCache] = False,
+        request_coalescer: Union[bool, RequestCoalescer] = False,
+        edit_coalescer: Union[bool, EditCoalescer] = False,
     ): ...
 
     @overload
@@ -203,9 +261,16 @@ class ExtBot(Bot, Generic[RLARGS]):
         private_key: Optional[bytes] = None,
         private_key_password: Optional[bytes] = None,
         defaults: Optional["Defaults"] = None,
-        arbitrary_callback_data: Union[bool, int] = False,
+        arbitrary_callback_data: Union[
+            bool, int, BaseCallbackDataStore, CallbackDataCodec
+        ] = False,
         local_mode: bool = False,
         rate_limiter: Optional["BaseRateLimiter[RLARGS]"] = None,
+        *,
+        file_id_cache: Union[bool, int, FileIdCache] = False,
+        response_cache: Union[bool, ResponseCache] = False,
+        request_coalescer: Union[bool, RequestCoalescer] = False,
+        edit_coalescer: Union[bool, EditCoalescer] = False,
     ): ...
 
     def __init__(
@@ -218,9 +283,16 @@ class ExtBot(Bot, Generic[RLARGS]):
         private_key: Optional[bytes] = None,
         private_key_password: Optional[bytes] = None,
         defaults: Optional["Defaults"] = None,
-        arbitrary_callback_data: Union[bool, int] = False,
+        arbitrary_callback_data: Union[
+            bool, int, BaseCallbackDataStore, CallbackDataCodec
+        ] = False,
         local_mode: bool = False,
         rate_limiter: Optional["BaseRateLimiter[RLARGS]"] = None,
+        *,
+        file_id_cache: Union[bool, int, FileIdCache] = False,
+        response_cache: Union[bool, ResponseCache] = False,
+        request_coalescer: Union[bool, RequestCoalescer] = False,
+        edit_coalescer: Union[bool, EditCoalescer] = False,
     ):
         super().__init__(
             token=token,
@@ -236,11 +308,47 @@ class ExtBot(Bot, Generic[RLARGS]):
             self._defaults: Optional[Defaults] = defaults
             self._rate_limiter: Optional[BaseRateLimiter] = rate_limiter
             self._callback_data_cache: Optional[CallbackDataCache] = None
+            self._callback_data_codec: Optional[CallbackDataCodec] = None
+
+            if isinstance(file_id_cache, FileIdCache):
+                self._file_id_cache: Optional[FileIdCache] = file_id_cache
+            elif file_id_cache is False:
+                self._file_id_cache = None
+            elif file_id_cache is True:
+                self._file_id_cache = FileIdCache()
+            else:
+                self._file_id_cache = FileIdCache(maxsize=file_id_cache)
+
+            if isinstance(response_cache, ResponseCache):
+                self._response_cache: Optional[ResponseCache] = response_cache
+            else:
+                self._response_cache = ResponseCache() if response_cache else None
+
+            if isinstance(request_coalescer, RequestCoalescer):
+                self._request_coalescer: Optional[RequestCoalescer] = request_coalescer
+            else:
+                self._request_coalescer = RequestCoalescer() if request_coalescer else None
+
+            if isinstance(edit_coalescer, EditCoalescer):
+                self._edit_coalescer: Optional[EditCoalescer] = edit_coalescer
+            else:
+                self._edit_coalescer = EditCoalescer() if edit_coalescer else None
 
             # set up callback_data
             if arbitrary_callback_data is False:
                 return
 
+            if isinstance(arbitrary_callback_data, CallbackDataCodec):
+                self._callback_data_codec = arbitrary_callback_data
+                self._callback_data_codec.set_bot(self)
+                return
+
+            if isinstance(arbitrary_callback_data, BaseCallbackDataStore):
+                self._callback_data_cache = CallbackDataCache(
+                    bot=self, store=arbitrary_callback_data
+                )
+                return
+
             if not isinstance(arbitrary_callback_data, bool):
                 maxsize = cast(int, arbitrary_callback_data)
             else:
@@ -286,6 +394,59 @@ class ExtBot(Bot, Generic[RLARGS]):
         """
         return self._callback_data_cache
 
+    @property
+    def callback_data_codec(self) -> Optional[CallbackDataCodec]:
+        """:class:`telegram.ext.CallbackDataCodec`: Optional. The codec for objects passed as
+        callback data for :class:`telegram.InlineKeyboardButton`, if
+        :paramref:`~telegram.ext.ExtBot.arbitrary_callback_data` is a
+        :class:`telegram.ext.CallbackDataCodec`. In that case, :attr:`callback_data_cache` is
+        :obj:`None`.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return self._callback_data_codec
+
+    @property
+    def file_id_cache(self) -> Optional[FileIdCache]:
+        """:class:`telegram.ext.FileIdCache`: Optional. The cache for the file ids of uploaded
+        files, if :paramref:`~telegram.ext.ExtBot.file_id_cache` was set.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return self._file_id_cache
+
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        """:class:`telegram.ext.ResponseCache`: Optional. The cache for the results of Bot API
+        methods that only read data, if :paramref:`~telegram.ext.ExtBot.response_cache` was set.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return self._response_cache
+
+    @property
+    def request_coalescer(self) -> Optional[RequestCoalescer]:
+        """:class:`telegram.ext.RequestCoalescer`: Optional. Combines single-message requests
+        into bulk requests, if :paramref:`~telegram.ext.ExtBot.request_coalescer` was set.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return self._request_coalescer
+
+    @property
+    def edit_coalescer(self) -> Optional[EditCoalescer]:
+        """:class:`telegram.ext.EditCoalescer`: Optional. Limits how often a message is edited,
+        if :paramref:`~telegram.ext.ExtBot.edit_coalescer` was set.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return self._edit_coalescer
+
+    @property
+    def _callback_data_processor(self) -> Optional[Union[CallbackDataCache, CallbackDataCodec]]:
+        # Both classes provide the same methods for processing keyboards, messages and queries
+        return self._callback_data_cache or self._callback_data_codec
+
     async def initialize(self) -> None:
         """See :meth:`telegram.Bot.initialize`. Also initializes the
         :paramref:`ExtBot.rate_limiter` (if set)
@@ -299,11 +460,24 @@ class ExtBot(Bot, Generic[RLARGS]):
     async def shutdown(self) -> None:
         """See :meth:`telegram.Bot.shutdown`. Also shuts down the
         :paramref:`ExtBot.rate_limiter` (if set) by
-        calling :meth:`telegram.ext.BaseRateLimiter.shutdown`.
+        calling :meth:`telegram.ext.BaseRateLimiter.shutdown` and the store of
+        :attr:`callback_data_cache` (if set) by calling
+        :meth:`telegram.ext.BaseCallbackDataStore.shutdown`.
+
+        .. versionchanged:: NEXT.VERSION
+            Also shuts down the store of :attr:`callback_data_cache` and makes the requests
+            buffered by :attr:`request_coalescer` and :attr:`edit_coalescer`.
         """
+        # Make the buffered requests before shutting down the rate limiter and request objects
+        if self._request_coalescer is not None:
+            await self._request_coalescer.flush()
+        if self._edit_coalescer is not None:
+            await self._edit_coalescer.flush()
         # Shut down the rate limiter before shutting down the request objects!
         if self.rate_limiter:
             await self.rate_limiter.shutdown()
+        if self.callback_data_cache is not None:
+            await self.callback_data_cache.store.shutdown()
         await super().shutdown()
 
     @classmethod
@@ -338,7 +512,8 @@ class ExtBot(Bot, Generic[RLARGS]):
         pool_timeout: ODVInput[float] = DEFAULT_NONE,
     ) -> Union[bool, JSONDict, list[JSONDict]]:
         """Order of method calls is: Bot.some_method -> Bot._post -> Bot._do_post.
-        So we can override Bot._do_post to add rate limiting.
+        So we can override Bot._do_post to add rate limiting, the file id cache, the response
+        cache and the request and edit coalescers.
         """
         rate_limit_args = self._extract_rl_kwargs(data)
         if not self.rate_limiter and rate_limit_args is not None:
@@ -346,23 +521,88 @@ class ExtBot(Bot, Generic[RLARGS]):
                 "`rate_limit_args` can only be used if a `ExtBot.rate_limiter` is set."
             )
 
-        # getting updates should not be rate limited!
-        if endpoint == "getUpdates" or not self.rate_limiter:
-            return await super()._do_post(
-                endpoint=endpoint,
-                data=data,
-                write_timeout=write_timeout,
-                connect_timeout=connect_timeout,
-                pool_timeout=pool_timeout,
-                read_timeout=read_timeout,
-            )
-
-        kwargs = {
+        kwargs: dict[str, ODVInput[float]] = {
             "read_timeout": read_timeout,
             "write_timeout": write_timeout,
             "connect_timeout": connect_timeout,
             "pool_timeout": pool_timeout,
         }
+
+        async def callback(endpoint: str, data: JSONDict) -> Union[bool, JSONDict, list[JSONDict]]:
+            return await self._do_post_cached(endpoint, data, rate_limit_args, kwargs)
+
+        if self._request_coalescer is not None and self._request_coalescer.can_coalesce(
+            endpoint, data
+        ):
+            return await self._request_coalescer.process_request(endpoint, data, callback)
+        if self._edit_coalescer is not None and self._edit_coalescer.can_coalesce(endpoint, data):
+            return await self._edit_coalescer.process_request(endpoint, data, callback)
+
+        return await self._do_post_cached(endpoint, data, rate_limit_args, kwargs)
+
+    async def _do_post_cached(
+        self,
+        endpoint: str,
+        data: JSONDict,
+        rate_limit_args: Optional[RLARGS],
+        kwargs: dict[str, ODVInput[float]],
+    ) -> Union[bool, JSONDict, list[JSONDict]]:
+        async def do_post() -> Union[bool, JSONDict, list[JSONDict]]:
+            if self._file_id_cache is not None and endpoint in FileIdCache.ENDPOINTS:
+                input_file = data.get(FileIdCache.ENDPOINTS[endpoint])
+                if isinstance(input_file, InputFile) and not input_file.attach_name:
+                    return await self._do_post_with_file_id_cache(
+                        self._file_id_cache, endpoint, data, input_file, rate_limit_args, kwargs
+                    )
+
+            return await self._do_post_rate_limited(endpoint, data, rate_limit_args, kwargs)
+
+        if self._response_cache is None:
+            return await do_post()
+        return await self._response_cache.process_request(endpoint, data, do_post)
+
+    async def _do_post_with_file_id_cache(
+        self,
+        cache: FileIdCache,
+        endpoint: str,
+        data: JSONDict,
+        input_file: InputFile,
+        rate_limit_args: Optional[RLARGS],
+        kwargs: dict[str, ODVInput[float]],
+    ) -> Union[bool, JSONDict, list[JSONDict]]:
+        key = await cache.get_key(endpoint, input_file)
+        if key is not None and (file_id := cache.get_file_id(key)) is not None:
+            try:
+                return await self._do_post_rate_limited(
+                    endpoint,
+                    {**data, FileIdCache.ENDPOINTS[endpoint]: file_id},
+                    rate_limit_args,
+                    kwargs,
+                )
+            except BadRequest as exc:
+                if not cache.is_file_id_error(exc):
+                    raise
+                self._LOGGER.debug(
+                    "Telegram rejected the cached file id %s, uploading the file again", file_id
+                )
+                cache.drop_file_id(key)
+
+        result = await self._do_post_rate_limited(endpoint, data, rate_limit_args, kwargs)
+        if key is not None and (file_id := cache.extract_file_id(endpoint, result)) is not None:
+            cache.put_file_id(key, file_id)
+        return result
+
+    async def _do_post_rate_limited(
+        self,
+        endpoint: str,
+        data: JSONDict,
+        rate_limit_args: Optional[RLARGS],
+        kwargs: dict[str, ODVInput[float]],
+    ) -> Union[bool, JSONDict, list[JSONDict]]:
+        # getting updates should not be rate limited!
+        if endpoint == "getUpdates" or not self.rate_limiter:
+            return await super()._do_post(endpoint=endpoint, data=data, **kwargs)
+
         self._LOGGER.debug(
             "Passing request through rate limiter of type %s with rate_limit_args %s",
             type(self.rate_limiter),
@@ -507,18 +747,18 @@ class ExtBot(Bot, Generic[RLARGS]):
 
     def _replace_keyboard(self, reply_markup: Optional[KT]) -> Optional[KT]:
         # If the reply_markup is an inline keyboard and we allow arbitrary callback data, let the
-        # CallbackDataCache build a new keyboard with the data replaced. Otherwise return the input
-        if isinstance(reply_markup, InlineKeyboardMarkup) and self.callback_data_cache is not None:
+        # CallbackDataCache or CallbackDataCodec build a new keyboard with the data replaced.
+        # Otherwise return the input
+        processor = self._callback_data_processor
+        if isinstance(reply_markup, InlineKeyboardMarkup) and processor is not None:
             # for some reason mypy doesn't understand that IKB is a subtype of Optional[KT]
-            return self.callback_data_cache.process_keyboard(  # type: ignore[return-value]
-                reply_markup
-            )
+            return processor.process_keyboard(reply_markup)  # type: ignore[return-value]
 
         return reply_markup
 
     def insert_callback_data(self, update: Update) -> None:
-        """If this bot allows for arbitrary callback data, this inserts the cached data into all
-        corresponding buttons within this update.
+        """If this bot allows for arbitrary callback data, this inserts the cached or decoded data
+        into all corresponding buttons within this update.
 
         Note:
             Checks :attr:`telegram.Message.via_bot` and :attr:`telegram.Message.from_user`
@@ -550,30 +790,31 @@ class ExtBot(Bot, Generic[RLARGS]):
             self._insert_callback_data(update.effective_message)
 
     def _insert_callback_data(self, obj: HandledTypes) -> HandledTypes:
-        if self.callback_data_cache is None:
+        processor = self._callback_data_processor
+        if processor is None:
             return obj
 
         if isinstance(obj, CallbackQuery):
-            self.callback_data_cache.process_callback_query(obj)
+            processor.process_callback_query(obj)
             return obj  # type: ignore[return-value]
 
         if isinstance(obj, Message):
             if obj.reply_to_message:
                 # reply_to_message can't contain further reply_to_messages, so no need to check
-                self.callback_data_cache.process_message(obj.reply_to_message)
+                processor.process_message(obj.reply_to_message)
                 if isinstance(obj.reply_to_message.pinned_message, Message):
                     # pinned messages can't contain reply_to_message, no need to check
-                    self.callback_data_cache.process_message(obj.reply_to_message.pinned_message)
+                    processor.process_message(obj.reply_to_message.pinned_message)
             if isinstance(obj.pinned_message, Message):
                 # pinned messages can't contain reply_to_message, no need to check
-                self.callback_data_cache.process_message(obj.pinned_message)
+                processor.process_message(obj.pinned_message)
 
             # Finally, handle the message itself
-            self.callback_data_cache.process_message(message=obj)
+            processor.process_message(message=obj)
             return obj  # type: ignore[return-value]
 
         if isinstance(obj, ChatFullInfo) and obj.pinned_message:
-            self.callback_data_cache.process_message(obj.pinned_message)
+            processor.process_message(obj.pinned_message)
 
         return obj
 
@@ -677,7 +918,7 @@ class ExtBot(Bot, Generic[RLARGS]):
         )
 
         # Process arbitrary callback
-        if self.callback_data_cache is None:
+        if self._callback_data_processor is None:
             return effective_results, next_offset
         results = []
         for result in effective_results:
@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the FileIdCache class."""
+import asyncio
+import hashlib
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+from types import MappingProxyType
+from typing import IO, Final, Optional, Union, cast
+
+from telegram import InputFile
+from telegram._utils.types import FileContent, JSONDict
+from telegram.error import BadRequest
+
+# Contents larger than this are hashed in a worker thread
+_HASH_IN_THREAD_SIZE = 1024 * 1024
+_CHUNK_SIZE = 64 * 1024
+# Parts of the error messages of the Bot API for file ids that can't be used (anymore)
+_FILE_ID_ERRORS = (
+    "file id",
+    "file reference",
+    "wrong type of the web page content",
+    "failed to get http url content",
+)
+
+
+def _hash_bytes(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _hash_file_handle(file_handle: IO[bytes]) -> str:
+    digest = hashlib.sha256()
+    file_handle.seek(0)
+    while chunk := file_handle.read(_CHUNK_SIZE):
+        digest.update(chunk)
+    file_handle.seek(0)
+    return digest.hexdigest()
+
+
+def _hash_local_file(path: Path) -> str:
+    with path.open("rb") as file_handle:
+        return _hash_file_handle(file_handle)
+
+
+class FileIdCache:
+    """Remembers the :attr:`~telegram.PhotoSize.file_id` of uploaded files by their content, such
+    that sending the same content again reuses the file already stored on Telegram's servers
+    instead of uploading it again.
+
+    If the :class:`~telegram.ext.ExtBot` uses a cache, the file is hashed before sending it via
+    one of the endpoints in :attr:`ENDPOINTS`, e.g. :meth:`~telegram.Bot.send_photo`. If the same
+    content was sent with the same file name before, the request is made with the stored file id
+    instead. Otherwise, the file is uploaded and the file id from the returned message is stored.
+    If Telegram rejects a stored file id, the entry is dropped and the file is uploaded again.
+
+    Files are hashed with SHA-256 in a worker thread. The hashes of local files passed as
+    :class:`pathlib.Path` are kept until the file is modified, so they are read only once.
+    File handles are only hashed if they are seekable. Asynchronous iterables are never cached,
+    as they can't be read twice.
+
+    Examples:
+        .. code-block:: python
+
+            application = ApplicationBuilder().token("TOKEN").file_id_cache(True).build()
+
+            for chat_id in chat_ids:
+                # Only the first call uploads the file
+                await application.bot.send_photo(chat_id, Path("banner.png"))
+
+    Note:
+        Files that are uploaded as part of :class:`telegram.InputMedia`, e.g. via
+        :meth:`~telegram.Bot.send_media_group`, and thumbnails are not cached.
+
+    .. seealso:: :meth:`telegram.ext.ApplicationBuilder.file_id_cache`,
+        :meth:`telegram.ext.BasePersistence.get_file_id_cache`
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        maxsize (:obj:`int`, optional): Maximum number of file ids to store. If the cache is full,
+            the least recently used entry is dropped. Defaults to ``1024``.
+
+    Attributes:
+        maxsize (:obj:`int`): Maximum number of file ids to store.
+    """
+
+    __slots__ = ("_changed", "_file_ids", "_path_digests", "maxsize")
+
+    ENDPOINTS: Final[Mapping[str, str]] = MappingProxyType(
+        {
+            "sendAnimation": "animation",
+            "sendAudio": "audio",
+            "sendDocument": "document",
+            "sendPhoto": "photo",
+            "sendSticker": "sticker",
+            "sendVideo": "video",
+            "sendVideoNote": "video_note",
+            "sendVoice": "voice",
+        }
+    )
+    """Mapping[:obj:`str`, :obj:`str`]: The endpoints whose uploads are cached, mapped to the
+    name of the parameter that holds the file."""
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("`maxsize` must be a positive integer.")
+        self.maxsize: int = maxsize
+        self._file_ids: OrderedDict[str, str] = OrderedDict()
+        self._path_digests: OrderedDict[Path, tuple[tuple[int, int], str]] = OrderedDict()
+        self._changed: bool = False
+
+    def __len__(self) -> int:
+        return len(self._file_ids)
+
+    @property
+    def persistence_data(self) -> dict[str, str]:
+        """dict[:obj:`str`, :obj:`str`]: The stored file ids by the keys of the contents. Can be
+        used to restore the cache with :meth:`load_persistence_data`.
+        """
+        return dict(self._file_ids)
+
+    def load_persistence_data(self, persistent_data: Mapping[str, str]) -> None:
+        """Loads data that was previously returned by :attr:`persistence_data`.
+
+        Args:
+            persistent_data (Mapping[:obj:`str`, :obj:`str`]): The data to load.
+        """
+        self._file_ids.update(persistent_data)
+        while len(self._file_ids) > self.maxsize:
+            self._file_ids.popitem(last=False)
+
+    def pop_changed(self) -> bool:
+        """Returns whether the cache was changed since the last call of this method. Used by
+        :meth:`telegram.ext.Application.update_persistence`.
+        """
+        changed, self._changed = self._changed, False
+        return changed
+
+    def mark_changed(self) -> None:
+        """Makes the next call of :meth:`pop_changed` return :obj:`True`. Used by
+        :meth:`telegram.ext.Application.update_persistence` if the changes reported by the last
+        call of :meth:`pop_changed` could not be persisted.
+        """
+        self._changed = True
+
+    def clear(self) -> None:
+        """Drops all stored file ids."""
+        if self._file_ids:
+            self._changed = True
+        self._file_ids.clear()
+        self._path_digests.clear()
+
+    async def get_key(self, endpoint: str, input_file: InputFile) -> Optional[str]:
+        """Computes the key under which the file id of the given upload is stored.
+
+        Args:
+            endpoint (:obj:`str`): The endpoint the file is sent with, one of :attr:`ENDPOINTS`.
+            input_file (:class:`telegram.InputFile`): The file to upload.
+
+        Returns:
+            :obj:`str` | :obj:`None`: The key or :obj:`None`, if the content can't be hashed
+            without consuming it.
+        """
+        digest = await self._get_digest(input_file.input_file_content)
+        if digest is None:
+            return None
+        return f"{self.ENDPOINTS[endpoint]}:{input_file.filename}:{digest}"
+
+    def get_file_id(self, key: str) -> Optional[str]:
+        """
+        Args:
+            key (:obj:`str`): A key returned by :meth:`get_key`.
+
+        Returns:
+            :obj:`str` | :obj:`None`: The stored file id, if any.
+        """
+        file_id = self._file_ids.get(key)
+        if file_id is not None:
+            self._file_ids.move_to_end(key)
+        return file_id
+
+    def put_file_id(self, key: str, file_id: str) -> None:
+        """Stores a file id.
+
+        Args:
+            key (:obj:`str`): A key returned by :meth:`get_key`.
+            file_id (:obj:`str`): The file id of the uploaded file.
+        """
+        if self._file_ids.get(key) != file_id:
+            self._changed = True
+        self._file_ids[key] = file_id
+        self._file_ids.move_to_end(key)
+        if len(self._file_ids) > self.maxsize:
+            self._file_ids.popitem(last=False)
+
+    def drop_file_id(self, key: str) -> None:
+        """Drops a stored file id, e.g. because Telegram rejected it.
+
+        Args:
+            key (:obj:`str`): A key returned by :meth:`get_key`.
+        """
+        if self._file_ids.pop(key, None) is not None:
+            self._changed = True
+
+    @staticmethod
+    def is_file_id_error(exc: BadRequest) -> bool:
+        """Checks whether Telegram rejected a request because of an invalid file id.
+
+        Args:
+            exc (:class:`telegram.error.BadRequest`): The error raised by the request.
+
+        Returns:
+            :obj:`bool`
+        """
+        message = exc.message.lower().replace("_", " ")
+        return any(part in message for part in _FILE_ID_ERRORS)
+
+    @classmethod
+    def extract_file_id(
+        cls, endpoint: str, result: Union[bool, JSONDict, list[JSONDict]]
+    ) -> Optional[str]:
+        """Extracts the file id of the uploaded file from the message returned by the Bot API.
+
+        Args:
+            endpoint (:obj:`str`): The endpoint the file was sent with, one of :attr:`ENDPOINTS`.
+            result (:obj:`dict`): The message returned by the Bot API in JSON format.
+
+        Returns:
+            :obj:`str` | :obj:`None`: The file id, if the message contains one.
+        """
+        if not isinstance(result, dict):
+            return None
+        obj = result.get(cls.ENDPOINTS[endpoint])
+        if isinstance(obj, list):
+            # For photos, the largest size is the last one
+            obj = obj[-1] if obj else None
+        if isinstance(obj, dict):
+            return obj.get("file_id")
+        return None
+
+    async def _get_digest(self, content: FileContent) -> Optional[str]:
+        if isinstance(content, bytes):
+            if len(content) < _HASH_IN_THREAD_SIZE:
+                return _hash_bytes(content)
+            return await asyncio.to_thread(_hash_bytes, content)
+
+        if isinstance(content, Path):
+            stat = await asyncio.to_thread(content.stat)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            cached = self._path_digests.get(content)
+            if cached is not None and cached[0] == signature:
+                self._path_digests.move_to_end(content)
+                return cached[1]
+
+            digest = await asyncio.to_thread(_hash_local_file, content)
+            self._path_digests[content] = (signature, digest)
+            self._path_digests.move_to_end(content)
+            if len(self._path_digests) > self.maxsize:
+                self._path_digests.popitem(last=False)
+            return digest
+
+        if hasattr(content, "seekable") and content.seekable():
+            return await asyncio.to_thread(_hash_file_handle, cast(IO[bytes], content))
+
+        return None
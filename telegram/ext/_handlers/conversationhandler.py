@@ -37,7 +37,7 @@ from telegram.ext._handlers.inlinequeryhandler import InlineQueryHandler
 from telegram.ext._handlers.stringcommandhandler import StringCommandHandler
 from telegram.ext._handlers.stringregexhandler import StringRegexHandler
 from telegram.ext._handlers.typehandler import TypeHandler
-from telegram.ext._utils.trackingdict import TrackingDict
+from telegram.ext._utils.conversationstore import ConversationStateStore
 from telegram.ext._utils.types import CCT, ConversationDict, ConversationKey
 
 if TYPE_CHECKING:
@@ -329,7 +329,7 @@ class ConversationHandler(BaseHandler[Update, CCT, object]):
         # conv has timed out.
         self.timeout_jobs: dict[ConversationKey, Job[Any]] = {}
         self._timeout_jobs_lock = asyncio.Lock()
-        self._conversations: ConversationDict = {}
+        self._conversations: ConversationDict = ConversationStateStore()
         self._child_conversations: set[ConversationHandler] = set()
 
         if persistent and not self.name:
@@ -580,7 +580,7 @@ class ConversationHandler(BaseHandler[Update, CCT, object]):
 
     async def _initialize_persistence(
         self, application: "Application"
-    ) -> dict[str, TrackingDict[ConversationKey, object]]:
+    ) -> dict[str, ConversationStateStore]:
         """Initializes the persistence for this handler and its child conversations.
         While this method is marked as protected, we expect it to be called by the
         Application/parent conversations. It's just protected to hide it from users.
@@ -589,7 +589,7 @@ class ConversationHandler(BaseHandler[Update, CCT, object]):
             application (:class:`telegram.ext.Application`): The application.
 
         Returns:
-            A dict {conversation.name -> TrackingDict}, which contains all dict of this
+            A dict {conversation.name -> ConversationStateStore}, which contains all dict of this
             conversation and possible child conversations.
 
         """
@@ -600,10 +600,7 @@ class ConversationHandler(BaseHandler[Update, CCT, object]):
             )
 
         current_conversations = self._conversations
-        self._conversations = cast(
-            TrackingDict[ConversationKey, object],
-            TrackingDict(),
-        )
+        self._conversations = ConversationStateStore(track_writes=True)
         # In the conversation already processed updates
         self._conversations.update(current_conversations)
         # above might be partly overridden but that's okay since we warn about that in
@@ -0,0 +1,621 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the HeapJobQueue class."""
+import asyncio
+import datetime
+import heapq
+import itertools
+import math
+import os
+import time
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Union, cast
+
+try:
+    from apscheduler.jobstores.base import ConflictingIdError, JobLookupError
+    from apscheduler.triggers.base import BaseTrigger
+    from apscheduler.triggers.cron import CronTrigger
+    from apscheduler.triggers.date import DateTrigger
+    from apscheduler.triggers.interval import IntervalTrigger
+    from apscheduler.util import convert_to_datetime
+except ImportError:
+    pass
+
+from telegram._utils.logging import get_logger
+from telegram._utils.types import JSONDict
+from telegram.ext._jobqueue import _ALL_DAYS, Job, JobQueue
+from telegram.ext._utils.types import CCT, JobCallback
+
+if TYPE_CHECKING:
+    from apscheduler.job import Job as APSJob
+
+_UNSUPPORTED_JOB_KWARGS = frozenset({"executor", "jobstore"})
+_JOB_KWARGS = frozenset(
+    {"coalesce", "id", "max_instances", "misfire_grace_time", "next_run_time", "replace_existing"}
+)
+_LOGGER = get_logger(__name__, class_name="HeapJobQueue")
+# Number of stale heap entries (from paused or removed jobs) that is tolerated before the heap
+# is rebuilt
+_MAX_STALE_ENTRIES = 1024
+
+
+class _JobOptions(NamedTuple):
+    misfire_grace_time: Optional[float]
+    coalesce: bool
+    max_instances: int
+
+
+# The same defaults as used by APScheduler
+_DEFAULT_OPTIONS = _JobOptions(misfire_grace_time=1, coalesce=True, max_instances=1)
+# Deadline on the monotonic clock, sequence number, job and timestamp of the run time
+_HeapEntry = tuple[float, int, "_HeapJob", float]
+
+
+def _deadline(run_time: float) -> float:
+    """Converts the timestamp of a run time to a deadline on the monotonic clock."""
+    return run_time - time.time() + time.monotonic()
+
+
+class _HeapJob:
+    """The scheduling information of a :class:`telegram.ext.Job` in a :class:`HeapJobQueue`.
+
+    Provides the parts of the interface of :class:`apscheduler.job.Job` that are used by
+    :class:`telegram.ext.Job`. For one-off jobs, ``_trigger`` is the timestamp of the run time,
+    which saves creating a trigger object for each of them.
+
+    The heap entry of the next run consists of the deadline on the monotonic clock, a sequence
+    number that breaks ties, the job itself and the timestamp of the run time. The timestamp is
+    only used for the trigger and for :attr:`next_run_time`, such that changes of the system time
+    don't affect when the jobs are run.
+    """
+
+    __slots__ = ("_entry", "_job", "_options", "_queue", "_trigger", "_tz", "id")
+
+    def __init__(
+        self,
+        queue: "HeapJobQueue[Any]",
+        job: Job[Any],
+        job_id: str,
+        trigger: Union[float, "BaseTrigger"],
+        tz: datetime.tzinfo,
+        options: _JobOptions,
+    ):
+        self._queue: HeapJobQueue[Any] = queue
+        self._job: Job[Any] = job
+        self.id: str = job_id
+        self._trigger: Union[float, BaseTrigger] = trigger
+        self._tz: datetime.tzinfo = tz
+        self._options: _JobOptions = options
+        # The heap entry of the next run, if any
+        self._entry: Optional[_HeapEntry] = None
+
+    def __str__(self) -> str:
+        # Same format as apscheduler.job.Job, which is used in log messages
+        next_run_time = self.next_run_time
+        status = (
+            f"next run at: {next_run_time:%Y-%m-%d %H:%M:%S %Z}" if next_run_time else "paused"
+        )
+        return f"{self.name} (trigger: {self.trigger}, {status})"
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._job.name
+
+    @property
+    def args(self) -> tuple["HeapJobQueue[Any]", Job[Any]]:
+        return self._queue, self._job
+
+    @property
+    def trigger(self) -> "BaseTrigger":
+        if isinstance(self._trigger, float):
+            return DateTrigger(run_date=datetime.datetime.fromtimestamp(self._trigger, self._tz))
+        return self._trigger
+
+    @property
+    def next_run_time(self) -> Optional[datetime.datetime]:
+        if self._entry is None:
+            return None
+        return datetime.datetime.fromtimestamp(self._entry[3], self._tz)
+
+    def pause(self) -> None:
+        self._queue._pause_job(self)  # pylint: disable=protected-access
+
+    def resume(self) -> None:
+        self._queue._resume_job(self)  # pylint: disable=protected-access
+
+    def remove(self) -> None:
+        self._queue._remove_job(self)  # pylint: disable=protected-access
+
+
+class HeapJobQueue(JobQueue[CCT]):
+    """A :class:`telegram.ext.JobQueue` that keeps the jobs scheduled via its ``run_*`` methods in
+    a binary heap and runs them from a single timer of the event loop, instead of handing them to
+    APScheduler. Compared to :class:`telegram.ext.JobQueue`, this considerably reduces the memory
+    footprint and the overhead of scheduling and running a job, which is noticeable for bots
+    scheduling hundreds of thousands of jobs.
+
+    The jobs follow the same semantics as the jobs of :class:`telegram.ext.JobQueue`. In
+    particular, the triggers of APScheduler are used to calculate the run times of repeating jobs
+    and the APScheduler defaults for misfires, coalescing and the maximum number of concurrently
+    running instances of a job apply.
+
+    Use it by passing an instance to :meth:`telegram.ext.ApplicationBuilder.job_queue`:
+
+    .. code-block:: python
+
+        application = ApplicationBuilder().token("TOKEN").job_queue(HeapJobQueue()).build()
+
+    Note:
+        * :paramref:`~telegram.ext.JobQueue.run_once.job_kwargs` only supports the keys
+          ``misfire_grace_time``, ``coalesce``, ``max_instances``, ``id``,
+          ``replace_existing`` and ``next_run_time`` as well as keyword arguments for the
+          trigger. :paramref:`~telegram.ext.JobQueue.run_custom.job_kwargs` additionally supports
+          ``trigger``, which may be ``"date"``, ``"interval"``, ``"cron"`` or an instance of
+          :class:`apscheduler.triggers.base.BaseTrigger`.
+        * :attr:`telegram.ext.Job.job` is not an :class:`apscheduler.job.Job` for jobs of this
+          class, but an object providing the attributes ``id``, ``name``, ``args``, ``trigger``
+          and ``next_run_time`` and the methods ``pause``, ``resume`` and ``remove``.
+        * :attr:`scheduler` is still started and stopped along with this class. Jobs added
+          directly to it are run by APScheduler and included in :meth:`jobs`.
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        max_concurrent_jobs (:obj:`int`, optional): The maximum number of job callbacks that may
+            run concurrently. See :paramref:`telegram.ext.JobQueue.max_concurrent_jobs`.
+    """
+
+    __slots__ = (
+        "_clock_offset",
+        "_heap",
+        "_instances",
+        "_jobs",
+        "_loop",
+        "_sequence",
+        "_tasks",
+        "_timer",
+    )
+
+    def __init__(self, max_concurrent_jobs: Optional[int] = None) -> None:
+        super().__init__(max_concurrent_jobs=max_concurrent_jobs)
+        self._heap: list[_HeapEntry] = []
+        self._jobs: dict[str, _HeapJob] = {}
+        # Number of currently running instances per job id
+        self._instances: dict[str, int] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._sequence = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Difference between the clock of the event loop and time.monotonic
+        self._clock_offset = 0.0
+
+    def _build_trigger(
+        self, trigger: Union[str, "BaseTrigger", None], trigger_args: JSONDict
+    ) -> "BaseTrigger":
+        if isinstance(trigger, BaseTrigger):
+            return trigger
+
+        trigger_args.setdefault("timezone", self.scheduler.timezone)
+        if trigger in (None, "date"):
+            return DateTrigger(**trigger_args)
+        if trigger == "interval":
+            return IntervalTrigger(**trigger_args)
+        if trigger == "cron":
+            return CronTrigger(**trigger_args)
+        raise ValueError(f"HeapJobQueue does not support the trigger {trigger!r}.")
+
+    @staticmethod
+    def _split_job_kwargs(job_kwargs: Optional[JSONDict]) -> tuple[JSONDict, JSONDict]:
+        if not job_kwargs:
+            return {}, {}
+        if unsupported := _UNSUPPORTED_JOB_KWARGS.intersection(job_kwargs):
+            raise ValueError(
+                f"HeapJobQueue does not support the job_kwargs {', '.join(sorted(unsupported))}."
+            )
+        job_settings = {key: value for key, value in job_kwargs.items() if key in _JOB_KWARGS}
+        trigger_args = {key: value for key, value in job_kwargs.items() if key not in _JOB_KWARGS}
+        return job_settings, trigger_args
+
+    def _add_job(
+        self,
+        job: Job[CCT],
+        trigger: Union[float, "BaseTrigger"],
+        tz: datetime.tzinfo,
+        job_settings: JSONDict,
+    ) -> Job[CCT]:
+        # Cheaper than uuid.uuid4().hex, which APScheduler uses
+        job_id = job_settings.get("id") or os.urandom(16).hex()
+        if job_id in self._jobs:
+            if not job_settings.get("replace_existing"):
+                raise ConflictingIdError(job_id)
+            self._remove_job(self._jobs[job_id])
+
+        heap_job = _HeapJob(self, job, job_id, trigger, tz, self._job_options(job_settings))
+        self._jobs[job_id] = heap_job
+        self._job_index.add(job_id, job)
+        # telegram.ext.Job only uses the part of the APSJob interface that _HeapJob provides
+        job._job = cast("APSJob", heap_job)  # pylint: disable=protected-access
+        self._schedule(heap_job, self._first_run_time(trigger, tz, job_settings))
+        return job
+
+    @staticmethod
+    def _job_options(job_settings: JSONDict) -> _JobOptions:
+        options = _DEFAULT_OPTIONS
+        if overrides := {key: job_settings[key] for key in options._fields if key in job_settings}:
+            options = options._replace(**overrides)
+        return options
+
+    def _first_run_time(
+        self, trigger: Union[float, "BaseTrigger"], tz: datetime.tzinfo, job_settings: JSONDict
+    ) -> Optional[float]:
+        if "next_run_time" in job_settings:
+            next_run_time = job_settings["next_run_time"]
+            return (
+                convert_to_datetime(next_run_time, tz, "next_run_time").timestamp()
+                if next_run_time
+                else None
+            )
+        if isinstance(trigger, float):
+            return trigger
+        return self._next_run_time(trigger, None, datetime.datetime.now(tz))
+
+    @staticmethod
+    def _next_run_time(
+        trigger: "BaseTrigger",
+        previous: Optional[datetime.datetime],
+        now: datetime.datetime,
+    ) -> Optional[float]:
+        next_run_time = trigger.get_next_fire_time(previous, now)
+        return next_run_time.timestamp() if next_run_time else None
+
+    def _schedule(self, heap_job: _HeapJob, run_time: Optional[float]) -> None:
+        if run_time is None:
+            heap_job._entry = None  # pylint: disable=protected-access
+            return
+
+        entry = (_deadline(run_time), next(self._sequence), heap_job, run_time)
+        heap_job._entry = entry  # pylint: disable=protected-access
+        heapq.heappush(self._heap, entry)
+        if self._loop is not None and self._heap[0] is entry:
+            self._set_timer()
+
+    def _unschedule(self, heap_job: _HeapJob) -> None:
+        # The heap entry is not removed right away but skipped once it's due
+        if heap_job._entry is None:  # pylint: disable=protected-access
+            return
+        heap_job._entry = None  # pylint: disable=protected-access
+        if len(self._heap) > len(self._jobs) + _MAX_STALE_ENTRIES:
+            # pylint: disable-next=protected-access
+            self._heap[:] = [entry for entry in self._heap if entry[2]._entry is entry]
+            heapq.heapify(self._heap)
+
+    def _set_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        heap = self._heap
+        while heap and heap[0][2]._entry is not heap[0]:  # pylint: disable=protected-access
+            heapq.heappop(heap)
+        if not heap or self._loop is None:
+            return
+
+        self._timer = self._loop.call_at(heap[0][0] + self._clock_offset, self._run_due_jobs)
+
+    def _run_due_jobs(self) -> None:
+        self._timer = None
+        now = time.monotonic()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            heap_job = entry[2]
+            if heap_job._entry is not entry:  # pylint: disable=protected-access
+                continue
+            heap_job._entry = None  # pylint: disable=protected-access
+            # The current time on the scale of the timestamps is derived from the delay of the
+            # deadline, which keeps the misfire handling independent of the system time
+            run_time = entry[3]
+            self._process_job(heap_job, run_time, run_time + now - entry[0])
+        self._set_timer()
+
+    def _process_job(self, heap_job: _HeapJob, scheduled: float, now: float) -> None:
+        # pylint: disable=protected-access
+        trigger = heap_job._trigger
+        if isinstance(trigger, float):
+            run_times = [scheduled]
+            next_run_time = None
+        else:
+            # Collect all run times that are due, just like APScheduler does
+            tz = heap_job._tz
+            now_dt = datetime.datetime.fromtimestamp(now, tz)
+            run_times = []
+            run_time: Optional[datetime.datetime] = datetime.datetime.fromtimestamp(scheduled, tz)
+            while run_time and run_time <= now_dt:
+                run_times.append(run_time.timestamp())
+                run_time = trigger.get_next_fire_time(run_time, now_dt)
+            next_run_time = run_time.timestamp() if run_time else None
+
+        options = heap_job._options
+        if options.coalesce:
+            run_times = run_times[-1:]
+
+        for run_time_ts in run_times:
+            delay = now - run_time_ts
+            if options.misfire_grace_time is not None and delay > options.misfire_grace_time:
+                _LOGGER.warning(
+                    'Run time of job "%s" was missed by %s',
+                    heap_job,
+                    datetime.timedelta(seconds=delay),
+                )
+                continue
+            if self._instances.get(heap_job.id, 0) >= options.max_instances:
+                _LOGGER.warning(
+                    'Execution of job "%s" skipped: maximum number of running instances reached '
+                    "(%d)",
+                    heap_job,
+                    options.max_instances,
+                )
+                break
+            self._start_job(heap_job, run_time_ts)
+
+        if next_run_time is None:
+            self._jobs.pop(heap_job.id, None)
+            self._job_index.remove(heap_job.id)
+        else:
+            self._schedule(heap_job, next_run_time)
+
+    def _start_job(self, heap_job: _HeapJob, run_time: float) -> "asyncio.Task[None]":
+        job_id = heap_job.id
+        self._instances[job_id] = self._instances.get(job_id, 0) + 1
+        self._limiter.submitted(job_id, (run_time,))
+        task = cast(asyncio.AbstractEventLoop, self._loop).create_task(
+            self.job_callback(self, heap_job._job),  # pylint: disable=protected-access
+            name=f"Job:{job_id}:run",
+        )
+        self._tasks.add(task)
+
+        def done_callback(finished_task: "asyncio.Task[None]") -> None:
+            self._tasks.discard(finished_task)
+            if (instances := self._instances[job_id] - 1) > 0:
+                self._instances[job_id] = instances
+            else:
+                del self._instances[job_id]
+            if not finished_task.cancelled() and (exc := finished_task.exception()):
+                _LOGGER.error('Job "%s" raised an exception', heap_job, exc_info=exc)
+
+        task.add_done_callback(done_callback)
+        return task
+
+    def _pause_job(self, heap_job: _HeapJob) -> None:
+        if heap_job.id not in self._jobs:
+            raise JobLookupError(heap_job.id)
+        self._unschedule(heap_job)
+
+    def _resume_job(self, heap_job: _HeapJob) -> None:
+        # pylint: disable=protected-access
+        if heap_job.id not in self._jobs:
+            raise JobLookupError(heap_job.id)
+        self._unschedule(heap_job)
+        if isinstance(heap_job._trigger, float):
+            run_time: Optional[float] = heap_job._trigger
+        else:
+            run_time = self._next_run_time(
+                heap_job._trigger, None, datetime.datetime.now(heap_job._tz)
+            )
+        if run_time is None:
+            self._remove_job(heap_job)
+        else:
+            self._schedule(heap_job, run_time)
+
+    def _remove_job(self, heap_job: _HeapJob) -> None:
+        if self._jobs.get(heap_job.id) is not heap_job:
+            raise JobLookupError(heap_job.id)
+        del self._jobs[heap_job.id]
+        self._job_index.remove(heap_job.id)
+        self._unschedule(heap_job)
+
+    def run_once(
+        self,
+        callback: JobCallback[CCT],
+        when: Union[float, datetime.timedelta, datetime.datetime, datetime.time],
+        data: Optional[object] = None,
+        name: Optional[str] = None,
+        chat_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        job_kwargs: Optional[JSONDict] = None,
+    ) -> Job[CCT]:
+        """See :meth:`telegram.ext.JobQueue.run_once`."""
+        job_settings, trigger_args = self._split_job_kwargs(job_kwargs)
+        if trigger_args:
+            raise TypeError(
+                f"Unexpected job_kwargs for a one-off job: {', '.join(sorted(trigger_args))}."
+            )
+
+        job = Job(callback=callback, data=data, name=name, chat_id=chat_id, user_id=user_id)
+        # Relative times don't need a detour via timezone aware datetimes
+        if isinstance(when, (int, float)):
+            return self._add_job(job, time.time() + when, self.scheduler.timezone, job_settings)
+        if isinstance(when, datetime.timedelta):
+            return self._add_job(
+                job, time.time() + when.total_seconds(), self.scheduler.timezone, job_settings
+            )
+
+        date_time = self._parse_time_input(when, shift_day=True)
+        tz = date_time.tzinfo or self.scheduler.timezone
+        run_time = convert_to_datetime(date_time, tz, "run_date").timestamp()
+        return self._add_job(job, run_time, tz, job_settings)
+
+    def run_repeating(
+        self,
+        callback: JobCallback[CCT],
+        interval: Union[float, datetime.timedelta],
+        first: Optional[Union[float, datetime.timedelta, datetime.datetime, datetime.time]] = None,
+        last: Optional[Union[float, datetime.timedelta, datetime.datetime, datetime.time]] = None,
+        data: Optional[object] = None,
+        name: Optional[str] = None,
+        chat_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        job_kwargs: Optional[JSONDict] = None,
+    ) -> Job[CCT]:
+        """See :meth:`telegram.ext.JobQueue.run_repeating`."""
+        job_settings, trigger_args = self._split_job_kwargs(job_kwargs)
+        job = Job(callback=callback, data=data, name=name, chat_id=chat_id, user_id=user_id)
+
+        dt_first = self._parse_time_input(first)
+        dt_last = self._parse_time_input(last)
+
+        if dt_last and dt_first and dt_last < dt_first:
+            raise ValueError("'last' must not be before 'first'!")
+
+        if isinstance(interval, datetime.timedelta):
+            interval = interval.total_seconds()
+
+        trigger = self._build_trigger(
+            "interval",
+            {"seconds": interval, "start_date": dt_first, "end_date": dt_last, **trigger_args},
+        )
+        return self._add_job(job, trigger, trigger.timezone, job_settings)
+
+    def run_monthly(
+        self,
+        callback: JobCallback[CCT],
+        when: datetime.time,
+        day: int,
+        data: Optional[object] = None,
+        name: Optional[str] = None,
+        chat_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        job_kwargs: Optional[JSONDict] = None,
+    ) -> Job[CCT]:
+        """See :meth:`telegram.ext.JobQueue.run_monthly`."""
+        job_settings, trigger_args = self._split_job_kwargs(job_kwargs)
+        job = Job(callback=callback, data=data, name=name, chat_id=chat_id, user_id=user_id)
+
+        trigger = self._build_trigger(
+            "cron",
+            {
+                "day": "last" if day == -1 else day,
+                "hour": when.hour,
+                "minute": when.minute,
+                "second": when.second,
+                "timezone": when.tzinfo or self.scheduler.timezone,
+                **trigger_args,
+            },
+        )
+        return self._add_job(job, trigger, trigger.timezone, job_settings)
+
+    def run_daily(
+        self,
+        callback: JobCallback[CCT],
+        time: datetime.time,  # pylint: disable=redefined-outer-name
+        days: tuple[int, ...] = _ALL_DAYS,
+        data: Optional[object] = None,
+        name: Optional[str] = None,
+        chat_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        job_kwargs: Optional[JSONDict] = None,
+    ) -> Job[CCT]:
+        """See :meth:`telegram.ext.JobQueue.run_daily`."""
+        job_settings, trigger_args = self._split_job_kwargs(job_kwargs)
+        job = Job(callback=callback, data=data, name=name, chat_id=chat_id, user_id=user_id)
+
+        trigger = self._build_trigger(
+            "cron",
+            {
+                "day_of_week": ",".join([self._CRON_MAPPING[d] for d in days]),
+                "hour": time.hour,
+                "minute": time.minute,
+                "second": time.second,
+                "timezone": time.tzinfo or self.scheduler.timezone,
+                **trigger_args,
+            },
+        )
+        return self._add_job(job, trigger, trigger.timezone, job_settings)
+
+    def run_custom(
+        self,
+        callback: JobCallback[CCT],
+        job_kwargs: JSONDict,
+        data: Optional[object] = None,
+        name: Optional[str] = None,
+        chat_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+    ) -> Job[CCT]:
+        """See :meth:`telegram.ext.JobQueue.run_custom`."""
+        job_settings, trigger_args = self._split_job_kwargs(job_kwargs)
+        job = Job(callback=callback, data=data, name=name, chat_id=chat_id, user_id=user_id)
+
+        trigger = self._build_trigger(trigger_args.pop("trigger", None), trigger_args)
+        tz = getattr(trigger, "timezone", None) or self.scheduler.timezone
+        return self._add_job(job, trigger, tz, job_settings)
+
+    async def start(self) -> None:
+        """Starts the :class:`HeapJobQueue`."""
+        await super().start()
+        self._loop = asyncio.get_running_loop()
+        self._clock_offset = self._loop.time() - time.monotonic()
+        self._set_timer()
+
+    async def stop(self, wait: bool = True) -> None:
+        """Shuts down the :class:`HeapJobQueue`.
+
+        Args:
+            wait (:obj:`bool`, optional): Whether to wait until all currently running jobs
+                have finished. Defaults to :obj:`True`.
+
+        """
+        self._loop = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if wait:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        else:
+            for task in self._tasks:
+                task.cancel()
+        await super().stop(wait=wait)
+
+    def jobs(self) -> tuple[Job[CCT], ...]:
+        """Returns a tuple of all *scheduled* jobs that are currently in the
+        :class:`HeapJobQueue`, ordered by their next run time.
+
+        Returns:
+            tuple[:class:`Job`]: Tuple of all *scheduled* jobs.
+        """
+        jobs = self._scheduled_jobs()
+        jobs.sort(key=lambda item: item[0])
+        return tuple(job for _, job in jobs)
+
+    def _scheduled_jobs(self) -> list[tuple[float, Job[CCT]]]:
+        """Returns all jobs along with the timestamp of their next run time, which is
+        :obj:`math.inf` for paused jobs."""
+        # pylint: disable=protected-access
+        jobs: list[tuple[float, Job[CCT]]] = [
+            (heap_job._entry[3] if heap_job._entry else math.inf, heap_job._job)
+            for heap_job in self._jobs.values()
+        ]
+        for aps_job in self.scheduler.get_jobs():
+            next_run_time = getattr(aps_job, "next_run_time", None)
+            jobs.append(
+                (
+                    next_run_time.timestamp() if next_run_time else math.inf,
+                    Job.from_aps_job(aps_job),
+                )
+            )
+        return jobs
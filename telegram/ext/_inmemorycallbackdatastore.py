@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the InMemoryCallbackDataStore class."""
+import time
+from typing import TYPE_CHECKING, Optional, TypeVar
+
+try:
+    from cachetools import Cache, LRUCache
+
+    CACHE_TOOLS_AVAILABLE = True
+except ImportError:
+    CACHE_TOOLS_AVAILABLE = False
+
+from telegram.ext._basecallbackdatastore import BaseCallbackDataStore
+from telegram.ext._utils.types import CDCData
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, MutableMapping
+
+_VT = TypeVar("_VT")
+
+
+class _KeyboardData:
+    __slots__ = ("access_time", "button_data", "keyboard_uuid")
+
+    def __init__(
+        self,
+        keyboard_uuid: str,
+        access_time: Optional[float] = None,
+        button_data: Optional[dict[str, object]] = None,
+    ):
+        self.keyboard_uuid = keyboard_uuid
+        self.button_data = button_data or {}
+        self.access_time = access_time or time.time()
+
+    def update_access_time(self) -> None:
+        """Updates the access time with the current time."""
+        self.access_time = time.time()
+
+    def to_tuple(self) -> tuple[str, float, dict[str, object]]:
+        """Gives a tuple representation consisting of the keyboard uuid, the access time and the
+        button data.
+        """
+        return self.keyboard_uuid, self.access_time, self.button_data
+
+
+class InMemoryCallbackDataStore(BaseCallbackDataStore):
+    """The default storage backend of :class:`telegram.ext.CallbackDataCache`. Keeps the data in
+    memory in two mappings with fixed maximum size. If necessary, will drop the least recently
+    used items.
+
+    Important:
+        If you want to use this class, you must install PTB with the optional requirement
+        ``callback-data``, i.e.
+
+        .. code-block:: bash
+
+           pip install "python-telegram-bot[callback-data]"
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        maxsize (:obj:`int`, optional): Maximum number of items in each of the mappings.
+            Defaults to ``1024``.
+    """
+
+    __slots__ = (
+        "_callback_queries",
+        "_evicted_callback_queries",
+        "_evicted_keyboards",
+        "_keyboard_data",
+        "_maxsize",
+    )
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if not CACHE_TOOLS_AVAILABLE:
+            raise RuntimeError(
+                "To use `InMemoryCallbackDataStore`, PTB must be installed via `pip install "
+                '"python-telegram-bot[callback-data]"`.'
+            )
+        super().__init__()
+        self._maxsize: int = maxsize
+        self._keyboard_data: LRUCache[str, _KeyboardData] = LRUCache(maxsize=maxsize)
+        self._callback_queries: LRUCache[str, str] = LRUCache(maxsize=maxsize)
+        # The keys that were evicted since the last call of pop_evicted. None until then.
+        self._evicted_keyboards: Optional[set[str]] = None
+        self._evicted_callback_queries: Optional[set[str]] = None
+
+    @property
+    def maxsize(self) -> int:
+        """:obj:`int`: The maximum number of items in each of the mappings."""
+        return self._maxsize
+
+    async def shutdown(self) -> None:
+        """Does nothing, as the data is only kept in memory."""
+
+    def _insert(
+        self,
+        mapping: "MutableMapping[str, _VT]",
+        evicted: Optional[set[str]],
+        key: str,
+        value: _VT,
+    ) -> None:
+        # Evict the least recently used item ourselves instead of leaving it to the LRUCache,
+        # such that we know its key
+        if mapping and key not in mapping and len(mapping) >= self._maxsize:
+            evicted_key, _ = mapping.popitem()
+            if evicted is not None:
+                evicted.add(evicted_key)
+        mapping[key] = value
+
+    def get_keyboard(self, keyboard_uuid: str) -> dict[str, object]:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.get_keyboard`."""
+        keyboard_data = self._keyboard_data[keyboard_uuid]
+        keyboard_data.update_access_time()
+        return keyboard_data.button_data
+
+    def put_keyboard(self, keyboard_uuid: str, button_data: dict[str, object]) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.put_keyboard`."""
+        self._insert(
+            self._keyboard_data,
+            self._evicted_keyboards,
+            keyboard_uuid,
+            _KeyboardData(keyboard_uuid=keyboard_uuid, button_data=button_data),
+        )
+
+    def drop_keyboard(self, keyboard_uuid: str) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.drop_keyboard`."""
+        self._keyboard_data.pop(keyboard_uuid, None)
+
+    def clear_keyboards(self, time_cutoff: Optional[float] = None) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.clear_keyboards`."""
+        if time_cutoff is None:
+            self._keyboard_data.clear()
+            return
+
+        # We need a list instead of a generator here, as the list doesn't change it's size
+        # during the iteration
+        to_drop = [
+            key for key, data in self._keyboard_data.items() if data.access_time < time_cutoff
+        ]
+        for key in to_drop:
+            self._keyboard_data.pop(key)
+
+    def put_callback_query(self, callback_query_id: str, keyboard_uuid: str) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.put_callback_query`."""
+        self._insert(
+            self._callback_queries,
+            self._evicted_callback_queries,
+            callback_query_id,
+            keyboard_uuid,
+        )
+
+    def pop_callback_query(self, callback_query_id: str) -> str:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.pop_callback_query`."""
+        return self._callback_queries.pop(callback_query_id)
+
+    def clear_callback_queries(self) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.clear_callback_queries`."""
+        self._callback_queries.clear()
+
+    @property
+    def persistence_data(self) -> CDCData:
+        """See :attr:`telegram.ext.BaseCallbackDataStore.persistence_data`."""
+        # While building a list/dict from the LRUCaches has linear runtime (in the number of
+        # entries), the runtime is bounded by maxsize and it has the big upside of not throwing a
+        # highly customized data structure at users trying to implement a custom persistence class
+        return [data.to_tuple() for data in self._keyboard_data.values()], dict(
+            self._callback_queries.items()
+        )
+
+    def peek_persistence_data(
+        self, keyboard_uuids: "Collection[str]", callback_query_ids: "Collection[str]"
+    ) -> CDCData:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.peek_persistence_data`."""
+        # Cache.__getitem__ doesn't update the order of the LRUCache
+        keyboard_data = [
+            Cache.__getitem__(self._keyboard_data, uuid).to_tuple()
+            for uuid in keyboard_uuids
+            if uuid in self._keyboard_data
+        ]
+        callback_queries = {
+            key: Cache.__getitem__(self._callback_queries, key)
+            for key in callback_query_ids
+            if key in self._callback_queries
+        }
+        return keyboard_data, callback_queries
+
+    def pop_evicted(self) -> tuple[set[str], set[str]]:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.pop_evicted`."""
+        evicted = (self._evicted_keyboards or set(), self._evicted_callback_queries or set())
+        self._evicted_keyboards = set()
+        self._evicted_callback_queries = set()
+        return evicted
+
+    def load_persistence_data(self, persistent_data: CDCData) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.load_persistence_data`."""
+        keyboard_data, callback_queries = persistent_data
+        for key, value in callback_queries.items():
+            self._insert(self._callback_queries, self._evicted_callback_queries, key, value)
+        for uuid, access_time, data in keyboard_data:
+            self._insert(
+                self._keyboard_data,
+                self._evicted_keyboards,
+                uuid,
+                _KeyboardData(keyboard_uuid=uuid, access_time=access_time, button_data=data),
+            )
@@ -16,14 +16,26 @@
 #
 # You should have received a copy of the GNU Lesser Public License
 # along with this program.  If not, see [http://www.gnu.org/licenses/].
-"""This module contains the classes JobQueue and Job."""
+"""This module contains the classes JobQueue, Job and BulkJob."""
 import asyncio
 import datetime
+import heapq
+import itertools
+import time
 import weakref
-from typing import TYPE_CHECKING, Any, Generic, Optional, Union, cast, overload
+from collections import deque
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, Generic, NoReturn, Optional, TypeVar, Union, cast, overload
 
 try:
     import pytz
+    from apscheduler.events import (
+        EVENT_ALL_JOBS_REMOVED,
+        EVENT_JOB_ADDED,
+        EVENT_JOB_MISSED,
+        EVENT_JOB_REMOVED,
+        EVENT_JOB_SUBMITTED,
+    )
     from apscheduler.executors.asyncio import AsyncIOExecutor
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
@@ -39,13 +51,223 @@ from telegram.ext._utils.types import CCT, JobCallback
 
 if TYPE_CHECKING:
     if APS_AVAILABLE:
-        from apscheduler.job import Job as APSJob
+        from apscheduler.events import (
+            JobEvent,
+            JobExecutionEvent,
+            JobSubmissionEvent,
+            SchedulerEvent,
+        )
+    from apscheduler.job import Job as APSJob
 
     from telegram.ext import Application
 
 
 _ALL_DAYS = tuple(range(7))
 _LOGGER = get_logger(__name__, class_name="JobQueue")
+_KT = TypeVar("_KT")
+
+
+def _to_timedelta(seconds: Optional[float]) -> Optional[datetime.timedelta]:
+    return None if seconds is None else datetime.timedelta(seconds=seconds)
+
+
+def _add_to_bucket(
+    index: dict[_KT, dict[str, "Job[Any]"]], key: _KT, job_id: str, job: "Job[Any]"
+) -> None:
+    if (bucket := index.get(key)) is None:
+        index[key] = bucket = {}
+    bucket[job_id] = job
+
+
+def _remove_from_bucket(index: dict[_KT, dict[str, "Job[Any]"]], key: _KT, job_id: str) -> None:
+    if (bucket := index.get(key)) is not None:
+        bucket.pop(job_id, None)
+        if not bucket:
+            del index[key]
+
+
+class _JobIndex:
+    """Secondary indexes of the jobs of a :class:`JobQueue` by name, chat id and user id. Within
+    each index, jobs are kept in the order in which they were added.
+
+    The keys that a job was indexed with are stored along with it, such that the job can be
+    removed from the indexes even if its attributes were changed in the meantime.
+    """
+
+    __slots__ = ("by_chat_id", "by_id", "by_name", "by_user_id")
+
+    def __init__(self) -> None:
+        self.by_id: dict[str, tuple[Job[Any], Optional[str], Optional[int], Optional[int]]] = {}
+        self.by_name: dict[Optional[str], dict[str, Job[Any]]] = {}
+        self.by_chat_id: dict[int, dict[str, Job[Any]]] = {}
+        self.by_user_id: dict[int, dict[str, Job[Any]]] = {}
+
+    def add(self, job_id: str, job: "Job[Any]") -> None:
+        if (entry := self.by_id.get(job_id)) is not None:
+            if entry[0] is job:
+                return
+            self.remove(job_id)
+
+        self.by_id[job_id] = (job, job.name, job.chat_id, job.user_id)
+        _add_to_bucket(self.by_name, job.name, job_id, job)
+        if job.chat_id is not None:
+            _add_to_bucket(self.by_chat_id, job.chat_id, job_id, job)
+        if job.user_id is not None:
+            _add_to_bucket(self.by_user_id, job.user_id, job_id, job)
+
+    def remove(self, job_id: str) -> None:
+        if (entry := self.by_id.pop(job_id, None)) is None:
+            return
+
+        _, name, chat_id, user_id = entry
+        _remove_from_bucket(self.by_name, name, job_id)
+        if chat_id is not None:
+            _remove_from_bucket(self.by_chat_id, chat_id, job_id)
+        if user_id is not None:
+            _remove_from_bucket(self.by_user_id, user_id, job_id)
+
+    def clear(self) -> None:
+        self.by_id.clear()
+        self.by_name.clear()
+        self.by_chat_id.clear()
+        self.by_user_id.clear()
+
+    @staticmethod
+    def get(index: dict[_KT, dict[str, "Job[Any]"]], key: _KT) -> tuple["Job[Any]", ...]:
+        if (bucket := index.get(key)) is None:
+            return ()
+        return tuple(bucket.values())
+
+
+class _JobLimiter:
+    """Limits the number of concurrently running job callbacks of a :class:`JobQueue`. Runs that
+    have to wait for a free slot are started by descending :attr:`Job.priority` and, for equal
+    priorities, in the order in which they became due. A run of a job that is due while another
+    run of the same job is still waiting for a slot is dropped.
+
+    Additionally keeps track of the lag between the scheduled and the actual start of the runs.
+    """
+
+    __slots__ = (
+        "_lag_count",
+        "_lag_sum",
+        "_scheduled",
+        "_sequence",
+        "_waiting",
+        "_waiting_ids",
+        "last_lag",
+        "max_concurrent_jobs",
+        "max_lag",
+        "running",
+    )
+
+    def __init__(self, max_concurrent_jobs: Optional[int]) -> None:
+        self.max_concurrent_jobs: Optional[int] = max_concurrent_jobs
+        self.running = 0
+        self._waiting: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._waiting_ids: set[str] = set()
+        self._sequence = itertools.count()
+        # The scheduled run times of the submitted runs that did not start yet, by job id
+        self._scheduled: dict[str, deque[float]] = {}
+        self.last_lag: Optional[float] = None
+        self.max_lag: Optional[float] = None
+        self._lag_sum = 0.0
+        self._lag_count = 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting_ids)
+
+    @property
+    def mean_lag(self) -> Optional[float]:
+        return self._lag_sum / self._lag_count if self._lag_count else None
+
+    def reset_lag(self) -> None:
+        self.last_lag = self.max_lag = None
+        self._lag_sum = 0.0
+        self._lag_count = 0
+
+    def submitted(self, job_id: str, run_times: Iterable[float]) -> None:
+        if (scheduled := self._scheduled.get(job_id)) is None:
+            self._scheduled[job_id] = scheduled = deque()
+        scheduled.extend(run_times)
+
+    def missed(self, job_id: str, run_time: float) -> None:
+        if (scheduled := self._scheduled.get(job_id)) is None:
+            return
+        try:
+            scheduled.remove(run_time)
+        except ValueError:
+            return
+        if not scheduled:
+            del self._scheduled[job_id]
+
+    def discard_unclaimed(self, job_id: str) -> None:
+        """Drops the scheduled run times of a job whose run neither started nor waits for a slot,
+        i.e. a job that is not run via :meth:`JobQueue.job_callback`.
+        """
+        if job_id not in self._waiting_ids:
+            self._scheduled.pop(job_id, None)
+
+    def _pop_scheduled(self, job_id: str, latest: bool = False) -> Optional[float]:
+        if (scheduled := self._scheduled.get(job_id)) is None:
+            return None
+        run_time = scheduled.pop() if latest else scheduled.popleft()
+        if not scheduled:
+            del self._scheduled[job_id]
+        return run_time
+
+    async def acquire(self, job: "Job[Any]") -> bool:
+        """Waits for a free slot. Returns :obj:`False`, if the run was dropped in favor of a run
+        of the same job that is already waiting.
+        """
+        job_id = job.job.id
+        if self.max_concurrent_jobs is None or (
+            self.running < self.max_concurrent_jobs and not self._waiting
+        ):
+            self.running += 1
+            return True
+
+        if job_id in self._waiting_ids:
+            # The waiting run keeps the earlier scheduled run time
+            self._pop_scheduled(job_id, latest=True)
+            return False
+
+        entry = (-job.priority, next(self._sequence), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiting, entry)
+        self._waiting_ids.add(job_id)
+        try:
+            await entry[2]
+        except asyncio.CancelledError:
+            if entry in self._waiting:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+            if entry[2].done() and not entry[2].cancelled():
+                # The slot was already handed over to this run
+                self.release()
+            raise
+        finally:
+            self._waiting_ids.discard(job_id)
+        return True
+
+    def release(self) -> None:
+        while self._waiting:
+            # Hand the slot over to the next waiting run. Runs that were cancelled in the same
+            # iteration of the event loop, e.g. on shutdown, still have to be skipped.
+            future = heapq.heappop(self._waiting)[2]
+            if not future.done():
+                future.set_result(None)
+                return
+        self.running -= 1
+
+    def record_lag(self, job_id: str) -> None:
+        if (scheduled := self._pop_scheduled(job_id)) is None:
+            return
+        lag = max(time.time() - scheduled, 0.0)
+        self.last_lag = lag
+        self.max_lag = lag if self.max_lag is None else max(self.max_lag, lag)
+        self._lag_sum += lag
+        self._lag_count += 1
 
 
 class JobQueue(Generic[CCT]):
@@ -68,12 +290,23 @@ class JobQueue(Generic[CCT]):
         :any:`Timer Bot <examples.timerbot>`
 
     .. seealso:: :wiki:`Architecture Overview <Architecture>`,
-        :wiki:`Job Queue <Extensions---JobQueue>`
+        :wiki:`Job Queue <Extensions---JobQueue>`, :class:`telegram.ext.HeapJobQueue`,
+        :class:`telegram.ext.PersistentJobQueue`
 
     .. versionchanged:: 20.0
         To use this class, PTB must be installed via
         ``pip install "python-telegram-bot[job-queue]"``.
 
+    Args:
+        max_concurrent_jobs (:obj:`int`, optional): The maximum number of job callbacks that may
+            run concurrently. This limit is independent of the concurrency of update handling,
+            see :meth:`telegram.ext.ApplicationBuilder.concurrent_updates`. Jobs that are due
+            while the limit is reached wait for a free slot and are started by descending
+            :attr:`Job.priority`. If a job is due again while one of its runs is still waiting,
+            the new run is dropped. Defaults to :obj:`None`, i.e. no limit.
+
+            .. versionadded:: NEXT.VERSION
+
     Attributes:
         scheduler (:class:`apscheduler.schedulers.asyncio.AsyncIOScheduler`): The scheduler.
 
@@ -94,21 +327,29 @@ class JobQueue(Generic[CCT]):
 
     """
 
-    __slots__ = ("_application", "_executor", "scheduler")
+    __slots__ = ("_application", "_executor", "_job_index", "_limiter", "scheduler")
     _CRON_MAPPING = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
 
-    def __init__(self) -> None:
+    def __init__(self, max_concurrent_jobs: Optional[int] = None) -> None:
         if not APS_AVAILABLE:
             raise RuntimeError(
                 "To use `JobQueue`, PTB must be installed via `pip install "
                 '"python-telegram-bot[job-queue]"`.'
             )
+        if max_concurrent_jobs is not None and max_concurrent_jobs < 1:
+            raise ValueError("`max_concurrent_jobs` must be at least 1.")
 
         self._application: Optional[weakref.ReferenceType[Application]] = None
         self._executor = AsyncIOExecutor()
         self.scheduler: "AsyncIOScheduler" = AsyncIOScheduler(  # noqa: UP037
             **self.scheduler_configuration
         )
+        self._job_index = _JobIndex()
+        self._limiter = _JobLimiter(max_concurrent_jobs)
+        self.scheduler.add_listener(
+            self._update_job_index, EVENT_JOB_ADDED | EVENT_JOB_REMOVED | EVENT_ALL_JOBS_REMOVED
+        )
+        self.scheduler.add_listener(self._track_run_times, EVENT_JOB_SUBMITTED | EVENT_JOB_MISSED)
 
     def __repr__(self) -> str:
         """Give a string representation of the JobQueue in the form ``JobQueue[application=...]``.
@@ -121,6 +362,67 @@ class JobQueue(Generic[CCT]):
         """
         return build_repr_with_selected_attrs(self, application=self.application)
 
+    @property
+    def max_concurrent_jobs(self) -> Optional[int]:
+        """:obj:`int`: Optional. The maximum number of job callbacks that may run concurrently.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return self._limiter.max_concurrent_jobs
+
+    @property
+    def running_jobs(self) -> int:
+        """:obj:`int`: The number of job callbacks that are currently running.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return self._limiter.running
+
+    @property
+    def waiting_jobs(self) -> int:
+        """:obj:`int`: The number of jobs that are due but wait for a free slot, because
+        :attr:`max_concurrent_jobs` is reached.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return self._limiter.waiting
+
+    @property
+    def last_lag(self) -> Optional[datetime.timedelta]:
+        """:obj:`datetime.timedelta`: Optional. The lag between the scheduled and the actual
+        start of the job that was started most recently.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return _to_timedelta(self._limiter.last_lag)
+
+    @property
+    def max_lag(self) -> Optional[datetime.timedelta]:
+        """:obj:`datetime.timedelta`: Optional. The maximum lag between the scheduled and the
+        actual start of the jobs since the job queue was created or :meth:`reset_lag_statistics`
+        was called.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return _to_timedelta(self._limiter.max_lag)
+
+    @property
+    def mean_lag(self) -> Optional[datetime.timedelta]:
+        """:obj:`datetime.timedelta`: Optional. The mean lag between the scheduled and the
+        actual start of the jobs since the job queue was created or :meth:`reset_lag_statistics`
+        was called.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        return _to_timedelta(self._limiter.mean_lag)
+
+    def reset_lag_statistics(self) -> None:
+        """Resets :attr:`last_lag`, :attr:`max_lag` and :attr:`mean_lag`.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        self._limiter.reset_lag()
+
     @property
     def application(self) -> "Application[Any, CCT, Any, Any, Any, JobQueue[CCT]]":
         """The application this JobQueue is associated with."""
@@ -233,11 +535,26 @@ class JobQueue(Generic[CCT]):
 
         .. versionadded:: 20.4
 
+        .. versionchanged:: NEXT.VERSION
+            Respects :attr:`max_concurrent_jobs`.
+
         Args:
             job_queue (:class:`JobQueue`): The job queue that created the job.
             job (:class:`~telegram.ext.Job`): The job to run.
         """
-        await job.run(job_queue.application)
+        limiter = job_queue._limiter  # pylint: disable=protected-access
+        if not await limiter.acquire(job):
+            _LOGGER.debug(
+                "Run of job %s dropped, since a previous run is still waiting to be started",
+                job.job,
+            )
+            return
+        limiter.record_lag(job.job.id)
+        # Job.run is shielded, so the callback keeps running if this run is cancelled. The slot
+        # must only be released once the callback has finished.
+        task = asyncio.ensure_future(job.run(job_queue.application))
+        task.add_done_callback(lambda _: limiter.release())
+        await asyncio.shield(task)
 
     def run_once(
         self,
@@ -321,6 +638,7 @@ class JobQueue(Generic[CCT]):
         )
 
         job._job = j  # pylint: disable=protected-access
+        self._job_index.add(j.id, job)
         return job
 
     def run_repeating(
@@ -448,6 +766,7 @@ class JobQueue(Generic[CCT]):
         )
 
         job._job = j  # pylint: disable=protected-access
+        self._job_index.add(j.id, job)
         return job
 
     def run_monthly(
@@ -526,12 +845,13 @@ class JobQueue(Generic[CCT]):
             **job_kwargs,
         )
         job._job = j  # pylint: disable=protected-access
+        self._job_index.add(j.id, job)
         return job
 
     def run_daily(
         self,
         callback: JobCallback[CCT],
-        time: datetime.time,
+        time: datetime.time,  # pylint: disable=redefined-outer-name
         days: tuple[int, ...] = _ALL_DAYS,
         data: Optional[object] = None,
         name: Optional[str] = None,
@@ -610,8 +930,89 @@ class JobQueue(Generic[CCT]):
         )
 
         job._job = j  # pylint: disable=protected-access
+        self._job_index.add(j.id, job)
         return job
 
+    def run_daily_for(
+        self,
+        chat_ids: Iterable[int],
+        callback: JobCallback[CCT],
+        time: datetime.time,  # pylint: disable=redefined-outer-name
+        days: tuple[int, ...] = _ALL_DAYS,
+        data: Optional[object] = None,
+        name: Optional[str] = None,
+        spread: Union[float, datetime.timedelta] = 0,
+        concurrency: int = 8,
+        job_kwargs: Optional[JSONDict] = None,
+    ) -> "BulkJob[CCT]":
+        """Creates a new :class:`BulkJob` that runs :paramref:`callback` for each of the given
+        chats on a daily basis and adds it to the queue.
+
+        In contrast to calling :meth:`run_daily` for each chat, only a single job is scheduled.
+        On each run, this job calls :paramref:`callback` once per chat, spreading the calls over
+        :paramref:`spread` and running at most :paramref:`concurrency` of them concurrently. This
+        avoids that all calls are made at the same moment and keeps the load on the job queue
+        independent of the number of chats.
+
+        .. versionadded:: NEXT.VERSION
+
+        Note:
+            The callbacks for the individual chats are run via :meth:`Job.run`. In the callback,
+            :attr:`telegram.ext.CallbackContext.job` is a :class:`Job` with the
+            :attr:`~Job.chat_id` of the respective chat, such that the corresponding
+            :attr:`~telegram.ext.CallbackContext.chat_data` is available. Calling
+            :meth:`Job.schedule_removal` on it only removes that chat from the bulk job.
+
+        Args:
+            chat_ids (Iterable[:obj:`int`]): The ids of the chats to run the callback for. Chats
+                can be added and removed later on via :meth:`BulkJob.add_chat` and
+                :meth:`BulkJob.remove_chat`.
+            callback (:term:`coroutine function`): The callback function that should be executed
+                for each chat. Callback signature::
+
+                    async def callback(context: CallbackContext)
+
+            time (:obj:`datetime.time`): Time of day at which the job should run. If the timezone
+                (:obj:`datetime.time.tzinfo`) is :obj:`None`, the default timezone of the bot will
+                be used, which is UTC unless :attr:`telegram.ext.Defaults.tzinfo` is used.
+            days (tuple[:obj:`int`], optional): Defines on which days of the week the job should
+                run (where ``0-6`` correspond to sunday - saturday). By default, the job will run
+                every day.
+            data (:obj:`object`, optional): Additional data needed for the callback function.
+                Can be accessed through :attr:`Job.data` in the callback. Defaults to
+                :obj:`None`.
+            name (:obj:`str`, optional): The name of the new job. Defaults to
+                :external:attr:`callback.__name__ <definition.__name__>`.
+            spread (:obj:`float` | :obj:`datetime.timedelta`, optional): Time span over which the
+                calls for the individual chats are evenly spread, either as :obj:`float` in
+                seconds or as :obj:`datetime.timedelta`. Defaults to ``0``, i.e. the calls are
+                made as fast as :paramref:`concurrency` allows.
+            concurrency (:obj:`int`, optional): The maximum number of chats that the callback
+                runs for concurrently. Defaults to ``8``.
+            job_kwargs (:obj:`dict`, optional): Arbitrary keyword arguments to pass to the
+                :meth:`apscheduler.schedulers.base.BaseScheduler.add_job()`.
+
+        Returns:
+            :class:`telegram.ext.BulkJob`: The new :class:`BulkJob` instance.
+
+        """
+        bulk_job = BulkJob(
+            callback=callback,
+            chat_ids=chat_ids,
+            data=data,
+            name=name,
+            spread=spread,
+            concurrency=concurrency,
+        )
+        bulk_job._job = self.run_daily(  # pylint: disable=protected-access
+            bulk_job._run,  # pylint: disable=protected-access
+            time,
+            days=days,
+            name=bulk_job.name,
+            job_kwargs=job_kwargs,
+        )
+        return bulk_job
+
     def run_custom(
         self,
         callback: JobCallback[CCT],
@@ -662,6 +1063,7 @@ class JobQueue(Generic[CCT]):
         j = self.scheduler.add_job(self.job_callback, args=(self, job), name=name, **job_kwargs)
 
         job._job = j  # pylint: disable=protected-access
+        self._job_index.add(j.id, job)
         return job
 
     async def start(self) -> None:
@@ -701,20 +1103,102 @@ class JobQueue(Generic[CCT]):
         """
         return tuple(Job.from_aps_job(job) for job in self.scheduler.get_jobs())
 
+    def _track_run_times(self, event: "SchedulerEvent") -> None:
+        """Keeps track of the scheduled run times of the jobs run via :meth:`job_callback`, such
+        that their lag can be measured.
+        """
+        job_id = cast("JobEvent", event).job_id
+        aps_job = self.scheduler.get_job(job_id)
+        if aps_job is not None and aps_job.func is not self.job_callback:
+            return
+        if event.code == EVENT_JOB_SUBMITTED:
+            if aps_job is None:
+                # The job was removed after its last run before the event was dispatched, so we
+                # can't tell whether it's run via job_callback. The run starts on the next
+                # iteration of the event loop, after which unclaimed run times are dropped.
+                asyncio.get_running_loop().call_soon(self._limiter.discard_unclaimed, job_id)
+            self._limiter.submitted(
+                job_id,
+                (
+                    run_time.timestamp()
+                    for run_time in cast("JobSubmissionEvent", event).scheduled_run_times
+                ),
+            )
+        else:
+            self._limiter.missed(
+                job_id, cast("JobExecutionEvent", event).scheduled_run_time.timestamp()
+            )
+
+    def _update_job_index(self, event: "SchedulerEvent") -> None:
+        """Keeps the job index in sync with jobs that are added to or removed from
+        :attr:`scheduler`, including jobs that are removed after their last run and jobs that are
+        added to :attr:`scheduler` directly.
+        """
+        if event.code == EVENT_ALL_JOBS_REMOVED:
+            self._job_index.clear()
+            for job in self.jobs():
+                self._job_index.add(job.job.id, job)
+            return
+
+        job_id = cast("JobEvent", event).job_id
+        if event.code == EVENT_JOB_REMOVED:
+            self._job_index.remove(job_id)
+            return
+
+        aps_job = self.scheduler.get_job(job_id)
+        if aps_job is not None and len(aps_job.args) > 1 and isinstance(aps_job.args[1], Job):
+            self._job_index.add(job_id, aps_job.args[1])
+
     def get_jobs_by_name(self, name: str) -> tuple["Job[CCT]", ...]:
         """Returns a tuple of all *pending/scheduled* jobs with the given name that are currently
         in the :class:`JobQueue`.
 
+        .. versionchanged:: NEXT.VERSION
+            The jobs are looked up in an index instead of iterating over all jobs. They are
+            returned in the order in which they were scheduled.
+
         Returns:
             tuple[:class:`Job`]: Tuple of all *pending* or *scheduled* jobs matching the name.
         """
-        return tuple(job for job in self.jobs() if job.name == name)
+        return self._job_index.get(self._job_index.by_name, name)
+
+    def get_jobs_by_chat(self, chat_id: int) -> tuple["Job[CCT]", ...]:
+        """Returns a tuple of all *pending/scheduled* jobs associated with the given chat, i.e.
+        with a matching :attr:`Job.chat_id`, that are currently in the :class:`JobQueue`. The jobs
+        are returned in the order in which they were scheduled.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            chat_id (:obj:`int`): The chat id.
+
+        Returns:
+            tuple[:class:`Job`]: Tuple of all *pending* or *scheduled* jobs of the chat.
+        """
+        return self._job_index.get(self._job_index.by_chat_id, chat_id)
+
+    def get_jobs_by_user(self, user_id: int) -> tuple["Job[CCT]", ...]:
+        """Returns a tuple of all *pending/scheduled* jobs associated with the given user, i.e.
+        with a matching :attr:`Job.user_id`, that are currently in the :class:`JobQueue`. The jobs
+        are returned in the order in which they were scheduled.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            user_id (:obj:`int`): The user id.
+
+        Returns:
+            tuple[:class:`Job`]: Tuple of all *pending* or *scheduled* jobs of the user.
+        """
+        return self._job_index.get(self._job_index.by_user_id, user_id)
 
 
 class Job(Generic[CCT]):
     """This class is a convenience wrapper for the jobs held in a :class:`telegram.ext.JobQueue`.
     With the current backend APScheduler, :attr:`job` holds a :class:`apscheduler.job.Job`
-    instance.
+    instance. For jobs of a :class:`telegram.ext.HeapJobQueue`, :attr:`job` holds a lightweight
+    object that provides the parts of the interface of :class:`apscheduler.job.Job` used by this
+    class.
 
     Objects of this class are comparable in terms of equality. Two objects of this class are
     considered equal, if their :class:`id <apscheduler.job.Job>` is equal.
@@ -765,6 +1249,11 @@ class Job(Generic[CCT]):
         user_id (:obj:`int`, optional): User id of the user that this job is associated with.
 
             .. versionadded:: 20.0
+        priority (:obj:`int`, optional): The priority of the job. If
+            :attr:`JobQueue.max_concurrent_jobs` is reached, waiting jobs with a higher priority
+            are started first. Defaults to ``0``.
+
+            .. versionadded:: NEXT.VERSION
     Attributes:
         callback (:term:`coroutine function`): The callback function that should be executed by the
             new job.
@@ -776,6 +1265,10 @@ class Job(Generic[CCT]):
         user_id (:obj:`int`): Optional. User id of the user that this job is associated with.
 
             .. versionadded:: 20.0
+        priority (:obj:`int`): The priority of the job. Can be changed at any time, e.g. right
+            after the job was scheduled.
+
+            .. versionadded:: NEXT.VERSION
     """
 
     __slots__ = (
@@ -786,6 +1279,7 @@ class Job(Generic[CCT]):
         "chat_id",
         "data",
         "name",
+        "priority",
         "user_id",
     )
 
@@ -796,6 +1290,7 @@ class Job(Generic[CCT]):
         name: Optional[str] = None,
         chat_id: Optional[int] = None,
         user_id: Optional[int] = None,
+        priority: int = 0,
     ):
         if not APS_AVAILABLE:
             raise RuntimeError(
@@ -808,6 +1303,7 @@ class Job(Generic[CCT]):
         self.name: Optional[str] = name or callback.__name__
         self.chat_id: Optional[int] = chat_id
         self.user_id: Optional[int] = user_id
+        self.priority: int = priority
 
         self._removed = False
         self._enabled = False
@@ -985,3 +1481,240 @@ class Job(Generic[CCT]):
         """
         self.job.remove()
         self._removed = True
+
+
+class _BulkChatJobHandle:
+    """Takes the place of the scheduler job of a :class:`BulkJob` in the :class:`Job` that is
+    passed to the callback for a single chat. Reading e.g. :attr:`Job.next_t` gives the values of
+    the bulk job, but the bulk job can't be changed for a single chat: Removing the job only
+    removes the chat from the bulk job and pausing or rescheduling it is not supported.
+    """
+
+    __slots__ = ("_bulk_job", "_chat_id")
+
+    def __init__(self, bulk_job: "BulkJob[Any]", chat_id: int) -> None:
+        self._bulk_job: BulkJob[Any] = bulk_job
+        self._chat_id: int = chat_id
+
+    def __getattr__(self, item: str) -> object:
+        return getattr(self._bulk_job.job.job, item)
+
+    def remove(self) -> None:
+        self._bulk_job._chat_ids.pop(self._chat_id, None)  # pylint: disable=protected-access
+
+    def _not_supported(self, *_: object, **__: object) -> NoReturn:
+        raise RuntimeError(
+            "The job of a single chat of a bulk job can't be paused or rescheduled. Use "
+            "`BulkJob.job` instead."
+        )
+
+    pause = resume = modify = reschedule = _not_supported
+
+
+class BulkJob(Generic[CCT]):
+    """A job that runs a callback for each chat of a set of chats. Instances of this class are
+    created by :meth:`JobQueue.run_daily_for`.
+
+    The bulk job is scheduled as a single :class:`Job`, which is available as :attr:`job`. Its
+    memory footprint is independent of the number of chats apart from the chat ids themselves.
+    Chats can be added and removed in constant time, also while the job is running.
+
+    This class is a :class:`~typing.Generic` class and accepts one type variable that specifies
+    the type of the argument ``context`` of :paramref:`callback`.
+
+    .. versionadded:: NEXT.VERSION
+
+    Note:
+        * If the :class:`~telegram.ext.Application` is stopped while the job is running, the
+          remaining chats are skipped.
+        * In the callback, :attr:`telegram.ext.CallbackContext.job` is a :class:`Job` for the
+          single chat. Calling :meth:`Job.schedule_removal` on it only removes the chat from the
+          bulk job, i.e. it's equivalent to :meth:`remove_chat`. Setting :attr:`Job.enabled`
+          raises a :exc:`RuntimeError`. Use :attr:`job` to remove or pause the whole bulk job.
+
+    Args:
+        callback (:term:`coroutine function`): The callback function that should be executed for
+            each chat. Callback signature::
+
+                async def callback(context: CallbackContext)
+
+        chat_ids (Iterable[:obj:`int`]): The ids of the chats to run the callback for.
+        data (:obj:`object`, optional): Additional data needed for the callback function.
+        name (:obj:`str`, optional): The name of the job. Defaults to
+            :external:attr:`callback.__name__ <definition.__name__>`.
+        spread (:obj:`float` | :obj:`datetime.timedelta`, optional): Time span over which the
+            calls for the individual chats are evenly spread. Defaults to ``0``.
+        concurrency (:obj:`int`, optional): The maximum number of chats that the callback runs for
+            concurrently. Defaults to ``8``.
+
+    Attributes:
+        callback (:term:`coroutine function`): The callback function that is executed for each
+            chat.
+        data (:obj:`object`): Optional. Additional data needed for the :attr:`callback` function.
+        name (:obj:`str`): The name of the job.
+        spread (:obj:`float`): Time span in seconds over which the calls for the individual chats
+            are spread.
+        concurrency (:obj:`int`): The maximum number of chats that the callback runs for
+            concurrently.
+    """
+
+    __slots__ = (
+        "_chat_ids",
+        "_job",
+        "_processed",
+        "_total",
+        "callback",
+        "concurrency",
+        "data",
+        "name",
+        "spread",
+    )
+
+    def __init__(
+        self,
+        callback: JobCallback[CCT],
+        chat_ids: Iterable[int],
+        data: Optional[object] = None,
+        name: Optional[str] = None,
+        spread: Union[float, datetime.timedelta] = 0,
+        concurrency: int = 8,
+    ):
+        if concurrency < 1:
+            raise ValueError("`concurrency` must be at least 1.")
+        if isinstance(spread, datetime.timedelta):
+            spread = spread.total_seconds()
+        if spread < 0:
+            raise ValueError("`spread` must not be negative.")
+
+        self.callback: JobCallback[CCT] = callback
+        self.data: Optional[object] = data
+        self.name: str = name or callback.__name__
+        self.spread: float = spread
+        self.concurrency: int = concurrency
+
+        # A dict instead of a set to keep the order in which the chats were added
+        self._chat_ids: dict[int, None] = dict.fromkeys(chat_ids)
+        self._processed = 0
+        self._total = 0
+        self._job: Job[CCT] = cast("Job[CCT]", None)
+
+    def __repr__(self) -> str:
+        """Give a string representation of the bulk job in the form
+        ``BulkJob[name=..., chats=...]``.
+
+        As this class doesn't implement :meth:`object.__str__`, the default implementation
+        will be used, which is equivalent to :meth:`__repr__`.
+
+        Returns:
+            :obj:`str`
+        """
+        return build_repr_with_selected_attrs(self, name=self.name, chats=len(self))
+
+    def __len__(self) -> int:
+        """Returns the number of chats of this bulk job."""
+        return len(self._chat_ids)
+
+    def __contains__(self, chat_id: object) -> bool:
+        """Checks whether the chat with the given id belongs to this bulk job."""
+        return chat_id in self._chat_ids
+
+    @property
+    def job(self) -> Job[CCT]:
+        """:class:`telegram.ext.Job`: The job that runs this bulk job. Use it e.g. to
+        :meth:`~Job.schedule_removal` the bulk job or to access its :attr:`~Job.next_t`.
+        """
+        return self._job
+
+    @property
+    def chat_ids(self) -> tuple[int, ...]:
+        """tuple[:obj:`int`]: The ids of the chats of this bulk job."""
+        return tuple(self._chat_ids)
+
+    @property
+    def progress(self) -> tuple[int, int]:
+        """tuple[:obj:`int`, :obj:`int`]: The number of chats that were processed in the current
+        or, if the job is not running, in the last run along with the total number of chats of
+        that run. Chats that were removed during the run count as processed.
+        """
+        return self._processed, self._total
+
+    def add_chat(self, chat_id: int) -> None:
+        """Adds a chat to this bulk job. If the job is currently running, the chat will be
+        processed on the next run.
+
+        Args:
+            chat_id (:obj:`int`): The id of the chat.
+        """
+        self._chat_ids[chat_id] = None
+
+    def remove_chat(self, chat_id: int) -> None:
+        """Removes a chat from this bulk job. If the job is currently running and the chat was
+        not processed yet, it will be skipped.
+
+        Args:
+            chat_id (:obj:`int`): The id of the chat.
+
+        Raises:
+            :exc:`KeyError`: If the chat does not belong to this bulk job.
+        """
+        del self._chat_ids[chat_id]
+
+    async def _run(self, context: CCT) -> None:
+        application = cast(
+            "Application[Any, CCT, Any, Any, Any, JobQueue[CCT]]", context.application
+        )
+        # Chats that are added during the run are processed on the next run
+        chat_ids = list(self._chat_ids)
+        self._processed = 0
+        self._total = len(chat_ids)
+        if not chat_ids:
+            return
+
+        # Only stop early if the job didn't run outside of a running application anyway
+        stop_with_application = application.running
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        interval = self.spread / len(chat_ids)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks: set[asyncio.Task[None]] = set()
+
+        for i, chat_id in enumerate(chat_ids):
+            if (delay := start + i * interval - loop.time()) > 0:
+                await asyncio.sleep(delay)
+            if stop_with_application and not application.running:
+                _LOGGER.debug(
+                    "Application stopped, skipping the remaining %d chats of bulk job %s",
+                    len(chat_ids) - i,
+                    self.name,
+                )
+                break
+            if chat_id not in self._chat_ids:
+                self._processed += 1
+                continue
+
+            await semaphore.acquire()
+            task = loop.create_task(
+                self._run_for_chat(application, chat_id, semaphore),
+                name=f"BulkJob:{self._job.id}:{chat_id}",
+            )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        await asyncio.gather(*tasks)
+
+    async def _run_for_chat(
+        self,
+        application: "Application[Any, CCT, Any, Any, Any, JobQueue[CCT]]",
+        chat_id: int,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        try:
+            job = Job(callback=self.callback, data=self.data, name=self.name, chat_id=chat_id)
+            # The job must not be able to remove or pause the bulk job for all chats
+            job._job = cast(  # pylint: disable=protected-access
+                "APSJob", _BulkChatJobHandle(self, chat_id)
+            )
+            await job.run(application)
+        finally:
+            semaphore.release()
+            self._processed += 1
@@ -0,0 +1,580 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the KeyValuePersistence class and the interface for the key-value
+clients used by it."""
+import json
+import pickle
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Collection, Mapping, MutableMapping, Sequence
+from io import BytesIO
+from typing import Any, Optional, cast, overload
+
+from telegram.ext._basepersistence import BasePersistence, PersistenceInput
+from telegram.ext._contexttypes import ContextTypes
+from telegram.ext._picklepersistence import _BotPickler, _BotUnpickler
+from telegram.ext._utils.types import BD, CD, UD, CDCData, ConversationDict, ConversationKey
+
+
+class BaseKeyValueClient(ABC):
+    """Abstract interface class that allows :class:`telegram.ext.KeyValuePersistence` to talk to
+    a key-value store. Implement this interface to connect the persistence to e.g. a Redis or
+    Memcached server.
+
+    All keys are :obj:`str` and all values are :obj:`bytes`.
+
+    .. versionadded:: NEXT.VERSION
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Retrieve the value for a single key.
+
+        Args:
+            key (:obj:`str`): The key.
+
+        Returns:
+            :obj:`bytes` | :obj:`None`: The stored value or :obj:`None`, if the key doesn't exist.
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None:
+        """Store the value for a single key.
+
+        Args:
+            key (:obj:`str`): The key.
+            value (:obj:`bytes`): The value.
+        """
+
+    @abstractmethod
+    async def mget(self, keys: Sequence[str]) -> Sequence[Optional[bytes]]:
+        """Retrieve the values for multiple keys in a single round trip.
+
+        Args:
+            keys (Sequence[:obj:`str`]): The keys.
+
+        Returns:
+            Sequence[:obj:`bytes` | :obj:`None`]: The stored values in the same order as
+            :paramref:`keys`. Missing keys are represented by :obj:`None`.
+        """
+
+    @abstractmethod
+    async def mset(self, mapping: Mapping[str, bytes]) -> None:
+        """Store multiple key-value pairs in a single round trip. Implementations should write
+        all pairs atomically if the store supports it.
+
+        Args:
+            mapping (Mapping[:obj:`str`, :obj:`bytes`]): The key-value pairs to store.
+        """
+
+    @abstractmethod
+    async def delete(self, keys: Collection[str]) -> None:
+        """Delete multiple keys in a single round trip. Keys that don't exist are ignored.
+
+        Args:
+            keys (Collection[:obj:`str`]): The keys to delete.
+        """
+
+    @abstractmethod
+    def scan(self, prefix: str) -> AsyncIterator[str]:
+        """Iterate over all keys starting with :paramref:`prefix`. Usually implemented as
+        asynchronous generator.
+
+        Args:
+            prefix (:obj:`str`): The prefix of the keys.
+
+        Returns:
+            AsyncIterator[:obj:`str`]: The keys.
+        """
+
+
+class InMemoryKeyValueClient(BaseKeyValueClient):
+    """Implementation of :class:`BaseKeyValueClient` that keeps all data in a :obj:`dict` in the
+    current process. This is the default client of :class:`telegram.ext.KeyValuePersistence` and
+    mostly useful for testing, as the data is lost when the process ends.
+
+    .. versionadded:: NEXT.VERSION
+
+    Attributes:
+        data (dict[:obj:`str`, :obj:`bytes`]): The stored data.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """See :meth:`BaseKeyValueClient.get`."""
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        """See :meth:`BaseKeyValueClient.set`."""
+        self.data[key] = value
+
+    async def mget(self, keys: Sequence[str]) -> Sequence[Optional[bytes]]:
+        """See :meth:`BaseKeyValueClient.mget`."""
+        return [self.data.get(key) for key in keys]
+
+    async def mset(self, mapping: Mapping[str, bytes]) -> None:
+        """See :meth:`BaseKeyValueClient.mset`."""
+        self.data.update(mapping)
+
+    async def delete(self, keys: Collection[str]) -> None:
+        """See :meth:`BaseKeyValueClient.delete`."""
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan(self, prefix: str) -> AsyncIterator[str]:
+        """See :meth:`BaseKeyValueClient.scan`."""
+        # Copy the keys so that the dict may be changed while iterating
+        for key in list(self.data):
+            if key.startswith(prefix):
+                yield key
+
+
+def _encode_key_parts(*parts: object) -> str:
+    # JSON keeps the distinction between int and str entries of conversation keys and makes sure
+    # that e.g. a handler name containing the separator can't collide with another name
+    return json.dumps(parts, separators=(",", ":"))
+
+
+class KeyValuePersistence(BasePersistence[UD, CD, BD]):
+    """Persistence class that stores the data in a key-value store, accessed via an instance of
+    :class:`telegram.ext.BaseKeyValueClient`.
+
+    Each user, chat and conversation key is stored under its own key of the store. Changes
+    collected by :class:`~telegram.ext.Application` within one run of
+    :meth:`~telegram.ext.Application.update_persistence` are written with a single
+    :meth:`~BaseKeyValueClient.mset` or :meth:`~BaseKeyValueClient.delete` call per kind of data.
+    Hence, multiple bot processes can share the same store, as long as they don't write the same
+    entries.
+
+    Attention:
+        The interface provided by this class is intended to be accessed exclusively by
+        :class:`~telegram.ext.Application`. Calling any of the methods below manually might
+        interfere with the integration of persistence into :class:`~telegram.ext.Application`.
+
+    Note:
+        Values are serialized with :mod:`pickle`. Just like in
+        :class:`~telegram.ext.PicklePersistence`, any reference to :attr:`~BasePersistence.bot`
+        will be replaced by a placeholder before pickling and :attr:`~BasePersistence.bot` will
+        be inserted back when loading the data.
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        client (:class:`telegram.ext.BaseKeyValueClient`, optional): The client to use. Defaults
+            to a new instance of :class:`telegram.ext.InMemoryKeyValueClient`.
+        namespace (:obj:`str`, optional): Prefix for all keys written by this instance. Use
+            different namespaces for different bots sharing the same store. Defaults to
+            ``"ptb"``.
+        store_data (:class:`~telegram.ext.PersistenceInput`, optional): Specifies which kinds of
+            data will be saved by this persistence instance. By default, all available kinds of
+            data will be saved.
+        refresh_data (:obj:`bool`, optional): When :obj:`True`, the ``refresh_*_data`` methods
+            will re-read the corresponding entry from the store before each handler callback, such
+            that changes written by other processes become visible. Entries with local changes
+            that were not written to the store yet are not re-read. This is only supported for
+            data that is a :class:`~collections.abc.MutableMapping`, e.g. :obj:`dict`. Defaults to
+            :obj:`False`.
+        update_interval (:obj:`int` | :obj:`float`, optional): The
+            :class:`~telegram.ext.Application` will update
+            the persistence in regular intervals. This parameter specifies the time (in seconds) to
+            wait between two consecutive runs of updating the persistence. Defaults to 60 seconds.
+        context_types (:class:`telegram.ext.ContextTypes`, optional): Pass an instance
+            of :class:`telegram.ext.ContextTypes` to customize the types used in the
+            ``context`` interface. If not passed, the defaults documented in
+            :class:`telegram.ext.ContextTypes` will be used.
+
+    Attributes:
+        client (:class:`telegram.ext.BaseKeyValueClient`): The client used to access the store.
+        namespace (:obj:`str`): Prefix for all keys written by this instance.
+        store_data (:class:`~telegram.ext.PersistenceInput`): Specifies which kinds of data will
+            be saved by this persistence instance.
+        refresh_data (:obj:`bool`): Whether the ``refresh_*_data`` methods re-read the data from
+            the store.
+        context_types (:class:`telegram.ext.ContextTypes`): Container for the types used
+            in the ``context`` interface.
+    """
+
+    __slots__ = (
+        "_last_written",
+        "client",
+        "context_types",
+        "namespace",
+        "refresh_data",
+    )
+
+    _MGET_CHUNK_SIZE = 1000
+
+    @overload
+    def __init__(
+        self: "KeyValuePersistence[dict[Any, Any], dict[Any, Any], dict[Any, Any]]",
+        client: Optional[BaseKeyValueClient] = None,
+        namespace: str = "ptb",
+        store_data: Optional[PersistenceInput] = None,
+        refresh_data: bool = False,
+        update_interval: float = 60,
+    ): ...
+
+    @overload
+    def __init__(
+        self: "KeyValuePersistence[UD, CD, BD]",
+        client: Optional[BaseKeyValueClient] = None,
+        namespace: str = "ptb",
+        store_data: Optional[PersistenceInput] = None,
+        refresh_data: bool = False,
+        update_interval: float = 60,
+        context_types: Optional[ContextTypes[Any, UD, CD, BD]] = None,
+    ): ...
+
+    def __init__(
+        self,
+        client: Optional[BaseKeyValueClient] = None,
+        namespace: str = "ptb",
+        store_data: Optional[PersistenceInput] = None,
+        refresh_data: bool = False,
+        update_interval: float = 60,
+        context_types: Optional[ContextTypes[Any, UD, CD, BD]] = None,
+    ):
+        super().__init__(store_data=store_data, update_interval=update_interval)
+        self.client: BaseKeyValueClient = client or InMemoryKeyValueClient()
+        self.namespace: str = namespace
+        self.refresh_data: bool = refresh_data
+        self.context_types: ContextTypes[Any, UD, CD, BD] = cast(
+            ContextTypes[Any, UD, CD, BD], context_types or ContextTypes()
+        )
+        # bot_data and callback_data are handed over on every run of update_persistence. We
+        # remember what was written last to avoid rewriting them if nothing changed. With
+        # refresh_data, we also remember what was last read or written for user_data and
+        # chat_data, such that refreshing doesn't overwrite changes that weren't written yet.
+        self._last_written: dict[str, bytes] = {}
+
+    def _dumps(self, obj: object) -> bytes:
+        buffer = BytesIO()
+        _BotPickler(self.bot, buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+        return buffer.getvalue()
+
+    def _loads(self, data: bytes, key: str) -> Any:
+        try:
+            return _BotUnpickler(self.bot, BytesIO(data)).load()
+        except pickle.UnpicklingError as exc:
+            raise TypeError(f"Key {key} does not contain valid pickle data") from exc
+        except Exception as exc:
+            raise TypeError(f"Something went wrong unpickling {key}") from exc
+
+    def _key(self, kind: str, *parts: object) -> str:
+        if not parts:
+            return f"{self.namespace}:{kind}"
+        return f"{self.namespace}:{kind}:{_encode_key_parts(*parts)}"
+
+    def _conversation_prefix(self, name: str) -> str:
+        # strip the closing bracket so that this is a prefix of all keys of the handler
+        return f"{self.namespace}:conversations:{_encode_key_parts(name)[:-1]},"
+
+    async def _load_prefix(self, prefix: str, track: bool = False) -> dict[str, Any]:
+        keys = [key async for key in self.client.scan(prefix)]
+        out: dict[str, Any] = {}
+        for i in range(0, len(keys), self._MGET_CHUNK_SIZE):
+            chunk = keys[i : i + self._MGET_CHUNK_SIZE]
+            for key, value in zip(chunk, await self.client.mget(chunk)):
+                if value is not None:
+                    out[key] = self._loads(value, key)
+                    if track:
+                        self._track(key, out[key])
+        return out
+
+    async def _load_id_mapping(self, kind: str) -> dict[int, Any]:
+        prefix = f"{self.namespace}:{kind}:"
+        data = await self._load_prefix(prefix, track=True)
+        return {json.loads(key[len(prefix) :])[0]: value for key, value in data.items()}
+
+    async def _set_if_changed(self, key: str, data: object) -> None:
+        value = self._dumps(data)
+        if self._last_written.get(key) == value:
+            return
+        await self.client.set(key, value)
+        self._last_written[key] = value
+
+    def _track(self, key: str, data: object) -> None:
+        if self.refresh_data:
+            self._last_written[key] = self._dumps(data)
+
+    def _has_local_changes(self, key: str, data: object) -> bool:
+        if key not in self._last_written:
+            # Data that was neither read from nor written to the store was created locally
+            return bool(data)
+        return self._dumps(data) != self._last_written[key]
+
+    async def _mset_tracked(self, data: Mapping[str, object]) -> None:
+        values = {key: self._dumps(value) for key, value in data.items()}
+        await self.client.mset(values)
+        if self.refresh_data:
+            self._last_written.update(values)
+
+    async def _delete_tracked(self, keys: list[str]) -> None:
+        await self.client.delete(keys)
+        for key in keys:
+            self._last_written.pop(key, None)
+
+    async def _refresh_mapping(self, key: str, data: object) -> None:
+        if not self.refresh_data or not isinstance(data, MutableMapping):
+            return
+        # Changes made by previous handlers are only written on the next run of
+        # update_persistence. Re-reading the data would silently drop them.
+        if self._has_local_changes(key, data):
+            return
+        value = await self.client.get(key)
+        if value is None:
+            return
+        data.clear()
+        data.update(self._loads(value, key))
+        self._last_written[key] = self._dumps(data)
+
+    async def get_user_data(self) -> dict[int, UD]:
+        """Returns the user_data stored under :attr:`namespace` or an empty :obj:`dict`.
+
+        Returns:
+            dict[:obj:`int`, :obj:`dict`]: The restored user data.
+        """
+        return await self._load_id_mapping("user_data")
+
+    async def get_chat_data(self) -> dict[int, CD]:
+        """Returns the chat_data stored under :attr:`namespace` or an empty :obj:`dict`.
+
+        Returns:
+            dict[:obj:`int`, :obj:`dict`]: The restored chat data.
+        """
+        return await self._load_id_mapping("chat_data")
+
+    async def get_bot_data(self) -> BD:
+        """Returns the bot_data stored under :attr:`namespace` or an empty object of type
+        :obj:`dict` | :attr:`telegram.ext.ContextTypes.bot_data`.
+
+        Returns:
+            :obj:`dict` | :attr:`telegram.ext.ContextTypes.bot_data`: The restored bot data.
+        """
+        key = self._key("bot_data")
+        value = await self.client.get(key)
+        if value is None:
+            return self.context_types.bot_data()
+        bot_data = self._loads(value, key)
+        self._track(key, bot_data)
+        return bot_data
+
+    async def get_callback_data(self) -> Optional[CDCData]:
+        """Returns the callback data stored under :attr:`namespace` or :obj:`None`.
+
+        Returns:
+            tuple[list[tuple[:obj:`str`, :obj:`float`, dict[:obj:`str`, :class:`object`]]],
+            dict[:obj:`str`, :obj:`str`]] | :obj:`None`: The restored metadata or :obj:`None`,
+            if no data was stored.
+        """
+        key = self._key("callback_data")
+        value = await self.client.get(key)
+        if value is None:
+            return None
+        return self._loads(value, key)
+
+    async def get_conversations(self, name: str) -> ConversationDict:
+        """Returns the conversations of the handler stored under :attr:`namespace` or an empty
+        :obj:`dict`.
+
+        Args:
+            name (:obj:`str`): The handlers name.
+
+        Returns:
+            :obj:`dict`: The restored conversations for the handler.
+        """
+        data = await self._load_prefix(self._conversation_prefix(name))
+        prefix_length = len(f"{self.namespace}:conversations:")
+        return {tuple(json.loads(key[prefix_length:])[1:]): state for key, state in data.items()}
+
+    async def update_conversation(
+        self, name: str, key: ConversationKey, new_state: Optional[object]
+    ) -> None:
+        """Will update the state of the given key in the store. If :paramref:`new_state` is
+        :obj:`None`, the key is deleted from the store instead.
+
+        Args:
+            name (:obj:`str`): The handler's name.
+            key (:obj:`tuple`): The key the state is changed for.
+            new_state (:class:`object`): The new state for the given key.
+        """
+        await self.update_conversations_many(name, {key: new_state})
+
+    async def update_conversations_many(
+        self, name: str, states: Mapping[ConversationKey, Optional[object]]
+    ) -> None:
+        """Will write all given states with a single call of
+        :meth:`~BaseKeyValueClient.mset` and delete the keys of ended conversations with a
+        single call of :meth:`~BaseKeyValueClient.delete`.
+
+        Args:
+            name (:obj:`str`): The handler's name.
+            states (Mapping[:obj:`tuple`, :class:`object`]): Mapping of the keys the state is
+                changed for to the new state.
+        """
+        to_set: dict[str, bytes] = {}
+        to_delete: list[str] = []
+        for key, new_state in states.items():
+            store_key = self._key("conversations", name, *key)
+            if new_state is None:
+                to_delete.append(store_key)
+            else:
+                to_set[store_key] = self._dumps(new_state)
+        if to_set:
+            await self.client.mset(to_set)
+        if to_delete:
+            await self.client.delete(to_delete)
+
+    async def update_user_data(self, user_id: int, data: UD) -> None:
+        """Will write the user_data of the given user to the store.
+
+        Args:
+            user_id (:obj:`int`): The user the data might have been changed for.
+            data (:obj:`dict`): The :attr:`telegram.ext.Application.user_data` ``[user_id]``.
+        """
+        key = self._key("user_data", user_id)
+        value = self._dumps(data)
+        await self.client.set(key, value)
+        if self.refresh_data:
+            self._last_written[key] = value
+
+    async def update_user_data_many(self, data: Mapping[int, UD]) -> None:
+        """Will write the user_data of all given users with a single call of
+        :meth:`~BaseKeyValueClient.mset`.
+
+        Args:
+            data (Mapping[:obj:`int`, :obj:`dict`]): Mapping of user IDs to the corresponding
+                :attr:`telegram.ext.Application.user_data` ``[user_id]``.
+        """
+        await self._mset_tracked(
+            {self._key("user_data", user_id): value for user_id, value in data.items()}
+        )
+
+    async def update_chat_data(self, chat_id: int, data: CD) -> None:
+        """Will write the chat_data of the given chat to the store.
+
+        Args:
+            chat_id (:obj:`int`): The chat the data might have been changed for.
+            data (:obj:`dict`): The :attr:`telegram.ext.Application.chat_data` ``[chat_id]``.
+        """
+        key = self._key("chat_data", chat_id)
+        value = self._dumps(data)
+        await self.client.set(key, value)
+        if self.refresh_data:
+            self._last_written[key] = value
+
+    async def update_chat_data_many(self, data: Mapping[int, CD]) -> None:
+        """Will write the chat_data of all given chats with a single call of
+        :meth:`~BaseKeyValueClient.mset`.
+
+        Args:
+            data (Mapping[:obj:`int`, :obj:`dict`]): Mapping of chat IDs to the corresponding
+                :attr:`telegram.ext.Application.chat_data` ``[chat_id]``.
+        """
+        await self._mset_tracked(
+            {self._key("chat_data", chat_id): value for chat_id, value in data.items()}
+        )
+
+    async def update_bot_data(self, data: BD) -> None:
+        """Will write the bot_data to the store, if it changed since the last write.
+
+        Args:
+            data (:obj:`dict` | :attr:`telegram.ext.ContextTypes.bot_data`): The
+                :attr:`telegram.ext.Application.bot_data`.
+        """
+        await self._set_if_changed(self._key("bot_data"), data)
+
+    async def update_callback_data(self, data: CDCData) -> None:
+        """Will write the callback_data to the store, if it changed since the last write.
+
+        Args:
+            data (tuple[list[tuple[:obj:`str`, :obj:`float`, \
+                dict[:obj:`str`, :class:`object`]]], dict[:obj:`str`, :obj:`str`]]):
+                The relevant data to restore :class:`telegram.ext.CallbackDataCache`.
+        """
+        await self._set_if_changed(self._key("callback_data"), data)
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        """Will delete the chat_data of the given chat from the store.
+
+        Args:
+            chat_id (:obj:`int`): The chat id to delete from the persistence.
+        """
+        await self.drop_chat_data_many((chat_id,))
+
+    async def drop_chat_data_many(self, chat_ids: Collection[int]) -> None:
+        """Will delete the chat_data of all given chats with a single call of
+        :meth:`~BaseKeyValueClient.delete`.
+
+        Args:
+            chat_ids (Collection[:obj:`int`]): The chat ids to delete from the persistence.
+        """
+        await self._delete_tracked([self._key("chat_data", chat_id) for chat_id in chat_ids])
+
+    async def drop_user_data(self, user_id: int) -> None:
+        """Will delete the user_data of the given user from the store.
+
+        Args:
+            user_id (:obj:`int`): The user id to delete from the persistence.
+        """
+        await self.drop_user_data_many((user_id,))
+
+    async def drop_user_data_many(self, user_ids: Collection[int]) -> None:
+        """Will delete the user_data of all given users with a single call of
+        :meth:`~BaseKeyValueClient.delete`.
+
+        Args:
+            user_ids (Collection[:obj:`int`]): The user ids to delete from the persistence.
+        """
+        await self._delete_tracked([self._key("user_data", user_id) for user_id in user_ids])
+
+    async def refresh_user_data(self, user_id: int, user_data: UD) -> None:
+        """If :attr:`refresh_data` is :obj:`True`, replaces the contents of
+        :paramref:`user_data` by the entry currently stored for the user. Does nothing otherwise.
+
+        .. seealso:: :meth:`telegram.ext.BasePersistence.refresh_user_data`
+        """
+        await self._refresh_mapping(self._key("user_data", user_id), user_data)
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: CD) -> None:
+        """If :attr:`refresh_data` is :obj:`True`, replaces the contents of
+        :paramref:`chat_data` by the entry currently stored for the chat. Does nothing otherwise.
+
+        .. seealso:: :meth:`telegram.ext.BasePersistence.refresh_chat_data`
+        """
+        await self._refresh_mapping(self._key("chat_data", chat_id), chat_data)
+
+    async def refresh_bot_data(self, bot_data: BD) -> None:
+        """If :attr:`refresh_data` is :obj:`True`, replaces the contents of
+        :paramref:`bot_data` by the currently stored bot_data. Does nothing otherwise.
+
+        .. seealso:: :meth:`telegram.ext.BasePersistence.refresh_bot_data`
+        """
+        await self._refresh_mapping(self._key("bot_data"), bot_data)
+
+    async def flush(self) -> None:
+        """Does nothing, as all data is written to the store immediately.
+
+        .. seealso:: :meth:`telegram.ext.BasePersistence.flush`
+        """
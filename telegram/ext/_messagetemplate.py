@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the MessageTemplate class."""
+import json
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from telegram import InlineKeyboardMarkup, LinkPreviewOptions, Message, MessageEntity
+from telegram._utils.defaultvalue import DEFAULT_NONE
+from telegram._utils.types import JSONDict, ODVInput, ReplyMarkup
+from telegram.ext._utils.types import RLARGS
+
+if TYPE_CHECKING:
+    from telegram import ReplyParameters
+    from telegram.ext import ExtBot
+
+
+class MessageTemplate:
+    """A text message that is sent or edited many times with the same content, e.g. the same
+    keyboard for thousands of users.
+
+    The content is converted to the format expected by the Bot API once when creating the
+    template. This includes the :attr:`~telegram.ext.Defaults.parse_mode` and
+    :attr:`~telegram.ext.Defaults.link_preview_options` of :attr:`telegram.ext.ExtBot.defaults`.
+    When sending the template, only the target of the message is added to the already encoded
+    content instead of converting :paramref:`entities` and :paramref:`reply_markup` again for
+    every request.
+
+    Examples:
+        .. code-block:: python
+
+            template = MessageTemplate(
+                application.bot,
+                "Please choose:",
+                reply_markup=InlineKeyboardMarkup.from_row(buttons),
+            )
+            for chat_id in chat_ids:
+                await template.send_message(chat_id)
+
+    Note:
+        If :paramref:`reply_markup` contains callback data and the bot uses a
+        :class:`telegram.ext.CallbackDataCache`, the keyboard is still passed to the cache on
+        every send, such that the cache knows about every message showing it. If all callback
+        data is hashable, the cache returns the same keyboard every time and the encoded keyboard
+        is reused. Otherwise, the keyboard is encoded again for every message.
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        bot (:class:`telegram.ext.ExtBot`): The bot used to send the message.
+        text (:obj:`str`): Text of the message to be sent.
+        parse_mode (:obj:`str`, optional): |parse_mode|
+        entities (Sequence[:class:`telegram.MessageEntity`], optional): Sequence of special
+            entities that appear in message text, which can be specified instead of
+            :paramref:`parse_mode`.
+        link_preview_options (:obj:`LinkPreviewOptions`, optional): Link preview generation
+            options for the message.
+        reply_markup (:class:`InlineKeyboardMarkup` | :class:`ReplyKeyboardMarkup` | \
+            :class:`ReplyKeyboardRemove` | :class:`ForceReply`, optional): Additional interface
+            options.
+
+    Attributes:
+        bot (:class:`telegram.ext.ExtBot`): The bot used to send the message.
+        text (:obj:`str`): Text of the message to be sent.
+        reply_markup (:class:`InlineKeyboardMarkup` | :class:`ReplyKeyboardMarkup` | \
+            :class:`ReplyKeyboardRemove` | :class:`ForceReply`): Optional. Additional interface
+            options.
+    """
+
+    __slots__ = (
+        "_encoded_markup",
+        "_fragments",
+        "_processed_markup",
+        "bot",
+        "reply_markup",
+        "text",
+    )
+
+    def __init__(
+        self,
+        bot: "ExtBot[Any]",
+        text: str,
+        parse_mode: ODVInput[str] = DEFAULT_NONE,
+        entities: Optional[Sequence[MessageEntity]] = None,
+        link_preview_options: ODVInput[LinkPreviewOptions] = DEFAULT_NONE,
+        reply_markup: Optional[ReplyMarkup] = None,
+    ):
+        self.bot: ExtBot[Any] = bot
+        self.text: str = text
+        self.reply_markup: Optional[ReplyMarkup] = reply_markup
+
+        data: JSONDict = {
+            "parse_mode": parse_mode,
+            "entities": entities,
+            "link_preview_options": link_preview_options,
+        }
+        # Resolve the defaults exactly like for a regular request
+        bot._insert_defaults(data)  # pylint: disable=protected-access
+        # None values are kept, such that they override the values passed by the bot methods
+        self._fragments: dict[str, Optional[str]] = {
+            "parse_mode": data["parse_mode"],
+            "entities": self._encode(data["entities"]),
+            "link_preview_options": self._encode(data["link_preview_options"]),
+        }
+
+        # The keyboard that was last encoded and its encoded form
+        self._processed_markup: Optional[ReplyMarkup] = None
+        self._encoded_markup: Optional[str] = None
+        if not self._needs_processing:
+            # pylint: disable-next=protected-access
+            self._processed_markup = self.bot._replace_keyboard(reply_markup)
+            self._encoded_markup = self._encode(self._processed_markup)
+
+    @staticmethod
+    def _encode(value: object) -> Optional[str]:
+        # Same encoding as in telegram.request.RequestParameter
+        if value is None:
+            return None
+        if isinstance(value, Sequence):
+            return json.dumps([obj.to_dict() for obj in value])
+        return json.dumps(value.to_dict())  # type: ignore[attr-defined]
+
+    @property
+    def _needs_processing(self) -> bool:
+        """Whether the keyboard must be passed to the CallbackDataCache for every message."""
+        return (
+            self.bot.callback_data_cache is not None
+            and isinstance(self.reply_markup, InlineKeyboardMarkup)
+            and any(
+                button.callback_data for row in self.reply_markup.inline_keyboard for button in row
+            )
+        )
+
+    def _api_kwargs(self, api_kwargs: Optional[JSONDict]) -> JSONDict:
+        if self._needs_processing:
+            # pylint: disable-next=protected-access
+            processed_markup = self.bot._replace_keyboard(self.reply_markup)
+            if processed_markup is not self._processed_markup:
+                self._processed_markup = processed_markup
+                self._encoded_markup = self._encode(processed_markup)
+
+        # The encoded values are passed as api_kwargs, as those override the arguments of the bot
+        # methods. telegram.request.RequestParameter passes strings on without encoding them again
+        kwargs: JSONDict = {**self._fragments, "reply_markup": self._encoded_markup}
+        if api_kwargs:
+            kwargs.update(api_kwargs)
+        return kwargs
+
+    async def send_message(
+        self,
+        chat_id: Union[int, str],
+        disable_notification: ODVInput[bool] = DEFAULT_NONE,
+        protect_content: ODVInput[bool] = DEFAULT_NONE,
+        message_thread_id: Optional[int] = None,
+        reply_parameters: Optional["ReplyParameters"] = None,
+        business_connection_id: Optional[str] = None,
+        message_effect_id: Optional[str] = None,
+        allow_paid_broadcast: Optional[bool] = None,
+        *,
+        read_timeout: ODVInput[float] = DEFAULT_NONE,
+        write_timeout: ODVInput[float] = DEFAULT_NONE,
+        connect_timeout: ODVInput[float] = DEFAULT_NONE,
+        pool_timeout: ODVInput[float] = DEFAULT_NONE,
+        api_kwargs: Optional[JSONDict] = None,
+        rate_limit_args: Optional[RLARGS] = None,
+    ) -> Message:
+        """Sends the message to a chat. For the documentation of the arguments, please see
+        :meth:`telegram.Bot.send_message`.
+
+        Returns:
+            :class:`telegram.Message`: On success, the sent message is returned.
+        """
+        return await self.bot.send_message(
+            chat_id=chat_id,
+            text=self.text,
+            disable_notification=disable_notification,
+            protect_content=protect_content,
+            message_thread_id=message_thread_id,
+            reply_parameters=reply_parameters,
+            business_connection_id=business_connection_id,
+            message_effect_id=message_effect_id,
+            allow_paid_broadcast=allow_paid_broadcast,
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+            api_kwargs=self._api_kwargs(api_kwargs),
+            rate_limit_args=rate_limit_args,
+        )
+
+    async def edit_message_text(
+        self,
+        chat_id: Optional[Union[str, int]] = None,
+        message_id: Optional[int] = None,
+        inline_message_id: Optional[str] = None,
+        business_connection_id: Optional[str] = None,
+        *,
+        read_timeout: ODVInput[float] = DEFAULT_NONE,
+        write_timeout: ODVInput[float] = DEFAULT_NONE,
+        connect_timeout: ODVInput[float] = DEFAULT_NONE,
+        pool_timeout: ODVInput[float] = DEFAULT_NONE,
+        api_kwargs: Optional[JSONDict] = None,
+        rate_limit_args: Optional[RLARGS] = None,
+    ) -> Union[Message, bool]:
+        """Edits a message to show the content of the template. For the documentation of the
+        arguments, please see :meth:`telegram.Bot.edit_message_text`.
+
+        Note:
+            Only an :class:`telegram.InlineKeyboardMarkup` can be used as
+            :attr:`reply_markup` when editing a message.
+
+        Returns:
+            :class:`telegram.Message`: On success, if edited message is not an inline message, the
+            edited message is returned, otherwise :obj:`True` is returned.
+        """
+        return await self.bot.edit_message_text(
+            text=self.text,
+            chat_id=chat_id,
+            message_id=message_id,
+            inline_message_id=inline_message_id,
+            business_connection_id=business_connection_id,
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+            api_kwargs=self._api_kwargs(api_kwargs),
+            rate_limit_args=rate_limit_args,
+        )
@@ -0,0 +1,573 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the PersistentJobQueue class."""
+import asyncio
+import contextlib
+import datetime
+import importlib
+import itertools
+import math
+import os
+import pickle
+import sqlite3
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from operator import itemgetter
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Union, cast
+
+with contextlib.suppress(ImportError):
+    from apscheduler.jobstores.base import ConflictingIdError, JobLookupError
+
+from telegram._utils.logging import get_logger
+from telegram._utils.types import FilePathInput, JSONDict
+from telegram.ext._heapjobqueue import HeapJobQueue, _HeapJob, _JobOptions
+from telegram.ext._jobqueue import Job
+from telegram.ext._picklepersistence import _BotPickler, _BotUnpickler
+from telegram.ext._utils.types import CCT, JobCallback
+
+if TYPE_CHECKING:
+    from apscheduler.job import Job as APSJob
+    from apscheduler.triggers.base import BaseTrigger
+
+_LOGGER = get_logger(__name__, class_name="PersistentJobQueue")
+
+_COLUMNS = "id, callback, name, chat_id, user_id, next_run_time, state"
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    "id TEXT PRIMARY KEY, callback TEXT NOT NULL, name TEXT, chat_id INTEGER, user_id INTEGER, "
+    "next_run_time REAL, state BLOB NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS jobs_next_run_time ON jobs (next_run_time)",
+    "CREATE INDEX IF NOT EXISTS jobs_name ON jobs (name)",
+    "CREATE INDEX IF NOT EXISTS jobs_chat_id ON jobs (chat_id)",
+    "CREATE INDEX IF NOT EXISTS jobs_user_id ON jobs (user_id)",
+)
+_INSERT = f"INSERT OR REPLACE INTO jobs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"  # noqa: S608
+_UPDATE_RUN_TIME = "UPDATE jobs SET next_run_time = ? WHERE id = ?"
+_UPDATE_STATE = "UPDATE jobs SET state = ? WHERE id = ?"
+_DELETE = "DELETE FROM jobs WHERE id = ?"
+_Row = tuple[str, str, Optional[str], Optional[int], Optional[int], Optional[float], bytes]
+_Write = tuple[str, tuple[object, ...]]
+
+
+class _StoredJob(_HeapJob):
+    """A :class:`_HeapJob` of a :class:`PersistentJobQueue`. Jobs are only held in memory while
+    they are due within the load window, so the timestamp of the next run is kept along with the
+    job instead of being taken from the heap entry.
+    """
+
+    __slots__ = ("__weakref__", "_run_time")
+
+    def __init__(
+        self,
+        queue: "PersistentJobQueue[Any]",
+        job: Job[Any],
+        job_id: str,
+        trigger: Union[float, "BaseTrigger"],
+        tz: datetime.tzinfo,
+        options: _JobOptions,
+        run_time: Optional[float],
+    ):
+        super().__init__(queue, job, job_id, trigger, tz, options)
+        self._run_time: Optional[float] = run_time
+
+    @property
+    def next_run_time(self) -> Optional[datetime.datetime]:
+        queue = cast("PersistentJobQueue[Any]", self._queue)
+        # Jobs that were removed or replaced by another job with the same id don't run anymore
+        # pylint: disable-next=protected-access
+        if self._run_time is None or queue._restored.get(self.id) is not self:
+            return None
+        return datetime.datetime.fromtimestamp(self._run_time, self._tz)
+
+
+class PersistentJobQueue(HeapJobQueue[CCT]):
+    """A :class:`telegram.ext.HeapJobQueue` that stores its jobs in an SQLite database, such that
+    they survive restarts of the bot.
+
+    Only the jobs that are due within :paramref:`load_window` are held in memory. On
+    :meth:`start`, these jobs are loaded from the database, which has an index on the next run
+    time of the jobs. While the job queue is running, the jobs that become due are loaded in
+    regular intervals. Hence, restarting a bot with hundreds of thousands of scheduled jobs is
+    cheap and doesn't require to schedule the jobs again.
+
+    Jobs that were due while the bot was offline are run on :meth:`start` according to their
+    ``misfire_grace_time`` and ``coalesce`` settings, just like jobs that are due while the event
+    loop is blocked. In particular, with the default ``misfire_grace_time`` of one second,
+    missed runs are skipped and logged. Pass ``misfire_grace_time=None`` via ``job_kwargs`` to
+    run them regardless of the delay.
+
+    Use it by passing an instance to :meth:`telegram.ext.ApplicationBuilder.job_queue`:
+
+    .. code-block:: python
+
+        application = (
+            ApplicationBuilder()
+            .token("TOKEN")
+            .job_queue(PersistentJobQueue("jobs.sqlite"))
+            .build()
+        )
+
+    Note:
+        * The callbacks of the jobs are stored by their import path. They must hence be
+          functions or static or class methods that are defined on module level. Callbacks that
+          can't be imported by their qualified name, e.g. lambdas or methods bound to an
+          instance, are rejected with a :exc:`ValueError`.
+        * :attr:`telegram.ext.Job.data` and :attr:`telegram.ext.Job.priority` are stored with
+          :mod:`pickle` when the job is scheduled and every time the callback has finished, so
+          changes made by the callback are kept.
+          The remaining attributes of :class:`telegram.ext.Job` are only stored when the job is
+          scheduled.
+        * The database is accessed from a separate thread. While the job queue is running, the
+          changes to the jobs are written once per iteration of the event loop. Otherwise, e.g.
+          for jobs that are scheduled before :meth:`start`, they are written right away.
+        * :meth:`jobs`, :meth:`get_jobs_by_name`, :meth:`get_jobs_by_chat` and
+          :meth:`get_jobs_by_user` also return jobs that are only stored in the database. These
+          methods block until the database was read. The :class:`telegram.ext.Job` instances of
+          these jobs are reused as long as they are referenced elsewhere.
+        * The database must only be used by one job queue at a time.
+        * :meth:`run_daily_for` is not supported, since the bulk jobs can't be stored.
+        * In addition, the notes of :class:`telegram.ext.HeapJobQueue` apply. Jobs added to
+          :attr:`scheduler` directly are not stored.
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        filepath (:obj:`str` | :obj:`pathlib.Path`): The path of the SQLite database. It will be
+            created if it does not exist.
+        load_window (:obj:`float` | :obj:`datetime.timedelta`, optional): Jobs that are due
+            within this time frame are held in memory, either as :obj:`float` in seconds or as
+            :obj:`datetime.timedelta`. Defaults to one hour.
+        max_concurrent_jobs (:obj:`int`, optional): The maximum number of job callbacks that may
+            run concurrently. See :paramref:`telegram.ext.JobQueue.max_concurrent_jobs`.
+
+    Attributes:
+        filepath (:obj:`pathlib.Path`): The path of the SQLite database.
+    """
+
+    __slots__ = (
+        "_callback_paths",
+        "_callbacks",
+        "_connection",
+        "_db_executor",
+        "_flush_handle",
+        "_load_task",
+        "_load_window",
+        "_loaded_until",
+        "_loading",
+        "_restored",
+        "_stored_ids",
+        "_writes",
+        "filepath",
+    )
+
+    def __init__(
+        self,
+        filepath: FilePathInput,
+        load_window: Union[float, datetime.timedelta] = datetime.timedelta(hours=1),
+        max_concurrent_jobs: Optional[int] = None,
+    ) -> None:
+        super().__init__(max_concurrent_jobs=max_concurrent_jobs)
+        if isinstance(load_window, datetime.timedelta):
+            load_window = load_window.total_seconds()
+        if load_window <= 0:
+            raise ValueError("`load_window` must be positive.")
+
+        self.filepath: Path = Path(filepath)
+        self._load_window: float = load_window
+        # All jobs that are due until this timestamp are held in memory
+        self._loaded_until: float = -math.inf
+        self._load_task: Optional[asyncio.Task[None]] = None
+        self._flush_handle: Optional[asyncio.Handle] = None
+        # The writes that were not handed to the database thread yet
+        self._writes: list[_Write] = []
+        # The ids of the jobs that were written while the next load window is read
+        self._loading: Optional[set[str]] = None
+        self._callbacks: dict[str, JobCallback[CCT]] = {}
+        self._callback_paths: dict[JobCallback[CCT], str] = {}
+        # The instances of the stored jobs that are referenced somewhere, such that each job is
+        # only restored once and its next run time is known without reading the database
+        self._restored: weakref.WeakValueDictionary[str, _StoredJob] = (
+            weakref.WeakValueDictionary()
+        )
+
+        # All database access except for this setup happens in a single thread, such that
+        # reads see the writes that were submitted before them
+        self._db_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="PersistentJobQueue"
+        )
+        self._connection = sqlite3.connect(self.filepath, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+        self._stored_ids: set[str] = {
+            job_id for job_id, in self._connection.execute("SELECT id FROM jobs")
+        }
+
+    def _callback_path(self, callback: JobCallback[CCT]) -> str:
+        try:
+            return self._callback_paths[callback]
+        except KeyError:
+            pass
+
+        path = f"{getattr(callback, '__module__', None)}:{getattr(callback, '__qualname__', None)}"
+        try:
+            resolved: Optional[JobCallback[CCT]] = self._resolve_callback(path)
+        except (ImportError, AttributeError):
+            resolved = None
+        if resolved != callback:
+            raise ValueError(
+                f"The callback {callback!r} can't be stored, since it can't be imported by its "
+                "qualified name. Use a function or a static or class method that is defined on "
+                "module level."
+            )
+        self._callback_paths[callback] = path
+        return path
+
+    def _resolve_callback(self, path: str) -> JobCallback[CCT]:
+        try:
+            return self._callbacks[path]
+        except KeyError:
+            pass
+
+        module_name, _, qualname = path.partition(":")
+        obj: Any = importlib.import_module(module_name)
+        for attribute in qualname.split("."):
+            obj = getattr(obj, attribute)
+        self._callbacks[path] = obj
+        return obj
+
+    def _dumps(self, obj: object) -> bytes:
+        buffer = BytesIO()
+        _BotPickler(self.application.bot, buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+        return buffer.getvalue()
+
+    def _loads(self, data: bytes) -> Any:
+        return _BotUnpickler(self.application.bot, BytesIO(data)).load()
+
+    def _dump_state(self, heap_job: _HeapJob) -> bytes:
+        # pylint: disable=protected-access
+        job = heap_job._job
+        return self._dumps(
+            (heap_job._trigger, heap_job._tz, tuple(heap_job._options), job.data, job.priority)
+        )
+
+    def _write(self, job_id: str, statement: str, parameters: tuple[object, ...]) -> None:
+        self._writes.append((statement, parameters))
+        if self._loading is not None:
+            self._loading.add(job_id)
+
+        if self._loop is None:
+            self._flush().result()
+        elif self._flush_handle is None:
+            # Writes are handed to the database thread once per iteration of the event loop, such
+            # that scheduling many jobs at once doesn't require a transaction per job
+            self._flush_handle = self._loop.call_soon(self._flush)
+
+    def _flush(self) -> "Future[None]":
+        """Hands the pending writes to the database thread."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        writes, self._writes = self._writes, []
+        return self._db_executor.submit(self._execute_writes, writes)
+
+    def _execute_writes(self, writes: list[_Write]) -> None:
+        # Runs in the database thread. Consecutive writes of the same kind are batched.
+        try:
+            for statement, group in itertools.groupby(writes, key=itemgetter(0)):
+                self._connection.executemany(statement, [parameters for _, parameters in group])
+            self._connection.commit()
+        except Exception as exc:
+            self._connection.rollback()
+            _LOGGER.exception(
+                "Failed to write %d changes to the database", len(writes), exc_info=exc
+            )
+
+    def _read_rows(self, where: str, parameters: tuple[object, ...]) -> "Future[list[_Row]]":
+        """Reads the matching rows in the database thread, after the pending writes were made."""
+        self._flush()
+        return self._db_executor.submit(
+            lambda: self._connection.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE {where} ORDER BY rowid",  # noqa: S608
+                parameters,
+            ).fetchall()
+        )
+
+    def _restore_job(self, row: _Row) -> Optional[_StoredJob]:
+        job_id, callback_path, name, chat_id, user_id, run_time, state = row
+        if (heap_job := self._restored.get(job_id)) is not None:
+            return heap_job
+
+        try:
+            callback = self._resolve_callback(callback_path)
+            trigger, tz, options, data, priority = self._loads(state)
+        except Exception as exc:
+            _LOGGER.exception(
+                "Job %s with callback %s could not be restored from the database and is skipped",
+                job_id,
+                callback_path,
+                exc_info=exc,
+            )
+            return None
+
+        job = Job(
+            callback=callback,
+            data=data,
+            name=name,
+            chat_id=chat_id,
+            user_id=user_id,
+            priority=priority,
+        )
+        heap_job = _StoredJob(self, job, job_id, trigger, tz, _JobOptions(*options), run_time)
+        job._job = cast("APSJob", heap_job)  # pylint: disable=protected-access
+        self._restored[job_id] = heap_job
+        self._stored_ids.add(job_id)
+        return heap_job
+
+    def _restore_jobs(self, where: str, parameters: tuple[object, ...]) -> list[_StoredJob]:
+        """Restores the jobs matching the condition that are not held in memory."""
+        return [
+            heap_job
+            for row in self._read_rows(where, parameters).result()
+            if row[0] not in self._jobs and (heap_job := self._restore_job(row)) is not None
+        ]
+
+    def _load(self, heap_job: _HeapJob, run_time: float) -> None:
+        self._jobs[heap_job.id] = heap_job
+        self._job_index.add(heap_job.id, heap_job._job)  # pylint: disable=protected-access
+        self._schedule(heap_job, run_time)
+
+    def _unload(self, heap_job: _HeapJob) -> None:
+        super()._remove_job(heap_job)
+
+    def _delete(self, job_id: str) -> None:
+        self._stored_ids.discard(job_id)
+        self._restored.pop(job_id, None)
+        self._write(job_id, _DELETE, (job_id,))
+
+    def _current(self, heap_job: _HeapJob) -> _StoredJob:
+        if self._restored.get(heap_job.id) is not heap_job:
+            raise JobLookupError(heap_job.id)
+        return cast(_StoredJob, heap_job)
+
+    async def _load_next_window(self) -> None:
+        loaded_until = self._loaded_until
+        self._loaded_until = time.time() + self._load_window
+        # Jobs that are written while the rows are read are either loaded right away or are not
+        # due within the window, so their rows are outdated
+        written: set[str] = set()
+        self._loading = written
+        try:
+            rows = await asyncio.wrap_future(
+                self._read_rows(
+                    "next_run_time > ? AND next_run_time <= ?", (loaded_until, self._loaded_until)
+                )
+            )
+        finally:
+            self._loading = None
+
+        for row in rows:
+            if row[0] in written or row[0] in self._jobs:
+                continue
+            if (heap_job := self._restore_job(row)) is not None:
+                self._load(heap_job, cast(float, row[5]))
+
+    async def _load_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._load_window / 2)
+            try:
+                await self._load_next_window()
+            except Exception as exc:
+                _LOGGER.exception("Failed to load the jobs from the database", exc_info=exc)
+
+    def _add_job(
+        self,
+        job: Job[CCT],
+        trigger: Union[float, "BaseTrigger"],
+        tz: datetime.tzinfo,
+        job_settings: JSONDict,
+    ) -> Job[CCT]:
+        # Fail early if the callback can't be stored
+        callback_path = self._callback_path(job.callback)
+
+        job_id = job_settings.get("id")
+        if job_id and job_id in self._stored_ids:
+            if not job_settings.get("replace_existing"):
+                raise ConflictingIdError(job_id)
+            if (current := self._jobs.get(job_id)) is not None:
+                self._unload(current)
+        job_id = job_id or os.urandom(16).hex()
+
+        run_time = self._first_run_time(trigger, tz, job_settings)
+        heap_job = _StoredJob(
+            self, job, job_id, trigger, tz, self._job_options(job_settings), run_time
+        )
+        job._job = cast("APSJob", heap_job)  # pylint: disable=protected-access
+        # This also replaces the previous job with the same id, if any
+        self._restored[job_id] = heap_job
+        self._stored_ids.add(job_id)
+        self._write(
+            job_id,
+            _INSERT,
+            (
+                job_id,
+                callback_path,
+                job.name,
+                job.chat_id,
+                job.user_id,
+                run_time,
+                self._dump_state(heap_job),
+            ),
+        )
+        if run_time is not None and run_time <= self._loaded_until:
+            self._load(heap_job, run_time)
+        return job
+
+    def _process_job(self, heap_job: _HeapJob, scheduled: float, now: float) -> None:
+        super()._process_job(heap_job, scheduled, now)
+        if self._jobs.get(heap_job.id) is not heap_job:
+            # This was the last run of the job
+            self._delete(heap_job.id)
+            return
+
+        entry = heap_job._entry  # pylint: disable=protected-access
+        run_time = entry[3] if entry else None
+        cast(_StoredJob, heap_job)._run_time = run_time  # pylint: disable=protected-access
+        self._write(heap_job.id, _UPDATE_RUN_TIME, (run_time, heap_job.id))
+        if run_time is None or run_time > self._loaded_until:
+            self._unload(heap_job)
+
+    def _start_job(self, heap_job: _HeapJob, run_time: float) -> "asyncio.Task[None]":
+        task = super()._start_job(heap_job, run_time)
+        task.add_done_callback(lambda _: self._update_data(heap_job))
+        return task
+
+    def _update_data(self, heap_job: _HeapJob) -> None:
+        # Store the changes that the callback made to the data. The job may have been removed or
+        # replaced by another job with the same id in the meantime, in which case there is
+        # nothing to do.
+        if self._restored.get(heap_job.id) is not heap_job:
+            return
+        self._write(heap_job.id, _UPDATE_STATE, (self._dump_state(heap_job), heap_job.id))
+
+    def _pause_job(self, heap_job: _HeapJob) -> None:
+        stored_job = self._current(heap_job)
+        # Paused jobs are not held in memory
+        if self._jobs.get(stored_job.id) is stored_job:
+            self._unload(stored_job)
+        stored_job._run_time = None  # pylint: disable=protected-access
+        self._write(stored_job.id, _UPDATE_RUN_TIME, (None, stored_job.id))
+
+    def _resume_job(self, heap_job: _HeapJob) -> None:
+        # pylint: disable=protected-access
+        stored_job = self._current(heap_job)
+        if self._jobs.get(stored_job.id) is stored_job:
+            # Like APScheduler, resuming a scheduled job calculates the next run time anew
+            self._unload(stored_job)
+
+        if isinstance(stored_job._trigger, float):
+            run_time: Optional[float] = stored_job._trigger
+        else:
+            run_time = self._next_run_time(
+                stored_job._trigger, None, datetime.datetime.now(stored_job._tz)
+            )
+
+        if run_time is None:
+            self._delete(stored_job.id)
+            return
+        stored_job._run_time = run_time
+        self._write(stored_job.id, _UPDATE_RUN_TIME, (run_time, stored_job.id))
+        if run_time <= self._loaded_until:
+            self._load(stored_job, run_time)
+
+    def _remove_job(self, heap_job: _HeapJob) -> None:
+        stored_job = self._current(heap_job)
+        if self._jobs.get(stored_job.id) is stored_job:
+            self._unload(stored_job)
+        self._delete(stored_job.id)
+
+    async def start(self) -> None:
+        """Starts the :class:`PersistentJobQueue` and loads the jobs that are due within the load
+        window from the database.
+        """
+        await super().start()
+        await self._load_next_window()
+        self._load_task = asyncio.create_task(
+            self._load_periodically(), name="PersistentJobQueue:load"
+        )
+
+    async def stop(self, wait: bool = True) -> None:
+        """Shuts down the :class:`PersistentJobQueue`. The jobs are kept in the database and are
+        loaded again on the next call of :meth:`start`. Jobs that are scheduled after this method
+        was called are stored in the database as well.
+
+        Args:
+            wait (:obj:`bool`, optional): Whether to wait until all currently running jobs
+                have finished. Defaults to :obj:`True`.
+
+        """
+        if self._load_task is not None:
+            self._load_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._load_task
+            self._load_task = None
+
+        await super().stop(wait=wait)
+
+        self._loaded_until = -math.inf
+        for heap_job in list(self._jobs.values()):
+            self._unload(heap_job)
+        await asyncio.wrap_future(self._flush())
+
+    def _scheduled_jobs(self) -> list[tuple[float, Job[CCT]]]:
+        jobs = super()._scheduled_jobs()
+        # pylint: disable=protected-access
+        jobs.extend(
+            (math.inf if heap_job._run_time is None else heap_job._run_time, heap_job._job)
+            for heap_job in self._restore_jobs("1", ())
+        )
+        return jobs
+
+    def _stored_jobs(self, column: str, value: object) -> tuple[Job[CCT], ...]:
+        return tuple(
+            heap_job._job  # pylint: disable=protected-access
+            for heap_job in self._restore_jobs(f"{column} = ?", (value,))
+        )
+
+    def get_jobs_by_name(self, name: str) -> tuple[Job[CCT], ...]:
+        """See :meth:`telegram.ext.JobQueue.get_jobs_by_name`. Also returns the jobs that are
+        only stored in the database.
+        """
+        return super().get_jobs_by_name(name) + self._stored_jobs("name", name)
+
+    def get_jobs_by_chat(self, chat_id: int) -> tuple[Job[CCT], ...]:
+        """See :meth:`telegram.ext.JobQueue.get_jobs_by_chat`. Also returns the jobs that are
+        only stored in the database.
+        """
+        return super().get_jobs_by_chat(chat_id) + self._stored_jobs("chat_id", chat_id)
+
+    def get_jobs_by_user(self, user_id: int) -> tuple[Job[CCT], ...]:
+        """See :meth:`telegram.ext.JobQueue.get_jobs_by_user`. Also returns the jobs that are
+        only stored in the database.
+        """
+        return super().get_jobs_by_user(user_id) + self._stored_jobs("user_id", user_id)
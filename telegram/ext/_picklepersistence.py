@@ -17,21 +17,53 @@
 # You should have received a copy of the GNU Lesser Public License
 # along with this program.  If not, see [http://www.gnu.org/licenses/].
 """This module contains the PicklePersistence class."""
+import lzma
 import pickle
+import struct
+import zlib
+from collections.abc import Collection, Iterator, Mapping
 from copy import deepcopy
+from io import BytesIO
+from itertools import islice
 from pathlib import Path
-from typing import Any, Callable, Optional, TypeVar, Union, cast, overload
+from typing import IO, Any, Callable, Literal, Optional, TypeVar, Union, cast, overload
 
 from telegram import Bot, TelegramObject
 from telegram._utils.types import FilePathInput
 from telegram._utils.warnings import warn
 from telegram.ext import BasePersistence, PersistenceInput
+from telegram.ext._callbackdatacache import apply_persistence_delta
 from telegram.ext._contexttypes import ContextTypes
 from telegram.ext._utils.types import BD, CD, UD, CDCData, ConversationDict, ConversationKey
 
 _REPLACED_KNOWN_BOT = "a known bot replaced by PTB's PicklePersistence"
 _REPLACED_UNKNOWN_BOT = "an unknown bot replaced by PTB's PicklePersistence"
 
+# Layout of the container format used when `compression` is set:
+# header: magic bytes, format version (1 byte), compression id (1 byte)
+# followed by any number of chunks: payload length (4 bytes, big endian), compressed payload
+# Each payload is a pickled tuple (path, kind, data). `path` is the tuple of dict keys leading
+# from the root object to the object that the chunk belongs to.
+_CONTAINER_MAGIC = b"PTBPICKLE"
+_CONTAINER_VERSION = 1
+_CHUNK_LENGTH = struct.Struct(">I")
+_CHUNK_VALUE = 0  # data is the object at `path`
+_CHUNK_ITEMS = 1  # data is a list of items of the dict at `path`
+_COMPRESSION_IDS: dict[str, int] = {"zlib": 1, "lzma": 2}
+_COMPRESSORS: dict[int, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    1: (zlib.compress, zlib.decompress),
+    2: (lzma.compress, lzma.decompress),
+}
+# How many levels of nested dicts are split into chunks for each kind of data
+_CHUNK_LEVELS: dict[str, int] = {
+    "user_data": 1,
+    "chat_data": 1,
+    "conversations": 2,
+    "bot_data": 0,
+    "callback_data": 0,
+    "file_id_cache": 1,
+}
+
 TelegramObj = TypeVar("TelegramObj", bound=TelegramObject)
 
 
@@ -117,6 +149,50 @@ class _BotUnpickler(pickle.Unpickler):
         raise pickle.UnpicklingError("Found unknown persistent id when unpickling!")
 
 
+def _iter_chunks(
+    obj: object, path: tuple[object, ...], levels: int, chunk_size: int
+) -> Iterator[tuple[tuple[object, ...], int, object]]:
+    if levels == 0 or not isinstance(obj, dict):
+        yield path, _CHUNK_VALUE, obj
+        return
+
+    if levels > 1:
+        # make sure that the dict is created on loading, even if it's empty
+        yield path, _CHUNK_ITEMS, []
+        for key, value in obj.items():
+            yield from _iter_chunks(value, (*path, key), levels - 1, chunk_size)
+        return
+
+    items = iter(obj.items())
+    chunk = list(islice(items, chunk_size))
+    # make sure that the dict is created on loading, even if it's empty
+    yield path, _CHUNK_ITEMS, chunk
+    while chunk := list(islice(items, chunk_size)):
+        yield path, _CHUNK_ITEMS, chunk
+
+
+def _insert_chunk(root: Any, path: tuple[object, ...], kind: int, data: Any) -> Any:
+    """Inserts the data of a chunk into the object tree and returns the new root."""
+    if not path:
+        if kind == _CHUNK_VALUE:
+            return data
+        if root is None:
+            root = {}
+        root.update(data)
+        return root
+
+    if root is None:
+        root = {}
+    node = root
+    for key in path[:-1]:
+        node = node.setdefault(key, {})
+    if kind == _CHUNK_VALUE:
+        node[path[-1]] = data
+    else:
+        node.setdefault(path[-1], {}).update(data)
+    return root
+
+
 class PicklePersistence(BasePersistence[UD, CD, BD]):
     """Using python's builtin :mod:`pickle` for making your bot persistent.
 
@@ -131,6 +207,18 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
         :attr:`~BasePersistence.bot` will be replaced by a placeholder before pickling and
         :attr:`~BasePersistence.bot` will be inserted back when loading the data.
 
+    Tip:
+        For large amounts of data, consider passing :paramref:`compression`. The files are then
+        written as a sequence of compressed chunks of at most :paramref:`chunk_size` entries of
+        ``user_data``, ``chat_data`` or the states of a single conversation handler. Each chunk is
+        pickled on its own, so loading and writing the files only needs memory for a single chunk
+        in addition to the data itself. Note that objects referenced from multiple chunks will be
+        duplicated when loading the data.
+
+        Files in either format are read independent of the value of :paramref:`compression`. To
+        migrate existing files, simply pass :paramref:`compression` - the files will be written
+        in the new format on the next write.
+
     Examples:
         :any:`Persistent Conversation Bot <examples.persistentconversationbot>`
 
@@ -167,6 +255,16 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
             wait between two consecutive runs of updating the persistence. Defaults to 60 seconds.
 
             .. versionadded:: 20.0
+        compression (:obj:`str`, optional): Either ``"zlib"`` or ``"lzma"``. If passed, the files
+            are written in a chunked format, compressed with :mod:`zlib` or :mod:`lzma`,
+            respectively. See the tip above for details. By default, the files contain the plain
+            pickled data.
+
+            .. versionadded:: NEXT.VERSION
+        chunk_size (:obj:`int`, optional): Maximum number of entries stored in a single chunk, if
+            :paramref:`compression` is passed. Defaults to ``1000``.
+
+            .. versionadded:: NEXT.VERSION
     Attributes:
         filepath (:obj:`str` | :obj:`pathlib.Path`): The filepath for storing the pickle files.
             When :attr:`single_file` is :obj:`False` this will be used as a prefix.
@@ -183,14 +281,24 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
             in the ``context`` interface.
 
             .. versionadded:: 13.6
+        compression (:obj:`str`): Optional. The compression used for writing the files.
+
+            .. versionadded:: NEXT.VERSION
+        chunk_size (:obj:`int`): Maximum number of entries stored in a single chunk, if
+            :attr:`compression` is set.
+
+            .. versionadded:: NEXT.VERSION
     """
 
     __slots__ = (
         "bot_data",
         "callback_data",
         "chat_data",
+        "chunk_size",
+        "compression",
         "context_types",
         "conversations",
+        "file_id_cache",
         "filepath",
         "on_flush",
         "single_file",
@@ -205,6 +313,9 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
         single_file: bool = True,
         on_flush: bool = False,
         update_interval: float = 60,
+        *,
+        compression: Optional[Literal["zlib", "lzma"]] = None,
+        chunk_size: int = 1000,
     ): ...
 
     @overload
@@ -216,6 +327,9 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
         on_flush: bool = False,
         update_interval: float = 60,
         context_types: Optional[ContextTypes[Any, UD, CD, BD]] = None,
+        *,
+        compression: Optional[Literal["zlib", "lzma"]] = None,
+        chunk_size: int = 1000,
     ): ...
 
     def __init__(
@@ -226,8 +340,15 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
         on_flush: bool = False,
         update_interval: float = 60,
         context_types: Optional[ContextTypes[Any, UD, CD, BD]] = None,
+        *,
+        compression: Optional[Literal["zlib", "lzma"]] = None,
+        chunk_size: int = 1000,
     ):
         super().__init__(store_data=store_data, update_interval=update_interval)
+        if compression is not None and compression not in _COMPRESSION_IDS:
+            raise ValueError(f"`compression` must be one of {tuple(_COMPRESSION_IDS)}.")
+        if chunk_size < 1:
+            raise ValueError("`chunk_size` must be a positive integer.")
         self.filepath: Path = Path(filepath)
         self.single_file: Optional[bool] = single_file
         self.on_flush: Optional[bool] = on_flush
@@ -235,21 +356,78 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
         self.chat_data: Optional[dict[int, CD]] = None
         self.bot_data: Optional[BD] = None
         self.callback_data: Optional[CDCData] = None
+        self.file_id_cache: Optional[dict[str, str]] = None
         self.conversations: Optional[dict[str, dict[tuple[Union[int, str], ...], object]]] = None
         self.context_types: ContextTypes[Any, UD, CD, BD] = cast(
             ContextTypes[Any, UD, CD, BD], context_types or ContextTypes()
         )
+        self.compression: Optional[str] = compression
+        self.chunk_size: int = chunk_size
+
+    def _unpickle(self, file: IO[bytes]) -> Any:
+        if file.read(len(_CONTAINER_MAGIC)) != _CONTAINER_MAGIC:
+            file.seek(0)
+            return _BotUnpickler(self.bot, file).load()
+
+        version, compression_id = file.read(2)
+        if version > _CONTAINER_VERSION:
+            raise pickle.UnpicklingError(f"Unsupported format version {version}")
+        decompress = _COMPRESSORS[compression_id][1]
+
+        root = None
+        while length_bytes := file.read(_CHUNK_LENGTH.size):
+            (length,) = _CHUNK_LENGTH.unpack(length_bytes)
+            payload = file.read(length)
+            if len(payload) != length:
+                raise pickle.UnpicklingError("File ended unexpectedly")
+            path, kind, data = _BotUnpickler(self.bot, BytesIO(decompress(payload))).load()
+            root = _insert_chunk(root, path, kind, data)
+        return root
+
+    def _pickle(self, filepath: Path, data: Any, kind: Optional[str]) -> None:
+        """Pickles the data to the file. `kind` is the kind of data for multi-file mode and
+        :obj:`None` for single-file mode."""
+        if not self.compression:
+            with filepath.open("wb") as file:
+                _BotPickler(self.bot, file, protocol=pickle.HIGHEST_PROTOCOL).dump(data)
+            return
+
+        compression_id = _COMPRESSION_IDS[self.compression]
+        compress = _COMPRESSORS[compression_id][0]
+        chunks: Iterator[tuple[tuple[object, ...], int, object]]
+        if kind is None:
+            chunks = (
+                chunk
+                for key, value in data.items()
+                for chunk in _iter_chunks(value, (key,), _CHUNK_LEVELS[key], self.chunk_size)
+            )
+        else:
+            chunks = _iter_chunks(data, (), _CHUNK_LEVELS[kind], self.chunk_size)
+
+        # Write to a temporary file first so that the file is not corrupted if the process is
+        # killed while writing
+        tmp_path = filepath.with_name(f"{filepath.name}.tmp")
+        with tmp_path.open("wb") as file:
+            file.write(_CONTAINER_MAGIC + bytes((_CONTAINER_VERSION, compression_id)))
+            for chunk in chunks:
+                buffer = BytesIO()
+                _BotPickler(self.bot, buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(chunk)
+                payload = compress(buffer.getvalue())
+                file.write(_CHUNK_LENGTH.pack(len(payload)))
+                file.write(payload)
+        tmp_path.replace(filepath)
 
     def _load_singlefile(self) -> None:
         try:
             with self.filepath.open("rb") as file:
-                data = _BotUnpickler(self.bot, file).load()
+                data = self._unpickle(file)
 
             self.user_data = data["user_data"]
             self.chat_data = data["chat_data"]
             # For backwards compatibility with files not containing bot data
             self.bot_data = data.get("bot_data", self.context_types.bot_data())
             self.callback_data = data.get("callback_data", {})
+            self.file_id_cache = data.get("file_id_cache", {})
             self.conversations = data["conversations"]
         except OSError:
             self.conversations = {}
@@ -257,6 +435,7 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
             self.chat_data = {}
             self.bot_data = self.context_types.bot_data()
             self.callback_data = None
+            self.file_id_cache = {}
         except pickle.UnpicklingError as exc:
             filename = self.filepath.name
             raise TypeError(f"File {filename} does not contain valid pickle data") from exc
@@ -266,7 +445,7 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
     def _load_file(self, filepath: Path) -> Any:
         try:
             with filepath.open("rb") as file:
-                return _BotUnpickler(self.bot, file).load()
+                return self._unpickle(file)
 
         except OSError:
             return None
@@ -276,19 +455,20 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
             raise TypeError(f"Something went wrong unpickling {filepath.name}") from exc
 
     def _dump_singlefile(self) -> None:
-        data = {
+        data: dict[str, object] = {
             "conversations": self.conversations,
             "user_data": self.user_data,
             "chat_data": self.chat_data,
             "bot_data": self.bot_data,
             "callback_data": self.callback_data,
         }
-        with self.filepath.open("wb") as file:
-            _BotPickler(self.bot, file, protocol=pickle.HIGHEST_PROTOCOL).dump(data)
+        # Only written if used, such that the format stays the same otherwise
+        if self.file_id_cache:
+            data["file_id_cache"] = self.file_id_cache
+        self._pickle(self.filepath, data, None)
 
-    def _dump_file(self, filepath: Path, data: object) -> None:
-        with filepath.open("wb") as file:
-            _BotPickler(self.bot, file, protocol=pickle.HIGHEST_PROTOCOL).dump(data)
+    def _dump_file(self, kind: str, data: object) -> None:
+        self._pickle(Path(f"{self.filepath}_{kind}"), data, kind)
 
     async def get_user_data(self) -> dict[int, UD]:
         """Returns the user_data from the pickle file if it exists or an empty :obj:`dict`.
@@ -365,6 +545,24 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
             return None
         return deepcopy(self.callback_data)
 
+    async def get_file_id_cache(self) -> Optional[dict[str, str]]:
+        """Returns the file ids of the :attr:`~telegram.ext.ExtBot.file_id_cache` from the pickle
+        file if it exists or :obj:`None`.
+
+        .. versionadded:: NEXT.VERSION
+
+        Returns:
+            dict[:obj:`str`, :obj:`str`] | :obj:`None`: The restored file ids or :obj:`None`, if
+            no data was stored.
+        """
+        if self.file_id_cache:
+            pass
+        elif not self.single_file:
+            self.file_id_cache = self._load_file(Path(f"{self.filepath}_file_id_cache")) or {}
+        else:
+            self._load_singlefile()
+        return dict(self.file_id_cache) if self.file_id_cache else None
+
     async def get_conversations(self, name: str) -> ConversationDict:
         """Returns the conversations from the pickle file if it exists or an empty dict.
 
@@ -403,7 +601,7 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
         self.conversations[name][key] = new_state
         if not self.on_flush:
             if not self.single_file:
-                self._dump_file(Path(f"{self.filepath}_conversations"), self.conversations)
+                self._dump_file("conversations", self.conversations)
             else:
                 self._dump_singlefile()
 
@@ -421,7 +619,7 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
         self.user_data[user_id] = data
         if not self.on_flush:
             if not self.single_file:
-                self._dump_file(Path(f"{self.filepath}_user_data"), self.user_data)
+                self._dump_file("user_data", self.user_data)
             else:
                 self._dump_singlefile()
 
@@ -439,7 +637,80 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
         self.chat_data[chat_id] = data
         if not self.on_flush:
             if not self.single_file:
-                self._dump_file(Path(f"{self.filepath}_chat_data"), self.chat_data)
+                self._dump_file("chat_data", self.chat_data)
+            else:
+                self._dump_singlefile()
+
+    async def update_user_data_many(self, data: Mapping[int, UD]) -> None:
+        """Will update the user_data of all given users and depending on :attr:`on_flush` save
+        the pickle file once.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            data (Mapping[:obj:`int`, :obj:`dict`]): Mapping of user IDs to the corresponding
+                :attr:`telegram.ext.Application.user_data` ``[user_id]``.
+        """
+        if self.user_data is None:
+            self.user_data = {}
+        changed = False
+        for user_id, user_data in data.items():
+            if self.user_data.get(user_id) != user_data:
+                self.user_data[user_id] = user_data
+                changed = True
+        if changed and not self.on_flush:
+            if not self.single_file:
+                self._dump_file("user_data", self.user_data)
+            else:
+                self._dump_singlefile()
+
+    async def update_chat_data_many(self, data: Mapping[int, CD]) -> None:
+        """Will update the chat_data of all given chats and depending on :attr:`on_flush` save
+        the pickle file once.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            data (Mapping[:obj:`int`, :obj:`dict`]): Mapping of chat IDs to the corresponding
+                :attr:`telegram.ext.Application.chat_data` ``[chat_id]``.
+        """
+        if self.chat_data is None:
+            self.chat_data = {}
+        changed = False
+        for chat_id, chat_data in data.items():
+            if self.chat_data.get(chat_id) != chat_data:
+                self.chat_data[chat_id] = chat_data
+                changed = True
+        if changed and not self.on_flush:
+            if not self.single_file:
+                self._dump_file("chat_data", self.chat_data)
+            else:
+                self._dump_singlefile()
+
+    async def update_conversations_many(
+        self, name: str, states: Mapping[ConversationKey, Optional[object]]
+    ) -> None:
+        """Will update the conversations for the given handler and depending on :attr:`on_flush`
+        save the pickle file once.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            name (:obj:`str`): The handler's name.
+            states (Mapping[:obj:`tuple`, :class:`object`]): Mapping of the keys the state is
+                changed for to the new state.
+        """
+        if not self.conversations:
+            self.conversations = {}
+        conversations = self.conversations.setdefault(name, {})
+        changed = False
+        for key, new_state in states.items():
+            if conversations.get(key) != new_state:
+                conversations[key] = new_state
+                changed = True
+        if changed and not self.on_flush:
+            if not self.single_file:
+                self._dump_file("conversations", self.conversations)
             else:
                 self._dump_singlefile()
 
@@ -455,7 +726,7 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
         self.bot_data = data
         if not self.on_flush:
             if not self.single_file:
-                self._dump_file(Path(f"{self.filepath}_bot_data"), self.bot_data)
+                self._dump_file("bot_data", self.bot_data)
             else:
                 self._dump_singlefile()
 
@@ -475,7 +746,54 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
         self.callback_data = data
         if not self.on_flush:
             if not self.single_file:
-                self._dump_file(Path(f"{self.filepath}_callback_data"), self.callback_data)
+                self._dump_file("callback_data", self.callback_data)
+            else:
+                self._dump_singlefile()
+
+    async def update_file_id_cache(self, data: dict[str, str]) -> None:
+        """Will update the file ids of the :attr:`~telegram.ext.ExtBot.file_id_cache` (if changed)
+        and depending on :attr:`on_flush` save the pickle file.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            data (dict[:obj:`str`, :obj:`str`]): The file ids to store.
+        """
+        if self.file_id_cache == data:
+            return
+        self.file_id_cache = data
+        if not self.on_flush:
+            if not self.single_file:
+                self._dump_file("file_id_cache", self.file_id_cache)
+            else:
+                self._dump_singlefile()
+
+    async def update_callback_data_delta(
+        self,
+        data: CDCData,
+        dropped_keyboards: Collection[str],
+        dropped_callback_queries: Collection[str],
+    ) -> None:
+        """Will apply the changes to the callback_data and depending on :attr:`on_flush` save the
+        pickle file. The pickle file is still written as a whole, but the complete callback data
+        doesn't have to be copied anymore.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            data (tuple[list[tuple[:obj:`str`, :obj:`float`, \
+                dict[:obj:`str`, :class:`object`]]], dict[:obj:`str`, :obj:`str`]]):
+                The keyboards and callback queries that were added or changed.
+            dropped_keyboards (Collection[:obj:`str`]): The UUIDs of the keyboards to delete.
+            dropped_callback_queries (Collection[:obj:`str`]): The IDs of the callback queries to
+                delete.
+        """
+        self.callback_data = apply_persistence_delta(
+            self.callback_data, data, dropped_keyboards, dropped_callback_queries
+        )
+        if not self.on_flush:
+            if not self.single_file:
+                self._dump_file("callback_data", self.callback_data)
             else:
                 self._dump_singlefile()
 
@@ -494,7 +812,7 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
 
         if not self.on_flush:
             if not self.single_file:
-                self._dump_file(Path(f"{self.filepath}_chat_data"), self.chat_data)
+                self._dump_file("chat_data", self.chat_data)
             else:
                 self._dump_singlefile()
 
@@ -513,7 +831,47 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
 
         if not self.on_flush:
             if not self.single_file:
-                self._dump_file(Path(f"{self.filepath}_user_data"), self.user_data)
+                self._dump_file("user_data", self.user_data)
+            else:
+                self._dump_singlefile()
+
+    async def drop_chat_data_many(self, chat_ids: Collection[int]) -> None:
+        """Will delete the specified keys from the ``chat_data`` and depending on
+        :attr:`on_flush` save the pickle file once.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            chat_ids (Collection[:obj:`int`]): The chat ids to delete from the persistence.
+        """
+        if self.chat_data is None:
+            return
+        for chat_id in chat_ids:
+            self.chat_data.pop(chat_id, None)
+
+        if not self.on_flush:
+            if not self.single_file:
+                self._dump_file("chat_data", self.chat_data)
+            else:
+                self._dump_singlefile()
+
+    async def drop_user_data_many(self, user_ids: Collection[int]) -> None:
+        """Will delete the specified keys from the ``user_data`` and depending on
+        :attr:`on_flush` save the pickle file once.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            user_ids (Collection[:obj:`int`]): The user ids to delete from the persistence.
+        """
+        if self.user_data is None:
+            return
+        for user_id in user_ids:
+            self.user_data.pop(user_id, None)
+
+        if not self.on_flush:
+            if not self.single_file:
+                self._dump_file("user_data", self.user_data)
             else:
                 self._dump_singlefile()
 
@@ -546,17 +904,20 @@ class PicklePersistence(BasePersistence[UD, CD, BD]):
                 or self.chat_data
                 or self.bot_data
                 or self.callback_data
+                or self.file_id_cache
                 or self.conversations
             ):
                 self._dump_singlefile()
         else:
             if self.user_data:
-                self._dump_file(Path(f"{self.filepath}_user_data"), self.user_data)
+                self._dump_file("user_data", self.user_data)
             if self.chat_data:
-                self._dump_file(Path(f"{self.filepath}_chat_data"), self.chat_data)
+                self._dump_file("chat_data", self.chat_data)
             if self.bot_data:
-                self._dump_file(Path(f"{self.filepath}_bot_data"), self.bot_data)
+                self._dump_file("bot_data", self.bot_data)
             if self.callback_data:
-                self._dump_file(Path(f"{self.filepath}_callback_data"), self.callback_data)
+                self._dump_file("callback_data", self.callback_data)
+            if self.file_id_cache:
+                self._dump_file("file_id_cache", self.file_id_cache)
             if self.conversations:
-                self._dump_file(Path(f"{self.filepath}_conversations"), self.conversations)
+                self._dump_file("conversations", self.conversations)
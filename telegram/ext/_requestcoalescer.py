@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the RequestCoalescer class."""
+import asyncio
+from collections.abc import Awaitable, Mapping
+from types import MappingProxyType
+from typing import Callable, Final, NamedTuple, Union
+
+from telegram._utils.logging import get_logger
+from telegram._utils.types import JSONDict
+from telegram.constants import BulkRequestLimit
+from telegram.error import BadRequest
+
+_LOGGER = get_logger(__name__, class_name="RequestCoalescer")
+
+_Result = Union[bool, JSONDict, list[JSONDict]]
+_Callback = Callable[[str, JSONDict], Awaitable[_Result]]
+
+
+class _PendingRequest(NamedTuple):
+    data: JSONDict
+    callback: _Callback
+    future: "asyncio.Future[_Result]"
+
+
+class RequestCoalescer:
+    """Combines single-message requests for the same chat that are made within a short time into
+    one request to the corresponding bulk method of the Bot API. For example, if many handlers
+    call :meth:`~telegram.Bot.delete_message` for the same chat concurrently, the messages are
+    deleted with a single call of :meth:`~telegram.Bot.delete_messages`. Every caller still gets
+    its own result.
+
+    If the :class:`~telegram.ext.ExtBot` uses a coalescer, requests to one of the endpoints in
+    :attr:`ENDPOINTS` are buffered for :attr:`delay` seconds. Afterwards, or as soon as
+    :attr:`max_batch_size` requests are buffered, the bulk request is made. If only one request
+    was buffered, it is made as it is. If the bulk request fails with a
+    :exc:`~telegram.error.BadRequest`, the buffered requests are made one by one, such that every
+    caller gets its own result or error. Other errors are raised for all callers.
+
+    Examples:
+        .. code-block:: python
+
+            application = ApplicationBuilder().token("TOKEN").request_coalescer(True).build()
+
+    Note:
+        * Only requests without additional parameters, e.g. ``api_kwargs``, are combined.
+        * :meth:`~telegram.Bot.delete_messages` skips messages that can't be found. Hence, calls
+          of :meth:`~telegram.Bot.delete_message` for messages that were already deleted return
+          :obj:`True` instead of raising an exception, if they are combined with other calls.
+        * :meth:`~telegram.Bot.forward_message` and :meth:`~telegram.Bot.copy_message` are not
+          combined: :meth:`~telegram.Bot.forward_messages` returns :class:`~telegram.MessageId`
+          objects instead of the forwarded messages, and :meth:`~telegram.Bot.copy_messages`
+          silently skips messages that can't be copied, so its results can't be matched to the
+          single requests.
+
+    .. seealso:: :meth:`telegram.ext.ApplicationBuilder.request_coalescer`
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        delay (:obj:`float`, optional): The number of seconds to buffer requests before making
+            the bulk request. Defaults to ``0.05``.
+        max_batch_size (:obj:`int`, optional): The maximum number of requests to combine. Defaults
+            to :tg-const:`telegram.constants.BulkRequestLimit.MAX_LIMIT`, which is also the
+            maximum value.
+
+    Attributes:
+        delay (:obj:`float`): The number of seconds to buffer requests before making the bulk
+            request.
+        max_batch_size (:obj:`int`): The maximum number of requests to combine.
+    """
+
+    __slots__ = ("_batches", "_tasks", "_timers", "delay", "max_batch_size")
+
+    ENDPOINTS: Final[Mapping[str, tuple[str, str]]] = MappingProxyType(
+        {"deleteMessage": ("deleteMessages", "message_ids")}
+    )
+    """Mapping[:obj:`str`, tuple[:obj:`str`, :obj:`str`]]: The endpoints whose requests are
+    combined, mapped to the bulk endpoint and the name of its parameter for the message ids."""
+
+    def __init__(
+        self,
+        delay: float = 0.05,
+        max_batch_size: int = BulkRequestLimit.MAX_LIMIT,
+    ):
+        if delay < 0:
+            raise ValueError("`delay` must not be negative.")
+        if not 1 <= max_batch_size <= BulkRequestLimit.MAX_LIMIT:
+            raise ValueError(
+                f"`max_batch_size` must be between 1 and {BulkRequestLimit.MAX_LIMIT}."
+            )
+        self.delay: float = delay
+        self.max_batch_size: int = max_batch_size
+        self._batches: dict[tuple[str, str], list[_PendingRequest]] = {}
+        self._timers: dict[tuple[str, str], asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @classmethod
+    def can_coalesce(cls, endpoint: str, data: JSONDict) -> bool:
+        """Checks whether a request can be combined with others.
+
+        Args:
+            endpoint (:obj:`str`): The Bot API endpoint, e.g. ``"deleteMessage"``.
+            data (:obj:`dict`): The parameters of the request.
+
+        Returns:
+            :obj:`bool`
+        """
+        return endpoint in cls.ENDPOINTS and data.keys() == {"chat_id", "message_id"}
+
+    async def process_request(self, endpoint: str, data: JSONDict, callback: _Callback) -> _Result:
+        """Buffers the request and returns its result once the bulk request was made.
+
+        Args:
+            endpoint (:obj:`str`): The Bot API endpoint. Must be one of :attr:`ENDPOINTS` and
+                :meth:`can_coalesce` must return :obj:`True` for the request.
+            data (:obj:`dict`): The parameters of the request.
+            callback (Callable[[:obj:`str`, :obj:`dict`], Awaitable[:obj:`bool` | :obj:`dict` | \
+                :obj:`list`]]): Makes a request to the passed endpoint with the passed parameters.
+
+        Returns:
+            :obj:`bool` | :obj:`dict` | :obj:`list`: The result of the request.
+        """
+        key = (endpoint, str(data["chat_id"]))
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[_Result] = loop.create_future()
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = []
+            self._timers[key] = loop.call_later(self.delay, self._send_batch, key)
+        batch.append(_PendingRequest(data, callback, future))
+
+        if len(batch) >= self.max_batch_size:
+            self._send_batch(key)
+
+        return await future
+
+    async def flush(self) -> None:
+        """Makes the requests for all buffered requests right away and waits until all requests
+        are done. Called by :meth:`telegram.ext.ExtBot.shutdown`.
+        """
+        for key in list(self._batches):
+            self._send_batch(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _send_batch(self, key: tuple[str, str]) -> None:
+        self._timers.pop(key).cancel()
+        task = asyncio.create_task(self._send(key[0], self._batches.pop(key)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, endpoint: str, batch: list[_PendingRequest]) -> None:
+        # Callers that were cancelled meanwhile don't want their request to be made anymore
+        batch = [request for request in batch if not request.future.done()]
+        if not batch:
+            return
+        if len(batch) == 1:
+            await self._send_single(endpoint, batch[0])
+            return
+
+        bulk_endpoint, ids_parameter = self.ENDPOINTS[endpoint]
+        message_ids = sorted({request.data["message_id"] for request in batch})
+        _LOGGER.debug(
+            "Combining %d %s requests into one %s request", len(batch), endpoint, bulk_endpoint
+        )
+        try:
+            result = await batch[0].callback(
+                bulk_endpoint, {"chat_id": batch[0].data["chat_id"], ids_parameter: message_ids}
+            )
+        except BadRequest as exc:
+            _LOGGER.debug("%s failed with %s, making the requests one by one", bulk_endpoint, exc)
+            await asyncio.gather(*(self._send_single(endpoint, request) for request in batch))
+            return
+        except asyncio.CancelledError:
+            for request in batch:
+                request.future.cancel()
+            raise
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(exc)
+            return
+
+        for request in batch:
+            if not request.future.done():
+                request.future.set_result(result)
+
+    @staticmethod
+    async def _send_single(endpoint: str, request: _PendingRequest) -> None:
+        try:
+            result = await request.callback(endpoint, request.data)
+        except asyncio.CancelledError:
+            request.future.cancel()
+            raise
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            if not request.future.done():
+                request.future.set_exception(exc)
+        else:
+            if not request.future.done():
+                request.future.set_result(result)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the ResponseCache class."""
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Mapping
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Final, Optional, Union
+
+from telegram._utils.logging import get_logger
+from telegram._utils.types import JSONDict
+
+if TYPE_CHECKING:
+    from telegram import Chat, Update
+
+_LOGGER = get_logger(__name__, class_name="ResponseCache")
+
+_Result = Union[bool, JSONDict, list[JSONDict]]
+_Key = tuple[str, tuple[tuple[str, str], ...]]
+
+# Endpoints that change the information returned by getChat, getChatMember or
+# getChatAdministrators for the chat passed as `chat_id`
+_CHAT_MODIFYING_ENDPOINTS: Final[frozenset[str]] = frozenset(
+    {
+        "approveChatJoinRequest",
+        "banChatMember",
+        "banChatSenderChat",
+        "declineChatJoinRequest",
+        "deleteChatPhoto",
+        "deleteChatStickerSet",
+        "leaveChat",
+        "pinChatMessage",
+        "promoteChatMember",
+        "restrictChatMember",
+        "setChatAdministratorCustomTitle",
+        "setChatDescription",
+        "setChatPermissions",
+        "setChatPhoto",
+        "setChatStickerSet",
+        "setChatTitle",
+        "unbanChatMember",
+        "unbanChatSenderChat",
+        "unpinAllChatMessages",
+        "unpinChatMessage",
+    }
+)
+# Endpoints that change the information returned by getStickerSet
+_STICKER_SET_MODIFYING_ENDPOINTS: Final[frozenset[str]] = frozenset(
+    {
+        "addStickerToSet",
+        "deleteStickerFromSet",
+        "deleteStickerSet",
+        "replaceStickerInSet",
+        "setCustomEmojiStickerSetThumbnail",
+        "setStickerEmojiList",
+        "setStickerKeywords",
+        "setStickerMaskPosition",
+        "setStickerPositionInSet",
+        "setStickerSetThumbnail",
+        "setStickerSetTitle",
+    }
+)
+# Service messages that change the information returned by getChat, getChatMember or
+# getChatAdministrators
+_CHAT_MODIFYING_MESSAGE_ATTRIBUTES: Final[tuple[str, ...]] = (
+    "chat_background_set",
+    "delete_chat_photo",
+    "left_chat_member",
+    "message_auto_delete_timer_changed",
+    "migrate_from_chat_id",
+    "migrate_to_chat_id",
+    "new_chat_members",
+    "new_chat_photo",
+    "new_chat_title",
+    "pinned_message",
+)
+
+
+class ResponseCache:
+    """A read-through cache for the results of Bot API methods that only read data, e.g.
+    :meth:`~telegram.Bot.get_chat` or :meth:`~telegram.Bot.get_chat_member`.
+
+    If the :class:`~telegram.ext.ExtBot` uses a cache, the result of a call to one of the methods
+    in :attr:`ttls` is stored for the given number of seconds. Calls with the same arguments
+    during that time return the stored result without making a request. Concurrent calls with the
+    same arguments share a single request.
+
+    Entries are dropped before their time is up, if the data they contain has changed:
+
+    * :meth:`process_update` drops the entries of a chat, if the update changes the chat or its
+      members, e.g. for :attr:`telegram.Update.chat_member` or a message with
+      :attr:`~telegram.Message.new_chat_title`. :class:`telegram.ext.Application` calls it for
+      every update before passing the update to the handlers.
+    * Successful calls of methods that change a chat, e.g. :meth:`~telegram.Bot.ban_chat_member`
+      or :meth:`~telegram.Bot.set_chat_title`, drop the entries of that chat.
+    * Successful calls of methods that change a sticker set drop all results of
+      :meth:`~telegram.Bot.get_sticker_set`.
+
+    Examples:
+        .. code-block:: python
+
+            application = (
+                ApplicationBuilder()
+                .token("TOKEN")
+                .response_cache(ResponseCache(ttls={"getChat": 300, "getMe": None}))
+                .build()
+            )
+
+    Note:
+        Results are stored as returned by the Bot API, i.e. every call returns new objects.
+        Calls are matched by the parameters sent to the Bot API, including ``api_kwargs``.
+        Timeouts are not taken into account.
+
+    Caution:
+        The cache can't know about all changes. For example, a chat member may change their
+        name without the bot receiving an update. Choose :paramref:`ttls` accordingly or call
+        :meth:`invalidate_chat` when needed.
+
+    .. seealso:: :meth:`telegram.ext.ApplicationBuilder.response_cache`
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        ttls (Mapping[:obj:`str`, :obj:`float` | :obj:`None`], optional): Maps names of Bot API
+            endpoints, e.g. ``"getChat"``, to the number of seconds their results are stored.
+            Updates :attr:`DEFAULT_TTLS`. Pass :obj:`None` as time to not cache an endpoint.
+        maxsize (:obj:`int`, optional): Maximum number of results to store. If the cache is full,
+            the least recently used result is dropped. Defaults to ``1024``.
+
+    Attributes:
+        ttls (Mapping[:obj:`str`, :obj:`float`]): The number of seconds the results of the
+            endpoints are stored. Endpoints that are not in this mapping are not cached.
+        maxsize (:obj:`int`): Maximum number of results to store.
+    """
+
+    __slots__ = ("_entries", "_generation", "_keys_by_chat", "_pending", "maxsize", "ttls")
+
+    DEFAULT_TTLS: Final[Mapping[str, float]] = MappingProxyType(
+        {
+            "getBusinessConnection": 300,
+            "getChat": 60,
+            "getChatAdministrators": 60,
+            "getChatMember": 60,
+            # The file_path is valid for at least one hour. Keeping it for 50 minutes leaves at
+            # least 10 minutes for downloading the file.
+            "getFile": 3000,
+            "getMe": 3600,
+            "getStickerSet": 300,
+        }
+    )
+    """Mapping[:obj:`str`, :obj:`float`]: The default number of seconds the results of the
+    endpoints are stored."""
+
+    def __init__(self, ttls: Optional[Mapping[str, Optional[float]]] = None, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("`maxsize` must be a positive integer.")
+        effective_ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.ttls: Mapping[str, float] = MappingProxyType(
+            {endpoint: ttl for endpoint, ttl in effective_ttls.items() if ttl and ttl > 0}
+        )
+        self.maxsize: int = maxsize
+        self._entries: OrderedDict[_Key, tuple[float, _Result]] = OrderedDict()
+        self._keys_by_chat: dict[str, set[_Key]] = {}
+        self._pending: dict[_Key, asyncio.Future[_Result]] = {}
+        # Incremented on every invalidation, so that results of requests that were in flight
+        # meanwhile are not stored
+        self._generation: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _make_key(endpoint: str, data: JSONDict) -> _Key:
+        return endpoint, tuple(sorted((key, str(value)) for key, value in data.items()))
+
+    async def process_request(
+        self, endpoint: str, data: JSONDict, callback: Callable[[], Awaitable[_Result]]
+    ) -> _Result:
+        """Returns the stored result of the request, if any. Otherwise, makes the request by
+        awaiting :paramref:`callback` and stores the result, if the endpoint is cached. If the
+        request changes data stored in the cache, the corresponding entries are dropped.
+
+        Args:
+            endpoint (:obj:`str`): The Bot API endpoint, e.g. ``"getChat"``.
+            data (:obj:`dict`): The parameters of the request.
+            callback (Callable[[], Awaitable[:obj:`bool` | :obj:`dict` | :obj:`list`]]): Makes the
+                request.
+
+        Returns:
+            :obj:`bool` | :obj:`dict` | :obj:`list`: The result of the request.
+        """
+        if endpoint not in self.ttls:
+            result = await callback()
+            self._invalidate_for_request(endpoint, data)
+            return result
+
+        key = self._make_key(endpoint, data)
+        if (entry := self._entries.get(key)) is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                return entry[1]
+            self._drop(key)
+
+        while (future := self._pending.get(key)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # If the shared request was cancelled, make the request ourselves
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        generation = self._generation
+        try:
+            result = await callback()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved, in case no one else waits for the result
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+        future.set_result(result)
+        if generation == self._generation:
+            self._store(key, self.ttls[endpoint], result, data.get("chat_id"))
+        return result
+
+    def _store(self, key: _Key, ttl: float, result: _Result, chat_id: object) -> None:
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        if chat_id is not None:
+            self._keys_by_chat.setdefault(str(chat_id), set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: _Key) -> None:
+        del self._entries[key]
+        for name, value in key[1]:
+            if name == "chat_id" and (keys := self._keys_by_chat.get(value)) is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_chat[value]
+
+    def _invalidate_for_request(self, endpoint: str, data: JSONDict) -> None:
+        if endpoint in _CHAT_MODIFYING_ENDPOINTS and "chat_id" in data:
+            self.invalidate_chat(data["chat_id"])
+        elif endpoint in _STICKER_SET_MODIFYING_ENDPOINTS:
+            self.invalidate_endpoint("getStickerSet")
+
+    def clear(self) -> None:
+        """Drops all stored results."""
+        self._generation += 1
+        self._entries.clear()
+        self._keys_by_chat.clear()
+
+    def invalidate_chat(self, chat_id: Union[int, str]) -> None:
+        """Drops all stored results of requests for the given chat, e.g. of
+        :meth:`~telegram.Bot.get_chat` and :meth:`~telegram.Bot.get_chat_member`.
+
+        Args:
+            chat_id (:obj:`int` | :obj:`str`): The chat id or username of the chat as passed to
+                the requests.
+        """
+        self._generation += 1
+        for key in list(self._keys_by_chat.get(str(chat_id), ())):
+            self._drop(key)
+
+    def invalidate_endpoint(self, endpoint: str) -> None:
+        """Drops all stored results of an endpoint.
+
+        Args:
+            endpoint (:obj:`str`): The Bot API endpoint, e.g. ``"getStickerSet"``.
+        """
+        self._generation += 1
+        for key in [key for key in self._entries if key[0] == endpoint]:
+            self._drop(key)
+
+    def _invalidate_chat_object(self, chat: "Chat") -> None:
+        _LOGGER.debug("Dropping cached results for chat %s", chat.id)
+        self.invalidate_chat(chat.id)
+        if chat.username:
+            self.invalidate_chat(f"@{chat.username}")
+
+    def process_update(self, update: "Update") -> None:
+        """Drops the stored results that are outdated by the update.
+        :class:`telegram.ext.Application` calls this method for every update. If you use the bot
+        without an application, call it for every incoming update.
+
+        Args:
+            update (:class:`telegram.Update`): The update.
+        """
+        if update.business_connection:
+            self.invalidate_endpoint("getBusinessConnection")
+            return
+
+        if chat_member_updated := (update.chat_member or update.my_chat_member):
+            self._invalidate_chat_object(chat_member_updated.chat)
+            return
+
+        message = update.effective_message
+        if message and any(
+            getattr(message, attribute) for attribute in _CHAT_MODIFYING_MESSAGE_ATTRIBUTES
+        ):
+            self._invalidate_chat_object(message.chat)
+            if message.migrate_to_chat_id:
+                self.invalidate_chat(message.migrate_to_chat_id)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains the SQLiteCallbackDataStore class."""
+import asyncio
+import datetime
+import math
+import pickle
+import sqlite3
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Optional, Union, cast
+
+from telegram._bot import Bot
+from telegram._utils.types import FilePathInput
+from telegram.ext._basecallbackdatastore import BaseCallbackDataStore
+from telegram.ext._picklepersistence import _BotPickler, _BotUnpickler
+from telegram.ext._utils.types import CDCData
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS keyboards ("
+    "uuid TEXT PRIMARY KEY, access_time REAL NOT NULL, button_data BLOB NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS keyboards_access_time ON keyboards (access_time)",
+    "CREATE TABLE IF NOT EXISTS callback_queries ("
+    "id TEXT PRIMARY KEY, keyboard_uuid TEXT NOT NULL, access_time REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS callback_queries_access_time ON callback_queries (access_time)",
+)
+# Expired entries are never returned, but they are deleted at most this often (in seconds)
+_PURGE_INTERVAL = 60.0
+
+
+class SQLiteCallbackDataStore(BaseCallbackDataStore):
+    """A storage backend for :class:`telegram.ext.CallbackDataCache` that keeps the data in an
+    SQLite database instead of in memory.
+
+    Keyboards are looked up by their UUID when a callback query arrives, so only the data of the
+    keyboards that are actually used is loaded into memory. New keyboards are written to the
+    database right away. Both tables have an index on the time of the last access, such that
+    evicting the least recently used entries and deleting expired entries doesn't require to
+    scan the whole database.
+
+    Since the data is kept in the database across restarts of the bot, it is neither loaded from
+    nor written to :attr:`telegram.ext.Application.persistence`, see :attr:`is_persistent`.
+
+    Use it by passing an instance to
+    :meth:`telegram.ext.ApplicationBuilder.arbitrary_callback_data`:
+
+    .. code-block:: python
+
+        application = (
+            ApplicationBuilder()
+            .token("TOKEN")
+            .arbitrary_callback_data(
+                SQLiteCallbackDataStore("callback_data.sqlite", expiry=datetime.timedelta(days=30))
+            )
+            .build()
+        )
+
+    Note:
+        * The callback data is stored with :mod:`pickle`. References to the bot are replaced on
+          loading just like in :class:`telegram.ext.PicklePersistence`.
+        * The database must only be used by one store at a time.
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        filepath (:obj:`str` | :obj:`pathlib.Path`): The path of the SQLite database. It will be
+            created if it does not exist.
+        maxsize (:obj:`int`, optional): Maximum number of keyboards and of callback queries in
+            the database. If necessary, the least recently used entries are dropped. By default,
+            the number of entries is not limited.
+        expiry (:obj:`float` | :obj:`datetime.timedelta`, optional): Keyboards and callback
+            queries that were not accessed for this time are dropped, either as :obj:`float` in
+            seconds or as :obj:`datetime.timedelta`. By default, entries don't expire.
+
+    Attributes:
+        filepath (:obj:`pathlib.Path`): The path of the SQLite database.
+    """
+
+    __slots__ = (
+        "_callback_query_count",
+        "_commit_handle",
+        "_connection",
+        "_expiry",
+        "_keyboard_count",
+        "_maxsize",
+        "_next_purge",
+        "filepath",
+    )
+
+    def __init__(
+        self,
+        filepath: FilePathInput,
+        maxsize: Optional[int] = None,
+        expiry: Optional[Union[float, datetime.timedelta]] = None,
+    ) -> None:
+        super().__init__()
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("`maxsize` must be positive.")
+        if isinstance(expiry, datetime.timedelta):
+            expiry = expiry.total_seconds()
+        if expiry is not None and expiry <= 0:
+            raise ValueError("`expiry` must be positive.")
+
+        self.filepath: Path = Path(filepath)
+        self._maxsize: Optional[int] = maxsize
+        self._expiry: Optional[float] = expiry
+        self._next_purge: float = -math.inf
+        self._commit_handle: Optional[asyncio.Handle] = None
+
+        self._connection = sqlite3.connect(self.filepath, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+        self._keyboard_count: int = self._count("keyboards")
+        self._callback_query_count: int = self._count("callback_queries")
+
+    @property
+    def maxsize(self) -> Optional[int]:
+        """:obj:`int`: Optional. Maximum number of keyboards and of callback queries in the
+        database.
+        """
+        return self._maxsize
+
+    @property
+    def expiry(self) -> Optional[datetime.timedelta]:
+        """:obj:`datetime.timedelta`: Optional. The time after which entries that were not
+        accessed are dropped.
+        """
+        return None if self._expiry is None else datetime.timedelta(seconds=self._expiry)
+
+    @property
+    def is_persistent(self) -> bool:
+        """:obj:`bool`: Always :obj:`True`, as the data is kept in the database."""
+        return True
+
+    async def shutdown(self) -> None:
+        """Commits all pending writes to the database."""
+        self._commit()
+
+    def _count(self, table: str) -> int:
+        query = f"SELECT COUNT(*) FROM {table}"  # noqa: S608
+        return self._connection.execute(query).fetchone()[0]
+
+    def _cutoff(self) -> float:
+        return -math.inf if self._expiry is None else time.time() - self._expiry
+
+    def _dumps(self, obj: object) -> bytes:
+        buffer = BytesIO()
+        _BotPickler(cast(Bot, self.bot), buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+        return buffer.getvalue()
+
+    def _loads(self, data: bytes) -> Any:
+        return _BotUnpickler(cast(Bot, self.bot), BytesIO(data)).load()
+
+    def _commit(self) -> None:
+        if self._commit_handle is not None:
+            self._commit_handle.cancel()
+            self._commit_handle = None
+        self._connection.commit()
+
+    def _commit_soon(self) -> None:
+        # Writes are committed once per iteration of the event loop such that processing many
+        # keyboards at once doesn't require a commit per keyboard
+        if self._commit_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._commit()
+        else:
+            self._commit_handle = loop.call_soon(self._commit)
+
+    def _evict(self, table: str, count: int) -> int:
+        """Drops the least recently used entries of the table if there are more than maxsize.
+        Returns the new number of entries.
+        """
+        if self._maxsize is None or count <= self._maxsize:
+            return count
+        key = "uuid" if table == "keyboards" else "id"
+        cursor = self._connection.execute(
+            f"DELETE FROM {table} WHERE {key} IN "  # noqa: S608
+            f"(SELECT {key} FROM {table} ORDER BY access_time LIMIT ?)",
+            (count - self._maxsize,),
+        )
+        return count - cursor.rowcount
+
+    def _purge_expired(self) -> None:
+        if self._expiry is None or (now := time.time()) < self._next_purge:
+            return
+        self._next_purge = now + min(self._expiry, _PURGE_INTERVAL)
+        self._delete_keyboards(now - self._expiry)
+        cursor = self._connection.execute(
+            "DELETE FROM callback_queries WHERE access_time < ?", (now - self._expiry,)
+        )
+        self._callback_query_count -= cursor.rowcount
+
+    def _delete_keyboards(self, time_cutoff: float) -> None:
+        cursor = self._connection.execute(
+            "DELETE FROM keyboards WHERE access_time < ?", (time_cutoff,)
+        )
+        self._keyboard_count -= cursor.rowcount
+
+    def _insert_keyboard(
+        self, keyboard_uuid: str, access_time: float, button_data: dict[str, object]
+    ) -> None:
+        cursor = self._connection.execute("DELETE FROM keyboards WHERE uuid = ?", (keyboard_uuid,))
+        self._connection.execute(
+            "INSERT INTO keyboards VALUES (?, ?, ?)",
+            (keyboard_uuid, access_time, self._dumps(button_data)),
+        )
+        self._keyboard_count = self._evict("keyboards", self._keyboard_count + 1 - cursor.rowcount)
+
+    def _insert_callback_query(
+        self, callback_query_id: str, keyboard_uuid: str, access_time: float
+    ) -> None:
+        # Deleting and inserting instead of replacing, such that the count stays accurate
+        cursor = self._connection.execute(
+            "DELETE FROM callback_queries WHERE id = ?", (callback_query_id,)
+        )
+        self._connection.execute(
+            "INSERT INTO callback_queries VALUES (?, ?, ?)",
+            (callback_query_id, keyboard_uuid, access_time),
+        )
+        self._callback_query_count = self._evict(
+            "callback_queries", self._callback_query_count + 1 - cursor.rowcount
+        )
+
+    def get_keyboard(self, keyboard_uuid: str) -> dict[str, object]:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.get_keyboard`."""
+        row = self._connection.execute(
+            "SELECT button_data FROM keyboards WHERE uuid = ? AND access_time >= ?",
+            (keyboard_uuid, self._cutoff()),
+        ).fetchone()
+        if row is None:
+            raise KeyError(keyboard_uuid)
+        self._connection.execute(
+            "UPDATE keyboards SET access_time = ? WHERE uuid = ?", (time.time(), keyboard_uuid)
+        )
+        self._commit_soon()
+        return cast(dict[str, object], self._loads(row[0]))
+
+    def put_keyboard(self, keyboard_uuid: str, button_data: dict[str, object]) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.put_keyboard`."""
+        self._purge_expired()
+        self._insert_keyboard(keyboard_uuid, time.time(), button_data)
+        self._commit_soon()
+
+    def drop_keyboard(self, keyboard_uuid: str) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.drop_keyboard`."""
+        cursor = self._connection.execute("DELETE FROM keyboards WHERE uuid = ?", (keyboard_uuid,))
+        self._keyboard_count -= cursor.rowcount
+        self._commit_soon()
+
+    def clear_keyboards(self, time_cutoff: Optional[float] = None) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.clear_keyboards`."""
+        self._delete_keyboards(math.inf if time_cutoff is None else time_cutoff)
+        self._commit_soon()
+
+    def put_callback_query(self, callback_query_id: str, keyboard_uuid: str) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.put_callback_query`."""
+        self._insert_callback_query(callback_query_id, keyboard_uuid, time.time())
+        self._commit_soon()
+
+    def pop_callback_query(self, callback_query_id: str) -> str:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.pop_callback_query`."""
+        row = self._connection.execute(
+            "SELECT keyboard_uuid FROM callback_queries WHERE id = ? AND access_time >= ?",
+            (callback_query_id, self._cutoff()),
+        ).fetchone()
+        cursor = self._connection.execute(
+            "DELETE FROM callback_queries WHERE id = ?", (callback_query_id,)
+        )
+        self._callback_query_count -= cursor.rowcount
+        self._commit_soon()
+        if row is None:
+            raise KeyError(callback_query_id)
+        return cast(str, row[0])
+
+    def clear_callback_queries(self) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.clear_callback_queries`."""
+        self._connection.execute("DELETE FROM callback_queries")
+        self._callback_query_count = 0
+        self._commit_soon()
+
+    @property
+    def persistence_data(self) -> CDCData:
+        """See :attr:`telegram.ext.BaseCallbackDataStore.persistence_data`.
+
+        Note:
+            This reads the whole database into memory.
+        """
+        cutoff = self._cutoff()
+        keyboards = [
+            (keyboard_uuid, access_time, self._loads(button_data))
+            for keyboard_uuid, access_time, button_data in self._connection.execute(
+                "SELECT uuid, access_time, button_data FROM keyboards WHERE access_time >= ? "
+                "ORDER BY access_time",
+                (cutoff,),
+            )
+        ]
+        callback_queries = dict(
+            self._connection.execute(
+                "SELECT id, keyboard_uuid FROM callback_queries WHERE access_time >= ? "
+                "ORDER BY access_time",
+                (cutoff,),
+            ).fetchall()
+        )
+        return keyboards, callback_queries
+
+    def load_persistence_data(self, persistent_data: CDCData) -> None:
+        """See :meth:`telegram.ext.BaseCallbackDataStore.load_persistence_data`.
+
+        Hint:
+            This allows to migrate data stored by :attr:`telegram.ext.Application.persistence`
+            to the database.
+        """
+        keyboard_data, callback_queries = persistent_data
+        now = time.time()
+        for callback_query_id, keyboard_uuid in callback_queries.items():
+            self._insert_callback_query(callback_query_id, keyboard_uuid, now)
+        for keyboard_uuid, access_time, button_data in keyboard_data:
+            self._insert_keyboard(keyboard_uuid, access_time, button_data)
+        self._commit()
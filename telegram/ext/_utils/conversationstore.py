@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains a memory efficient mapping for the states of a ConversationHandler.
+
+.. versionadded:: NEXT.VERSION
+
+Warning:
+    Contents of this module are intended to be used internally by the library and *not* by the
+    user. Changes to this module are not considered breaking changes and may not be documented in
+    the changelog.
+"""
+from collections.abc import Iterator, Mapping, MutableMapping
+from enum import Enum
+from typing import Final, Optional, Union
+
+from telegram.ext._utils.trackingdict import TrackingDict
+from telegram.ext._utils.types import ConversationKey
+
+_PackedKey = Union[int, ConversationKey]
+
+# Each entry of a key is stored in 64 bits, the number of entries in the lowest 2 bits
+_ENTRY_BITS: Final = 64
+_ENTRY_OFFSET: Final = 1 << (_ENTRY_BITS - 1)
+_ENTRY_MASK: Final = (1 << _ENTRY_BITS) - 1
+_MAX_PACKED_ENTRIES: Final = 3
+_LENGTH_BITS: Final = 2
+_LENGTH_MASK: Final = (1 << _LENGTH_BITS) - 1
+
+
+def _pack_key(key: ConversationKey) -> _PackedKey:
+    """Packs keys consisting of up to three 64-bit integers (e.g. ``(chat_id, user_id)``) into a
+    single :obj:`int`. All other keys are returned unchanged.
+    """
+    if not 0 < len(key) <= _MAX_PACKED_ENTRIES:
+        return key
+    packed = 0
+    for entry in key:
+        # exclude bool and other int subclasses, they would not survive the round trip
+        if type(entry) is not int or not -_ENTRY_OFFSET <= entry < _ENTRY_OFFSET:
+            return key
+        packed = (packed << _ENTRY_BITS) | (entry + _ENTRY_OFFSET)
+    return (packed << _LENGTH_BITS) | len(key)
+
+
+def _unpack_key(packed: _PackedKey) -> ConversationKey:
+    if not isinstance(packed, int):
+        return packed
+    length = packed & _LENGTH_MASK
+    packed >>= _LENGTH_BITS
+    entries = []
+    for _ in range(length):
+        entries.append((packed & _ENTRY_MASK) - _ENTRY_OFFSET)
+        packed >>= _ENTRY_BITS
+    return tuple(reversed(entries))
+
+
+class ConversationStateStore(MutableMapping[ConversationKey, object]):
+    """Mutable mapping from conversation keys to states that uses considerably less memory than a
+    :obj:`dict` for large numbers of conversations:
+
+    * Keys consisting of up to three 64-bit integers - like ``(chat_id, user_id)`` - are stored as
+      a single :obj:`int` instead of a :obj:`tuple` of :obj:`int`.
+    * States of type :obj:`int`, :obj:`str` and :class:`enum.Enum` are interned, such that equal
+      states loaded e.g. from persistence share a single object. Interned states are dropped
+      again once no conversation is in them anymore.
+    * If writes are tracked, the set of changed keys references the same packed key objects as
+      the mapping itself.
+
+    Write access is tracked in the same way as in
+    :class:`~telegram.ext._utils.trackingdict.TrackingDict`, which allows the
+    :class:`~telegram.ext.Application` to update the persistence with the changed states.
+
+    Args:
+        track_writes (:obj:`bool`, optional): Whether to track write access. Defaults to
+            :obj:`False`.
+    """
+
+    DELETED: Final = TrackingDict.DELETED
+    """Special marker indicating that an entry was deleted."""
+
+    __slots__ = ("_data", "_interned", "_references", "_write_access_keys")
+
+    def __init__(self, track_writes: bool = False) -> None:
+        self._data: dict[_PackedKey, object] = {}
+        self._interned: dict[tuple[type, object], object] = {}
+        # Number of conversations per interned state
+        self._references: dict[tuple[type, object], int] = {}
+        self._write_access_keys: Optional[set[_PackedKey]] = set() if track_writes else None
+
+    def _intern(self, value: object) -> object:
+        if isinstance(value, (int, str, Enum)):
+            # The type is part of the key, since e.g. 1 == 1.0 == True
+            intern_key = (type(value), value)
+            self._references[intern_key] = self._references.get(intern_key, 0) + 1
+            return self._interned.setdefault(intern_key, value)
+        return value
+
+    def _release(self, value: object) -> None:
+        if isinstance(value, (int, str, Enum)):
+            intern_key = (type(value), value)
+            if (references := self._references[intern_key] - 1) > 0:
+                self._references[intern_key] = references
+            else:
+                del self._references[intern_key]
+                del self._interned[intern_key]
+
+    def _store(self, packed_key: _PackedKey, value: object) -> None:
+        value = self._intern(value)
+        if (old := self._data.get(packed_key, self.DELETED)) is not self.DELETED:
+            self._release(old)
+        self._data[packed_key] = value
+
+    def _track_write(self, packed_key: _PackedKey) -> None:
+        if self._write_access_keys is not None:
+            self._write_access_keys.add(packed_key)
+
+    def __getitem__(self, key: ConversationKey) -> object:
+        return self._data[_pack_key(key)]
+
+    def __setitem__(self, key: ConversationKey, value: object) -> None:
+        packed_key = _pack_key(key)
+        self._track_write(packed_key)
+        self._store(packed_key, value)
+
+    def __delitem__(self, key: ConversationKey) -> None:
+        packed_key = _pack_key(key)
+        self._release(self._data.pop(packed_key))
+        self._track_write(packed_key)
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, tuple):
+            return False
+        return _pack_key(key) in self._data
+
+    def __iter__(self) -> Iterator[ConversationKey]:
+        return (_unpack_key(packed_key) for packed_key in self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def clear(self) -> None:
+        if self._write_access_keys is not None:
+            self._write_access_keys.update(self._data)
+        self._data.clear()
+        self._interned.clear()
+        self._references.clear()
+
+    def update_no_track(self, mapping: Mapping[ConversationKey, object]) -> None:
+        """Like ``update``, but doesn't count towards write access."""
+        for key, value in mapping.items():
+            self._store(_pack_key(key), value)
+
+    def pop_accessed_keys(self) -> set[ConversationKey]:
+        """Returns all keys that were write-accessed since the last time this method was called."""
+        if not self._write_access_keys:
+            return set()
+        out = self._write_access_keys
+        self._write_access_keys = set()
+        return {_unpack_key(packed_key) for packed_key in out}
+
+    def pop_accessed_write_items(self) -> list[tuple[ConversationKey, object]]:
+        """Returns all keys & corresponding values as list of tuples that were write-accessed
+        since the last time this method was called. If a key was deleted, the value will be
+        :attr:`DELETED`.
+        """
+        if not self._write_access_keys:
+            return []
+        out = self._write_access_keys
+        self._write_access_keys = set()
+        return [
+            (_unpack_key(packed_key), self._data.get(packed_key, self.DELETED))
+            for packed_key in out
+        ]
+
+    def mark_as_accessed(self, key: ConversationKey) -> None:
+        """Use this method have the key returned again in the next call to
+        :meth:`pop_accessed_write_items` or :meth:`pop_accessed_keys`
+        """
+        self._track_write(_pack_key(key))
@@ -17,8 +17,16 @@
 # along with this program.  If not, see [http://www.gnu.org/licenses/].
 """This module contains classes that handle the networking backend of ``python-telegram-bot``."""
 
+from ._aiohttprequest import AiohttpRequest
 from ._baserequest import BaseRequest
 from ._httpxrequest import HTTPXRequest
 from ._requestdata import RequestData
+from ._trafficclassrequest import TrafficClassRequest
 
-__all__ = ("BaseRequest", "HTTPXRequest", "RequestData")
+__all__ = (
+    "AiohttpRequest",
+    "BaseRequest",
+    "HTTPXRequest",
+    "RequestData",
+    "TrafficClassRequest",
+)
@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains methods to make POST and GET requests using the aiohttp library."""
+import asyncio
+import secrets
+from collections.abc import AsyncIterator
+from http import HTTPStatus
+from typing import Any, Optional, Union
+
+try:
+    import aiohttp
+
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from telegram._utils.defaultvalue import DefaultValue
+from telegram._utils.logging import get_logger
+from telegram._utils.types import ODVInput
+from telegram.error import NetworkError, TelegramError, TimedOut
+from telegram.request._baserequest import BaseRequest
+from telegram.request._requestdata import RequestData
+
+_LOGGER = get_logger(__name__, "AiohttpRequest")
+_CHUNK_SIZE = 64 * 1024
+
+
+class AiohttpRequest(BaseRequest):
+    """Implementation of :class:`~telegram.request.BaseRequest` using the library
+    `aiohttp <https://docs.aiohttp.org>`_. Can be used as drop-in replacement for
+    :class:`~telegram.request.HTTPXRequest`, e.g. if the overhead per request matters because
+    the bot makes a very large number of small requests.
+
+    Important:
+        If you want to use this class, you must install PTB with the optional requirement
+        ``aiohttp``, i.e.
+
+        .. code-block:: bash
+
+           pip install "python-telegram-bot[aiohttp]"
+
+    Note:
+        * Only HTTP/1.1 is supported.
+        * Only HTTP proxies are supported.
+        * aiohttp has no timeout for write operations. Instead, the total duration of a request
+          is limited to the sum of the connect, write and read timeouts, if none of them is
+          :obj:`None`.
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        connection_pool_size (:obj:`int`, optional): Number of connections to keep in the
+            connection pool. Defaults to ``1``.
+        read_timeout (:obj:`float` | :obj:`None`, optional): If passed, specifies the maximum
+            amount of time (in seconds) to wait for a response from Telegram's server.
+            This value is used unless a different value is passed to :meth:`do_request`.
+            Defaults to ``5``.
+        write_timeout (:obj:`float` | :obj:`None`, optional): If passed, specifies the maximum
+            amount of time (in seconds) to wait for a write operation to complete.
+            This value is used unless a different value is passed to :meth:`do_request`.
+            Defaults to ``5``.
+
+            Hint:
+                This timeout is used for all requests except for those that upload media/files.
+                For the latter, :paramref:`media_write_timeout` is used.
+        connect_timeout (:obj:`float` | :obj:`None`, optional): If passed, specifies the
+            maximum amount of time (in seconds) to wait for a connection attempt to a server
+            to succeed. This value is used unless a different value is passed to
+            :meth:`do_request`. Defaults to ``5``.
+        pool_timeout (:obj:`float` | :obj:`None`, optional): If passed, specifies the maximum
+            amount of time (in seconds) to wait for a connection to become available.
+            This value is used unless a different value is passed to :meth:`do_request`.
+            Defaults to ``1``.
+
+            Warning:
+                With a finite pool timeout, you must expect :exc:`telegram.error.TimedOut`
+                exceptions to be thrown when more requests are made simultaneously than there are
+                connections in the connection pool!
+        proxy (:obj:`str`, optional): The URL to an HTTP proxy server, e.g.
+            ``'http://127.0.0.1:3128'``. Defaults to :obj:`None`. The proxy can also be set via
+            the environment variables ``HTTP_PROXY`` and ``HTTPS_PROXY``.
+        media_write_timeout (:obj:`float` | :obj:`None`, optional): Like :paramref:`write_timeout`,
+            but used only for requests that upload media/files. This value is used unless a
+            different value is passed to :paramref:`do_request.write_timeout` of
+            :meth:`do_request`. Defaults to ``20`` seconds.
+        aiohttp_kwargs (dict[:obj:`str`, Any], optional): Additional keyword arguments to be passed
+            to the `aiohttp.ClientSession \
+            <https://docs.aiohttp.org/en/stable/client_reference.html#aiohttp.ClientSession>`_
+            constructor.
+
+            Warning:
+                This parameter is intended for advanced users that want to fine-tune the behavior
+                of the underlying ``aiohttp`` session. The values passed here will override the
+                defaults set by ``python-telegram-bot``.
+
+    Raises:
+        :exc:`RuntimeError`: If the optional requirement ``aiohttp`` is not installed.
+    """
+
+    __slots__ = (
+        "_connect_timeout",
+        "_connection_pool_size",
+        "_media_write_timeout",
+        "_pool_semaphore",
+        "_pool_timeout",
+        "_proxy",
+        "_read_timeout",
+        "_session",
+        "_session_kwargs",
+        "_write_timeout",
+    )
+
+    def __init__(
+        self,
+        connection_pool_size: int = 1,
+        read_timeout: Optional[float] = 5.0,
+        write_timeout: Optional[float] = 5.0,
+        connect_timeout: Optional[float] = 5.0,
+        pool_timeout: Optional[float] = 1.0,
+        proxy: Optional[str] = None,
+        media_write_timeout: Optional[float] = 20.0,
+        aiohttp_kwargs: Optional[dict[str, Any]] = None,
+    ):
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError(
+                "To use `AiohttpRequest`, PTB must be installed via `pip install "
+                '"python-telegram-bot[aiohttp]"`.'
+            )
+
+        self._connection_pool_size: int = connection_pool_size
+        self._read_timeout: Optional[float] = read_timeout
+        self._write_timeout: Optional[float] = write_timeout
+        self._connect_timeout: Optional[float] = connect_timeout
+        self._pool_timeout: Optional[float] = pool_timeout
+        self._media_write_timeout: Optional[float] = media_write_timeout
+        self._proxy: Optional[str] = proxy
+        self._session_kwargs: dict[str, Any] = {
+            "headers": {"User-Agent": self.USER_AGENT},
+            # Like httpx, respect the proxy environment variables
+            "trust_env": True,
+            **(aiohttp_kwargs or {}),
+        }
+        # Created in initialize, as aiohttp needs a running event loop for that
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pool_semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        """See :attr:`BaseRequest.read_timeout`.
+
+        Returns:
+            :obj:`float` | :obj:`None`: The default read timeout in seconds as passed to
+                :paramref:`AiohttpRequest.read_timeout`.
+        """
+        return self._read_timeout
+
+    async def initialize(self) -> None:
+        """See :meth:`BaseRequest.initialize`."""
+        if self._session is not None and not self._session.closed:
+            return
+
+        # We limit the number of concurrent requests ourselves to apply the pool timeout
+        self._pool_semaphore = asyncio.Semaphore(self._connection_pool_size)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self._connection_pool_size),
+            **self._session_kwargs,
+        )
+
+    async def shutdown(self) -> None:
+        """See :meth:`BaseRequest.shutdown`."""
+        if self._session is None or self._session.closed:
+            _LOGGER.debug("This AiohttpRequest is already shut down. Returning.")
+            return
+
+        await self._session.close()
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        write_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        connect_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        pool_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+    ) -> tuple[int, bytes]:
+        """See :meth:`BaseRequest.do_request`."""
+        if self._session is None or self._session.closed or self._pool_semaphore is None:
+            raise RuntimeError("This AiohttpRequest is not initialized!")
+
+        timeout = self._build_timeout(
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            has_files=request_data is not None and request_data.contains_files,
+        )
+
+        headers = {}
+        data: Union[dict[str, str], AsyncIterator[bytes], None] = None
+        if request_data is not None and request_data.contains_files:
+            # The multipart body is streamed in chunks, such that files are never completely
+            # read into memory
+            boundary = secrets.token_hex(16)
+            headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+            if (content_length := request_data.multipart_content_length(boundary)) is not None:
+                headers["Content-Length"] = str(content_length)
+            data = request_data.multipart_stream(boundary)
+        elif request_data is not None:
+            data = request_data.json_parameters
+
+        await self._acquire_connection(pool_timeout)
+        try:
+            async with self._session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                data=data,
+                timeout=timeout,
+                proxy=self._proxy,
+            ) as response:
+                return response.status, await response.read()
+        except (asyncio.TimeoutError, aiohttp.ClientError) as err:
+            raise self._convert_error(err) from err
+        finally:
+            self._pool_semaphore.release()
+
+    async def retrieve_stream(
+        self,
+        url: str,
+        offset: int = 0,
+        read_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        write_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        connect_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        pool_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+    ) -> AsyncIterator[bytes]:
+        """See :meth:`BaseRequest.retrieve_stream`. Streams the response and requests it from
+        :paramref:`~BaseRequest.retrieve_stream.offset` on via an HTTP ``Range`` header.
+
+        Note:
+            Unlike for the other requests, the total duration of the download is not limited, as
+            downloading large files may take arbitrarily long. The read timeout still applies to
+            each read operation.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        if self._session is None or self._session.closed or self._pool_semaphore is None:
+            raise RuntimeError("This AiohttpRequest is not initialized!")
+
+        timeout = self._build_timeout(
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            limit_total=False,
+        )
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        await self._acquire_connection(pool_timeout)
+        try:
+            async with self._session.get(
+                url, headers=headers, timeout=timeout, proxy=self._proxy
+            ) as response:
+                if not HTTPStatus.OK <= response.status <= 299:
+                    self._raise_for_error_response(response.status, await response.read())
+
+                chunks: AsyncIterator[bytes] = response.content.iter_chunked(_CHUNK_SIZE)
+                if offset and response.status != HTTPStatus.PARTIAL_CONTENT:
+                    chunks = self._skip_bytes(chunks, offset)
+                async for chunk in chunks:
+                    yield chunk
+        except (asyncio.TimeoutError, aiohttp.ClientError) as err:
+            raise self._convert_error(err) from err
+        finally:
+            self._pool_semaphore.release()
+
+    def _build_timeout(
+        self,
+        read_timeout: ODVInput[float],
+        write_timeout: ODVInput[float],
+        connect_timeout: ODVInput[float],
+        has_files: bool = False,
+        limit_total: bool = True,
+    ) -> "aiohttp.ClientTimeout":
+        # If user did not specify timeouts (for e.g. in a bot method), use the default ones when we
+        # created this instance.
+        if isinstance(read_timeout, DefaultValue):
+            read_timeout = self._read_timeout
+        if isinstance(connect_timeout, DefaultValue):
+            connect_timeout = self._connect_timeout
+        if isinstance(write_timeout, DefaultValue):
+            write_timeout = self._media_write_timeout if has_files else self._write_timeout
+
+        total_timeout = (
+            None
+            if not limit_total
+            or read_timeout is None
+            or write_timeout is None
+            or connect_timeout is None
+            else read_timeout + write_timeout + connect_timeout
+        )
+        return aiohttp.ClientTimeout(
+            total=total_timeout, sock_connect=connect_timeout, sock_read=read_timeout
+        )
+
+    async def _acquire_connection(self, pool_timeout: ODVInput[float]) -> None:
+        if isinstance(pool_timeout, DefaultValue):
+            pool_timeout = self._pool_timeout
+
+        try:
+            await asyncio.wait_for(
+                self._pool_semaphore.acquire(), timeout=pool_timeout  # type: ignore[union-attr]
+            )
+        except asyncio.TimeoutError as exc:
+            raise TimedOut(
+                message=(
+                    "Pool timeout: All connections in the connection pool are occupied. "
+                    "Request was *not* sent to Telegram. Consider adjusting the connection "
+                    "pool size or the pool timeout."
+                )
+            ) from exc
+
+    @staticmethod
+    def _convert_error(err: Exception) -> TelegramError:
+        if isinstance(err, asyncio.TimeoutError):
+            # Also covers aiohttp.ServerTimeoutError, which is a subclass
+            return TimedOut()
+        # We include the class name for easier debugging. Especially useful if the error
+        # message of `err` is empty.
+        return NetworkError(f"aiohttp.{err.__class__.__name__}: {err}")
@@ -19,10 +19,11 @@
 """This module contains an abstract class to make POST and GET requests."""
 import abc
 import json
+from collections.abc import AsyncIterator
 from contextlib import AbstractAsyncContextManager
 from http import HTTPStatus
 from types import TracebackType
-from typing import Final, Optional, TypeVar, Union, final
+from typing import Final, NoReturn, Optional, TypeVar, Union, final
 
 from telegram._utils.defaultvalue import DEFAULT_NONE as _DEFAULT_NONE
 from telegram._utils.defaultvalue import DefaultValue
@@ -260,6 +261,74 @@ class BaseRequest(
             pool_timeout=pool_timeout,
         )
 
+    async def retrieve_stream(
+        self,
+        url: str,
+        offset: int = 0,
+        read_timeout: ODVInput[float] = DEFAULT_NONE,
+        write_timeout: ODVInput[float] = DEFAULT_NONE,
+        connect_timeout: ODVInput[float] = DEFAULT_NONE,
+        pool_timeout: ODVInput[float] = DEFAULT_NONE,
+    ) -> AsyncIterator[bytes]:
+        """Retrieve the contents of a file by its URL in chunks, such that the file doesn't have
+        to be held in memory completely.
+
+        The default implementation retrieves the complete file via :meth:`retrieve` and yields it
+        as a single chunk. Implementations that support streaming responses should override this
+        method. If the download can be started at :paramref:`offset`, e.g. by an HTTP ``Range``
+        header, they should make use of that.
+
+        Warning:
+            This method will be called by the methods of :class:`telegram.File` and should *not*
+            be called manually.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            url (:obj:`str`): The web location we want to retrieve.
+            offset (:obj:`int`, optional): The number of bytes at the start of the file to skip,
+                e.g. to resume an interrupted download. Defaults to ``0``.
+            read_timeout (:obj:`float` | :obj:`None`, optional): If passed, specifies the maximum
+                amount of time (in seconds) to wait for data from Telegram's server instead
+                of the time specified during creating of this object. Defaults to
+                :attr:`DEFAULT_NONE`.
+            write_timeout (:obj:`float` | :obj:`None`, optional): If passed, specifies the maximum
+                amount of time (in seconds) to wait for a write operation to complete (in terms of
+                a network socket) instead of the time specified during creating of this object.
+                Defaults to :attr:`DEFAULT_NONE`.
+            connect_timeout (:obj:`float` | :obj:`None`, optional): If passed, specifies the
+                maximum amount of time (in seconds) to wait for a connection attempt to a server
+                to succeed instead of the time specified during creating of this object. Defaults
+                to :attr:`DEFAULT_NONE`.
+            pool_timeout (:obj:`float` | :obj:`None`, optional): If passed, specifies the maximum
+                amount of time (in seconds) to wait for a connection to become available instead
+                of the time specified during creating of this object. Defaults to
+                :attr:`DEFAULT_NONE`.
+
+        Yields:
+            :obj:`bytes`: The next chunk of the files contents.
+        """
+        payload = await self.retrieve(
+            url,
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+        )
+        yield payload[offset:]
+
+    @staticmethod
+    async def _skip_bytes(chunks: AsyncIterator[bytes], count: int) -> AsyncIterator[bytes]:
+        """Skips the first ``count`` bytes of ``chunks``. For implementations of
+        :meth:`retrieve_stream` whose ``Range`` request was answered with the complete file.
+        """
+        async for chunk in chunks:
+            if count >= len(chunk):
+                count -= len(chunk)
+                continue
+            yield chunk[count:]
+            count = 0
+
     async def _request_wrapper(
         self,
         url: str,
@@ -305,18 +374,19 @@ class BaseRequest(
             TelegramError
 
         """
-        # Import needs to be here since HTTPXRequest is a subclass of BaseRequest
-        from telegram.request import HTTPXRequest  # pylint: disable=import-outside-toplevel
+        # Import needs to be here since these classes are subclasses of BaseRequest
+        # pylint: disable-next=import-outside-toplevel
+        from telegram.request import AiohttpRequest, HTTPXRequest, TrafficClassRequest
 
         # 20 is the documented default value for all the media related bot methods and custom
         # implementations of BaseRequest may explicitly rely on that. Hence, we follow the
         # standard deprecation policy and deprecate starting with version 20.7.
-        # For our own implementation HTTPXRequest, we can handle that ourselves, so we skip the
+        # For our own implementations, we can handle that ourselves, so we skip the
         # warning in that case.
         has_files = request_data and request_data.multipart_data
         if (
             has_files
-            and not isinstance(self, HTTPXRequest)
+            and not isinstance(self, (AiohttpRequest, HTTPXRequest, TrafficClassRequest))
             and isinstance(write_timeout, DefaultValue)
         ):
             warn(
@@ -345,10 +415,13 @@ class BaseRequest(
         except Exception as exc:
             raise NetworkError(f"Unknown error in HTTP implementation: {exc!r}") from exc
 
-        if HTTPStatus.OK <= code <= 299:
-            # 200-299 range are HTTP success statuses
-            return payload
+        # 200-299 range are HTTP success statuses
+        if not HTTPStatus.OK <= code <= 299:
+            self._raise_for_error_response(code, payload)
+        return payload
 
+    def _raise_for_error_response(self, code: int, payload: bytes) -> NoReturn:
+        """Raises the exception matching an unsuccessful response of the Bot API."""
         response_data = self.parse_json_payload(payload)
 
         description = response_data.get("description")
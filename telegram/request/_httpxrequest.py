@@ -17,7 +17,9 @@
 # You should have received a copy of the GNU Lesser Public License
 # along with this program.  If not, see [http://www.gnu.org/licenses/].
 """This module contains methods to make POST and GET requests using the httpx library."""
-from collections.abc import Collection
+import secrets
+from collections.abc import AsyncIterator, Collection
+from http import HTTPStatus
 from typing import Any, Optional, Union
 
 import httpx
@@ -26,7 +28,7 @@ from telegram._utils.defaultvalue import DefaultValue
 from telegram._utils.logging import get_logger
 from telegram._utils.types import HTTPVersion, ODVInput, SocketOpt
 from telegram._utils.warnings import warn
-from telegram.error import NetworkError, TimedOut
+from telegram.error import NetworkError, TelegramError, TimedOut
 from telegram.request._baserequest import BaseRequest
 from telegram.request._requestdata import RequestData
 from telegram.warnings import PTBDeprecationWarning
@@ -267,9 +269,93 @@ class HTTPXRequest(BaseRequest):
         if self._client.is_closed:
             raise RuntimeError("This HTTPXRequest is not initialized!")
 
-        files = request_data.multipart_data if request_data else None
-        data = request_data.json_parameters if request_data else None
+        timeout = self._build_timeout(
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+            has_files=request_data is not None and request_data.contains_files,
+        )
+
+        headers = {"User-Agent": self.USER_AGENT}
+        payload: dict[str, Any]
+        if request_data is not None and request_data.contains_files:
+            # We encode the multipart body ourselves instead of passing the files to httpx, such
+            # that files are streamed in chunks and read without blocking the event loop
+            boundary = secrets.token_hex(16)
+            headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+            if (content_length := request_data.multipart_content_length(boundary)) is not None:
+                headers["Content-Length"] = str(content_length)
+            payload = {"content": request_data.multipart_stream(boundary)}
+        else:
+            payload = {
+                "files": None,
+                "data": request_data.json_parameters if request_data else None,
+            }
+
+        try:
+            res = await self._client.request(
+                method=method,
+                url=url,
+                headers=headers,
+                timeout=timeout,
+                **payload,
+            )
+        except httpx.HTTPError as err:
+            raise self._convert_error(err) from err
 
+        return res.status_code, res.content
+
+    async def retrieve_stream(
+        self,
+        url: str,
+        offset: int = 0,
+        read_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        write_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        connect_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        pool_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+    ) -> AsyncIterator[bytes]:
+        """See :meth:`BaseRequest.retrieve_stream`. Streams the response and requests it from
+        :paramref:`~BaseRequest.retrieve_stream.offset` on via an HTTP ``Range`` header.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        if self._client.is_closed:
+            raise RuntimeError("This HTTPXRequest is not initialized!")
+
+        timeout = self._build_timeout(
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+        )
+        headers = {"User-Agent": self.USER_AGENT}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        try:
+            async with self._client.stream(
+                "GET", url, headers=headers, timeout=timeout
+            ) as response:
+                if not HTTPStatus.OK <= response.status_code <= 299:
+                    self._raise_for_error_response(response.status_code, await response.aread())
+
+                chunks = response.aiter_bytes()
+                if offset and response.status_code != HTTPStatus.PARTIAL_CONTENT:
+                    chunks = self._skip_bytes(chunks, offset)
+                async for chunk in chunks:
+                    yield chunk
+        except httpx.HTTPError as err:
+            raise self._convert_error(err) from err
+
+    def _build_timeout(
+        self,
+        read_timeout: ODVInput[float],
+        write_timeout: ODVInput[float],
+        connect_timeout: ODVInput[float],
+        pool_timeout: ODVInput[float],
+        has_files: bool = False,
+    ) -> httpx.Timeout:
         # If user did not specify timeouts (for e.g. in a bot method), use the default ones when we
         # created this instance.
         if isinstance(read_timeout, DefaultValue):
@@ -280,40 +366,31 @@ class HTTPXRequest(BaseRequest):
             pool_timeout = self._client.timeout.pool
 
         if isinstance(write_timeout, DefaultValue):
-            write_timeout = self._client.timeout.write if not files else self._media_write_timeout
+            write_timeout = (
+                self._client.timeout.write if not has_files else self._media_write_timeout
+            )
 
-        timeout = httpx.Timeout(
+        return httpx.Timeout(
             connect=connect_timeout,
             read=read_timeout,
             write=write_timeout,
             pool=pool_timeout,
         )
 
-        try:
-            res = await self._client.request(
-                method=method,
-                url=url,
-                headers={"User-Agent": self.USER_AGENT},
-                timeout=timeout,
-                files=files,
-                data=data,
+    @staticmethod
+    def _convert_error(err: httpx.HTTPError) -> TelegramError:
+        if isinstance(err, httpx.PoolTimeout):
+            return TimedOut(
+                message=(
+                    "Pool timeout: All connections in the connection pool are occupied. "
+                    "Request was *not* sent to Telegram. Consider adjusting the connection "
+                    "pool size or the pool timeout."
+                )
             )
-        except httpx.TimeoutException as err:
-            if isinstance(err, httpx.PoolTimeout):
-                raise TimedOut(
-                    message=(
-                        "Pool timeout: All connections in the connection pool are occupied. "
-                        "Request was *not* sent to Telegram. Consider adjusting the connection "
-                        "pool size or the pool timeout."
-                    )
-                ) from err
-            raise TimedOut from err
-        except httpx.HTTPError as err:
-            # HTTPError must come last as its the base httpx exception class
-            # TODO p4: do something smart here; for now just raise NetworkError
+        if isinstance(err, httpx.TimeoutException):
+            return TimedOut()
+        # TODO p4: do something smart here; for now just raise NetworkError
 
-            # We include the class name for easier debugging. Especially useful if the error
-            # message of `err` is empty.
-            raise NetworkError(f"httpx.{err.__class__.__name__}: {err}") from err
-
-        return res.status_code, res.content
+        # We include the class name for easier debugging. Especially useful if the error
+        # message of `err` is empty.
+        return NetworkError(f"httpx.{err.__class__.__name__}: {err}")
@@ -18,13 +18,24 @@
 #  along with this program.  If not, see [http://www.gnu.org/licenses/].
 """This module contains a class that holds the parameters of a request to the Bot API."""
 import json
-from typing import Any, Optional, Union, final
+from collections.abc import AsyncIterator
+from typing import Any, Final, Optional, Union, final
 from urllib.parse import urlencode
 
+from telegram._utils.files import get_content_length, iter_file_content
 from telegram._utils.strings import TextEncoding
-from telegram._utils.types import UploadFileDict
+from telegram._utils.types import FileContent, UploadFileDict
 from telegram.request._requestparameter import RequestParameter
 
+_MULTIPART_CHUNK_SIZE: Final[int] = 64 * 1024
+# Escaping of names and file names in the multipart headers as done by browsers, see
+# https://html.spec.whatwg.org/#multipart-form-data
+_MULTIPART_ESCAPES: Final[dict[int, str]] = {
+    ord('"'): "%22",
+    ord("\r"): "%0D",
+    ord("\n"): "%0A",
+}
+
 
 @final
 class RequestData:
@@ -133,6 +144,9 @@ class RequestData:
 
         .. versionchanged:: 21.5
             Content may now be a file handle.
+        .. versionchanged:: NEXT.VERSION
+            Content may now be an asynchronous iterable, see :class:`telegram.InputFile`. Use
+            :meth:`multipart_stream` to support those.
         """
         multipart_data: UploadFileDict = {}
         for param in self._parameters:
@@ -140,3 +154,71 @@ class RequestData:
             if m_data:
                 multipart_data.update(m_data)
         return multipart_data
+
+    def _multipart_parts(self, boundary: str) -> list[tuple[bytes, FileContent]]:
+        """The header and the content of each part of the multipart body."""
+        parts: list[tuple[bytes, FileContent]] = []
+        for name, value in self.json_parameters.items():
+            header = (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name.translate(_MULTIPART_ESCAPES)}"'
+                "\r\n\r\n"
+            )
+            parts.append((header.encode(TextEncoding.UTF_8), value.encode(TextEncoding.UTF_8)))
+        for name, (filename, content, mimetype) in self.multipart_data.items():
+            header = (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name.translate(_MULTIPART_ESCAPES)}"; '
+                f'filename="{filename.translate(_MULTIPART_ESCAPES)}"\r\n'
+                f"Content-Type: {mimetype}\r\n\r\n"
+            )
+            parts.append((header.encode(TextEncoding.UTF_8), content))
+        return parts
+
+    async def multipart_stream(
+        self, boundary: str, chunk_size: int = _MULTIPART_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Encodes the parameters and files as ``multipart/form-data`` body and yields it in
+        chunks. Files are read only while the body is consumed and in chunks of at most
+        :paramref:`chunk_size` bytes, so uploading a file needs only little memory independent of
+        its size. Reading from the file system is done in a worker thread.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            boundary (:obj:`str`): The boundary between the parts of the body. Must also be passed
+                in the ``Content-Type`` header as
+                ``multipart/form-data; boundary=<boundary>``.
+            chunk_size (:obj:`int`, optional): The maximal number of bytes to read from a file at
+                once. Defaults to 64 KiB.
+
+        Yields:
+            :obj:`bytes`: The next chunk of the body.
+        """
+        for header, content in self._multipart_parts(boundary):
+            yield header
+            async for chunk in iter_file_content(content, chunk_size):
+                yield chunk
+            yield b"\r\n"
+        yield f"--{boundary}--\r\n".encode(TextEncoding.UTF_8)
+
+    def multipart_content_length(self, boundary: str) -> Optional[int]:
+        """The number of bytes that :meth:`multipart_stream` yields for the given boundary.
+
+        .. versionadded:: NEXT.VERSION
+
+        Args:
+            boundary (:obj:`str`): The boundary between the parts of the body.
+
+        Returns:
+            :obj:`int` | :obj:`None`: The length of the body or :obj:`None`, if it is not known in
+            advance, e.g. because a file is given as asynchronous iterable. In that case, the body
+            has to be sent with ``Transfer-Encoding: chunked``.
+        """
+        length = len(f"--{boundary}--\r\n")
+        for header, content in self._multipart_parts(boundary):
+            content_length = get_content_length(content)
+            if content_length is None:
+                return None
+            length += len(header) + content_length + 2
+        return length
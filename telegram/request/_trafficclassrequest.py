@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""This module contains a class that distributes requests over several request objects by their
+traffic class.
+"""
+import asyncio
+from collections.abc import AsyncIterator, Mapping
+from types import MappingProxyType
+from typing import Final, Optional
+
+from telegram._utils.types import ODVInput
+from telegram.request._baserequest import BaseRequest
+from telegram.request._requestdata import RequestData
+
+
+class TrafficClassRequest(BaseRequest):
+    """Implementation of :class:`~telegram.request.BaseRequest` that distributes the requests over
+    several request objects, one for each traffic class. This way, e.g. a wave of large uploads
+    can not occupy the connections needed for answering callback queries, as each class has its
+    own connection pool and default timeouts.
+
+    The traffic class of a request is determined as follows:
+
+    1. Downloads of files, i.e. :meth:`retrieve`, belong to :attr:`DOWNLOAD`.
+    2. Endpoints listed in :paramref:`endpoint_classes` belong to the given class.
+    3. Requests that upload files belong to :attr:`MEDIA_UPLOAD`.
+    4. Endpoints listed in :attr:`DEFAULT_ENDPOINT_CLASSES` belong to the given class.
+    5. All other requests belong to :paramref:`default_class`.
+
+    Requests of classes that are not in :paramref:`requests` are made with the request object of
+    :paramref:`default_class`.
+
+    Examples:
+        .. code-block:: python
+
+            request = TrafficClassRequest(
+                {
+                    TrafficClassRequest.INTERACTIVE: HTTPXRequest(connection_pool_size=64),
+                    TrafficClassRequest.BULK: HTTPXRequest(
+                        connection_pool_size=128, pool_timeout=None
+                    ),
+                    TrafficClassRequest.MEDIA_UPLOAD: HTTPXRequest(
+                        connection_pool_size=16, pool_timeout=None
+                    ),
+                },
+                endpoint_classes={"sendMessage": TrafficClassRequest.BULK},
+            )
+
+    .. seealso:: :meth:`telegram.ext.ApplicationBuilder.traffic_classes`
+
+    .. versionadded:: NEXT.VERSION
+
+    Args:
+        requests (Mapping[:obj:`str`, :class:`telegram.request.BaseRequest`]): The request
+            objects by the names of the traffic classes. Must contain :paramref:`default_class`.
+        endpoint_classes (Mapping[:obj:`str`, :obj:`str`], optional): Maps names of Bot API
+            endpoints, e.g. ``"sendMessage"``, to the names of traffic classes. Takes precedence
+            over all other rules except for downloads.
+        default_class (:obj:`str`, optional): The traffic class of requests that match no other
+            rule. Defaults to :attr:`INTERACTIVE`.
+
+    Raises:
+        :exc:`ValueError`: If :paramref:`requests` doesn't contain :paramref:`default_class`.
+    """
+
+    __slots__ = ("_default_class", "_endpoint_classes", "_requests")
+
+    INTERACTIVE: Final[str] = "interactive"
+    """:obj:`str`: Traffic class for requests that a user waits for, e.g. answering callback
+    queries."""
+    BULK: Final[str] = "bulk"
+    """:obj:`str`: Traffic class for requests that are made many times in a row, e.g. forwarding
+    or deleting many messages."""
+    MEDIA_UPLOAD: Final[str] = "media_upload"
+    """:obj:`str`: Traffic class for requests that upload files."""
+    DOWNLOAD: Final[str] = "download"
+    """:obj:`str`: Traffic class for downloading files."""
+    DEFAULT_ENDPOINT_CLASSES: Final[Mapping[str, str]] = MappingProxyType(
+        {
+            "copyMessage": BULK,
+            "copyMessages": BULK,
+            "deleteMessage": BULK,
+            "deleteMessages": BULK,
+            "forwardMessage": BULK,
+            "forwardMessages": BULK,
+            "sendMediaGroup": BULK,
+        }
+    )
+    """Mapping[:obj:`str`, :obj:`str`]: The traffic classes of endpoints that are usually used
+    for bulk operations. Requests to these endpoints that upload files still belong to
+    :attr:`MEDIA_UPLOAD`."""
+
+    def __init__(
+        self,
+        requests: Mapping[str, BaseRequest],
+        endpoint_classes: Optional[Mapping[str, str]] = None,
+        default_class: str = INTERACTIVE,
+    ):
+        if default_class not in requests:
+            raise ValueError(
+                f"No request object was passed for the default class {default_class}."
+            )
+
+        self._requests: dict[str, BaseRequest] = dict(requests)
+        self._endpoint_classes: dict[str, str] = dict(endpoint_classes or {})
+        self._default_class: str = default_class
+
+    @property
+    def requests(self) -> Mapping[str, BaseRequest]:
+        """Mapping[:obj:`str`, :class:`telegram.request.BaseRequest`]: The request objects by the
+        names of the traffic classes.
+        """
+        return MappingProxyType(self._requests)
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        """See :attr:`BaseRequest.read_timeout`.
+
+        Returns:
+            :obj:`float` | :obj:`None`: The default read timeout of the request object of
+                :paramref:`default_class`.
+        """
+        return self._requests[self._default_class].read_timeout
+
+    def _unique_requests(self) -> list[BaseRequest]:
+        # The same object may be used for several classes
+        return list({id(request): request for request in self._requests.values()}.values())
+
+    async def initialize(self) -> None:
+        """See :meth:`BaseRequest.initialize`. Initializes all request objects."""
+        await asyncio.gather(*(request.initialize() for request in self._unique_requests()))
+
+    async def shutdown(self) -> None:
+        """See :meth:`BaseRequest.shutdown`. Shuts down all request objects."""
+        await asyncio.gather(*(request.shutdown() for request in self._unique_requests()))
+
+    def get_traffic_class(
+        self, url: str, method: str, request_data: Optional[RequestData] = None
+    ) -> str:
+        """Determines the traffic class of a request, as described above.
+
+        Args:
+            url (:obj:`str`): The URL of the request.
+            method (:obj:`str`): HTTP method (i.e. ``'POST'``, ``'GET'``, etc.).
+            request_data (:class:`telegram.request.RequestData`, optional): The data of the
+                request.
+
+        Returns:
+            :obj:`str`: The name of the traffic class.
+        """
+        if method == "GET":
+            return self.DOWNLOAD
+
+        endpoint = url.rsplit("/", 1)[-1]
+        if (traffic_class := self._endpoint_classes.get(endpoint)) is not None:
+            return traffic_class
+        if request_data is not None and request_data.contains_files:
+            return self.MEDIA_UPLOAD
+        return self.DEFAULT_ENDPOINT_CLASSES.get(endpoint, self._default_class)
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        write_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        connect_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        pool_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+    ) -> tuple[int, bytes]:
+        """See :meth:`BaseRequest.do_request`. Passes the request on to the request object of
+        its traffic class.
+        """
+        request = self._get_request(url, method, request_data)
+        return await request.do_request(
+            url=url,
+            method=method,
+            request_data=request_data,
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+        )
+
+    async def retrieve_stream(
+        self,
+        url: str,
+        offset: int = 0,
+        read_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        write_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        connect_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+        pool_timeout: ODVInput[float] = BaseRequest.DEFAULT_NONE,
+    ) -> AsyncIterator[bytes]:
+        """See :meth:`BaseRequest.retrieve_stream`. Passes the download on to the request object
+        of :attr:`DOWNLOAD`.
+
+        .. versionadded:: NEXT.VERSION
+        """
+        request = self._get_request(url, "GET")
+        async for chunk in request.retrieve_stream(
+            url,
+            offset=offset,
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+        ):
+            yield chunk
+
+    def _get_request(
+        self, url: str, method: str, request_data: Optional[RequestData] = None
+    ) -> BaseRequest:
+        traffic_class = self.get_traffic_class(url, method, request_data)
+        return self._requests.get(traffic_class) or self._requests[self._default_class]
@@ -17,18 +17,34 @@
 # You should have received a copy of the GNU Lesser Public License
 # along with this program.  If not, see [http://www.gnu.org/licenses/].
 import os
+import tracemalloc
 from io import BytesIO
 from pathlib import Path
 from tempfile import TemporaryFile, mkstemp
 
 import pytest
 
-from telegram import File, FileCredentials, Voice
-from telegram.error import TelegramError
+from telegram import Bot, File, FileCredentials, Voice
+from telegram.error import BadRequest, NetworkError, TelegramError
+from telegram.request import HTTPXRequest
 from tests.auxil.files import data_file
+from tests.auxil.networking import FakeBotAPIServer
 from tests.auxil.slots import mro_slots
 
 
+def patch_retrieve_stream(monkeypatch, file, content):
+    """Lets the request object of the files bot return ``content`` in chunks of 5 bytes."""
+    offsets = []
+
+    async def retrieve_stream(url, offset=0, *args, **kwargs):
+        offsets.append(offset)
+        for i in range(offset, len(content), 5):
+            yield content[i : i + 5]
+
+    monkeypatch.setattr(file.get_bot().request, "retrieve_stream", retrieve_stream)
+    return offsets
+
+
 @pytest.fixture(scope="module")
 def file(bot):
     file = File(
@@ -153,10 +169,7 @@ class TestFileWithoutRequest(FileTestBase):
         assert hash(a) != hash(e)
 
     async def test_download(self, monkeypatch, file):
-        async def test(*args, **kwargs):
-            return self.file_content
-
-        monkeypatch.setattr(file.get_bot().request, "retrieve", test)
+        patch_retrieve_stream(monkeypatch, file, self.file_content)
         out_file = await file.download_to_drive()
 
         try:
@@ -168,10 +181,7 @@ class TestFileWithoutRequest(FileTestBase):
         "custom_path_type", [str, Path], ids=["str custom_path", "pathlib.Path custom_path"]
     )
     async def test_download_custom_path(self, monkeypatch, file, custom_path_type):
-        async def test(*args, **kwargs):
-            return self.file_content
-
-        monkeypatch.setattr(file.get_bot().request, "retrieve", test)
+        patch_retrieve_stream(monkeypatch, file, self.file_content)
         file_handle, custom_path = mkstemp()
         custom_path = Path(custom_path)
         try:
@@ -183,20 +193,14 @@ class TestFileWithoutRequest(FileTestBase):
             custom_path.unlink(missing_ok=True)
 
     async def test_download_file_obj(self, monkeypatch, file):
-        async def test(*args, **kwargs):
-            return self.file_content
-
-        monkeypatch.setattr(file.get_bot().request, "retrieve", test)
+        patch_retrieve_stream(monkeypatch, file, self.file_content)
         with TemporaryFile() as custom_fobj:
             await file.download_to_memory(out=custom_fobj)
             custom_fobj.seek(0)
             assert custom_fobj.read() == self.file_content
 
     async def test_download_bytearray(self, monkeypatch, file):
-        async def test(*args, **kwargs):
-            return self.file_content
-
-        monkeypatch.setattr(file.get_bot().request, "retrieve", test)
+        patch_retrieve_stream(monkeypatch, file, self.file_content)
 
         # Check that a download to a newly allocated bytearray works.
         buf = await file.download_as_bytearray()
@@ -210,10 +214,9 @@ class TestFileWithoutRequest(FileTestBase):
         assert buf2[: len(buf)] == buf
 
     async def test_download_encrypted(self, monkeypatch, offline_bot, encrypted_file):
-        async def test(*args, **kwargs):
-            return data_file("image_encrypted.jpg").read_bytes()
-
-        monkeypatch.setattr(encrypted_file.get_bot().request, "retrieve", test)
+        patch_retrieve_stream(
+            monkeypatch, encrypted_file, data_file("image_encrypted.jpg").read_bytes()
+        )
         out_file = await encrypted_file.download_to_drive()
 
         try:
@@ -222,30 +225,27 @@ class TestFileWithoutRequest(FileTestBase):
             out_file.unlink(missing_ok=True)
 
     async def test_download_file_obj_encrypted(self, monkeypatch, encrypted_file):
-        async def test(*args, **kwargs):
-            return data_file("image_encrypted.jpg").read_bytes()
-
-        monkeypatch.setattr(encrypted_file.get_bot().request, "retrieve", test)
+        patch_retrieve_stream(
+            monkeypatch, encrypted_file, data_file("image_encrypted.jpg").read_bytes()
+        )
         with TemporaryFile() as custom_fobj:
             await encrypted_file.download_to_memory(out=custom_fobj)
             custom_fobj.seek(0)
             assert custom_fobj.read() == data_file("image_decrypted.jpg").read_bytes()
 
     async def test_download_file_obj_local_file_encrypted(self, monkeypatch, encrypted_local_file):
-        async def test(*args, **kwargs):
-            return data_file("image_encrypted.jpg").read_bytes()
-
-        monkeypatch.setattr(encrypted_local_file.get_bot().request, "retrieve", test)
+        patch_retrieve_stream(
+            monkeypatch, encrypted_local_file, data_file("image_encrypted.jpg").read_bytes()
+        )
         with TemporaryFile() as custom_fobj:
             await encrypted_local_file.download_to_memory(out=custom_fobj)
             custom_fobj.seek(0)
             assert custom_fobj.read() == data_file("image_decrypted.jpg").read_bytes()
 
     async def test_download_bytearray_encrypted(self, monkeypatch, encrypted_file):
-        async def test(*args, **kwargs):
-            return data_file("image_encrypted.jpg").read_bytes()
-
-        monkeypatch.setattr(encrypted_file.get_bot().request, "retrieve", test)
+        patch_retrieve_stream(
+            monkeypatch, encrypted_file, data_file("image_encrypted.jpg").read_bytes()
+        )
 
         # Check that a download to a newly allocated bytearray works.
         buf = await encrypted_file.download_as_bytearray()
@@ -258,6 +258,111 @@ class TestFileWithoutRequest(FileTestBase):
         assert buf2[len(buf) :] == buf
         assert buf2[: len(buf)] == buf
 
+    async def test_iter_bytes(self, monkeypatch, file):
+        offsets = patch_retrieve_stream(monkeypatch, file, self.file_content)
+        chunks = [chunk async for chunk in file.iter_bytes()]
+        assert len(chunks) > 1
+        assert b"".join(chunks) == self.file_content
+
+        assert b"".join([chunk async for chunk in file.iter_bytes(offset=3)]) == (
+            self.file_content[3:]
+        )
+        assert offsets == [0, 3]
+
+    async def test_iter_bytes_encrypted(self, monkeypatch, encrypted_file):
+        offsets = patch_retrieve_stream(
+            monkeypatch, encrypted_file, data_file("image_encrypted.jpg").read_bytes()
+        )
+        decrypted = data_file("image_decrypted.jpg").read_bytes()
+        assert b"".join([chunk async for chunk in encrypted_file.iter_bytes()]) == decrypted
+        assert b"".join([chunk async for chunk in encrypted_file.iter_bytes(10)]) == (
+            decrypted[10:]
+        )
+        # Encrypted files are always downloaded completely
+        assert offsets == [0, 0]
+
+    async def test_iter_bytes_local_file(self, local_file):
+        content = Path(local_file.file_path).read_bytes()
+        assert b"".join([chunk async for chunk in local_file.iter_bytes()]) == content
+        assert b"".join([chunk async for chunk in local_file.iter_bytes(offset=4)]) == (
+            content[4:]
+        )
+
+    async def test_download_resume(self, monkeypatch, file, tmp_path):
+        offsets = patch_retrieve_stream(monkeypatch, file, self.file_content)
+        out_file = tmp_path / "file"
+        out_file.write_bytes(self.file_content[:4])
+
+        assert await file.download_to_drive(out_file, resume=True) == out_file
+        assert out_file.read_bytes() == self.file_content
+        assert offsets == [4]
+
+        # Without resume, the file is overwritten
+        assert await file.download_to_drive(out_file) == out_file
+        assert out_file.read_bytes() == self.file_content
+        assert offsets == [4, 0]
+
+    async def test_download_resume_file_size(self, monkeypatch, file, tmp_path):
+        offsets = patch_retrieve_stream(monkeypatch, file, self.file_content)
+        out_file = tmp_path / "file"
+
+        # The file is already complete
+        out_file.write_bytes(bytes(file.file_size))
+        await file.download_to_drive(out_file, resume=True)
+        assert offsets == []
+
+        # The file can't be a partial download of this file
+        out_file.write_bytes(bytes(file.file_size + 1))
+        await file.download_to_drive(out_file, resume=True)
+        assert out_file.read_bytes() == self.file_content
+        assert offsets == [0]
+
+    async def test_download_failure_keeps_partial_file(self, monkeypatch, file, tmp_path):
+        async def retrieve_stream(*args, **kwargs):
+            yield self.file_content[:4]
+            raise NetworkError("connection lost")
+
+        monkeypatch.setattr(file.get_bot().request, "retrieve_stream", retrieve_stream)
+        out_file = tmp_path / "file"
+        with pytest.raises(NetworkError, match="connection lost"):
+            await file.download_to_drive(out_file)
+        assert out_file.read_bytes() == self.file_content[:4]
+
+        patch_retrieve_stream(monkeypatch, file, self.file_content)
+        await file.download_to_drive(out_file, resume=True)
+        assert out_file.read_bytes() == self.file_content
+
+    async def test_download_is_streamed(self, tmp_path):
+        """Downloading a large file must only need memory in the order of the chunk size."""
+        file_size = 32 * 1024 * 1024
+        content = os.urandom(file_size)
+        out_file = tmp_path / "file"
+
+        async with FakeBotAPIServer(download_content=content) as server, HTTPXRequest() as request:
+            file = File(self.file_id, self.file_unique_id, file_size, server.file_url)
+            file.set_bot(Bot("123:abc", request=request))
+            tracemalloc.start()
+            try:
+                await file.download_to_drive(out_file)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+            assert out_file.read_bytes() == content
+            assert peak < file_size / 8
+
+            # Interrupted downloads are resumed with a range request
+            with out_file.open("r+b") as out:
+                out.truncate(file_size // 2)
+            await file.download_to_drive(out_file, resume=True)
+            assert out_file.read_bytes() == content
+            assert f"Range: bytes={file_size // 2}-" in server.requests[-1][0]
+
+            file = File(self.file_id, self.file_unique_id, file_size, server.file_url + "_too_big")
+            file.set_bot(Bot("123:abc", request=request))
+            with pytest.raises(BadRequest, match="file is too big"):
+                await file.download_to_drive(tmp_path / "other_file")
+
     async def test_download_no_file_path(self):
         with pytest.raises(RuntimeError, match="No `file_path` available"):
             await File(self.file_id, self.file_unique_id).download_to_drive()
@@ -265,6 +370,8 @@ class TestFileWithoutRequest(FileTestBase):
             await File(self.file_id, self.file_unique_id).download_to_memory(BytesIO())
         with pytest.raises(RuntimeError, match="No `file_path` available"):
             await File(self.file_id, self.file_unique_id).download_as_bytearray()
+        with pytest.raises(RuntimeError, match="No `file_path` available"):
+            await File(self.file_id, self.file_unique_id).iter_bytes().__anext__()
 
 
 class TestFileWithRequest(FileTestBase):
@@ -291,6 +398,19 @@ class TestFileWithRequest(FileTestBase):
             os.close(file_handle)
             custom_path.unlink(missing_ok=True)
 
+    @pytest.mark.parametrize("hard_link", [True, False])
+    async def test_download_custom_path_local_file_hard_link(self, tmp_path, hard_link):
+        source = tmp_path / "server" / "file"
+        source.parent.mkdir()
+        source.write_bytes(self.file_content)
+        local_file = File(self.file_id, self.file_unique_id, file_path=str(source))
+        custom_path = tmp_path / "custom"
+
+        out_file = await local_file.download_to_drive(custom_path, hard_link=hard_link)
+        assert out_file == custom_path
+        assert out_file.read_bytes() == self.file_content
+        assert source.samefile(custom_path) is hard_link
+
     async def test_download_file_obj_local_file(self, local_file):
         with TemporaryFile() as custom_fobj:
             await local_file.download_to_memory(out=custom_fobj)
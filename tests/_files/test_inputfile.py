@@ -20,6 +20,7 @@ import contextlib
 import subprocess
 import sys
 from io import BufferedReader, BytesIO
+from pathlib import Path
 
 import pytest
 
@@ -56,6 +57,31 @@ class TestInputFileWithoutRequest:
             # This exception may be thrown if the process has finished before we had the chance
             # to kill it.
 
+    def test_path(self, png_file):
+        input_file = InputFile(png_file)
+        # The file is not read on initialization
+        assert input_file.input_file_content == png_file
+        assert input_file.filename == "game.png"
+        assert input_file.mimetype == "image/png"
+        assert InputFile(png_file, filename="custom.jpg").filename == "custom.jpg"
+
+        # Networking backends get a file handle that opens the file only when it is read
+        filename, content, mimetype = input_file.field_tuple
+        assert (filename, mimetype) == ("game.png", "image/png")
+        assert not isinstance(content, Path)
+        assert content.read() == png_file.read_bytes()
+        content.close()
+
+    def test_async_iterable(self):
+        async def content():
+            yield b"data"
+
+        iterable = content()
+        input_file = InputFile(iterable, filename="file.txt")
+        assert input_file.input_file_content is iterable
+        assert input_file.field_tuple == ("file.txt", iterable, "text/plain")
+        assert InputFile(content()).filename == "application.octet-stream"
+
     @pytest.mark.parametrize("attach", [True, False])
     def test_attach(self, attach):
         input_file = InputFile("contents", attach=attach)
@@ -17,6 +17,8 @@
 # You should have received a copy of the GNU Lesser Public License
 # along with this program.  If not, see [http://www.gnu.org/licenses/].
 import contextlib
+import os
+import shutil
 import subprocess
 import sys
 from pathlib import Path
@@ -97,6 +99,53 @@ class TestFiles:
         assert isinstance(parsed, InputFile)
         assert parsed.filename == "test_file"
 
+    @pytest.mark.parametrize("path", [str, Path], ids=["str", "Path"])
+    def test_parse_file_input_path_is_not_read(self, path):
+        source_file = data_file("game.gif")
+        parsed = telegram._utils.files.parse_file_input(path(source_file))
+
+        assert isinstance(parsed, InputFile)
+        assert parsed.input_file_content == source_file
+        assert parsed.filename == "game.gif"
+        assert parsed.mimetype == "image/gif"
+
+    @pytest.mark.parametrize("hard_link", [True, False])
+    @pytest.mark.parametrize("copy_file_range", [True, False])
+    def test_copy_local_file(self, tmp_path, monkeypatch, hard_link, copy_file_range):
+        if not copy_file_range:
+            monkeypatch.delattr(os, "copy_file_range", raising=False)
+        source = tmp_path / "source"
+        source.write_bytes(bytes(range(256)) * 1024)
+        destination = tmp_path / "destination"
+        destination.write_bytes(b"existing content is overwritten")
+
+        telegram._utils.files.copy_local_file(source, destination, hard_link=hard_link)
+
+        assert destination.read_bytes() == source.read_bytes()
+        assert source.samefile(destination) is hard_link
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["destination", "source"]
+
+    def test_copy_local_file_link_fails(self, tmp_path, monkeypatch):
+        def link(*args):
+            raise OSError("Invalid cross-device link")
+
+        monkeypatch.setattr(os, "link", link)
+        source = tmp_path / "source"
+        source.write_bytes(b"content")
+        destination = tmp_path / "destination"
+
+        telegram._utils.files.copy_local_file(source, destination, hard_link=True)
+        assert destination.read_bytes() == b"content"
+        assert not source.samefile(destination)
+
+    @pytest.mark.parametrize("hard_link", [True, False])
+    def test_copy_local_file_same_file(self, tmp_path, hard_link):
+        source = tmp_path / "source"
+        source.write_bytes(b"content")
+        with pytest.raises(shutil.SameFileError):
+            telegram._utils.files.copy_local_file(source, source, hard_link=hard_link)
+        assert source.read_bytes() == b"content"
+
     def test_parse_file_input_bytes(self):
         source_file = data_file("text_file.txt")
         parsed = telegram._utils.files.parse_file_input(source_file.read_bytes())
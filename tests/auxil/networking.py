@@ -16,6 +16,7 @@
 #
 #  You should have received a copy of the GNU Lesser Public License
 #  along with this program.  If not, see [http://www.gnu.org/licenses/].
+import asyncio
 from pathlib import Path
 from typing import Optional
 
@@ -29,6 +30,146 @@ from telegram.error import BadRequest, RetryAfter, TimedOut
 from telegram.request import BaseRequest, HTTPXRequest, RequestData
 
 
+class FakeBotAPIServer:
+    """A minimal local HTTP/1.1 server that stands in for the Bot API. Answers ``getUpdates`` with
+    an empty list after ``get_updates_delay`` seconds and all other requests with ``True``.
+    Requests that upload files are answered only after ``upload_delay`` seconds.
+
+    Use as ``async with FakeBotAPIServer() as server:`` and make requests to ``server.url``.
+    If ``keep_bodies`` is False, only the first 64 KiB of each body are kept in ``requests``, so
+    that the server doesn't hold large uploads in memory.
+
+    GET requests to ``server.file_url`` are answered with ``download_content``. ``Range`` headers
+    are respected unless ``range_requests`` is False. Downloading ``server.file_url + "_too_big"``
+    fails with a ``BadRequest``.
+    """
+
+    def __init__(
+        self,
+        upload_delay: float = 0,
+        get_updates_delay: float = 0,
+        keep_bodies: bool = True,
+        download_content: bytes = b"",
+        range_requests: bool = True,
+    ):
+        self.upload_delay = upload_delay
+        self.get_updates_delay = get_updates_delay
+        self.keep_bodies = keep_bodies
+        self.download_content = download_content
+        self.range_requests = range_requests
+        # The header and the body of all received requests
+        self.requests: list[tuple[str, bytes]] = []
+        # The size of the body of all received requests
+        self.body_sizes: list[int] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connection_tasks: set[asyncio.Task] = set()
+
+    @property
+    def url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/bot123"
+
+    @property
+    def file_url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/file/bot123/file"
+
+    async def __aenter__(self) -> "FakeBotAPIServer":
+        self._server = await asyncio.start_server(self._handle_connection, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self._server.close()
+        # Close keep-alive connections that are still open
+        for task in self._connection_tasks:
+            task.cancel()
+        await asyncio.gather(*self._connection_tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    @staticmethod
+    async def _read_body(reader, header: str):
+        if "transfer-encoding: chunked" in header.lower():
+            while size := int(await reader.readuntil(b"\r\n"), 16):
+                yield await reader.readexactly(size)
+                await reader.readexactly(2)
+            await reader.readexactly(2)
+            return
+
+        content_length = 0
+        for line in header.split("\r\n"):
+            if line.lower().startswith("content-length:"):
+                content_length = int(line.split(":")[1])
+        while content_length:
+            chunk = await reader.read(min(content_length, 64 * 1024))
+            if not chunk:
+                raise asyncio.IncompleteReadError(b"", content_length)
+            content_length -= len(chunk)
+            yield chunk
+
+    async def _send_file(self, writer, header: str, path: str) -> None:
+        if path.endswith("_too_big"):
+            response = b'{"ok": false, "error_code": 400, "description": "file is too big"}'
+            writer.write(
+                b"HTTP/1.1 400 Bad Request\r\nContent-Type: application/json\r\n"
+                b"Content-Length: " + str(len(response)).encode() + b"\r\n\r\n" + response
+            )
+            await writer.drain()
+            return
+
+        content = memoryview(self.download_content)
+        status = b"200 OK"
+        for line in header.split("\r\n"):
+            if self.range_requests and line.lower().startswith("range: bytes="):
+                content = content[int(line.split("=")[1].rstrip("-")) :]
+                status = b"206 Partial Content"
+        writer.write(
+            b"HTTP/1.1 " + status + b"\r\nContent-Type: application/octet-stream\r\n"
+            b"Content-Length: " + str(len(content)).encode() + b"\r\n\r\n"
+        )
+        # Send the file in chunks, so that the server doesn't buffer large files
+        for i in range(0, len(content), 64 * 1024):
+            writer.write(content[i : i + 64 * 1024])
+            await writer.drain()
+
+    async def _handle_connection(self, reader, writer) -> None:
+        task = asyncio.current_task()
+        self._connection_tasks.add(task)
+        try:
+            while True:
+                header = (await reader.readuntil(b"\r\n\r\n")).decode()
+                body = bytearray()
+                body_size = 0
+                async for chunk in self._read_body(reader, header):
+                    body_size += len(chunk)
+                    if self.keep_bodies or len(body) < 64 * 1024:
+                        body += chunk
+                self.requests.append((header, bytes(body)))
+                self.body_sizes.append(body_size)
+
+                response = b'{"ok": true, "result": true}'
+                # The request line is e.g. "POST /bot123/getUpdates HTTP/1.1"
+                path = header.split(" ", 2)[1]
+                if path.startswith("/file/"):
+                    await self._send_file(writer, header, path)
+                    continue
+                if path.endswith("/getUpdates"):
+                    await asyncio.sleep(self.get_updates_delay)
+                    response = b'{"ok": true, "result": []}'
+                elif b"filename=" in body:
+                    await asyncio.sleep(self.upload_delay)
+
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(response)).encode() + b"\r\n\r\n" + response
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connection_tasks.discard(task)
+            writer.close()
+
+
 class NonchalantHttpxRequest(HTTPXRequest):
     """This Request class is used in the tests to suppress errors that we don't care about
     in the test suite.
@@ -40,7 +40,12 @@ from telegram.ext import Defaults
 from tests.auxil.build_messages import DATE
 from tests.auxil.ci_bots import BOT_INFO_PROVIDER, JOB_INDEX
 from tests.auxil.constants import PRIVATE_KEY, TEST_TOPIC_ICON_COLOR, TEST_TOPIC_NAME
-from tests.auxil.envvars import GITHUB_ACTION, RUN_TEST_OFFICIAL, TEST_WITH_OPT_DEPS
+from tests.auxil.envvars import (
+    GITHUB_ACTION,
+    RUN_BENCHMARKS,
+    RUN_TEST_OFFICIAL,
+    TEST_WITH_OPT_DEPS,
+)
 from tests.auxil.files import data_file
 from tests.auxil.networking import NonchalantHttpxRequest
 from tests.auxil.pytest_classes import PytestBot, make_bot
@@ -76,8 +81,11 @@ def no_rerun_after_xfail_or_flood(error, name, test: pytest.Function, plugin):
 
 
 def pytest_collection_modifyitems(items: list[pytest.Item]):
-    """Here we add a flaky marker to all request making tests and a (no_)req marker to the rest."""
+    """Here we add a flaky marker to all request making tests and a (no_)req marker to the rest.
+    Benchmarks are skipped unless they were requested explicitly."""
     for item in items:  # items are the test methods
+        if item.get_closest_marker(name="benchmark") and not RUN_BENCHMARKS:
+            item.add_marker(pytest.mark.skip(reason="Set TEST_BENCHMARKS=true to run benchmarks"))
         parent = item.parent  # Get the parent of the item (class, or module if defined outside)
         if parent is None:  # should never happen, but just in case
             return
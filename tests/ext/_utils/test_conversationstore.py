@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import enum
+import tracemalloc
+
+import pytest
+
+from telegram.ext._utils.conversationstore import ConversationStateStore
+from telegram.ext._utils.trackingdict import TrackingDict
+from tests.auxil.slots import mro_slots
+
+
+class State(enum.Enum):
+    ONE = 1
+    TWO = 2
+
+
+@pytest.fixture
+def store() -> ConversationStateStore:
+    store = ConversationStateStore(track_writes=True)
+    store.update_no_track({(1, 2): 1})
+    return store
+
+
+@pytest.fixture
+def data() -> dict:
+    return {(1, 2): 1}
+
+
+class TestConversationStateStore:
+    def test_slot_behaviour(self, store):
+        for attr in store.__slots__:
+            assert getattr(store, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(store)) == len(set(mro_slots(store))), "duplicate slot"
+
+    def test_deleted_marker(self):
+        assert ConversationStateStore.DELETED is TrackingDict.DELETED
+
+    @pytest.mark.parametrize(
+        "key",
+        [
+            (1,),
+            (-1, 2),
+            (1, -2, 3),
+            (2**63 - 1, -(2**63), 0),
+            (2**63, 1),
+            (1, 2, 3, 4),
+            (),
+            (1, "inline_message_id"),
+            (True, 1),
+        ],
+    )
+    def test_key_round_trip(self, key):
+        store = ConversationStateStore()
+        store[key] = "state"
+        assert key in store
+        assert store[key] == "state"
+        (stored_key,) = store
+        assert stored_key == key
+        assert [type(entry) for entry in stored_key] == [type(entry) for entry in key]
+
+    def test_keys_dont_collide(self):
+        store = ConversationStateStore()
+        keys = [(0,), (0, 0), (0, 0, 0), (1,), (0, 1), (1, 0), (-1,), ("1",), (1.0,)]
+        for i, key in enumerate(keys):
+            store[key] = i
+        assert len(store) == len(keys)
+        assert [store[key] for key in keys] == list(range(len(keys)))
+
+    def test_contains_non_tuple(self, store):
+        assert 1 not in store
+        assert "key" not in store
+
+    def test_states_are_interned(self):
+        # build equal states at runtime to make sure that they are distinct objects
+        store = ConversationStateStore()
+        store.update_no_track({(1,): int("1000"), (2,): "".join(list("state"))})
+        store[(3,)] = int("1000")
+        store[(4,)] = "".join(list("state"))
+        store[(5,)] = State.ONE
+        assert store[(1,)] is store[(3,)]
+        assert store[(2,)] is store[(4,)]
+        assert store[(5,)] is State.ONE
+
+        # equal but of different type, must not be merged
+        store[(6,)] = True
+        store[(7,)] = 1.0
+        store[(8,)] = 1
+        assert store[(6,)] is True
+        assert type(store[(7,)]) is float
+        assert type(store[(8,)]) is int
+
+        # mutable states are stored as is
+        state = ["list"]
+        store[(9,)] = state
+        assert store[(9,)] is state
+
+    def test_interned_states_are_released(self):
+        store = ConversationStateStore()
+        store.update_no_track({(1,): "a", (2,): "a", (3,): State.ONE})
+        store[(1,)] = "b"
+        assert len(store._interned) == 3
+        store[(2,)] = ["not interned"]
+        del store[(1,)]
+        assert list(store._interned.values()) == [State.ONE]
+        store.pop((3,))
+        assert not store._interned
+        assert not store._references
+
+        store[(1,)] = "a"
+        store.clear()
+        assert not store._interned
+        assert not store._references
+
+    def test_representations(self, store, data):
+        assert repr(store) == repr(data)
+        assert str(store) == str(data)
+
+    def test_len_and_boolean(self, store, data):
+        assert len(store) == len(data)
+        assert bool(store)
+        assert not ConversationStateStore()
+
+    def test_equality(self, store, data):
+        assert store == data
+        assert data == store
+        assert store != ConversationStateStore()
+        assert store != 1
+
+    def test_no_tracking(self):
+        store = ConversationStateStore()
+        store[(1,)] = 1
+        del store[(1,)]
+        store[(2,)] = 2
+        store.clear()
+        store.mark_as_accessed((3,))
+        assert not store.pop_accessed_keys()
+        assert not store.pop_accessed_write_items()
+
+    def test_getitem(self, store):
+        assert store[(1, 2)] == 1
+        with pytest.raises(KeyError):
+            store[(2, 1)]
+        assert not store.pop_accessed_write_items()
+        assert not store.pop_accessed_keys()
+
+    def test_setitem(self, store):
+        store[(5,)] = 5
+        assert store[(5,)] == 5
+        assert store.pop_accessed_write_items() == [((5,), 5)]
+        store[(5,)] = 7
+        assert store[(5,)] == 7
+        assert store.pop_accessed_keys() == {(5,)}
+
+    def test_delitem(self, store):
+        store[(5,)] = 7
+        del store[(1, 2)]
+        assert (1, 2) not in store
+        assert store.pop_accessed_keys() == {(1, 2), (5,)}
+        del store[(5,)]
+        assert store.pop_accessed_write_items() == [((5,), ConversationStateStore.DELETED)]
+        with pytest.raises(KeyError):
+            del store[(5,)]
+        assert not store.pop_accessed_keys()
+
+    def test_update_no_track(self, store):
+        store.update_no_track({(2,): 2, ("a", 3): 3})
+        assert store == {(1, 2): 1, (2,): 2, ("a", 3): 3}
+        assert not store.pop_accessed_keys()
+
+    def test_pop(self, store):
+        assert store.pop((1, 2)) == 1
+        assert store.pop_accessed_write_items() == [((1, 2), ConversationStateStore.DELETED)]
+        with pytest.raises(KeyError):
+            store.pop((1, 2))
+        assert store.pop((1, 2), 8) == 8
+        assert not store.pop_accessed_keys()
+
+    def test_clear(self, store):
+        store[("a",)] = 7
+        store.pop_accessed_keys()
+        store.clear()
+        assert store == {}
+        assert store.pop_accessed_keys() == {(1, 2), ("a",)}
+
+    def test_set_default(self, store):
+        assert store.setdefault((1, 2), 2) == 1
+        assert not store.pop_accessed_keys()
+        assert store.setdefault((3,), 4) == 4
+        assert store.pop_accessed_write_items() == [((3,), 4)]
+
+    def test_iter(self, store, data):
+        data.update({(2,): 2, ("a",): 3, (4, 4, 4): 4})
+        store.update_no_track({(2,): 2, ("a",): 3, (4, 4, 4): 4})
+        assert list(store) == list(data)
+        assert list(store.items()) == list(data.items())
+
+    def test_mark_as_accessed(self, store):
+        store.mark_as_accessed((1, 2))
+        assert store.pop_accessed_keys() == {(1, 2)}
+        assert store.pop_accessed_keys() == set()
+
+    def test_memory_usage(self):
+        # (chat_id, user_id) keys with enum states. The keys are created inside the measurement,
+        # just like the keys built from incoming updates.
+        def measure(factory):
+            tracemalloc.start()
+            try:
+                mapping = factory()
+                for i in range(20_000):
+                    mapping[(-1001000000000 - i, 1000000000 + i)] = State(i % 2 + 1)
+                return tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+
+        assert measure(ConversationStateStore) < 0.6 * measure(dict)
+        assert measure(lambda: ConversationStateStore(track_writes=True)) < 0.75 * measure(
+            TrackingDict
+        )
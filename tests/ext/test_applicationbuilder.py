@@ -33,14 +33,17 @@ from telegram.ext import (
     CallbackDataCache,
     ContextTypes,
     Defaults,
+    EditCoalescer,
     ExtBot,
     JobQueue,
     PicklePersistence,
+    RequestCoalescer,
+    ResponseCache,
     Updater,
 )
 from telegram.ext._applicationbuilder import _BOT_CHECKS
 from telegram.ext._baseupdateprocessor import SimpleUpdateProcessor
-from telegram.request import HTTPXRequest
+from telegram.request import HTTPXRequest, TrafficClassRequest
 from telegram.warnings import PTBDeprecationWarning
 from tests.auxil.constants import PRIVATE_KEY
 from tests.auxil.envvars import TEST_WITH_OPT_DEPS
@@ -147,6 +150,10 @@ class TestApplicationBuilder:
         assert app.bot.callback_data_cache is None
         assert app.bot.defaults is None
         assert app.bot.rate_limiter is None
+        assert app.bot.file_id_cache is None
+        assert app.bot.response_cache is None
+        assert app.bot.request_coalescer is None
+        assert app.bot.edit_coalescer is None
         assert app.bot.local_mode is False
 
         get_updates_client = app.bot._request[0]._client
@@ -212,6 +219,7 @@ class TestApplicationBuilder:
             "bot",
             "updater",
             "http_version",
+            "traffic_classes",
         ],
     )
     def test_mutually_exclusive_for_request(self, builder, method):
@@ -355,6 +363,9 @@ class TestApplicationBuilder:
         request = HTTPXRequest()
         get_updates_request = HTTPXRequest()
         rate_limiter = AIORateLimiter()
+        response_cache = ResponseCache()
+        request_coalescer = RequestCoalescer()
+        edit_coalescer = EditCoalescer()
         builder.token(bot.token).base_url("base_url").base_file_url("base_file_url").private_key(
             PRIVATE_KEY
         ).defaults(defaults).arbitrary_callback_data(42).request(request).get_updates_request(
@@ -363,6 +374,14 @@ class TestApplicationBuilder:
             rate_limiter
         ).local_mode(
             True
+        ).file_id_cache(
+            42
+        ).response_cache(
+            response_cache
+        ).request_coalescer(
+            request_coalescer
+        ).edit_coalescer(
+            edit_coalescer
         )
         built_bot = builder.build().bot
 
@@ -380,6 +399,10 @@ class TestApplicationBuilder:
         assert built_bot.private_key
         assert built_bot.rate_limiter is rate_limiter
         assert built_bot.local_mode is True
+        assert built_bot.file_id_cache.maxsize == 42
+        assert built_bot.response_cache is response_cache
+        assert built_bot.request_coalescer is request_coalescer
+        assert built_bot.edit_coalescer is edit_coalescer
 
         @dataclass
         class Client:
@@ -465,6 +488,34 @@ class TestApplicationBuilder:
             else:
                 assert kwargs.get("socket_options") == ((4, 5, 6),)
 
+    @pytest.mark.parametrize("custom_interactive", [True, False])
+    def test_traffic_classes(self, bot, builder, custom_interactive):
+        upload_request = HTTPXRequest()
+        interactive_request = HTTPXRequest()
+        requests = {TrafficClassRequest.MEDIA_UPLOAD: upload_request}
+        if custom_interactive:
+            requests[TrafficClassRequest.INTERACTIVE] = interactive_request
+
+        app = (
+            builder.token(bot.token)
+            .connection_pool_size(42)
+            .traffic_classes(requests, endpoint_classes={"sendMessage": "media_upload"})
+            .build()
+        )
+        request = app.bot.request
+        assert isinstance(request, TrafficClassRequest)
+        assert request.requests[TrafficClassRequest.MEDIA_UPLOAD] is upload_request
+        assert request.get_traffic_class("https://x/sendMessage", "POST") == "media_upload"
+        if custom_interactive:
+            assert request.requests[TrafficClassRequest.INTERACTIVE] is interactive_request
+        else:
+            default_request = request.requests[TrafficClassRequest.INTERACTIVE]
+            assert default_request._client_kwargs["limits"] == httpx.Limits(
+                max_connections=42, max_keepalive_connections=42
+            )
+        # get_updates is not affected
+        assert isinstance(app.bot._request[0], HTTPXRequest)
+
     def test_custom_application_class(self, bot, builder):
         class CustomApplication(Application):
             def __init__(self, arg, **kwargs):
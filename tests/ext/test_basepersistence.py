@@ -690,9 +690,8 @@ class TestBasePersistence:
             assert not caplog.text
 
             assert papp.persistence.updated_bot_data == papp.persistence.store_data.bot_data
-            assert (
-                papp.persistence.updated_callback_data == papp.persistence.store_data.callback_data
-            )
+            # Unchanged callback data is not written again
+            assert not papp.persistence.updated_callback_data
             assert not papp.persistence.updated_chat_ids
             assert not papp.persistence.updated_user_ids
             assert not papp.persistence.updated_conversations
@@ -708,9 +707,8 @@ class TestBasePersistence:
             # Make sure that "nothing updated" is not just due to an error
             assert not caplog.text
             assert papp.persistence.updated_bot_data == papp.persistence.store_data.bot_data
-            assert (
-                papp.persistence.updated_callback_data == papp.persistence.store_data.callback_data
-            )
+            # Unchanged callback data is not written again
+            assert not papp.persistence.updated_callback_data
             assert not papp.persistence.updated_chat_ids
             assert not papp.persistence.updated_user_ids
             assert not papp.persistence.updated_conversations
@@ -755,9 +753,8 @@ class TestBasePersistence:
             # Make sure that "nothing updated" is not just due to an error
             assert not caplog.text
             assert papp.persistence.updated_bot_data == papp.persistence.store_data.bot_data
-            assert (
-                papp.persistence.updated_callback_data == papp.persistence.store_data.callback_data
-            )
+            # Unchanged callback data is not written again
+            assert not papp.persistence.updated_callback_data
             assert not papp.persistence.updated_chat_ids
             assert not papp.persistence.updated_user_ids
             assert not papp.persistence.updated_conversations
@@ -773,9 +770,8 @@ class TestBasePersistence:
             # Make sure that "nothing updated" is not just due to an error
             assert not caplog.text
             assert papp.persistence.updated_bot_data == papp.persistence.store_data.bot_data
-            assert (
-                papp.persistence.updated_callback_data == papp.persistence.store_data.callback_data
-            )
+            # Unchanged callback data is not written again
+            assert not papp.persistence.updated_callback_data
             assert not papp.persistence.updated_chat_ids
             assert not papp.persistence.updated_user_ids
             assert not papp.persistence.updated_conversations
@@ -1103,6 +1099,248 @@ class TestBasePersistence:
             assert papp.persistence.dropped_chat_ids == {1: 1}
             assert papp.persistence.updated_chat_ids == {2: 1}
 
+    async def test_batch_methods_default_delegation(self):
+        persistence = TrackingPersistence()
+        await persistence.update_user_data_many({1: {"a": 1}, 2: {"b": 2}})
+        await persistence.update_chat_data_many({3: {"c": 3}})
+        await persistence.update_conversations_many("conv", {(1, 1): 1, (2, 2): None})
+        await persistence.drop_user_data_many({1})
+        await persistence.drop_chat_data_many([3, 4])
+
+        assert persistence.updated_user_ids == {1: 1, 2: 1}
+        assert persistence.user_data == {2: {"b": 2}}
+        assert persistence.updated_chat_ids == {3: 1}
+        assert persistence.chat_data == {}
+        assert persistence.updated_conversations == {"conv": {(1, 1): 1, (2, 2): 1}}
+        assert persistence.conversations["conv"] == {(1, 1): 1, (2, 2): None}
+        assert persistence.dropped_user_ids == {1: 1}
+        assert persistence.dropped_chat_ids == {3: 1, 4: 1}
+
+    async def test_batch_methods_default_errors(self, bot_info):
+        class ErrorPersistence(TrackingPersistence):
+            async def update_user_data(self, user_id, data):
+                if user_id != 2:
+                    raise Exception(f"PersistenceError {user_id}")
+                await super().update_user_data(user_id, data)
+
+            async def drop_chat_data(self, chat_id):
+                raise Exception(f"PersistenceError {chat_id}")
+
+        persistence = ErrorPersistence()
+        with pytest.raises(Exception, match="PersistenceError 7"):
+            await persistence.drop_chat_data_many([7])
+
+        app = ApplicationBuilder().bot(make_bot(bot_info)).persistence(persistence).build()
+        errors = []
+
+        async def error(update, context):
+            errors.append(str(context.error))
+
+        app.add_error_handler(error)
+        async with app:
+            app.mark_data_for_update_persistence(user_ids={1, 2, 3})
+            await app.update_persistence()
+
+        # All calls are awaited and each error is handled separately
+        assert persistence.updated_user_ids == {2: 1}
+        assert sorted(errors) == ["PersistenceError 1", "PersistenceError 3"]
+
+    @default_papp
+    async def test_update_persistence_uses_batch_methods(self, papp: Application, monkeypatch):
+        calls = collections.defaultdict(list)
+
+        def record(method_name):
+            async def method(*args, **kwargs):
+                calls[method_name].append((args, kwargs))
+
+            return method
+
+        for method_name in (
+            "update_user_data_many",
+            "update_chat_data_many",
+            "drop_user_data_many",
+            "drop_chat_data_many",
+            "update_conversations_many",
+            "update_user_data",
+            "update_chat_data",
+            "drop_user_data",
+            "drop_chat_data",
+            "update_conversation",
+        ):
+            monkeypatch.setattr(papp.persistence, method_name, record(method_name))
+
+        async with papp:
+            for chat_id in (1, 2, 3):
+                await papp.process_update(
+                    TrackingConversationHandler.build_update(HandlerStates.END, chat_id=chat_id)
+                )
+            papp.drop_chat_data(7)
+            papp.drop_chat_data(8)
+            papp.drop_user_data(42)
+
+            await papp.update_persistence()
+
+        # The final update_persistence call in `stop` has nothing left to persist
+        assert set(calls) == {
+            "update_user_data_many",
+            "update_chat_data_many",
+            "drop_user_data_many",
+            "drop_chat_data_many",
+            "update_conversations_many",
+        }
+        assert len(calls["update_chat_data_many"]) == 1
+        assert set(calls["update_chat_data_many"][0][0][0]) == {1, 2, 3}
+        assert len(calls["update_user_data_many"]) == 1
+        assert set(calls["update_user_data_many"][0][0][0]) == {1, 2, 3}
+        assert len(calls["drop_chat_data_many"]) == 1
+        assert set(calls["drop_chat_data_many"][0][0][0]) == {7, 8}
+        assert len(calls["drop_user_data_many"]) == 1
+        assert set(calls["drop_user_data_many"][0][0][0]) == {42}
+        assert len(calls["update_conversations_many"]) == 1
+        kwargs = calls["update_conversations_many"][0][1]
+        assert kwargs["name"] == "conv_1"
+        assert set(kwargs["states"]) == {(1, 1), (2, 2), (3, 3)}
+
+    async def test_update_callback_data_delta_default(self, bot_info):
+        persistence = TrackingPersistence()
+        bot = make_bot(bot_info, arbitrary_callback_data=True, offline=True)
+        persistence.set_bot(bot)
+        bot.callback_data_cache.process_keyboard(
+            InlineKeyboardMarkup.from_button(InlineKeyboardButton("text", callback_data=1))
+        )
+
+        await persistence.update_callback_data_delta(([], {}), [], [])
+        assert persistence.updated_callback_data
+        assert persistence.callback_data == bot.callback_data_cache.persistence_data
+        assert persistence.callback_data is not bot.callback_data_cache.persistence_data
+
+    @default_papp
+    async def test_update_persistence_callback_data_delta(self, papp: Application, monkeypatch):
+        deltas = []
+
+        async def update_callback_data_delta(*args):
+            deltas.append(args)
+
+        monkeypatch.setattr(
+            papp.persistence, "update_callback_data_delta", update_callback_data_delta
+        )
+        reply_markup = InlineKeyboardMarkup.from_button(
+            InlineKeyboardButton("text", callback_data=1)
+        )
+        cache = papp.bot.callback_data_cache
+
+        async with papp:
+            cache.process_keyboard(reply_markup)
+            await papp.update_persistence()
+            # The first run hands over the complete data
+            assert papp.persistence.updated_callback_data
+            assert not deltas
+            assert len(papp.persistence.callback_data[0]) == 1
+
+            papp.persistence.reset_tracking()
+            out = cache.process_keyboard(reply_markup)
+            await papp.update_persistence()
+            assert not papp.persistence.updated_callback_data
+            assert len(deltas) == 1
+            (keyboard_data, callback_queries), dropped_keyboards, dropped_queries = deltas[0]
+            assert [entry[0] for entry in keyboard_data] == [
+                cache.extract_uuids(out.inline_keyboard[0][0].callback_data)[0]
+            ]
+            assert callback_queries == {}
+            assert not dropped_keyboards
+            assert not dropped_queries
+
+            # No changes -> no call
+            await papp.update_persistence()
+            assert len(deltas) == 1
+
+    @default_papp
+    async def test_update_persistence_callback_data_delta_error(
+        self, papp: Application, monkeypatch
+    ):
+        async def update_callback_data_delta(*args):
+            raise Exception("PersistenceError")
+
+        monkeypatch.setattr(
+            papp.persistence, "update_callback_data_delta", update_callback_data_delta
+        )
+        errors = []
+
+        async def error(update, context):
+            errors.append(context.error)
+
+        papp.add_error_handler(error)
+        cache = papp.bot.callback_data_cache
+
+        async with papp:
+            await papp.update_persistence()
+            assert papp.persistence.updated_callback_data
+
+            papp.persistence.reset_tracking()
+            out = cache.process_keyboard(
+                InlineKeyboardMarkup.from_button(InlineKeyboardButton("text", callback_data=1))
+            )
+            await papp.update_persistence()
+            assert not papp.persistence.updated_callback_data
+            assert len(errors) == 1
+
+            # The changes that could not be handed over are not lost
+            await papp.update_persistence()
+            assert papp.persistence.updated_callback_data
+            assert [entry[0] for entry in papp.persistence.callback_data[0]] == [
+                cache.extract_uuids(out.inline_keyboard[0][0].callback_data)[0]
+            ]
+            assert len(errors) == 1
+
+    @pytest.mark.parametrize("store_file_ids", [True, False])
+    async def test_update_persistence_file_id_cache(self, bot_info, monkeypatch, store_file_ids):
+        persistence = TrackingPersistence(
+            store_data=PersistenceInput(file_id_cache=store_file_ids)
+        )
+        written = []
+        fail = [True]
+
+        async def get_file_id_cache():
+            return {"a": "1"}
+
+        async def update_file_id_cache(data):
+            if fail[0]:
+                raise Exception("PersistenceError")
+            written.append(data)
+
+        monkeypatch.setattr(persistence, "get_file_id_cache", get_file_id_cache)
+        monkeypatch.setattr(persistence, "update_file_id_cache", update_file_id_cache)
+        app = (
+            ApplicationBuilder()
+            .bot(make_bot(bot_info, file_id_cache=True))
+            .persistence(persistence)
+            .build()
+        )
+        errors = []
+
+        async def error(update, context):
+            errors.append(context.error)
+
+        app.add_error_handler(error)
+
+        async with app:
+            cache = app.bot.file_id_cache
+            assert cache.persistence_data == ({"a": "1"} if store_file_ids else {})
+            cache.put_file_id("b", "2")
+            await app.update_persistence()
+            assert len(errors) == int(store_file_ids)
+
+            # The changes that could not be handed over are handed over on the next run
+            fail[0] = False
+            await app.update_persistence()
+            if store_file_ids:
+                assert written == [{"a": "1", "b": "2"}]
+            else:
+                assert written == []
+
+            await app.update_persistence()
+            assert len(written) == int(store_file_ids)
+
     async def test_errors_while_persisting(self, bot_info, caplog):
         class ErrorPersistence(TrackingPersistence):
             def raise_error(self):
@@ -1157,6 +1395,7 @@ class TestBasePersistence:
             with caplog.at_level(logging.ERROR):
                 await app.update_persistence()
 
+        # The callback data that could not be written is written again on shutdown
         assert len(caplog.records) == 6
         assert test_flag == [True, True, True, True, True, True]
         for record in caplog.records:
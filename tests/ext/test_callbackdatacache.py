@@ -25,9 +25,16 @@ import pytest
 
 from telegram import CallbackQuery, Chat, InlineKeyboardButton, InlineKeyboardMarkup, Message, User
 from telegram._utils.datetime import UTC
-from telegram.ext import ExtBot
-from telegram.ext._callbackdatacache import CallbackDataCache, InvalidCallbackData, _KeyboardData
+from telegram.ext import (
+    BaseCallbackDataStore,
+    ExtBot,
+    InMemoryCallbackDataStore,
+    SQLiteCallbackDataStore,
+)
+from telegram.ext._callbackdatacache import CallbackDataCache, InvalidCallbackData
+from telegram.ext._inmemorycallbackdatastore import _KeyboardData
 from tests.auxil.envvars import TEST_WITH_OPT_DEPS
+from tests.auxil.pytest_classes import make_bot
 from tests.auxil.slots import mro_slots
 
 
@@ -52,6 +59,12 @@ class TestNoCallbackDataCache:
         with pytest.raises(RuntimeError, match=r"python-telegram-bot\[callback-data\]"):
             ExtBot(token="TOKEN", arbitrary_callback_data=True)
 
+    def test_init_with_store(self, bot, tmp_path):
+        store = SQLiteCallbackDataStore(tmp_path / "callback_data.sqlite")
+        assert CallbackDataCache(bot=bot, store=store).store is store
+        with pytest.raises(RuntimeError, match=r"python-telegram-bot\[callback-data\]"):
+            InMemoryCallbackDataStore()
+
 
 class TestInvalidCallbackData:
     def test_slot_behaviour(self):
@@ -63,6 +76,54 @@ class TestInvalidCallbackData:
         ), "duplicate slot"
 
 
+class TestInMemoryCallbackDataStore:
+    def test_slot_behaviour(self):
+        store = InMemoryCallbackDataStore()
+        for attr in store.__slots__:
+            assert getattr(store, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(store)) == len(set(mro_slots(store))), "duplicate slot"
+
+    def test_maxsize(self):
+        assert InMemoryCallbackDataStore().maxsize == 1024
+        assert InMemoryCallbackDataStore(maxsize=5).maxsize == 5
+        assert not InMemoryCallbackDataStore().is_persistent
+
+    def test_pop_evicted(self):
+        store = InMemoryCallbackDataStore(maxsize=2)
+        store.put_keyboard("a", {})
+        store.put_keyboard("b", {})
+        store.put_keyboard("c", {})
+        # Evictions are only tracked after the first call
+        assert store.pop_evicted() == (set(), set())
+
+        store.get_keyboard("b")
+        store.put_keyboard("d", {})
+        for i in range(3):
+            store.put_callback_query(str(i), "b")
+        assert store.pop_evicted() == ({"c"}, {"0"})
+        assert store.pop_evicted() == (set(), set())
+
+        # dropping or clearing the data doesn't count as eviction
+        store.drop_keyboard("b")
+        store.clear_keyboards()
+        store.clear_callback_queries()
+        assert store.pop_evicted() == (set(), set())
+
+    def test_peek_persistence_data(self):
+        store = InMemoryCallbackDataStore(maxsize=2)
+        store.put_keyboard("a", {"1": "a"})
+        store.put_keyboard("b", {"1": "b"})
+        store.put_callback_query("1", "a")
+        keyboard_data, callback_queries = store.peek_persistence_data(["a", "c"], ["1", "2"])
+        assert [entry[0] for entry in keyboard_data] == ["a"]
+        assert keyboard_data[0][2] == {"1": "a"}
+        assert callback_queries == {"1": "a"}
+
+        # peeking doesn't change the order of the LRU
+        store.put_keyboard("c", {})
+        assert [entry[0] for entry in store.persistence_data[0]] == ["b", "c"]
+
+
 class TestKeyboardData:
     def test_slot_behaviour(self):
         keyboard_data = _KeyboardData("uuid")
@@ -97,6 +158,48 @@ class TestCallbackDataCache:
         assert cdc.maxsize == maxsize
         assert cdc.bot is bot
 
+    def test_init_store(self, bot):
+        cdc = CallbackDataCache(bot)
+        assert isinstance(cdc.store, InMemoryCallbackDataStore)
+        assert cdc.store.bot is bot
+
+        store = InMemoryCallbackDataStore(maxsize=5)
+        cdc = CallbackDataCache(bot, maxsize=10, store=store)
+        assert cdc.store is store
+        assert cdc.store.bot is bot
+        assert cdc.maxsize == 5
+
+    def test_bot_init_with_store(self):
+        store = InMemoryCallbackDataStore(maxsize=5)
+        bot = ExtBot(token="TOKEN", arbitrary_callback_data=store)
+        assert bot.callback_data_cache.store is store
+        assert bot.callback_data_cache.maxsize == 5
+
+    async def test_custom_store(self, bot):
+        class Store(InMemoryCallbackDataStore):
+            __slots__ = ("lookups",)
+
+            def __init__(self):
+                super().__init__()
+                self.lookups = 0
+
+            def get_keyboard(self, keyboard_uuid):
+                self.lookups += 1
+                return super().get_keyboard(keyboard_uuid)
+
+        assert issubclass(Store, BaseCallbackDataStore)
+        cdc = CallbackDataCache(bot, store=Store())
+        reply_markup = InlineKeyboardMarkup.from_row(
+            [InlineKeyboardButton(str(i), callback_data=i) for i in range(3)]
+        )
+        message = Message(
+            1, None, None, from_user=bot.bot, reply_markup=cdc.process_keyboard(reply_markup)
+        )
+        cdc.process_message(message)
+        assert message.reply_markup == reply_markup
+        # The keyboard is looked up only once for all buttons
+        assert cdc.store.lookups == 1
+
     def test_init_and_access__persistent_data(self, bot):
         """This also tests CDC.load_persistent_data."""
         keyboard_data = _KeyboardData("123", 456, {"button": 678})
@@ -104,11 +207,11 @@ class TestCallbackDataCache:
         cdc = CallbackDataCache(bot, persistent_data=persistent_data)
 
         assert cdc.maxsize == 1024
-        assert dict(cdc._callback_queries) == {"id": "123"}
-        assert list(cdc._keyboard_data.keys()) == ["123"]
-        assert cdc._keyboard_data["123"].keyboard_uuid == "123"
-        assert cdc._keyboard_data["123"].access_time == 456
-        assert cdc._keyboard_data["123"].button_data == {"button": 678}
+        assert dict(cdc.store._callback_queries) == {"id": "123"}
+        assert list(cdc.store._keyboard_data.keys()) == ["123"]
+        assert cdc.store._keyboard_data["123"].keyboard_uuid == "123"
+        assert cdc.store._keyboard_data["123"].access_time == 456
+        assert cdc.store._keyboard_data["123"].button_data == {"button": 678}
 
         assert cdc.persistence_data == persistent_data
 
@@ -133,10 +236,12 @@ class TestCallbackDataCache:
         )
         assert keyboard_1 == keyboard_2
         assert (
-            callback_data_cache._keyboard_data[keyboard_1].button_data[button_1] == "some data 1"
+            callback_data_cache.store._keyboard_data[keyboard_1].button_data[button_1]
+            == "some data 1"
         )
         assert (
-            callback_data_cache._keyboard_data[keyboard_2].button_data[button_2] == "some data 2"
+            callback_data_cache.store._keyboard_data[keyboard_2].button_data[button_2]
+            == "some data 2"
         )
 
     def test_process_keyboard_no_changing_button(self, callback_data_cache):
@@ -156,7 +261,11 @@ class TestCallbackDataCache:
 
         out1 = cdc.process_keyboard(reply_markup)
         assert len(cdc.persistence_data[0]) == 1
-        out2 = cdc.process_keyboard(reply_markup)
+        out2 = cdc.process_keyboard(
+            InlineKeyboardMarkup.from_row(
+                [non_changing_button, changing_button_2, changing_button_1]
+            )
+        )
         assert len(cdc.persistence_data[0]) == 1
 
         keyboard_1, _ = cdc.extract_uuids(out1.inline_keyboard[0][1].callback_data)
@@ -201,9 +310,9 @@ class TestCallbackDataCache:
             if data:
                 assert callback_query.data == "some data 1"
                 # make sure that we stored the mapping CallbackQuery.id -> keyboard_uuid correctly
-                assert len(callback_data_cache._keyboard_data) == 1
-                assert callback_data_cache._callback_queries[cq_id] == next(
-                    iter(callback_data_cache._keyboard_data.keys())
+                assert len(callback_data_cache.store._keyboard_data) == 1
+                assert callback_data_cache.store._callback_queries[cq_id] == next(
+                    iter(callback_data_cache.store._keyboard_data.keys())
                 )
             else:
                 assert callback_query.data is None
@@ -326,14 +435,191 @@ class TestCallbackDataCache:
         callback_data_cache.drop_data(callback_query)
         assert callback_data_cache.persistence_data == ([], {})
 
+    def test_process_keyboard_button_ids(self, callback_data_cache):
+        out = callback_data_cache.process_keyboard(
+            InlineKeyboardMarkup.from_column(
+                [InlineKeyboardButton(str(i), callback_data=i + 1) for i in range(20)]
+            )
+        )
+        keyboard_uuid = callback_data_cache.extract_uuids(out.inline_keyboard[0][0].callback_data)[
+            0
+        ]
+        button_ids = [
+            row[0].callback_data.removeprefix(keyboard_uuid) for row in out.inline_keyboard
+        ]
+        assert button_ids == [format(i, "x") for i in range(20)]
+        assert len(keyboard_uuid) == 32
+
+    def test_process_keyboard_deduplication(self, callback_data_cache):
+        def make_markup():
+            return InlineKeyboardMarkup.from_row(
+                [
+                    InlineKeyboardButton("non-changing", url="https://ptb.org"),
+                    InlineKeyboardButton("changing", callback_data=("some", 1)),
+                ]
+            )
+
+        out_1 = callback_data_cache.process_keyboard(make_markup())
+        out_2 = callback_data_cache.process_keyboard(make_markup())
+        assert out_2 is out_1
+        assert len(callback_data_cache.persistence_data[0]) == 1
+
+        # The same data with a different type or text gives a different keyboard
+        out_3 = callback_data_cache.process_keyboard(
+            InlineKeyboardMarkup.from_row(
+                [
+                    InlineKeyboardButton("non-changing", url="https://ptb.org"),
+                    InlineKeyboardButton("changing", callback_data=("some", True)),
+                ]
+            )
+        )
+        out_4 = callback_data_cache.process_keyboard(
+            InlineKeyboardMarkup.from_button(
+                InlineKeyboardButton("other", callback_data=("some", 1))
+            )
+        )
+        assert len({out_1, out_3, out_4}) == 3
+        assert len(callback_data_cache.persistence_data[0]) == 3
+        for out, data in ((out_1, ("some", 1)), (out_3, ("some", True)), (out_4, ("some", 1))):
+            callback_query = CallbackQuery(
+                "1",
+                from_user=None,
+                chat_instance=None,
+                data=out.inline_keyboard[0][-1].callback_data,
+            )
+            callback_data_cache.process_callback_query(callback_query)
+            assert callback_query.data == data
+            assert type(callback_query.data[1]) is type(data[1])
+
+    def test_process_keyboard_unhashable_data(self, callback_data_cache):
+        reply_markup = InlineKeyboardMarkup.from_button(
+            InlineKeyboardButton("changing", callback_data={"some": "data"})
+        )
+        out_1 = callback_data_cache.process_keyboard(reply_markup)
+        out_2 = callback_data_cache.process_keyboard(reply_markup)
+        assert out_1 != out_2
+        assert len(callback_data_cache.persistence_data[0]) == 2
+
+    @pytest.mark.parametrize("method", ["drop", "clear"])
+    def test_process_keyboard_deduplication_after_removal(self, callback_data_cache, method):
+        reply_markup = InlineKeyboardMarkup.from_button(
+            InlineKeyboardButton("changing", callback_data="some data")
+        )
+        out_1 = callback_data_cache.process_keyboard(reply_markup)
+        if method == "drop":
+            keyboard_uuid = callback_data_cache.extract_uuids(
+                out_1.inline_keyboard[0][0].callback_data
+            )[0]
+            callback_data_cache._store.drop_keyboard(keyboard_uuid)
+        else:
+            callback_data_cache.clear_callback_data()
+
+        out_2 = callback_data_cache.process_keyboard(reply_markup)
+        assert out_2 != out_1
+        assert len(callback_data_cache.persistence_data[0]) == 1
+        callback_query = CallbackQuery(
+            "1", from_user=None, chat_instance=None, data=out_2.inline_keyboard[0][0].callback_data
+        )
+        callback_data_cache.process_callback_query(callback_query)
+        assert callback_query.data == "some data"
+
+    @pytest.mark.parametrize("reload", [True, False])
+    def test_drop_data_identical_keyboards(self, callback_data_cache, bot, reload):
+        reply_markup = InlineKeyboardMarkup.from_button(
+            InlineKeyboardButton("changing", callback_data="some data")
+        )
+        outs = [callback_data_cache.process_keyboard(reply_markup) for _ in range(3)]
+        assert outs[0] is outs[1] is outs[2]
+        assert len(callback_data_cache.persistence_data[0]) == 1
+        if reload:
+            # e.g. after a restart
+            callback_data_cache = CallbackDataCache(
+                bot, persistent_data=callback_data_cache.persistence_data
+            )
+
+        callback_queries = [
+            CallbackQuery(
+                str(i),
+                from_user=None,
+                chat_instance=None,
+                data=out.inline_keyboard[0][0].callback_data,
+            )
+            for i, out in enumerate(outs)
+        ]
+        # Dropping the data of one message doesn't affect the other ones
+        for callback_query in callback_queries:
+            callback_data_cache.process_callback_query(callback_query)
+            assert callback_query.data == "some data"
+            assert len(callback_data_cache.persistence_data[0]) == 1
+            callback_data_cache.drop_data(callback_query)
+        assert callback_data_cache.persistence_data == ([], {})
+
+    def test_send_count_is_no_button(self, callback_data_cache):
+        reply_markup = InlineKeyboardMarkup.from_button(
+            InlineKeyboardButton("changing", callback_data="some data")
+        )
+        callback_data_cache.process_keyboard(reply_markup)
+        out = callback_data_cache.process_keyboard(reply_markup)
+        keyboard_uuid = callback_data_cache.extract_uuids(out.inline_keyboard[0][0].callback_data)[
+            0
+        ]
+        callback_query = CallbackQuery(
+            "1", from_user=None, chat_instance=None, data=f"{keyboard_uuid}sends"
+        )
+        callback_data_cache.process_callback_query(callback_query)
+        assert isinstance(callback_query.data, InvalidCallbackData)
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize(
+        ("arbitrary_callback_data", "callback_data"),
+        [(False, "some data"), (True, "some data"), (True, {"unhashable": "data"})],
+        ids=["no cache", "cache", "cache without deduplication"],
+    )
+    async def test_keyboard_heavy_sends(
+        self, bot_info, monkeypatch, arbitrary_callback_data, callback_data
+    ):
+        number_of_sends = 100_000
+        message = Message(1, datetime.now(tz=UTC), Chat(1, "private")).to_json().encode()
+
+        async def do_request(*args, request_data=None, **kwargs):
+            # Serialize the keyboard like a real request would
+            assert request_data.json_parameters["reply_markup"]
+            return 200, b'{"ok": true, "result": ' + message + b"}"
+
+        async with make_bot(
+            bot_info, arbitrary_callback_data=arbitrary_callback_data
+        ) as offline_bot:
+            monkeypatch.setattr(offline_bot.request, "do_request", do_request)
+            reply_markup = InlineKeyboardMarkup.from_column(
+                [
+                    InlineKeyboardButton(str(i), callback_data=callback_data if i else "x")
+                    for i in range(8)
+                ]
+            )
+
+            start = time.perf_counter()
+            for chat_id in range(number_of_sends):
+                await offline_bot.send_message(chat_id, "text", reply_markup=reply_markup)
+            duration = time.perf_counter() - start
+
+        print(
+            f"Sent {number_of_sends} keyboards with arbitrary_callback_data="
+            f"{arbitrary_callback_data} in {duration:.2f}s"
+        )
+
     @pytest.mark.parametrize("method", ["callback_data", "callback_queries"])
     def test_clear_all(self, callback_data_cache, method):
         changing_button_1 = InlineKeyboardButton("changing", callback_data="some data 1")
         changing_button_2 = InlineKeyboardButton("changing", callback_data="some data 2")
-        reply_markup = InlineKeyboardMarkup.from_row([changing_button_1, changing_button_2])
 
         for i in range(100):
-            out = callback_data_cache.process_keyboard(reply_markup)
+            # distinct keyboards, as identical ones would share an entry
+            non_changing_button = InlineKeyboardButton(str(i), url="https://ptb.org")
+            out = callback_data_cache.process_keyboard(
+                InlineKeyboardMarkup.from_row(
+                    [changing_button_1, changing_button_2, non_changing_button]
+                )
+            )
             callback_query = CallbackQuery(
                 str(i),
                 from_user=None,
@@ -401,3 +687,70 @@ class TestCallbackDataCache:
             next(iter(data[2].values())) for data in callback_data_cache.persistence_data[0]
         ]
         assert callback_data == [str(i) for i in range(50, 100)]
+
+    def test_pop_persistence_delta(self, callback_data_cache):
+        reply_markup = InlineKeyboardMarkup.from_button(
+            InlineKeyboardButton("changing", callback_data="some data")
+        )
+        out_1 = callback_data_cache.process_keyboard(reply_markup)
+        # Changes are only tracked after the first call
+        assert callback_data_cache.pop_persistence_delta() is None
+        assert callback_data_cache.pop_persistence_delta() == (([], {}), set(), set())
+
+        out_2 = callback_data_cache.process_keyboard(
+            InlineKeyboardMarkup.from_button(
+                InlineKeyboardButton("changing", callback_data="other data")
+            )
+        )
+        keyboard_1 = callback_data_cache.extract_uuids(out_1.inline_keyboard[0][0].callback_data)[
+            0
+        ]
+        keyboard_2 = callback_data_cache.extract_uuids(out_2.inline_keyboard[0][0].callback_data)[
+            0
+        ]
+        callback_query = CallbackQuery(
+            "1", from_user=None, chat_instance=None, data=out_1.inline_keyboard[0][0].callback_data
+        )
+        callback_data_cache.process_callback_query(callback_query)
+
+        (keyboard_data, callback_queries), dropped_keyboards, dropped_callback_queries = (
+            callback_data_cache.pop_persistence_delta()
+        )
+        assert {entry[0] for entry in keyboard_data} == {keyboard_1, keyboard_2}
+        assert callback_queries == {"1": keyboard_1}
+        assert dropped_keyboards == dropped_callback_queries == set()
+
+        callback_data_cache.drop_data(callback_query)
+        assert callback_data_cache.pop_persistence_delta() == (([], {}), {keyboard_1}, {"1"})
+
+        callback_data_cache.clear_callback_queries()
+        assert callback_data_cache.pop_persistence_delta() is None
+        callback_data_cache.clear_callback_data()
+        assert callback_data_cache.pop_persistence_delta() is None
+        callback_data_cache.load_persistence_data(([], {}))
+        assert callback_data_cache.pop_persistence_delta() is None
+        assert callback_data_cache.pop_persistence_delta() == (([], {}), set(), set())
+
+    def test_pop_persistence_delta_evicted(self, bot):
+        callback_data_cache = CallbackDataCache(bot, maxsize=1)
+        callback_data_cache.pop_persistence_delta()
+        reply_markup = InlineKeyboardMarkup.from_button(
+            InlineKeyboardButton("changing", callback_data="some data")
+        )
+        out_1 = callback_data_cache.process_keyboard(reply_markup)
+        keyboard_1 = callback_data_cache.extract_uuids(out_1.inline_keyboard[0][0].callback_data)[
+            0
+        ]
+        callback_data_cache.pop_persistence_delta()
+
+        out_2 = callback_data_cache.process_keyboard(
+            InlineKeyboardMarkup.from_button(
+                InlineKeyboardButton("changing", callback_data="other data")
+            )
+        )
+        keyboard_2 = callback_data_cache.extract_uuids(out_2.inline_keyboard[0][0].callback_data)[
+            0
+        ]
+        (keyboard_data, _), dropped_keyboards, _ = callback_data_cache.pop_persistence_delta()
+        assert [entry[0] for entry in keyboard_data] == [keyboard_2]
+        assert dropped_keyboards == {keyboard_1}
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import base64
+from copy import deepcopy
+from datetime import datetime
+from enum import Enum, IntEnum
+
+import pytest
+
+from telegram import CallbackQuery, Chat, InlineKeyboardButton, InlineKeyboardMarkup, Message, User
+from telegram.ext import (
+    ApplicationBuilder,
+    CallbackContext,
+    CallbackDataCodec,
+    InvalidCallbackData,
+)
+from tests.auxil.pytest_classes import make_bot
+from tests.auxil.slots import mro_slots
+
+
+class Action(Enum):
+    EDIT = "edit"
+    DELETE = "delete"
+
+
+class Page(IntEnum):
+    FIRST = 1
+    SECOND = 2
+
+
+class Other(IntEnum):
+    ONE = 1
+
+
+@pytest.fixture
+def codec():
+    return CallbackDataCodec("secret", enums=[Action, Page])
+
+
+@pytest.fixture
+async def codec_bot(bot_info, codec):
+    async with make_bot(bot_info, offline=True, arbitrary_callback_data=codec) as _bot:
+        yield _bot
+
+
+class TestCallbackDataCodec:
+    def test_slot_behaviour(self, codec):
+        for attr in codec.__slots__:
+            assert getattr(codec, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(codec)) == len(set(mro_slots(codec))), "duplicate slot"
+
+    def test_init(self):
+        codec = CallbackDataCodec(b"secret")
+        assert codec.signature_size == 4
+        assert codec.bot is None
+        assert CallbackDataCodec("secret", signature_size=32).signature_size == 32
+
+        with pytest.raises(ValueError, match="`secret` must not be empty"):
+            CallbackDataCodec("")
+        with pytest.raises(ValueError, match="`signature_size` must be between"):
+            CallbackDataCodec("secret", signature_size=0)
+        with pytest.raises(ValueError, match="`signature_size` must be between"):
+            CallbackDataCodec("secret", signature_size=33)
+        with pytest.raises(ValueError, match="At most 15 enums"):
+            CallbackDataCodec("secret", enums=[Action] * 16)
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            None,
+            True,
+            False,
+            0,
+            14,
+            15,
+            -1,
+            -(2**40),
+            2**62,
+            "",
+            "some data",
+            "ü" * 20,
+            Action.DELETE,
+            Page.SECOND,
+            (),
+            (1, "a", None),
+            (Action.EDIT, (Page.FIRST, (True, -5))),
+            tuple(range(20)),
+        ],
+    )
+    def test_round_trip(self, codec, data):
+        encoded = codec.encode(data)
+        assert len(encoded.encode("utf-8")) <= 64
+        decoded = codec.decode(encoded)
+        assert decoded == data
+        assert type(decoded) is type(data)
+
+    def test_lists_are_decoded_as_tuples(self, codec):
+        assert codec.decode(codec.encode([1, [2, "3"]])) == (1, (2, "3"))
+
+    def test_compact_encoding(self, codec):
+        # one byte for small ints and enum classes, four bytes signature
+        assert len(base64.b85decode(codec.encode(3))) == 5
+        assert len(base64.b85decode(codec.encode((Action.DELETE, 42)))) == 9
+
+    def test_enums_with_equal_values(self):
+        codec = CallbackDataCodec("secret", enums=[Page, Other])
+        assert codec.decode(codec.encode(Other.ONE)) is Other.ONE
+        assert codec.decode(codec.encode(Page.FIRST)) is Page.FIRST
+
+    def test_encode_errors(self, codec):
+        with pytest.raises(TypeError, match="type float can not be encoded"):
+            codec.encode(1.5)
+        with pytest.raises(TypeError, match="type dict can not be encoded"):
+            codec.encode(("a", {}))
+        with pytest.raises(TypeError, match="enum Other was not registered"):
+            codec.encode(Other.ONE)
+        with pytest.raises(ValueError, match="Telegram allows at most 64 bytes"):
+            codec.encode("x" * 60)
+
+    def test_decode_invalid(self, codec):
+        encoded = codec.encode(("some", "data"))
+        raw = bytearray(base64.b85decode(encoded))
+        raw[1] ^= 1
+        tampered = base64.b85encode(bytes(raw)).decode()
+
+        for data in (tampered, "not base 85 \x00", "", "0"):
+            with pytest.raises(InvalidCallbackData) as exc_info:
+                codec.decode(data)
+            assert exc_info.value.callback_data == data
+
+        with pytest.raises(InvalidCallbackData):
+            CallbackDataCodec("other secret").decode(encoded)
+        with pytest.raises(InvalidCallbackData):
+            # a removed enum invalidates the data
+            CallbackDataCodec("secret", enums=[Action]).decode(codec.encode(Page.FIRST))
+
+    def test_decode_validly_signed_garbage(self, codec):
+        # Trailing bytes and unknown tags are rejected even if the signature is valid
+        for payload in (b"\x21\x21", b"\xff", b"\x4f\x05ab"):
+            data = base64.b85encode(payload + codec._sign(payload)).decode()
+            with pytest.raises(InvalidCallbackData):
+                codec.decode(data)
+
+    def test_process_keyboard(self, codec):
+        non_changing_button = InlineKeyboardButton("non-changing", url="https://ptb.org")
+        reply_markup = InlineKeyboardMarkup.from_row(
+            [
+                non_changing_button,
+                InlineKeyboardButton("1", callback_data=(Action.EDIT, 1)),
+                InlineKeyboardButton("2", callback_data="some data"),
+            ]
+        )
+        out = codec.process_keyboard(reply_markup)
+        assert out.inline_keyboard[0][0] is non_changing_button
+        assert codec.decode(out.inline_keyboard[0][1].callback_data) == (Action.EDIT, 1)
+        assert codec.decode(out.inline_keyboard[0][2].callback_data) == "some data"
+        # the input is not changed
+        assert reply_markup.inline_keyboard[0][1].callback_data == (Action.EDIT, 1)
+
+        reply_markup = InlineKeyboardMarkup.from_button(non_changing_button)
+        assert codec.process_keyboard(reply_markup) is reply_markup
+
+    @pytest.mark.parametrize("invalid", [True, False])
+    def test_process_callback_query(self, codec, invalid):
+        reply_markup = InlineKeyboardMarkup.from_row(
+            [
+                InlineKeyboardButton("non-changing", url="https://ptb.org"),
+                InlineKeyboardButton("1", callback_data=(Action.EDIT, 1)),
+            ]
+        )
+        out = CallbackDataCodec("other" if invalid else "secret", enums=[Action]).process_keyboard(
+            reply_markup
+        )
+
+        message = Message(1, datetime.now(), Chat(1, "private"), reply_markup=out)
+        message._unfreeze()
+        message.reply_to_message = deepcopy(message)
+        message.pinned_message = deepcopy(message)
+        callback_query = CallbackQuery(
+            "1",
+            from_user=None,
+            chat_instance=None,
+            data=out.inline_keyboard[0][1].callback_data,
+            message=message,
+        )
+        codec.process_callback_query(callback_query)
+
+        for msg in (message, message.reply_to_message, message.pinned_message):
+            if invalid:
+                assert isinstance(
+                    msg.reply_markup.inline_keyboard[0][1].callback_data, InvalidCallbackData
+                )
+            else:
+                assert msg.reply_markup == reply_markup
+        if invalid:
+            assert isinstance(callback_query.data, InvalidCallbackData)
+        else:
+            assert callback_query.data == (Action.EDIT, 1)
+
+    def test_process_message_wrong_sender(self, codec_bot):
+        codec = codec_bot.callback_data_codec
+        out = codec.process_keyboard(
+            InlineKeyboardMarkup.from_button(InlineKeyboardButton("test", callback_data=1))
+        )
+        callback_data = out.inline_keyboard[0][0].callback_data
+        message = Message(
+            1, None, None, from_user=User(1, "first", False), reply_markup=deepcopy(out)
+        )
+        codec.process_message(message)
+        assert message.reply_markup.inline_keyboard[0][0].callback_data == callback_data
+
+        message = Message(1, None, None, from_user=codec_bot.bot, reply_markup=deepcopy(out))
+        codec.process_message(message)
+        assert message.reply_markup.inline_keyboard[0][0].callback_data == 1
+
+    def test_ext_bot(self, codec_bot, codec):
+        assert codec_bot.callback_data_codec is codec
+        assert codec_bot.callback_data_cache is None
+        assert codec.bot is codec_bot
+
+        reply_markup = InlineKeyboardMarkup.from_button(
+            InlineKeyboardButton("test", callback_data=(Page.SECOND, "x"))
+        )
+        out = codec_bot._replace_keyboard(reply_markup)
+        assert codec.decode(out.inline_keyboard[0][0].callback_data) == (Page.SECOND, "x")
+
+        message = Message(1, None, None, from_user=codec_bot.bot, reply_markup=out)
+        codec_bot._insert_callback_data(message)
+        assert message.reply_markup == reply_markup
+
+    async def test_drop_callback_data_does_nothing(self, codec_bot):
+        app = ApplicationBuilder().bot(codec_bot).build()
+        context = CallbackContext(app)
+        context.drop_callback_data(CallbackQuery("1", None, None))
@@ -386,3 +386,133 @@ class TestDictPersistence:
         await dict_persistence.update_callback_data(callback_data)
 
         assert not flag
+
+    async def test_update_callback_data_delta(self):
+        dict_persistence = DictPersistence(
+            callback_data_json=json.dumps(([["a", 1.0, {"1": "a"}]], {"x": "a"}))
+        )
+        assert dict_persistence.callback_data_json
+        await dict_persistence.update_callback_data_delta(
+            ([("b", 2.0, {"1": "b"})], {"y": "b"}), ["a"], ["x"]
+        )
+        assert dict_persistence.callback_data == ([("b", 2.0, {"1": "b"})], {"y": "b"})
+        assert json.loads(dict_persistence.callback_data_json) == [
+            [["b", 2.0, {"1": "b"}]],
+            {"y": "b"},
+        ]
+
+    async def test_json_outputs_only_encode_changed_entries(self, monkeypatch):
+        dict_persistence = DictPersistence()
+        for i in range(10):
+            await dict_persistence.update_user_data(i, {"i": i})
+            await dict_persistence.update_chat_data(-i, {"i": i})
+            await dict_persistence.update_conversation("name", (i, i), i)
+
+        user_data = {i: {"i": i} for i in range(10)}
+        chat_data = {-i: {"i": i} for i in range(10)}
+        conversations = {"name": {(i, i): i for i in range(10)}}
+        assert dict_persistence.user_data_json == json.dumps(user_data)
+        assert dict_persistence.chat_data_json == json.dumps(chat_data)
+        assert dict_persistence.conversations_json == (
+            DictPersistence._encode_conversations_to_json(conversations)
+        )
+
+        encoded = []
+        orig_dumps = json.dumps
+
+        def dumps(obj, *args, **kwargs):
+            encoded.append(obj)
+            return orig_dumps(obj, *args, **kwargs)
+
+        monkeypatch.setattr(json, "dumps", dumps)
+
+        await dict_persistence.update_user_data(3, {"i": "new"})
+        await dict_persistence.drop_user_data(4)
+        await dict_persistence.update_chat_data(-3, {"i": "new"})
+        await dict_persistence.update_conversation("name", (3, 3), "new")
+        user_data[3] = {"i": "new"}
+        del user_data[4]
+        chat_data[-3] = {"i": "new"}
+        conversations["name"][(3, 3)] = "new"
+
+        assert dict_persistence.user_data_json == orig_dumps(user_data)
+        assert dict_persistence.chat_data_json == orig_dumps(chat_data)
+        assert encoded == [{"i": "new"}, {"i": "new"}]
+
+        encoded.clear()
+        assert dict_persistence.conversations_json == orig_dumps(
+            {"name": {orig_dumps(key): state for key, state in conversations["name"].items()}}
+        )
+        # The state and the keys of the conversations
+        assert "new" in encoded
+        assert all(isinstance(obj, (str, tuple)) for obj in encoded)
+
+        # Accessing again without changes doesn't encode anything
+        encoded.clear()
+        dict_persistence.user_data_json
+        dict_persistence.chat_data_json
+        dict_persistence.conversations_json
+        assert not encoded
+
+    async def test_changes_since(self):
+        dict_persistence = DictPersistence()
+        assert dict_persistence.version == 0
+        await dict_persistence.update_user_data(1, {"a": 1})
+        await dict_persistence.update_user_data(2, {"b": 2})
+        await dict_persistence.update_chat_data(1, {"c": 3})
+        await dict_persistence.update_conversation("name", (1, 1), "state")
+        version = dict_persistence.version
+        assert version == 4
+
+        assert dict_persistence.user_data_changes_since(0) == {1: '{"a": 1}', 2: '{"b": 2}'}
+        assert dict_persistence.chat_data_changes_since(0) == {1: '{"c": 3}'}
+        assert dict_persistence.conversations_changes_since(0) == {"name": {(1, 1): '"state"'}}
+        assert dict_persistence.user_data_changes_since(version) == {}
+        assert dict_persistence.chat_data_changes_since(version) == {}
+        assert dict_persistence.conversations_changes_since(version) == {}
+
+        # no change -> no new version
+        await dict_persistence.update_user_data(1, {"a": 1})
+        await dict_persistence.drop_chat_data(123)
+        assert dict_persistence.version == version
+
+        await dict_persistence.update_user_data(1, {"a": 2})
+        await dict_persistence.drop_user_data(2)
+        await dict_persistence.drop_chat_data(1)
+        await dict_persistence.update_conversation("name", (1, 1), None)
+        assert dict_persistence.version == version + 4
+        assert dict_persistence.user_data_changes_since(version) == {1: '{"a": 2}', 2: None}
+        assert dict_persistence.chat_data_changes_since(version) == {1: None}
+        assert dict_persistence.conversations_changes_since(version) == {"name": {(1, 1): "null"}}
+        assert dict_persistence.user_data_changes_since(version + 1) == {2: None}
+
+    async def test_changes_since_forgets_reported_drops(self):
+        dict_persistence = DictPersistence()
+        for i in range(10):
+            await dict_persistence.update_user_data(i, {"a": i})
+            await dict_persistence.update_chat_data(i, {"a": i})
+            await dict_persistence.update_conversation("name", (i, i), "state")
+        for i in range(10):
+            await dict_persistence.drop_user_data(i)
+            await dict_persistence.drop_chat_data(i)
+            await dict_persistence.update_conversation("name", (i, i), None)
+        version = dict_persistence.version
+
+        # Drops are reported until a version after the drop is passed
+        assert dict_persistence.user_data_changes_since(0) == dict.fromkeys(range(10))
+        assert len(dict_persistence.chat_data_changes_since(0)) == 10
+        assert len(dict_persistence.conversations_changes_since(0)["name"]) == 10
+        assert dict_persistence.user_data_changes_since(version) == {}
+        assert dict_persistence.chat_data_changes_since(version) == {}
+        assert dict_persistence.conversations_changes_since(version) == {}
+        assert not dict_persistence._user_data_versions
+        assert not dict_persistence._user_data_dropped
+        assert not dict_persistence._chat_data_versions
+        assert not dict_persistence._chat_data_dropped
+        assert not dict_persistence._conversations_versions
+        assert not dict_persistence._conversations_dropped
+
+        # Data that is added again after being dropped is reported as changed
+        await dict_persistence.update_user_data(1, {"b": 1})
+        await dict_persistence.drop_user_data(2)
+        assert dict_persistence.user_data_changes_since(version) == {1: '{"b": 1}'}
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import asyncio
+import json
+import time
+
+import pytest
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
+from telegram.ext import EditCoalescer
+from tests.auxil.pytest_classes import make_bot
+from tests.auxil.slots import mro_slots
+
+
+class RequestRecorder:
+    """Answers edits like the Bot API and records the time of every request. Edits with the text
+    in `failing` fail."""
+
+    def __init__(self, bot, monkeypatch):
+        self.requests = []
+        self.times = []
+        self.failing = set()
+        monkeypatch.setattr(bot.request, "do_request", self.do_request)
+
+    async def do_request(self, url, method, request_data=None, *args, **kwargs):
+        endpoint = url.rsplit("/", 1)[-1]
+        parameters = request_data.parameters
+        self.requests.append((endpoint, parameters))
+        self.times.append(time.perf_counter())
+
+        if parameters.get("text") in self.failing:
+            description = "Bad Request: message is not modified"
+            return (
+                400,
+                json.dumps({"ok": False, "error_code": 400, "description": description}).encode(),
+            )
+        if "inline_message_id" in parameters:
+            result = True
+        else:
+            result = {
+                "message_id": parameters["message_id"],
+                "date": 0,
+                "chat": {"id": parameters["chat_id"], "type": "private"},
+                "text": parameters.get("text", "text"),
+            }
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+@pytest.fixture
+async def coalescing_bot(bot_info):
+    async with make_bot(bot_info, edit_coalescer=EditCoalescer(min_interval=0.2)) as _bot:
+        yield _bot
+
+
+class TestEditCoalescer:
+    def test_slot_behaviour(self):
+        inst = EditCoalescer()
+        for attr in inst.__slots__:
+            assert getattr(inst, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(inst)) == len(set(mro_slots(inst))), "duplicate slot"
+
+    def test_init(self, bot_info):
+        coalescer = EditCoalescer()
+        assert coalescer.min_interval == 1
+        assert len(coalescer) == 0
+        with pytest.raises(ValueError, match="negative"):
+            EditCoalescer(min_interval=-1)
+
+        assert make_bot(bot_info).edit_coalescer is None
+        assert isinstance(make_bot(bot_info, edit_coalescer=True).edit_coalescer, EditCoalescer)
+        assert make_bot(bot_info, edit_coalescer=coalescer).edit_coalescer is coalescer
+
+    @pytest.mark.parametrize(
+        ("endpoint", "data", "expected"),
+        [
+            ("editMessageText", {"chat_id": 1, "message_id": 2, "text": "a"}, True),
+            ("editMessageText", {"inline_message_id": "3", "text": "a"}, True),
+            ("editMessageLiveLocation", {"chat_id": 1, "message_id": 2}, True),
+            ("editMessageReplyMarkup", {"chat_id": 1, "message_id": 2}, True),
+            ("editMessageCaption", {"chat_id": 1, "message_id": 2}, True),
+            ("editMessageText", {"chat_id": 1, "text": "a"}, False),
+            ("editMessageMedia", {"chat_id": 1, "message_id": 2}, False),
+            ("sendMessage", {"chat_id": 1, "text": "a"}, False),
+        ],
+    )
+    def test_can_coalesce(self, endpoint, data, expected):
+        assert EditCoalescer.can_coalesce(endpoint, data) is expected
+
+    async def test_process_request_invalid(self):
+        async def callback(endpoint, data):
+            return True
+
+        with pytest.raises(ValueError, match="Can't coalesce requests to sendMessage"):
+            await EditCoalescer().process_request("sendMessage", {"chat_id": 1}, callback)
+
+    async def test_last_write_wins(self, coalescing_bot, monkeypatch):
+        recorder = RequestRecorder(coalescing_bot, monkeypatch)
+        first = await coalescing_bot.edit_message_text("0", chat_id=1, message_id=1)
+        assert first.text == "0"
+
+        # All edits within the interval are superseded by the most recent one
+        messages = await asyncio.gather(
+            *(coalescing_bot.edit_message_text(str(i), chat_id=1, message_id=1) for i in (1, 2, 3))
+        )
+        assert [message.text for message in messages] == ["3", "3", "3"]
+        assert [data["text"] for _, data in recorder.requests] == ["0", "3"]
+        assert recorder.times[1] - recorder.times[0] >= 0.15
+        assert len(coalescing_bot.edit_coalescer) == 1
+
+        # Once nothing was edited within the interval, edits are sent right away again
+        await asyncio.sleep(0.3)
+        assert len(coalescing_bot.edit_coalescer) == 0
+        start = time.perf_counter()
+        await coalescing_bot.edit_message_text("4", chat_id=1, message_id=1)
+        assert time.perf_counter() - start < 0.15
+
+    async def test_messages_are_independent(self, coalescing_bot, monkeypatch):
+        recorder = RequestRecorder(coalescing_bot, monkeypatch)
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                coalescing_bot.edit_message_text("a", chat_id=1, message_id=1),
+                coalescing_bot.edit_message_text("b", chat_id=1, message_id=2),
+                coalescing_bot.edit_message_text("c", chat_id=2, message_id=1),
+                coalescing_bot.edit_message_text("d", inline_message_id="1"),
+                coalescing_bot.edit_message_reply_markup(chat_id=2, message_id=2),
+            ),
+            0.15,
+        )
+        assert [getattr(result, "text", result) for result in results] == [
+            "a",
+            "b",
+            "c",
+            True,
+            "text",
+        ]
+        assert len(recorder.requests) == 5
+
+    async def test_methods_keep_order(self, coalescing_bot, monkeypatch):
+        recorder = RequestRecorder(coalescing_bot, monkeypatch)
+        markup_1 = InlineKeyboardMarkup.from_button(InlineKeyboardButton("1", callback_data="1"))
+        markup_2 = InlineKeyboardMarkup.from_button(InlineKeyboardButton("2", callback_data="2"))
+        await coalescing_bot.edit_message_text("0", chat_id=1, message_id=1)
+
+        # The text edit is buffered, but must not overwrite the markup of the later markup edit.
+        # Only calls of the same method that follow each other are combined.
+        results = await asyncio.gather(
+            coalescing_bot.edit_message_text("1", chat_id=1, message_id=1),
+            coalescing_bot.edit_message_text("2", chat_id=1, message_id=1, reply_markup=markup_1),
+            coalescing_bot.edit_message_reply_markup(
+                chat_id=1, message_id=1, reply_markup=markup_2
+            ),
+        )
+        assert [result.text for result in results] == ["2", "2", "text"]
+        assert [endpoint for endpoint, _ in recorder.requests] == [
+            "editMessageText",
+            "editMessageText",
+            "editMessageReplyMarkup",
+        ]
+        assert recorder.requests[1][1]["text"] == "2"
+        assert recorder.requests[2][1]["reply_markup"] == markup_2.to_dict()
+        # Edits of the same message respect the interval regardless of the method
+        assert recorder.times[1] - recorder.times[0] >= 0.15
+        assert recorder.times[2] - recorder.times[1] >= 0.15
+
+    async def test_errors(self, coalescing_bot, monkeypatch):
+        recorder = RequestRecorder(coalescing_bot, monkeypatch)
+        recorder.failing.add("2")
+        await coalescing_bot.edit_message_text("0", chat_id=1, message_id=1)
+        results = await asyncio.gather(
+            coalescing_bot.edit_message_text("1", chat_id=1, message_id=1),
+            coalescing_bot.edit_message_text("2", chat_id=1, message_id=1),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, BadRequest) for result in results)
+        assert [data["text"] for _, data in recorder.requests] == ["0", "2"]
+
+    async def test_cancelled_caller(self, coalescing_bot, monkeypatch):
+        recorder = RequestRecorder(coalescing_bot, monkeypatch)
+        await coalescing_bot.edit_message_text("0", chat_id=1, message_id=1)
+        task = asyncio.create_task(coalescing_bot.edit_message_text("1", chat_id=1, message_id=1))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.sleep(0.3)
+        assert [data["text"] for _, data in recorder.requests] == ["0"]
+        assert len(coalescing_bot.edit_coalescer) == 0
+
+    async def test_flush_on_shutdown(self, bot_info, monkeypatch):
+        async with make_bot(bot_info, edit_coalescer=EditCoalescer(min_interval=10)) as bot:
+            recorder = RequestRecorder(bot, monkeypatch)
+            await bot.edit_message_text("0", chat_id=1, message_id=1)
+            task = asyncio.create_task(bot.edit_message_text("1", chat_id=1, message_id=1))
+            await asyncio.sleep(0.01)
+            start = time.perf_counter()
+        # Shutting down sends the most recent edit right away
+        assert (await task).text == "1"
+        assert time.perf_counter() - start < 1
+        assert [data["text"] for _, data in recorder.requests] == ["0", "1"]
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import datetime as dtm
+
+import pytest
+
+from telegram import (
+    CallbackQuery,
+    Chat,
+    ChatBoost,
+    ChatBoostSourcePremium,
+    ChatBoostUpdated,
+    ChatMemberMember,
+    ChatMemberUpdated,
+    ExternalReplyInfo,
+    GiveawayCompleted,
+    GiveawayWinners,
+    InaccessibleMessage,
+    Message,
+    MessageOriginChannel,
+    MessageOriginChat,
+    MessageOriginUser,
+    PollAnswer,
+    ProximityAlertTriggered,
+    Update,
+    User,
+)
+from telegram._utils.datetime import UTC
+from telegram.ext import ApplicationBuilder, EntityStore, TypeHandler
+from tests.auxil.slots import mro_slots
+
+NOW = dtm.datetime.now(tz=UTC)
+GROUP = Chat(-1, Chat.SUPERGROUP, title="group", username="Group")
+USER = User(1, "user", False, username="User")
+
+
+def message_update(**kwargs):
+    return Update(1, message=Message(1, NOW, GROUP, from_user=USER, **kwargs))
+
+
+class TestEntityStore:
+    def test_slot_behaviour(self):
+        inst = EntityStore()
+        for attr in inst.__slots__:
+            assert getattr(inst, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(inst)) == len(set(mro_slots(inst))), "duplicate slot"
+
+    def test_init(self):
+        assert EntityStore().maxsize == 4096
+        assert EntityStore(maxsize=42).maxsize == 42
+        with pytest.raises(ValueError, match="positive integer"):
+            EntityStore(maxsize=0)
+
+    def test_process_update(self):
+        store = EntityStore()
+        store.process_update(message_update())
+        assert store.get_user(1) is USER
+        assert store.get_chat(-1) is GROUP
+        assert store.get_user(-1) is None
+        assert store.get_chat(1) is None
+        assert len(store) == 2
+
+        assert store.resolve_username("user") == 1
+        assert store.resolve_username("@GROUP") == -1
+        assert store.resolve_username("@unknown") is None
+
+    def test_nested_entities(self):
+        store = EntityStore()
+        channel = Chat(-2, Chat.CHANNEL, username="channel")
+        forwarded_from = User(2, "forwarded", False)
+        mentioned = User(3, "new member", False)
+        store.process_update(
+            message_update(
+                forward_origin=MessageOriginUser(NOW, forwarded_from),
+                new_chat_members=[mentioned],
+                reply_to_message=Message(
+                    2, NOW, GROUP, forward_origin=MessageOriginChannel(NOW, channel, 1)
+                ),
+            )
+        )
+        assert store.get_user(2) is forwarded_from
+        assert store.get_user(3) is mentioned
+        assert store.get_chat(-2) is channel
+        assert store.resolve_username("channel") == -2
+
+        callback_query_user = User(4, "clicker", False)
+        store.process_update(
+            Update(
+                2,
+                callback_query=CallbackQuery(
+                    "1", callback_query_user, "instance", message=Message(3, NOW, GROUP)
+                ),
+            )
+        )
+        assert store.get_user(4) is callback_query_user
+
+        old_member = ChatMemberMember(User(5, "member", False))
+        store.process_update(
+            Update(3, chat_member=ChatMemberUpdated(GROUP, USER, NOW, old_member, old_member))
+        )
+        assert store.get_user(5) is old_member.user
+
+    def test_other_locations(self):
+        store = EntityStore()
+        users = [User(user_id, str(user_id), False) for user_id in range(2, 7)]
+        chats = [Chat(chat_id, Chat.CHANNEL) for chat_id in range(-8, -1)]
+        store.process_update(
+            message_update(
+                proximity_alert_triggered=ProximityAlertTriggered(users[0], users[1], 1),
+                external_reply=ExternalReplyInfo(MessageOriginChat(NOW, chats[0]), chats[1]),
+                pinned_message=InaccessibleMessage(chats[2], 1),
+                giveaway_completed=GiveawayCompleted(
+                    1,
+                    0,
+                    giveaway_message=Message(
+                        2,
+                        NOW,
+                        chats[3],
+                        giveaway_winners=GiveawayWinners(chats[4], 1, NOW, 1, [users[2]]),
+                    ),
+                ),
+            )
+        )
+        store.process_update(Update(2, poll_answer=PollAnswer("1", [0], chats[5])))
+        store.process_update(Update(3, poll_answer=PollAnswer("1", [0], user=users[3])))
+        store.process_update(
+            Update(
+                4,
+                chat_boost=ChatBoostUpdated(
+                    chats[6], ChatBoost("1", NOW, NOW, ChatBoostSourcePremium(users[4]))
+                ),
+            )
+        )
+        assert all(store.get_user(user.id) is user for user in users)
+        assert all(store.get_chat(chat.id) is chat for chat in chats)
+
+    def test_first_occurrence_wins(self):
+        store = EntityStore()
+        renamed = User(1, "user", False, username="new_name")
+        store.process_update(
+            Update(
+                1,
+                message=Message(
+                    1,
+                    NOW,
+                    GROUP,
+                    from_user=renamed,
+                    reply_to_message=Message(2, NOW, GROUP, from_user=USER),
+                ),
+            )
+        )
+        assert store.get_user(1) is renamed
+
+    def test_username_changes(self):
+        store = EntityStore()
+        store.process_update(message_update())
+        renamed = User(1, "user", False, username="new_name")
+        store.process_update(Update(2, message=Message(2, NOW, GROUP, from_user=renamed)))
+        assert store.resolve_username("new_name") == 1
+        assert store.resolve_username("user") is None
+
+        # A user and their private chat share id and username
+        private_chat = Chat(1, Chat.PRIVATE, username="new_name")
+        store.process_update(Update(3, message=Message(3, NOW, private_chat, from_user=renamed)))
+        store.process_update(
+            Update(4, message=Message(4, NOW, private_chat, from_user=User(1, "user", False)))
+        )
+        assert store.resolve_username("new_name") == 1
+
+    def test_maxsize(self):
+        store = EntityStore(maxsize=2)
+        for user_id in range(1, 4):
+            store.process_update(
+                Update(
+                    user_id,
+                    message=Message(
+                        1,
+                        NOW,
+                        GROUP,
+                        from_user=User(user_id, "user", False, username=f"user_{user_id}"),
+                    ),
+                )
+            )
+        assert store.get_user(1) is None
+        assert store.get_user(3) is not None
+        assert store.resolve_username("user_1") is None
+        assert store.resolve_username("user_3") == 3
+        assert len(store) == 3
+
+        store.clear()
+        assert len(store) == 0
+        assert store.resolve_username("user_3") is None
+
+    async def test_application(self, bot):
+        application = ApplicationBuilder().bot(bot).entity_store(True).build()
+        assert isinstance(application.entity_store, EntityStore)
+        titles = []
+
+        async def callback(update, context):
+            titles.append(context.application.entity_store.get_chat(-1).title)
+
+        application.add_handler(TypeHandler(Update, callback))
+        async with application:
+            await application.process_update(message_update())
+        assert titles == ["group"]
+
+        assert ApplicationBuilder().bot(bot).build().entity_store is None
+        store = EntityStore()
+        assert ApplicationBuilder().bot(bot).entity_store(store).build().entity_store is store
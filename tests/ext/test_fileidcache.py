@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import datetime as dtm
+import io
+import json
+import os
+
+import pytest
+
+import telegram.ext._fileidcache
+from telegram import Chat, Document, InputFile, Message, PhotoSize
+from telegram._utils.datetime import UTC
+from telegram.error import BadRequest
+from telegram.ext import ApplicationBuilder, FileIdCache, PicklePersistence
+from tests.auxil.pytest_classes import make_bot
+from tests.auxil.slots import mro_slots
+
+
+class RequestRecorder:
+    """Answers like the Bot API: Uploads get a new file id, file ids are accepted unless they
+    were revoked."""
+
+    def __init__(self, bot, monkeypatch):
+        self.requests = []
+        self.revoked = set()
+        self.uploads = 0
+        monkeypatch.setattr(bot.request, "do_request", self.do_request)
+
+    async def do_request(self, url, method, request_data=None, *args, **kwargs):
+        endpoint = url.rsplit("/", 1)[-1]
+        field = FileIdCache.ENDPOINTS[endpoint]
+        if request_data.contains_files:
+            self.uploads += 1
+            file_id = f"file_id_{self.uploads}"
+        else:
+            file_id = request_data.json_parameters[field]
+        self.requests.append((endpoint, request_data.contains_files, file_id))
+
+        if file_id in self.revoked:
+            return (
+                400,
+                json.dumps(
+                    {
+                        "ok": False,
+                        "error_code": 400,
+                        "description": "Bad Request: wrong file identifier/HTTP URL specified",
+                    }
+                ).encode(),
+            )
+
+        kwargs = (
+            {"photo": [PhotoSize(f"small_{file_id}", "u", 1, 1), PhotoSize(file_id, "u", 2, 2)]}
+            if field == "photo"
+            else {"document": Document(file_id, "u")}
+        )
+        message = Message(1, dtm.datetime.now(tz=UTC), Chat(1, "private"), **kwargs)
+        return 200, b'{"ok": true, "result": ' + message.to_json().encode() + b"}"
+
+
+@pytest.fixture
+async def cache_bot(bot_info):
+    async with make_bot(bot_info, file_id_cache=True) as _bot:
+        yield _bot
+
+
+@pytest.fixture
+def banner(tmp_path):
+    path = tmp_path / "banner.png"
+    path.write_bytes(b"banner content")
+    return path
+
+
+class TestFileIdCache:
+    def test_slot_behaviour(self):
+        inst = FileIdCache()
+        for attr in inst.__slots__:
+            assert getattr(inst, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(inst)) == len(set(mro_slots(inst))), "duplicate slot"
+
+    def test_init(self, bot_info):
+        assert FileIdCache().maxsize == 1024
+        assert FileIdCache(maxsize=42).maxsize == 42
+        with pytest.raises(ValueError, match="positive integer"):
+            FileIdCache(maxsize=0)
+
+        assert make_bot(bot_info).file_id_cache is None
+        assert make_bot(bot_info, file_id_cache=True).file_id_cache.maxsize == 1024
+        assert make_bot(bot_info, file_id_cache=42).file_id_cache.maxsize == 42
+        cache = FileIdCache()
+        assert make_bot(bot_info, file_id_cache=cache).file_id_cache is cache
+
+    async def test_get_key(self, banner):
+        cache = FileIdCache()
+        key = await cache.get_key("sendPhoto", InputFile(banner))
+        assert key.startswith("photo:banner.png:")
+        # Same content, same key - no matter where the content comes from
+        assert await cache.get_key("sendPhoto", InputFile(b"banner content", "banner.png")) == key
+        assert (
+            await cache.get_key(
+                "sendPhoto",
+                InputFile(io.BytesIO(b"banner content"), "banner.png", read_file_handle=False),
+            )
+            == key
+        )
+        # Different endpoint, file name or content, different key
+        assert await cache.get_key("sendDocument", InputFile(banner)) != key
+        assert await cache.get_key("sendPhoto", InputFile(banner, "other.png")) != key
+        assert await cache.get_key("sendPhoto", InputFile(b"other", "banner.png")) != key
+
+    async def test_get_key_not_hashable(self):
+        async def content():
+            yield b"content"
+
+        iterable = content()
+        assert await FileIdCache().get_key("sendPhoto", InputFile(iterable)) is None
+        # The content was not consumed
+        assert [chunk async for chunk in iterable] == [b"content"]
+
+    async def test_get_key_file_handle_position(self):
+        file_handle = io.BytesIO(b"content")
+        file_handle.seek(3)
+        await FileIdCache().get_key("sendPhoto", InputFile(file_handle, read_file_handle=False))
+        assert file_handle.tell() == 0
+
+    async def test_local_file_hashed_once(self, banner, monkeypatch):
+        hashed = []
+        original_hash = telegram.ext._fileidcache._hash_local_file
+
+        def hash_local_file(path):
+            hashed.append(path)
+            return original_hash(path)
+
+        monkeypatch.setattr(telegram.ext._fileidcache, "_hash_local_file", hash_local_file)
+        cache = FileIdCache()
+        key = await cache.get_key("sendPhoto", InputFile(banner))
+        assert await cache.get_key("sendPhoto", InputFile(banner)) == key
+        assert hashed == [banner]
+
+        # Modifying the file invalidates the hash
+        banner.write_bytes(b"new banner content")
+        stat = banner.stat()
+        os.utime(banner, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert await cache.get_key("sendPhoto", InputFile(banner)) != key
+        assert hashed == [banner, banner]
+
+    def test_file_ids(self):
+        cache = FileIdCache(maxsize=2)
+        assert cache.pop_changed() is False
+        cache.put_file_id("a", "1")
+        cache.put_file_id("b", "2")
+        assert cache.pop_changed() is True
+        assert cache.pop_changed() is False
+
+        # Storing the same value again is not a change
+        cache.put_file_id("b", "2")
+        assert cache.pop_changed() is False
+
+        # a is used most recently, so b is dropped
+        assert cache.get_file_id("a") == "1"
+        cache.put_file_id("c", "3")
+        assert cache.get_file_id("b") is None
+        assert cache.persistence_data == {"a": "1", "c": "3"}
+        assert len(cache) == 2
+
+        cache.drop_file_id("a")
+        assert cache.get_file_id("a") is None
+        assert cache.pop_changed() is True
+        cache.drop_file_id("a")
+        assert cache.pop_changed() is False
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.pop_changed() is True
+
+        cache.mark_changed()
+        assert cache.pop_changed() is True
+        assert cache.pop_changed() is False
+
+    def test_load_persistence_data(self):
+        cache = FileIdCache(maxsize=2)
+        cache.load_persistence_data({"a": "1", "b": "2", "c": "3"})
+        assert cache.persistence_data == {"b": "2", "c": "3"}
+        assert cache.pop_changed() is False
+
+    @pytest.mark.parametrize(
+        ("message", "expected"),
+        [
+            ("Bad Request: wrong file identifier/HTTP URL specified", True),
+            ("Bad Request: wrong remote file identifier specified: can't unserialize it", True),
+            ("Bad Request: FILE_REFERENCE_EXPIRED", True),
+            ("Bad Request: chat not found", False),
+        ],
+    )
+    def test_is_file_id_error(self, message, expected):
+        assert FileIdCache.is_file_id_error(BadRequest(message)) is expected
+
+    @pytest.mark.parametrize(
+        ("endpoint", "result", "expected"),
+        [
+            ("sendPhoto", {"photo": [{"file_id": "small"}, {"file_id": "big"}]}, "big"),
+            ("sendDocument", {"document": {"file_id": "id"}}, "id"),
+            ("sendDocument", {"animation": {"file_id": "id"}}, None),
+            ("sendPhoto", {"photo": []}, None),
+            ("sendPhoto", True, None),
+        ],
+    )
+    def test_extract_file_id(self, endpoint, result, expected):
+        assert FileIdCache.extract_file_id(endpoint, result) == expected
+
+    async def test_send_reuses_file_id(self, cache_bot, monkeypatch, banner):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        for chat_id in range(3):
+            message = await cache_bot.send_photo(chat_id, banner)
+            assert message.photo[-1].file_id == "file_id_1"
+        await cache_bot.send_document(1, banner)
+        await cache_bot.send_document(1, banner)
+
+        assert recorder.requests == [
+            ("sendPhoto", True, "file_id_1"),
+            ("sendPhoto", False, "file_id_1"),
+            ("sendPhoto", False, "file_id_1"),
+            ("sendDocument", True, "file_id_2"),
+            ("sendDocument", False, "file_id_2"),
+        ]
+
+    async def test_revoked_file_id(self, cache_bot, monkeypatch, banner):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        await cache_bot.send_photo(1, banner)
+        recorder.revoked.add("file_id_1")
+
+        message = await cache_bot.send_photo(1, banner)
+        assert message.photo[-1].file_id == "file_id_2"
+        await cache_bot.send_photo(1, banner)
+
+        assert recorder.requests == [
+            ("sendPhoto", True, "file_id_1"),
+            ("sendPhoto", False, "file_id_1"),
+            ("sendPhoto", True, "file_id_2"),
+            ("sendPhoto", False, "file_id_2"),
+        ]
+
+    async def test_other_errors_are_raised(self, cache_bot, monkeypatch, banner):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        await cache_bot.send_photo(1, banner)
+
+        async def do_request(*args, **kwargs):
+            return (
+                400,
+                b'{"ok": false, "error_code": 400, "description": "Bad Request: chat not found"}',
+            )
+
+        monkeypatch.setattr(cache_bot.request, "do_request", do_request)
+        with pytest.raises(BadRequest, match="Chat not found"):
+            await cache_bot.send_photo(1, banner)
+        # The file id is kept
+        assert len(cache_bot.file_id_cache) == 1
+        assert recorder.uploads == 1
+
+    async def test_not_cached(self, bot_info, cache_bot, monkeypatch, banner):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        # file ids and URLs are sent as they are
+        await cache_bot.send_photo(1, "some_file_id")
+        assert len(cache_bot.file_id_cache) == 0
+
+        # Without cache, every send uploads the file
+        async with make_bot(bot_info) as bot:
+            recorder = RequestRecorder(bot, monkeypatch)
+            await bot.send_photo(1, banner)
+            await bot.send_photo(1, banner)
+        assert recorder.uploads == 2
+
+    async def test_persistence(self, bot_info, tmp_path, monkeypatch, banner):
+        def build_application():
+            application = (
+                ApplicationBuilder()
+                .bot(make_bot(bot_info, file_id_cache=True))
+                .persistence(PicklePersistence(tmp_path / "persistence"))
+                .build()
+            )
+            return application, RequestRecorder(application.bot, monkeypatch)
+
+        application, recorder = build_application()
+        async with application:
+            await application.bot.send_photo(1, banner)
+            await application.update_persistence()
+        assert recorder.uploads == 1
+
+        application, recorder = build_application()
+        async with application:
+            assert len(application.bot.file_id_cache) == 1
+            await application.bot.send_photo(1, banner)
+        assert recorder.requests == [("sendPhoto", False, "file_id_1")]
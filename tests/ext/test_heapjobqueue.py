@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+"""The general behaviour of HeapJobQueue is tested along with JobQueue in test_jobqueue.py. This
+module contains the tests for the parts that are specific to HeapJobQueue."""
+import asyncio
+import datetime as dtm
+import logging
+import time
+
+import pytest
+
+from telegram.ext import ApplicationBuilder, HeapJobQueue, Job
+from tests.auxil.envvars import TEST_WITH_OPT_DEPS
+from tests.auxil.slots import mro_slots
+
+if TEST_WITH_OPT_DEPS:
+    from apscheduler.jobstores.base import ConflictingIdError, JobLookupError
+    from apscheduler.triggers.interval import IntervalTrigger
+
+
+@pytest.fixture
+async def job_queue(app):
+    jq = HeapJobQueue()
+    jq.set_application(app)
+    await jq.start()
+    yield jq
+    await jq.stop()
+
+
+@pytest.mark.skipif(
+    not TEST_WITH_OPT_DEPS, reason="Only relevant if the optional dependency is installed"
+)
+@pytest.mark.flaky(3, 1)  # Timings aren't quite perfect
+class TestHeapJobQueue:
+    result = 0
+
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        self.result = 0
+
+    async def callback(self, context):
+        self.result += 1
+
+    def test_slot_behaviour(self, job_queue):
+        heap_job = job_queue.run_once(self.callback, 10).job
+        for inst in (job_queue, heap_job):
+            for attr in inst.__slots__:
+                assert getattr(inst, attr, "err") != "err", f"got extra slot '{attr}'"
+            assert len(mro_slots(inst)) == len(set(mro_slots(inst))), "duplicate slot"
+
+    def test_application_builder(self, bot):
+        job_queue = HeapJobQueue()
+        application = ApplicationBuilder().bot(bot).job_queue(job_queue).build()
+        assert application.job_queue is job_queue
+        assert job_queue.application is application
+
+    async def test_job_interface(self, job_queue):
+        when = dtm.datetime.now(dtm.timezone.utc) + dtm.timedelta(days=1)
+        job = job_queue.run_once(self.callback, when, name="name")
+        heap_job = job.job
+
+        assert heap_job.id == job.id
+        assert heap_job.name == "name"
+        assert heap_job.args == (job_queue, job)
+        assert Job.from_aps_job(heap_job) is job
+        assert job.next_t == when
+        assert str(heap_job.trigger) == f"date[{when:%Y-%m-%d %H:%M:%S UTC}]"
+        assert str(heap_job) == (
+            f"name (trigger: date[{when:%Y-%m-%d %H:%M:%S UTC}], "
+            f"next run at: {when:%Y-%m-%d %H:%M:%S UTC})"
+        )
+
+        job.enabled = False
+        assert job.next_t is None
+        assert str(heap_job).endswith(", paused)")
+        job.enabled = True
+        assert job.next_t == when
+
+    async def test_jobs_ordered_by_next_run_time(self, job_queue):
+        job_1 = job_queue.run_once(self.callback, 30)
+        job_2 = job_queue.run_repeating(self.callback, 10)
+        job_3 = job_queue.run_once(self.callback, 20)
+        job_4 = job_queue.run_custom(self.callback, {"trigger": "interval", "seconds": 5})
+        assert job_queue.jobs() == (job_4, job_2, job_3, job_1)
+
+        job_2.enabled = False
+        assert job_queue.jobs() == (job_4, job_3, job_1, job_2)
+
+    async def test_jobs_includes_scheduler_jobs(self, job_queue):
+        heap_job = job_queue.run_once(self.callback, 30)
+        aps_job = Job(self.callback)
+        job_queue.scheduler.add_job(
+            job_queue.job_callback, args=(job_queue, aps_job), trigger="interval", seconds=10
+        )
+        assert job_queue.jobs() == (aps_job, heap_job)
+
+    async def test_remove_finished_job(self, job_queue):
+        job = job_queue.run_once(self.callback, 0.05)
+        await asyncio.sleep(0.1)
+        assert self.result == 1
+        assert job_queue.jobs() == ()
+        # Same behavior as for jobs scheduled via APScheduler
+        with pytest.raises(JobLookupError):
+            job.schedule_removal()
+
+    @pytest.mark.parametrize("misfire_grace_time", [None, 1])
+    async def test_misfire_grace_time(self, job_queue, caplog, misfire_grace_time):
+        job_kwargs = {} if misfire_grace_time == 1 else {"misfire_grace_time": misfire_grace_time}
+        job_queue.run_once(self.callback, dtm.timedelta(seconds=-5), job_kwargs=job_kwargs)
+
+        with caplog.at_level(logging.WARNING):
+            await asyncio.sleep(0.05)
+
+        if misfire_grace_time is None:
+            assert self.result == 1
+            assert not caplog.records
+        else:
+            assert self.result == 0
+            assert len(caplog.records) == 1
+            assert "was missed by 0:00:05" in caplog.records[0].getMessage()
+
+    @pytest.mark.parametrize("coalesce", [True, False])
+    async def test_coalesce(self, job_queue, coalesce):
+        job_queue.run_repeating(
+            self.callback,
+            0.1,
+            first=0.1,
+            job_kwargs={"coalesce": coalesce, "misfire_grace_time": None, "max_instances": 10},
+        )
+        # Block the event loop such that several runs are overdue
+        time.sleep(0.45)  # noqa: ASYNC251
+        await asyncio.sleep(0.02)
+        assert self.result == (1 if coalesce else 4)
+
+    @pytest.mark.parametrize("max_instances", [1, 2])
+    async def test_max_instances(self, job_queue, caplog, max_instances):
+        event = asyncio.Event()
+
+        async def callback(_):
+            self.result += 1
+            await event.wait()
+
+        job_queue.run_repeating(
+            callback, 0.05, first=0.05, job_kwargs={"max_instances": max_instances}
+        )
+        with caplog.at_level(logging.WARNING):
+            await asyncio.sleep(0.23)
+        event.set()
+
+        assert self.result == max_instances
+        assert caplog.records
+        assert "maximum number of running instances reached" in caplog.records[0].getMessage()
+
+    async def test_job_id(self, job_queue):
+        job = job_queue.run_once(self.callback, 10, job_kwargs={"id": "job_id"})
+        assert job.id == "job_id"
+
+        with pytest.raises(ConflictingIdError):
+            job_queue.run_once(self.callback, 10, job_kwargs={"id": "job_id"})
+
+        new_job = job_queue.run_repeating(
+            self.callback, 10, job_kwargs={"id": "job_id", "replace_existing": True}
+        )
+        assert job_queue.jobs() == (new_job,)
+        assert job_queue.jobs()[0] is new_job
+
+    async def test_next_run_time(self, job_queue):
+        job = job_queue.run_repeating(self.callback, 0.05, job_kwargs={"next_run_time": None})
+        assert job.next_t is None
+        await asyncio.sleep(0.1)
+        assert self.result == 0
+        assert job_queue.jobs() == (job,)
+
+        when = dtm.datetime.now(dtm.timezone.utc) + dtm.timedelta(seconds=0.05)
+        job_queue.run_repeating(self.callback, 10, job_kwargs={"next_run_time": when})
+        await asyncio.sleep(0.1)
+        assert self.result == 1
+
+    async def test_run_custom_trigger_instance(self, job_queue):
+        job = job_queue.run_custom(
+            self.callback, {"trigger": IntervalTrigger(seconds=0.1, timezone=dtm.timezone.utc)}
+        )
+        assert job.job.trigger.interval == dtm.timedelta(seconds=0.1)
+        await asyncio.sleep(0.25)
+        assert self.result == 2
+
+    async def test_job_kwargs_as_trigger_arguments(self, job_queue):
+        end_date = dtm.datetime.now(dtm.timezone.utc) + dtm.timedelta(seconds=0.15)
+        job_queue.run_repeating(self.callback, 0.1, job_kwargs={"end_date": end_date})
+        await asyncio.sleep(0.35)
+        assert self.result == 1
+        assert job_queue.jobs() == ()
+
+    async def test_invalid_job_kwargs(self, job_queue):
+        with pytest.raises(ValueError, match="does not support the job_kwargs executor, jobstore"):
+            job_queue.run_once(self.callback, 10, job_kwargs={"jobstore": "a", "executor": "b"})
+        with pytest.raises(TypeError, match="Unexpected job_kwargs for a one-off job: end_date"):
+            job_queue.run_once(self.callback, 10, job_kwargs={"end_date": 1})
+        with pytest.raises(ValueError, match="does not support the trigger 'calendarinterval'"):
+            job_queue.run_custom(self.callback, {"trigger": "calendarinterval"})
+        assert job_queue.jobs() == ()
+
+    async def test_jobs_added_before_start(self, app):
+        job_queue = HeapJobQueue()
+        job_queue.set_application(app)
+        job_queue.run_once(self.callback, 0.05)
+        await asyncio.sleep(0.1)
+        assert self.result == 0
+
+        await job_queue.start()
+        await asyncio.sleep(0.05)
+        assert self.result == 1
+        await job_queue.stop()
+
+    async def test_system_time_change(self, job_queue, monkeypatch, caplog):
+        job = job_queue.run_once(self.callback, 0.05)
+        next_t = job.next_t
+        # The deadlines are kept on the monotonic clock, so the jobs neither count as missed nor
+        # are run early when the system time jumps
+        real_time = time.time
+        monkeypatch.setattr(time, "time", lambda: real_time() + 3600)
+        job_queue.run_once(self.callback, 0.5)
+        assert job.next_t == next_t
+
+        with caplog.at_level(logging.WARNING):
+            await asyncio.sleep(0.1)
+        assert self.result == 1
+        assert not caplog.records
+
+    async def test_stale_entries_are_dropped(self, job_queue, monkeypatch):
+        monkeypatch.setattr("telegram.ext._heapjobqueue._MAX_STALE_ENTRIES", 10)
+        jobs = [job_queue.run_once(self.callback, 10 + i) for i in range(100)]
+        for job in jobs[:50]:
+            job.schedule_removal()
+        assert len(job_queue._heap) <= 50 + 10
+        assert job_queue.jobs() == tuple(jobs[50:])
+
+    @pytest.mark.benchmark
+    async def test_many_one_shot_jobs(self, job_queue):
+        number_of_jobs = 100_000
+        done = asyncio.Event()
+
+        async def callback(_):
+            self.result += 1
+            if self.result == number_of_jobs:
+                done.set()
+
+        start = time.perf_counter()
+        for i in range(number_of_jobs):
+            job_queue.run_once(callback, 0.1 + i * 1e-6, job_kwargs={"misfire_grace_time": None})
+        scheduled = time.perf_counter()
+        await asyncio.wait_for(done.wait(), timeout=120)
+        finished = time.perf_counter()
+
+        print(
+            f"Scheduled {number_of_jobs} jobs in {scheduled - start:.2f}s, all of them ran after "
+            f"{finished - start:.2f}s"
+        )
+        assert job_queue.jobs() == ()
+        assert not job_queue._heap
@@ -25,7 +25,15 @@ import time
 
 import pytest
 
-from telegram.ext import ApplicationBuilder, CallbackContext, ContextTypes, Defaults, Job, JobQueue
+from telegram.ext import (
+    ApplicationBuilder,
+    CallbackContext,
+    ContextTypes,
+    Defaults,
+    HeapJobQueue,
+    Job,
+    JobQueue,
+)
 from tests.auxil.envvars import GITHUB_ACTION, TEST_WITH_OPT_DEPS
 from tests.auxil.pytest_classes import make_bot
 from tests.auxil.slots import mro_slots
@@ -44,9 +52,9 @@ class CustomContext(CallbackContext):
     pass
 
 
-@pytest.fixture
-async def job_queue(app):
-    jq = JobQueue()
+@pytest.fixture(params=[JobQueue, HeapJobQueue], ids=["JobQueue", "HeapJobQueue"])
+async def job_queue(app, request):
+    jq = request.param()
     jq.set_application(app)
     await jq.start()
     yield jq
@@ -57,9 +65,10 @@ async def job_queue(app):
     TEST_WITH_OPT_DEPS, reason="Only relevant if the optional dependency is not installed"
 )
 class TestNoJobQueue:
-    def test_init_job_queue(self):
+    @pytest.mark.parametrize("job_queue_class", [JobQueue, HeapJobQueue])
+    def test_init_job_queue(self, job_queue_class):
         with pytest.raises(RuntimeError, match=r"python-telegram-bot\[job-queue\]"):
-            JobQueue()
+            job_queue_class()
 
     def test_init_job(self):
         with pytest.raises(RuntimeError, match=r"python-telegram-bot\[job-queue\]"):
@@ -459,6 +468,60 @@ class TestJobQueue:
         assert job_queue.get_jobs_by_name("name1") == (job1, job2)
         assert job_queue.get_jobs_by_name("name2") == (job3,)
 
+    async def test_get_jobs_by_chat_and_user(self, job_queue):
+        callback = self.job_run_once
+
+        job1 = job_queue.run_once(callback, 10, chat_id=1, user_id=2)
+        job2 = job_queue.run_repeating(callback, 10, chat_id=1)
+        job3 = job_queue.run_daily(callback, dtm.time(), user_id=2)
+        job4 = job_queue.run_custom(
+            callback, {"trigger": "interval", "seconds": 10}, chat_id=3, user_id=3
+        )
+
+        assert job_queue.get_jobs_by_chat(1) == (job1, job2)
+        assert job_queue.get_jobs_by_chat(3) == (job4,)
+        assert job_queue.get_jobs_by_chat(2) == ()
+        assert job_queue.get_jobs_by_user(2) == (job1, job3)
+        assert job_queue.get_jobs_by_user(3) == (job4,)
+        assert job_queue.get_jobs_by_user(1) == ()
+
+        job1.schedule_removal()
+        # changing the attributes doesn't affect the index
+        job4.chat_id = 4
+        job4.schedule_removal()
+        assert job_queue.get_jobs_by_chat(1) == (job2,)
+        assert job_queue.get_jobs_by_chat(3) == ()
+        assert job_queue.get_jobs_by_user(2) == (job3,)
+        assert job_queue.get_jobs_by_user(3) == ()
+
+    async def test_job_index_updated_after_last_run(self, job_queue):
+        async def callback(_):
+            self.result += 1
+
+        job = job_queue.run_once(callback, 0.05, name="name", chat_id=1, user_id=1)
+        assert job_queue.get_jobs_by_name("name") == (job,)
+        await asyncio.sleep(0.1)
+        assert self.result == 1
+        assert job_queue.get_jobs_by_name("name") == ()
+        assert job_queue.get_jobs_by_chat(1) == ()
+        assert job_queue.get_jobs_by_user(1) == ()
+
+    async def test_job_index_with_jobs_added_to_scheduler(self, job_queue):
+        job = Job(self.job_run_once, name="name", chat_id=1)
+        job_queue.scheduler.add_job(
+            job_queue.job_callback, args=(job_queue, job), trigger="interval", seconds=10
+        )
+        assert job_queue.get_jobs_by_name("name") == (job,)
+        assert job_queue.get_jobs_by_chat(1) == (job,)
+
+        other_job = job_queue.run_once(self.job_run_once, 10, name="name")
+        job_queue.scheduler.remove_all_jobs()
+        assert job_queue.get_jobs_by_chat(1) == ()
+        if isinstance(job_queue, HeapJobQueue):
+            assert job_queue.get_jobs_by_name("name") == (other_job,)
+        else:
+            assert job_queue.get_jobs_by_name("name") == ()
+
     async def test_job_run(self, app):
         job = app.job_queue.run_repeating(self.job_run_once, 0.02)
         await asyncio.sleep(0.05)  # the job queue has not started yet
@@ -622,6 +685,8 @@ class TestJobQueue:
             assert task.done()
 
     async def test_from_aps_job(self, job_queue):
+        if isinstance(job_queue, HeapJobQueue):
+            pytest.skip("HeapJobQueue doesn't create APScheduler jobs")
         job = job_queue.run_once(self.job_run_once, 0.1, name="test_job")
         aps_job = job_queue.scheduler.get_job(job.id)
 
@@ -633,6 +698,8 @@ class TestJobQueue:
         """We manually create a ext.Job and an aps job such that the former has no reference to the
         latter. Then we test that Job.from_aps_job() still sets the reference correctly.
         """
+        if isinstance(job_queue, HeapJobQueue):
+            pytest.skip("HeapJobQueue doesn't create APScheduler jobs")
         job = Job(self.job_run_once)
         aps_job = job_queue.scheduler.add_job(
             func=job_queue.job_callback,
@@ -687,3 +754,313 @@ class TestJobQueue:
 
         assert received_jobs == {2}
         assert len(caplog.records) == 0
+
+
+@pytest.mark.skipif(
+    not TEST_WITH_OPT_DEPS, reason="Only relevant if the optional dependency is installed"
+)
+@pytest.mark.flaky(3, 1)  # Timings aren't quite perfect
+class TestBulkJob:
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        self.results = []
+
+    async def callback(self, context):
+        self.results.append((context.job.chat_id, context.job.data))
+        assert context.chat_data is context.application.chat_data[context.job.chat_id]
+
+    def test_slot_behaviour(self, job_queue):
+        bulk_job = job_queue.run_daily_for([1], self.callback, dtm.time())
+        for attr in bulk_job.__slots__:
+            assert getattr(bulk_job, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(bulk_job)) == len(set(mro_slots(bulk_job))), "duplicate slot"
+
+    def test_invalid_arguments(self, job_queue):
+        with pytest.raises(ValueError, match="concurrency"):
+            job_queue.run_daily_for([1], self.callback, dtm.time(), concurrency=0)
+        with pytest.raises(ValueError, match="spread"):
+            job_queue.run_daily_for([1], self.callback, dtm.time(), spread=-1)
+        assert job_queue.jobs() == ()
+
+    async def test_run_daily_for(self, job_queue):
+        bulk_job = job_queue.run_daily_for(
+            [1, 2, 3],
+            self.callback,
+            dtm.time(hour=12),
+            days=(1,),
+            spread=dtm.timedelta(minutes=1),
+            concurrency=2,
+        )
+        assert job_queue.jobs() == (bulk_job.job,)
+        assert bulk_job.job.name == bulk_job.name == "callback"
+        assert bulk_job.job.next_t.time() == dtm.time(hour=12)
+        assert bulk_job.job.next_t.weekday() == 0
+        assert bulk_job.spread == 60
+        assert bulk_job.concurrency == 2
+        assert bulk_job.chat_ids == (1, 2, 3)
+        assert len(bulk_job) == 3
+        assert 2 in bulk_job
+        assert 4 not in bulk_job
+        assert repr(bulk_job) == "BulkJob[name=callback, chats=3]"
+        assert bulk_job.progress == (0, 0)
+
+        bulk_job.job.schedule_removal()
+        assert job_queue.jobs() == ()
+
+    async def test_fan_out(self, job_queue, app):
+        bulk_job = job_queue.run_daily_for([1, 2, 3], self.callback, dtm.time(), data="data")
+        bulk_job.add_chat(4)
+        bulk_job.remove_chat(1)
+        with pytest.raises(KeyError):
+            bulk_job.remove_chat(1)
+
+        await bulk_job.job.run(app)
+        assert self.results == [(2, "data"), (3, "data"), (4, "data")]
+        assert bulk_job.progress == (3, 3)
+
+    async def test_exception_in_callback(self, job_queue, app):
+        errors = []
+
+        async def callback(context):
+            if context.job.chat_id == 2:
+                raise RuntimeError("Test Error")
+            self.results.append(context.job.chat_id)
+
+        async def error_handler(_, context):
+            errors.append((context.job.chat_id, context.error))
+
+        app.add_error_handler(error_handler)
+        bulk_job = job_queue.run_daily_for([1, 2, 3], callback, dtm.time())
+        await bulk_job.job.run(app)
+        await asyncio.sleep(0.05)
+        assert self.results == [1, 3]
+        assert len(errors) == 1
+        assert errors[0][0] == 2
+        assert str(errors[0][1]) == "Test Error"
+
+    async def test_change_chats_while_running(self, job_queue, app):
+        async def callback(context):
+            self.results.append(context.job.chat_id)
+            if context.job.chat_id == 1:
+                bulk_job.remove_chat(3)
+                bulk_job.add_chat(4)
+
+        bulk_job = job_queue.run_daily_for([1, 2, 3], callback, dtm.time(), concurrency=1)
+        await bulk_job.job.run(app)
+        assert self.results == [1, 2]
+        assert bulk_job.progress == (3, 3)
+        assert bulk_job.chat_ids == (1, 2, 4)
+
+    async def test_schedule_removal_in_callback(self, job_queue, app):
+        async def callback(context):
+            self.results.append(context.job.chat_id)
+            assert context.job.next_t == bulk_job.job.next_t
+            if context.job.chat_id == 2:
+                # Only removes this chat, not the bulk job for all chats
+                context.job.schedule_removal()
+                assert context.job.removed
+                with pytest.raises(RuntimeError, match="BulkJob.job"):
+                    context.job.enabled = False
+
+        bulk_job = job_queue.run_daily_for([1, 2, 3], callback, dtm.time(), concurrency=1)
+        await bulk_job.job.run(app)
+        assert self.results == [1, 2, 3]
+        assert bulk_job.chat_ids == (1, 3)
+        assert not bulk_job.job.removed
+        assert job_queue.jobs() == (bulk_job.job,)
+
+        await bulk_job.job.run(app)
+        assert self.results == [1, 2, 3, 1, 3]
+
+    async def test_concurrency(self, job_queue, app):
+        running = 0
+
+        async def callback(_):
+            nonlocal running
+            running += 1
+            self.results.append(running)
+            await asyncio.sleep(0.05)
+            running -= 1
+
+        bulk_job = job_queue.run_daily_for(range(10), callback, dtm.time(), concurrency=3)
+        await bulk_job.job.run(app)
+        assert len(self.results) == 10
+        assert max(self.results) == 3
+
+    async def test_spread(self, job_queue, app):
+        loop = asyncio.get_running_loop()
+
+        async def callback(_):
+            self.results.append(loop.time())
+
+        bulk_job = job_queue.run_daily_for(range(5), callback, dtm.time(), spread=0.25)
+        task = asyncio.create_task(bulk_job.job.run(app))
+        await asyncio.sleep(0.12)
+        assert bulk_job.progress == (3, 5)
+        await task
+
+        intervals = [b - a for a, b in zip(self.results, self.results[1:])]
+        assert all(interval == pytest.approx(0.05, abs=0.02) for interval in intervals)
+
+    async def test_application_stop(self, app):
+        async def callback(context):
+            self.results.append(context.job.chat_id)
+
+        async with app:
+            await app.start()
+            bulk_job = app.job_queue.run_daily_for(range(10), callback, dtm.time(), spread=0.5)
+            task = asyncio.create_task(bulk_job.job.run(app))
+            await asyncio.sleep(0.12)
+            await app.stop()
+            await task
+
+        assert self.results == [0, 1, 2]
+        assert bulk_job.progress == (3, 10)
+
+
+@pytest.fixture
+async def limited_job_queue(job_queue, app):
+    jq = type(job_queue)(max_concurrent_jobs=1)
+    jq.set_application(app)
+    await jq.start()
+    yield jq
+    await jq.stop()
+
+
+@pytest.mark.skipif(
+    not TEST_WITH_OPT_DEPS, reason="Only relevant if the optional dependency is installed"
+)
+@pytest.mark.flaky(3, 1)  # Timings aren't quite perfect
+class TestJobConcurrencyLimit:
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        self.results = []
+        self.event = asyncio.Event()
+
+    async def block(self, context):
+        await self.event.wait()
+
+    async def record(self, context):
+        self.results.append(context.job.name)
+
+    def test_invalid_max_concurrent_jobs(self, job_queue):
+        with pytest.raises(ValueError, match="max_concurrent_jobs"):
+            type(job_queue)(max_concurrent_jobs=0)
+
+    def test_defaults(self, job_queue):
+        assert job_queue.max_concurrent_jobs is None
+        assert job_queue.running_jobs == 0
+        assert job_queue.waiting_jobs == 0
+        assert job_queue.last_lag is None
+        assert job_queue.max_lag is None
+        assert job_queue.mean_lag is None
+        assert Job(self.record).priority == 0
+
+    async def test_max_concurrent_jobs(self, job_queue, app):
+        jq = type(job_queue)(max_concurrent_jobs=2)
+        jq.set_application(app)
+        await jq.start()
+        try:
+            for i in range(5):
+                jq.run_once(self.block, 0.05, name=str(i))
+            await asyncio.sleep(0.1)
+            assert jq.max_concurrent_jobs == 2
+            assert jq.running_jobs == 2
+            assert jq.waiting_jobs == 3
+
+            self.event.set()
+            await asyncio.sleep(0.05)
+            assert jq.running_jobs == 0
+            assert jq.waiting_jobs == 0
+        finally:
+            await jq.stop()
+
+    async def test_priority(self, limited_job_queue):
+        limited_job_queue.run_once(self.block, 0.02)
+        for name, priority in (("low", -1), ("default", 0), ("high", 5), ("default_2", 0)):
+            limited_job_queue.run_once(self.record, 0.05, name=name).priority = priority
+        await asyncio.sleep(0.1)
+        assert self.results == []
+        assert limited_job_queue.waiting_jobs == 4
+
+        self.event.set()
+        await asyncio.sleep(0.05)
+        assert self.results == ["high", "default", "default_2", "low"]
+
+    async def test_waiting_run_is_not_duplicated(self, limited_job_queue):
+        limited_job_queue.run_once(self.block, 0.02)
+        limited_job_queue.run_repeating(
+            self.record, 0.05, first=0.05, name="repeating", job_kwargs={"max_instances": 10}
+        )
+        await asyncio.sleep(0.28)
+        assert limited_job_queue.waiting_jobs == 1
+
+        self.event.set()
+        await asyncio.sleep(0.01)
+        assert self.results == ["repeating"]
+
+    async def test_lag(self, limited_job_queue):
+        limited_job_queue.run_once(self.record, 0.02)
+        await asyncio.sleep(0.05)
+        assert limited_job_queue.last_lag < dtm.timedelta(seconds=0.02)
+
+        limited_job_queue.run_once(self.block, 0.02)
+        limited_job_queue.run_once(self.record, 0.05)
+        await asyncio.sleep(0.25)
+        self.event.set()
+        await asyncio.sleep(0.01)
+
+        assert limited_job_queue.last_lag.total_seconds() == pytest.approx(0.2, abs=0.05)
+        assert limited_job_queue.max_lag == limited_job_queue.last_lag
+        assert dtm.timedelta(0) < limited_job_queue.mean_lag < limited_job_queue.max_lag
+
+        limited_job_queue.reset_lag_statistics()
+        assert limited_job_queue.last_lag is None
+        assert limited_job_queue.max_lag is None
+        assert limited_job_queue.mean_lag is None
+
+    @pytest.mark.parametrize("cancel_waiting_first", [True, False])
+    async def test_cancel_running_and_waiting_run(self, app, cancel_waiting_first):
+        jq = HeapJobQueue(max_concurrent_jobs=1)
+        jq.set_application(app)
+        await jq.start()
+        running = jq.run_once(self.block, 60, name="running")
+        waiting = jq.run_once(self.record, 60, name="waiting")
+        running_task = asyncio.create_task(jq.job_callback(jq, running))
+        await asyncio.sleep(0)
+        waiting_task = asyncio.create_task(jq.job_callback(jq, waiting))
+        await asyncio.sleep(0)
+        assert jq.running_jobs == 1
+        assert jq.waiting_jobs == 1
+
+        # Both runs are cancelled in the same iteration of the event loop, e.g. by
+        # HeapJobQueue.stop(wait=False)
+        tasks = (
+            [waiting_task, running_task] if cancel_waiting_first else [running_task, waiting_task]
+        )
+        for task in tasks:
+            task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+        assert jq.waiting_jobs == 0
+        assert self.results == []
+
+        # The callback of the running job is shielded, so it keeps its slot until it's done
+        assert jq.running_jobs == 1
+        waiting_task = asyncio.create_task(jq.job_callback(jq, waiting))
+        await asyncio.sleep(0)
+        assert jq.waiting_jobs == 1
+        self.event.set()
+        await waiting_task
+        assert self.results == ["waiting"]
+        assert jq.running_jobs == 0
+        await jq.stop()
+
+    async def test_missed_runs_dont_count_towards_lag(self, job_queue):
+        job_queue.run_once(self.record, dtm.timedelta(seconds=-5))
+        await asyncio.sleep(0.05)
+        assert self.results == []
+        job_queue.run_once(self.record, 0.02)
+        await asyncio.sleep(0.05)
+        assert self.results == ["record"]
+        assert job_queue.max_lag < dtm.timedelta(seconds=0.02)
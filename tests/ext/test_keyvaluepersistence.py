@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import collections
+
+import pytest
+
+from telegram import Update, User
+from telegram.ext import (
+    BaseKeyValueClient,
+    ContextTypes,
+    InMemoryKeyValueClient,
+    KeyValuePersistence,
+    PersistenceInput,
+)
+from tests.auxil.slots import mro_slots
+
+
+class CountingClient(InMemoryKeyValueClient):
+    __slots__ = ("calls",)
+
+    def __init__(self):
+        super().__init__()
+        self.calls = collections.Counter()
+
+    async def set(self, key, value):
+        self.calls["set"] += 1
+        await super().set(key, value)
+
+    async def mset(self, mapping):
+        self.calls["mset"] += 1
+        await super().mset(mapping)
+
+    async def mget(self, keys):
+        self.calls["mget"] += 1
+        return await super().mget(keys)
+
+    async def delete(self, keys):
+        self.calls["delete"] += 1
+        await super().delete(keys)
+
+
+@pytest.fixture
+def client():
+    return CountingClient()
+
+
+@pytest.fixture
+def persistence(client):
+    return KeyValuePersistence(client=client)
+
+
+class TestInMemoryKeyValueClient:
+    def test_slot_behaviour(self):
+        inst = InMemoryKeyValueClient()
+        for attr in inst.__slots__:
+            assert getattr(inst, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(inst)) == len(set(mro_slots(inst))), "duplicate slot"
+
+    def test_abstract_methods(self):
+        with pytest.raises(TypeError, match="delete, get, mget, mset, scan, set"):
+            BaseKeyValueClient()
+
+    async def test_operations(self):
+        client = InMemoryKeyValueClient()
+        assert await client.get("a") is None
+        await client.set("a", b"1")
+        await client.mset({"b": b"2", "c:1": b"3", "c:2": b"4"})
+        assert await client.get("a") == b"1"
+        assert await client.mget(["b", "x", "c:1"]) == [b"2", None, b"3"]
+        assert sorted([key async for key in client.scan("c:")]) == ["c:1", "c:2"]
+        await client.delete(["a", "c:1", "x"])
+        assert client.data == {"b": b"2", "c:2": b"4"}
+
+
+class TestKeyValuePersistence:
+    def test_slot_behaviour(self, persistence):
+        inst = persistence
+        for attr in inst.__slots__:
+            assert getattr(inst, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(inst)) == len(set(mro_slots(inst))), "duplicate slot"
+
+    def test_defaults(self):
+        persistence = KeyValuePersistence()
+        assert isinstance(persistence.client, InMemoryKeyValueClient)
+        assert persistence.namespace == "ptb"
+        assert persistence.refresh_data is False
+        assert persistence.store_data == PersistenceInput()
+
+    async def test_no_data(self, persistence):
+        assert await persistence.get_user_data() == {}
+        assert await persistence.get_chat_data() == {}
+        assert await persistence.get_bot_data() == {}
+        assert await persistence.get_callback_data() is None
+        assert await persistence.get_conversations("name") == {}
+
+    async def test_round_trip(self, persistence, client):
+        await persistence.update_user_data(1, {"a": 1})
+        await persistence.update_chat_data(-1, {"b": 2})
+        await persistence.update_bot_data({"c": 3})
+        await persistence.update_callback_data(([("id", 1.0, {"button": "data"})], {"q": "id"}))
+        await persistence.update_conversation("name", (1, 2), "state")
+        await persistence.update_conversation("name", ("str", 2), "other_state")
+
+        new_persistence = KeyValuePersistence(client=client)
+        assert await new_persistence.get_user_data() == {1: {"a": 1}}
+        assert await new_persistence.get_chat_data() == {-1: {"b": 2}}
+        assert await new_persistence.get_bot_data() == {"c": 3}
+        assert await new_persistence.get_callback_data() == (
+            [("id", 1.0, {"button": "data"})],
+            {"q": "id"},
+        )
+        assert await new_persistence.get_conversations("name") == {
+            (1, 2): "state",
+            ("str", 2): "other_state",
+        }
+
+        await persistence.drop_user_data(1)
+        await persistence.drop_chat_data(-1)
+        await persistence.update_conversation("name", (1, 2), None)
+        assert await new_persistence.get_user_data() == {}
+        assert await new_persistence.get_chat_data() == {}
+        assert await new_persistence.get_conversations("name") == {("str", 2): "other_state"}
+
+    async def test_batch_methods_single_round_trip(self, persistence, client):
+        await persistence.update_user_data_many({i: {"i": i} for i in range(100)})
+        await persistence.update_chat_data_many({-i: {"i": i} for i in range(100)})
+        await persistence.update_conversations_many(
+            "name", {(i, i): i if i % 2 else None for i in range(100)}
+        )
+        assert client.calls == {"mset": 3, "delete": 1}
+
+        client.calls.clear()
+        await persistence.drop_user_data_many(range(50))
+        await persistence.drop_chat_data_many([-i for i in range(50)])
+        assert client.calls == {"delete": 2}
+
+        assert set(await persistence.get_user_data()) == set(range(50, 100))
+        assert set(await persistence.get_chat_data()) == {-i for i in range(50, 100)}
+        assert set(await persistence.get_conversations("name")) == {
+            (i, i) for i in range(1, 100, 2)
+        }
+
+    async def test_load_in_chunks(self, persistence, client, monkeypatch):
+        monkeypatch.setattr(KeyValuePersistence, "_MGET_CHUNK_SIZE", 10)
+        await persistence.update_user_data_many({i: i for i in range(25)})
+        client.calls.clear()
+        assert await persistence.get_user_data() == {i: i for i in range(25)}
+        assert client.calls == {"mget": 3}
+
+    async def test_conversation_names_dont_collide(self, persistence):
+        await persistence.update_conversation("name", (1,), "a")
+        await persistence.update_conversation('name",', (1,), "b")
+        await persistence.update_conversation("name:1", (1,), "c")
+        await persistence.update_conversation("name_2", (1,), "d")
+
+        assert await persistence.get_conversations("name") == {(1,): "a"}
+        assert await persistence.get_conversations('name",') == {(1,): "b"}
+        assert await persistence.get_conversations("name:1") == {(1,): "c"}
+
+    async def test_namespaces(self, client):
+        persistence_1 = KeyValuePersistence(client=client, namespace="bot1")
+        persistence_2 = KeyValuePersistence(client=client, namespace="bot2")
+        await persistence_1.update_user_data(1, "one")
+        await persistence_2.update_user_data(1, "two")
+        await persistence_2.update_bot_data({"bot": 2})
+
+        assert await persistence_1.get_user_data() == {1: "one"}
+        assert await persistence_2.get_user_data() == {1: "two"}
+        assert await persistence_1.get_bot_data() == {}
+        assert all(key.startswith(("bot1:", "bot2:")) for key in client.data)
+
+    async def test_no_write_if_data_did_not_change(self, persistence, client):
+        await persistence.update_bot_data({"a": 1})
+        await persistence.update_callback_data(([], {}))
+        assert client.calls == {"set": 2}
+        await persistence.update_bot_data({"a": 1})
+        await persistence.update_callback_data(([], {}))
+        assert client.calls == {"set": 2}
+        await persistence.update_bot_data({"a": 2})
+        assert client.calls == {"set": 3}
+
+    @pytest.mark.parametrize("refresh_data", [True, False])
+    async def test_refresh_data(self, client, refresh_data):
+        writer = KeyValuePersistence(client=client)
+        reader = KeyValuePersistence(client=client, refresh_data=refresh_data)
+        await writer.update_user_data(1, {"old": 1})
+        await writer.update_chat_data(1, {"old": 1})
+        await writer.update_bot_data({"old": 1})
+        user_data = (await reader.get_user_data())[1]
+        chat_data = (await reader.get_chat_data())[1]
+        bot_data = await reader.get_bot_data()
+
+        await writer.update_user_data(1, {"new": "user"})
+        await writer.update_chat_data(1, {"new": "chat"})
+        await writer.update_bot_data({"new": "bot"})
+        await reader.refresh_user_data(1, user_data)
+        await reader.refresh_chat_data(1, chat_data)
+        await reader.refresh_bot_data(bot_data)
+        if refresh_data:
+            assert user_data == {"new": "user"}
+            assert chat_data == {"new": "chat"}
+            assert bot_data == {"new": "bot"}
+        else:
+            assert user_data == chat_data == bot_data == {"old": 1}
+
+        # nothing stored for this user -> nothing changes
+        user_data = {"old": 1}
+        await reader.refresh_user_data(2, user_data)
+        assert user_data == {"old": 1}
+
+    async def test_refresh_data_keeps_unwritten_changes(self, client):
+        persistence = KeyValuePersistence(client=client, refresh_data=True)
+        other = KeyValuePersistence(client=client)
+        await other.update_user_data(1, {"count": 0})
+        await other.update_bot_data({"count": 0})
+        user_data = (await persistence.get_user_data())[1]
+        bot_data = await persistence.get_bot_data()
+
+        # A handler changes the data, which is only written on the next run of
+        # update_persistence. The next update must still see the change.
+        user_data["count"] = 1
+        bot_data["count"] = 1
+        new_user_data = {"count": 1}
+        await persistence.refresh_user_data(1, user_data)
+        await persistence.refresh_bot_data(bot_data)
+        await persistence.refresh_user_data(2, new_user_data)
+        assert user_data == bot_data == new_user_data == {"count": 1}
+
+        # Once written, changes of other processes are picked up again
+        await persistence.update_user_data(1, user_data)
+        await persistence.update_bot_data(bot_data)
+        await other.update_user_data(1, {"count": 2})
+        await other.update_bot_data({"count": 2})
+        await persistence.refresh_user_data(1, user_data)
+        await persistence.refresh_bot_data(bot_data)
+        assert user_data == bot_data == {"count": 2}
+
+        # Dropped data is not tracked anymore
+        assert "ptb:user_data:[1]" in persistence._last_written
+        await persistence.drop_user_data(1)
+        assert "ptb:user_data:[1]" not in persistence._last_written
+
+    async def test_with_context_types(self, client):
+        cc = ContextTypes(bot_data=int)
+        persistence = KeyValuePersistence(client=client, context_types=cc)
+        assert await persistence.get_bot_data() == 0
+        await persistence.update_bot_data(7)
+        assert await KeyValuePersistence(client=client, context_types=cc).get_bot_data() == 7
+
+    async def test_invalid_data(self, persistence, client):
+        client.data["ptb:bot_data"] = b"invalid"
+        with pytest.raises(TypeError, match="ptb:bot_data"):
+            await persistence.get_bot_data()
+
+    async def test_bot_replacement(self, persistence, client, cdc_bot):
+        persistence.set_bot(cdc_bot)
+        user = User(1, "Dev", False)
+        user.set_bot(cdc_bot)
+        await persistence.update_user_data(1, {"user": user, "update": Update(1)})
+
+        new_persistence = KeyValuePersistence(client=client)
+        new_persistence.set_bot(cdc_bot)
+        user_data = (await new_persistence.get_user_data())[1]
+        assert user_data["user"] == user
+        assert user_data["user"].get_bot() is cdc_bot
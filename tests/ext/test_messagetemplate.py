@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import datetime as dtm
+import json
+
+import pytest
+
+from telegram import (
+    Chat,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    LinkPreviewOptions,
+    Message,
+    MessageEntity,
+    ReplyKeyboardMarkup,
+)
+from telegram._utils.datetime import UTC
+from telegram.ext import CallbackDataCodec, Defaults, MessageTemplate
+from tests.auxil.envvars import TEST_WITH_OPT_DEPS
+from tests.auxil.pytest_classes import make_bot
+from tests.auxil.slots import mro_slots
+
+
+class RequestRecorder:
+    def __init__(self, bot, monkeypatch):
+        self.requests = []
+        message = Message(1, dtm.datetime.now(tz=UTC), Chat(1, "private"), text="text")
+        self.response = b'{"ok": true, "result": ' + message.to_json().encode() + b"}"
+        monkeypatch.setattr(bot.request, "do_request", self.do_request)
+
+    async def do_request(self, url, method, request_data=None, *args, **kwargs):
+        self.requests.append((url.rsplit("/", 1)[-1], request_data.json_parameters))
+        return 200, self.response
+
+
+@pytest.fixture
+async def template_bot(bot_info):
+    async with make_bot(bot_info) as _bot:
+        yield _bot
+
+
+@pytest.fixture
+def keyboard():
+    return InlineKeyboardMarkup.from_row(
+        [
+            InlineKeyboardButton("url", url="https://python-telegram-bot.org"),
+            InlineKeyboardButton("data", callback_data="some data"),
+        ]
+    )
+
+
+class TestMessageTemplate:
+    def test_slot_behaviour(self, template_bot):
+        template = MessageTemplate(template_bot, "text")
+        for attr in template.__slots__:
+            assert getattr(template, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(template)) == len(set(mro_slots(template))), "duplicate slot"
+
+    def test_init(self, template_bot, keyboard):
+        template = MessageTemplate(template_bot, "text", reply_markup=keyboard)
+        assert template.bot is template_bot
+        assert template.text == "text"
+        assert template.reply_markup is keyboard
+
+    @pytest.mark.parametrize(
+        "reply_markup",
+        [None, "inline", ReplyKeyboardMarkup.from_button("button", resize_keyboard=True)],
+    )
+    async def test_send_message_same_payload(
+        self, template_bot, monkeypatch, keyboard, reply_markup
+    ):
+        if reply_markup == "inline":
+            reply_markup = keyboard
+        recorder = RequestRecorder(template_bot, monkeypatch)
+        kwargs = {
+            "text": "some text",
+            "entities": [MessageEntity(MessageEntity.BOLD, 0, 4)],
+            "link_preview_options": LinkPreviewOptions(is_disabled=True),
+            "reply_markup": reply_markup,
+        }
+        template = MessageTemplate(template_bot, **kwargs)
+
+        message = await template.send_message(1, disable_notification=True, message_thread_id=2)
+        await template_bot.send_message(
+            1, disable_notification=True, message_thread_id=2, **kwargs
+        )
+
+        assert isinstance(message, Message)
+        assert recorder.requests[0] == recorder.requests[1]
+        assert recorder.requests[0][0] == "sendMessage"
+
+    async def test_edit_message_text_same_payload(self, template_bot, monkeypatch, keyboard):
+        recorder = RequestRecorder(template_bot, monkeypatch)
+        template = MessageTemplate(template_bot, "some text", reply_markup=keyboard)
+
+        message = await template.edit_message_text(chat_id=1, message_id=2)
+        await template_bot.edit_message_text(
+            "some text", chat_id=1, message_id=2, reply_markup=keyboard
+        )
+
+        assert isinstance(message, Message)
+        assert recorder.requests[0] == recorder.requests[1]
+        assert recorder.requests[0][0] == "editMessageText"
+
+    async def test_content_is_encoded_once(self, template_bot, monkeypatch, keyboard):
+        recorder = RequestRecorder(template_bot, monkeypatch)
+        template = MessageTemplate(
+            template_bot,
+            "some text",
+            entities=[MessageEntity(MessageEntity.BOLD, 0, 4)],
+            reply_markup=keyboard,
+        )
+
+        def to_dict(*args, **kwargs):
+            pytest.fail("The content must not be converted again")
+
+        monkeypatch.setattr(InlineKeyboardMarkup, "to_dict", to_dict)
+        monkeypatch.setattr(MessageEntity, "to_dict", to_dict)
+        for chat_id in range(3):
+            await template.send_message(chat_id)
+
+        assert [request[1]["chat_id"] for request in recorder.requests] == ["0", "1", "2"]
+        assert json.loads(recorder.requests[0][1]["reply_markup"])["inline_keyboard"][0][1] == {
+            "text": "data",
+            "callback_data": "some data",
+        }
+
+    async def test_api_kwargs(self, template_bot, monkeypatch, keyboard):
+        recorder = RequestRecorder(template_bot, monkeypatch)
+        template = MessageTemplate(template_bot, "text", reply_markup=keyboard)
+        await template.send_message(1, api_kwargs={"reply_markup": None, "extra": "value"})
+        parameters = recorder.requests[0][1]
+        assert "reply_markup" not in parameters
+        assert parameters["extra"] == "value"
+
+    @pytest.mark.parametrize("pass_values", [True, False])
+    async def test_defaults(self, bot_info, monkeypatch, pass_values):
+        defaults = Defaults(
+            parse_mode="HTML",
+            link_preview_options=LinkPreviewOptions(is_disabled=True, show_above_text=True),
+        )
+        kwargs = (
+            {"parse_mode": None, "link_preview_options": LinkPreviewOptions(is_disabled=False)}
+            if pass_values
+            else {}
+        )
+        async with make_bot(bot_info, defaults=defaults) as bot:
+            recorder = RequestRecorder(bot, monkeypatch)
+            template = MessageTemplate(bot, "<b>text</b>", **kwargs)
+            await template.send_message(1)
+            await bot.send_message(1, "<b>text</b>", **kwargs)
+
+        assert recorder.requests[0] == recorder.requests[1]
+        parameters = recorder.requests[0][1]
+        if pass_values:
+            assert "parse_mode" not in parameters
+            assert json.loads(parameters["link_preview_options"]) == {
+                "is_disabled": False,
+                "show_above_text": True,
+            }
+        else:
+            assert parameters["parse_mode"] == "HTML"
+            assert json.loads(parameters["link_preview_options"]) == {
+                "is_disabled": True,
+                "show_above_text": True,
+            }
+
+    @pytest.mark.skipif(
+        not TEST_WITH_OPT_DEPS, reason="Only relevant if the optional dependency is installed"
+    )
+    @pytest.mark.parametrize("callback_data", ["some data", {"unhashable": "data"}])
+    async def test_callback_data_cache(self, bot_info, monkeypatch, callback_data):
+        keyboard = InlineKeyboardMarkup.from_button(
+            InlineKeyboardButton("data", callback_data=callback_data)
+        )
+        async with make_bot(bot_info, arbitrary_callback_data=True) as bot:
+            recorder = RequestRecorder(bot, monkeypatch)
+            template = MessageTemplate(bot, "text", reply_markup=keyboard)
+            encoded = []
+            encode = MessageTemplate._encode
+
+            def record_encode(value):
+                encoded.append(value)
+                return encode(value)
+
+            monkeypatch.setattr(MessageTemplate, "_encode", staticmethod(record_encode))
+            await template.send_message(1)
+            await template.send_message(2)
+            await template.send_message(3)
+
+            keyboards = [
+                json.loads(request[1]["reply_markup"])["inline_keyboard"][0][0]["callback_data"]
+                for request in recorder.requests
+            ]
+            for data in keyboards:
+                keyboard_uuid = bot.callback_data_cache.extract_uuids(data)[0]
+                assert bot.callback_data_cache._store.get_keyboard(keyboard_uuid)
+            if isinstance(callback_data, str):
+                # Identical keyboards share an entry in the cache, so the keyboard is encoded
+                # only once
+                assert keyboards[0] == keyboards[1] == keyboards[2]
+                assert len(encoded) == 1
+            else:
+                assert len(set(keyboards)) == 3
+                assert len(encoded) == 3
+
+    async def test_callback_data_codec(self, bot_info, monkeypatch):
+        codec = CallbackDataCodec("secret")
+        keyboard = InlineKeyboardMarkup.from_button(
+            InlineKeyboardButton("data", callback_data=("some", 1))
+        )
+        async with make_bot(bot_info, arbitrary_callback_data=codec) as bot:
+            recorder = RequestRecorder(bot, monkeypatch)
+            template = MessageTemplate(bot, "text", reply_markup=keyboard)
+
+            def process_keyboard(*args, **kwargs):
+                pytest.fail("The keyboard must only be processed once")
+
+            monkeypatch.setattr(CallbackDataCodec, "process_keyboard", process_keyboard)
+            await template.send_message(1)
+
+        data = json.loads(recorder.requests[0][1]["reply_markup"])["inline_keyboard"][0][0]
+        assert codec.decode(data["callback_data"]) == ("some", 1)
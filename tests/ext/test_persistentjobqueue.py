@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from telegram.ext import ApplicationBuilder, PersistentJobQueue
+from tests.auxil.envvars import TEST_WITH_OPT_DEPS
+from tests.auxil.pytest_classes import make_bot
+from tests.auxil.slots import mro_slots
+
+if TEST_WITH_OPT_DEPS:
+    from apscheduler.jobstores.base import ConflictingIdError, JobLookupError
+
+# The callbacks must be importable, so they can't be methods of the test class
+RESULTS = []
+
+
+async def record(context):
+    RESULTS.append((context.job.name, context.job.data, context.job.chat_id, context.job.user_id))
+
+
+async def count(context):
+    context.job.data["count"] += 1
+    RESULTS.append(context.job.data["count"])
+
+
+async def slow(context):
+    await asyncio.sleep(0.2)
+    RESULTS.append("slow")
+
+
+class Callbacks:
+    @staticmethod
+    async def static_method(context):
+        RESULTS.append("static")
+
+    @classmethod
+    async def class_method(cls, context):
+        RESULTS.append("class")
+
+    async def method(self, context):
+        RESULTS.append("method")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "jobs.sqlite"
+
+
+@pytest.fixture
+async def job_queue(app, db_path):
+    jq = PersistentJobQueue(db_path, load_window=0.2)
+    jq.set_application(app)
+    await jq.start()
+    yield jq
+    await jq.stop()
+
+
+def build_app(bot_info, db_path, **kwargs):
+    return (
+        ApplicationBuilder()
+        .bot(make_bot(bot_info, offline=True))
+        .job_queue(PersistentJobQueue(db_path, **kwargs))
+        .build()
+    )
+
+
+@pytest.mark.skipif(
+    not TEST_WITH_OPT_DEPS, reason="Only relevant if the optional dependency is installed"
+)
+@pytest.mark.flaky(3, 1)  # Timings aren't quite perfect
+class TestPersistentJobQueue:
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        RESULTS.clear()
+
+    def test_slot_behaviour(self, job_queue):
+        stored_job = job_queue.run_once(record, 10).job
+        for inst in (job_queue, stored_job):
+            for attr in inst.__slots__:
+                assert getattr(inst, attr, "err") != "err", f"got extra slot '{attr}'"
+            assert len(mro_slots(inst)) == len(set(mro_slots(inst))), "duplicate slot"
+
+    def test_invalid_load_window(self, db_path):
+        with pytest.raises(ValueError, match="must be positive"):
+            PersistentJobQueue(db_path, load_window=0)
+
+    async def test_callbacks(self, job_queue):
+        async def local_function(_):
+            pass
+
+        for callback in (lambda _: None, local_function, Callbacks().method):
+            with pytest.raises(ValueError, match="can't be stored"):
+                job_queue.run_once(callback, 0.05)
+
+        job_queue.run_once(Callbacks.static_method, 0.05)
+        job_queue.run_once(Callbacks.class_method, 0.05)
+        await asyncio.sleep(0.1)
+        assert sorted(RESULTS) == ["class", "static"]
+
+    async def test_jobs_survive_restart(self, bot_info, db_path, monkeypatch):
+        # Missed runs are run, such that the jobs can be made due by moving the clock forward
+        job_kwargs = {"misfire_grace_time": None}
+        app = build_app(bot_info, db_path)
+        async with app:
+            await app.start()
+            app.job_queue.run_once(
+                record,
+                10,
+                data={"bot": app.bot},
+                name="once",
+                chat_id=1,
+                user_id=2,
+                job_kwargs=job_kwargs,
+            )
+            app.job_queue.run_repeating(
+                count, 10, first=0.05, data={"count": 0}, name="count", job_kwargs=job_kwargs
+            ).priority = 3
+            app.job_queue.run_once(record, 10, name="paused").enabled = False
+            await asyncio.sleep(0.1)
+            await app.stop()
+        assert RESULTS == [1]
+
+        app = build_app(bot_info, db_path)
+        async with app:
+            jobs = {job.name: job for job in app.job_queue.jobs()}
+            assert set(jobs) == {"once", "count", "paused"}
+            assert jobs["once"].data["bot"] is app.bot
+            assert (jobs["once"].chat_id, jobs["once"].user_id) == (1, 2)
+            assert jobs["count"].data == {"count": 1}
+            # Just like the data, the priority is stored after each run
+            assert jobs["count"].priority == 3
+            assert jobs["once"].priority == 0
+            assert jobs["paused"].next_t is None
+
+            real_time = time.time
+            monkeypatch.setattr(time, "time", lambda: real_time() + 15)
+            await app.start()
+            await asyncio.sleep(0.05)
+            await app.stop()
+        assert RESULTS == [1, ("once", {"bot": app.bot}, 1, 2), 2]
+
+    async def test_misfire_on_restart(self, app, db_path, caplog):
+        job_queue = PersistentJobQueue(db_path)
+        job_queue.set_application(app)
+        job_queue.run_once(record, 0.05, name="missed")
+        job_queue.run_once(record, 0.05, name="run", job_kwargs={"misfire_grace_time": None})
+        await asyncio.sleep(1.1)
+
+        job_queue = PersistentJobQueue(db_path)
+        job_queue.set_application(app)
+        with caplog.at_level(logging.WARNING):
+            await job_queue.start()
+            await asyncio.sleep(0.05)
+            await job_queue.stop()
+
+        assert RESULTS == [("run", None, None, None)]
+        assert len(caplog.records) == 1
+        assert 'Run time of job "missed' in caplog.records[0].getMessage()
+        # Missed one-off jobs are removed just like one-off jobs that ran
+        assert job_queue.jobs() == ()
+
+    async def test_application_stop(self, bot_info, db_path):
+        app = build_app(bot_info, db_path)
+        async with app:
+            await app.start()
+            app.job_queue.run_once(slow, 0.05)
+            app.job_queue.run_once(record, 0.5, name="pending")
+            await asyncio.sleep(0.1)
+            # Application.stop waits for the running job
+            await app.stop()
+            assert RESULTS == ["slow"]
+            # Jobs scheduled after the job queue was stopped are stored as well
+            app.job_queue.run_once(record, 0.1, name="after_stop")
+            assert not app.job_queue._jobs
+
+        app = build_app(bot_info, db_path)
+        async with app:
+            assert sorted(job.name for job in app.job_queue.jobs()) == ["after_stop", "pending"]
+            await app.start()
+            await asyncio.sleep(0.5)
+            await app.stop()
+        assert sorted(RESULTS[1:]) == [
+            ("after_stop", None, None, None),
+            ("pending", None, None, None),
+        ]
+
+    async def test_load_window(self, job_queue):
+        near_job = job_queue.run_once(record, 0.05, name="near")
+        far_job = job_queue.run_once(record, 0.5, name="far", chat_id=1, user_id=1)
+        assert set(job_queue._jobs) == {near_job.id}
+
+        # Jobs that are not loaded yet are still accessible
+        assert job_queue.jobs() == (near_job, far_job)
+        assert job_queue.get_jobs_by_name("far") == (far_job,)
+        assert job_queue.get_jobs_by_chat(1) == (far_job,)
+        assert job_queue.get_jobs_by_user(1) == (far_job,)
+        assert far_job.next_t is not None
+
+        await asyncio.sleep(0.4)
+        assert set(job_queue._jobs) == {far_job.id}
+        await asyncio.sleep(0.2)
+        assert [name for name, *_ in RESULTS] == ["near", "far"]
+        assert job_queue.jobs() == ()
+
+    async def test_repeating_job_is_unloaded(self, job_queue):
+        job = job_queue.run_repeating(count, 0.5, first=0.05, data={"count": 0})
+        await asyncio.sleep(0.1)
+        assert RESULTS == [1]
+        assert not job_queue._jobs
+        assert job.next_t is not None
+        await asyncio.sleep(0.5)
+        assert RESULTS == [1, 2]
+
+    async def test_pause_resume_remove(self, job_queue):
+        loaded_job = job_queue.run_once(record, 0.1)
+        stored_job = job_queue.run_once(record, 10)
+
+        for job in (loaded_job, stored_job):
+            job.enabled = False
+            assert job.next_t is None
+            assert job.id not in job_queue._jobs
+        loaded_job.enabled = True
+        stored_job.enabled = True
+        assert set(job_queue._jobs) == {loaded_job.id}
+        assert stored_job.next_t is not None
+
+        stored_job.schedule_removal()
+        assert job_queue.jobs() == (loaded_job,)
+        for method in (stored_job.schedule_removal, stored_job.job.pause, stored_job.job.resume):
+            with pytest.raises(JobLookupError):
+                method()
+
+        await asyncio.sleep(0.15)
+        assert len(RESULTS) == 1
+
+    async def test_job_id(self, job_queue):
+        job_queue.run_once(record, 10, job_kwargs={"id": "job_id"})
+        with pytest.raises(ConflictingIdError):
+            job_queue.run_once(record, 10, job_kwargs={"id": "job_id"})
+
+        job = job_queue.run_once(
+            record, 0.05, name="new", job_kwargs={"id": "job_id", "replace_existing": True}
+        )
+        assert job_queue.jobs() == (job,)
+        assert job_queue.jobs()[0].name == "new"
+
+    async def test_replaced_while_running(self, job_queue, db_path, app):
+        job_queue.run_repeating(
+            slow, 10, first=0.05, data="old", name="old", job_kwargs={"id": "job_id"}
+        )
+        await asyncio.sleep(0.1)
+        # The job is running, but it's not held in memory since the next run is not due soon
+        assert not job_queue._jobs
+        job_queue.run_once(
+            record,
+            10,
+            data="new",
+            name="new",
+            job_kwargs={"id": "job_id", "replace_existing": True},
+        )
+        # Waits for the running job and the writes
+        await job_queue.stop()
+        assert RESULTS == ["slow"]
+
+        restarted_queue = PersistentJobQueue(db_path)
+        restarted_queue.set_application(app)
+        job = restarted_queue.get_jobs_by_name("new")[0]
+        assert (job.data, job.job.trigger.run_date) == ("new", job.next_t)
+
+    async def test_database_thread(self, job_queue, monkeypatch):
+        threads = set()
+
+        class Connection:
+            def __init__(self, connection):
+                self.connection = connection
+
+            def __getattr__(self, name):
+                threads.add(threading.current_thread())
+                return getattr(self.connection, name)
+
+        monkeypatch.setattr(job_queue, "_connection", Connection(job_queue._connection))
+        loaded_job = job_queue.run_once(record, 0.1)
+        stored_job = job_queue.run_once(record, 10)
+        for job in (loaded_job, stored_job):
+            job.enabled = False
+            job.enabled = True
+        loaded_job.schedule_removal()
+        assert stored_job.next_t is not None
+        assert not threads
+
+        assert job_queue.jobs() == (stored_job,)
+        assert len(threads) == 1
+        assert threading.current_thread() not in threads
+
+    async def test_restore_failure(self, job_queue, db_path, caplog):
+        job_queue.run_once(record, 0.1, name="valid")
+        # wait for the commit
+        await asyncio.sleep(0)
+        connection = sqlite3.connect(db_path)
+        connection.execute(
+            "INSERT INTO jobs VALUES ('id', 'tests.unknown:callback', 'invalid', NULL, NULL, 0, "
+            "x'00')"
+        )
+        connection.commit()
+        connection.close()
+
+        with caplog.at_level(logging.ERROR):
+            assert [job.name for job in job_queue.jobs()] == ["valid"]
+        assert len(caplog.records) == 1
+        assert "Job id with callback tests.unknown:callback" in caplog.records[0].getMessage()
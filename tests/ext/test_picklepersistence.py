@@ -1006,3 +1006,158 @@ class TestPicklePersistence:
         await pickle_persistence.update_callback_data(callback_data)
 
         assert not pickle_persistence.filepath.is_file()
+
+    @pytest.mark.parametrize("singlefile", [True, False])
+    @pytest.mark.parametrize("compression", ["zlib", "lzma"])
+    async def test_compressed_round_trip(
+        self, singlefile, compression, user_data, chat_data, bot_data, callback_data, conversations
+    ):
+        persistence = PicklePersistence(
+            "pickletest", single_file=singlefile, compression=compression, chunk_size=1
+        )
+        await persistence.update_user_data_many(user_data)
+        await persistence.update_chat_data_many(chat_data)
+        await persistence.update_bot_data(bot_data)
+        await persistence.update_callback_data(callback_data)
+        for name, states in conversations.items():
+            await persistence.update_conversations_many(name, states)
+
+        files = [Path("pickletest")] if singlefile else list(Path().glob("pickletest_*"))
+        assert files
+        for file in files:
+            assert file.read_bytes().startswith(b"PTBPICKLE")
+        assert not list(Path().glob("*.tmp"))
+
+        persistence = PicklePersistence("pickletest", single_file=singlefile)
+        assert await persistence.get_user_data() == user_data
+        assert await persistence.get_chat_data() == chat_data
+        assert await persistence.get_bot_data() == bot_data
+        assert await persistence.get_callback_data() == callback_data
+        for name, states in conversations.items():
+            assert await persistence.get_conversations(name) == states
+
+    @pytest.mark.parametrize("singlefile", [True, False])
+    async def test_compressed_empty_data(self, singlefile):
+        persistence = PicklePersistence("pickletest", single_file=singlefile, compression="zlib")
+        await persistence.update_user_data(1, {})
+        await persistence.drop_user_data(1)
+        await persistence.update_conversation("name", (1, 1), None)
+        await persistence.flush()
+
+        persistence = PicklePersistence("pickletest", single_file=singlefile)
+        assert await persistence.get_user_data() == {}
+        assert await persistence.get_conversations("name") == {}
+        assert persistence.conversations == {"name": {}}
+
+    async def test_compressed_chunks(self):
+        persistence = PicklePersistence("pickletest", compression="zlib", chunk_size=10)
+        await persistence.update_user_data_many({i: {"data": "x" * 100} for i in range(95)})
+        # compression takes care of the repetitive data
+        assert Path("pickletest").stat().st_size < 95 * 100
+        persistence = PicklePersistence("pickletest")
+        assert len(await persistence.get_user_data()) == 95
+
+    @pytest.mark.parametrize("singlefile", [True, False])
+    async def test_migrate_to_compressed(self, singlefile, good_pickle_files, user_data):
+        persistence = PicklePersistence("pickletest", single_file=singlefile, compression="lzma")
+        assert await persistence.get_user_data() == user_data
+        await persistence.update_user_data(1, {"new": "data"})
+
+        filepath = Path("pickletest" if singlefile else "pickletest_user_data")
+        assert filepath.read_bytes().startswith(b"PTBPICKLE")
+        persistence = PicklePersistence("pickletest", single_file=singlefile)
+        assert await persistence.get_user_data() == {**user_data, 1: {"new": "data"}}
+
+        # and back
+        await persistence.update_user_data(2, {"new": "data"})
+        with filepath.open("rb") as file:
+            assert not file.read().startswith(b"PTBPICKLE")
+
+    async def test_compressed_custom_pickler_unpickler(self, cdc_bot):
+        persistence = PicklePersistence("pickletest", compression="zlib")
+        persistence.set_bot(cdc_bot)
+        user = User(1, "Dev", False)
+        user.set_bot(cdc_bot)
+        await persistence.update_chat_data(1, {"user": user})
+
+        persistence = PicklePersistence("pickletest")
+        persistence.set_bot(cdc_bot)
+        assert (await persistence.get_chat_data())[1]["user"].get_bot() is cdc_bot
+
+    async def test_compressed_unsupported_version(self):
+        Path("pickletest").write_bytes(b"PTBPICKLE" + bytes((255, 1)))
+        persistence = PicklePersistence("pickletest")
+        with pytest.raises(TypeError, match="does not contain valid pickle data"):
+            await persistence.get_user_data()
+
+    async def test_compressed_truncated_file(self):
+        persistence = PicklePersistence("pickletest", compression="zlib")
+        await persistence.update_user_data(1, {"a": 1})
+        Path("pickletest").write_bytes(Path("pickletest").read_bytes()[:-3])
+        persistence = PicklePersistence("pickletest")
+        with pytest.raises(TypeError, match="does not contain valid pickle data"):
+            await persistence.get_user_data()
+
+    @pytest.mark.parametrize("singlefile", [True, False])
+    @pytest.mark.parametrize("compression", [None, "zlib"])
+    async def test_file_id_cache(self, singlefile, compression, user_data):
+        persistence = PicklePersistence(
+            "pickletest", single_file=singlefile, compression=compression
+        )
+        assert await persistence.get_file_id_cache() is None
+        await persistence.update_user_data_many(user_data)
+        await persistence.update_file_id_cache({"photo:a.png:hash": "file_id"})
+        if not singlefile:
+            assert Path("pickletest_file_id_cache").is_file()
+
+        persistence = PicklePersistence("pickletest", single_file=singlefile)
+        assert await persistence.get_file_id_cache() == {"photo:a.png:hash": "file_id"}
+        assert await persistence.get_user_data() == user_data
+
+    async def test_file_id_cache_not_written_if_unused(self):
+        persistence = PicklePersistence("pickletest")
+        await persistence.update_bot_data({"a": 1})
+        assert "file_id_cache" not in persistence._load_file(Path("pickletest"))
+
+    async def test_invalid_compression_arguments(self):
+        with pytest.raises(ValueError, match="`compression` must be one of"):
+            PicklePersistence("pickletest", compression="gzip")
+        with pytest.raises(ValueError, match="`chunk_size` must be"):
+            PicklePersistence("pickletest", compression="zlib", chunk_size=0)
+
+    @pytest.mark.parametrize("singlefile", [True, False])
+    async def test_batch_methods_write_once(self, singlefile, monkeypatch):
+        persistence = PicklePersistence("pickletest", single_file=singlefile)
+        writes = []
+        monkeypatch.setattr(PicklePersistence, "_pickle", lambda *args: writes.append(args))
+
+        await persistence.update_user_data_many({i: {"i": i} for i in range(10)})
+        await persistence.update_chat_data_many({i: {"i": i} for i in range(10)})
+        await persistence.update_conversations_many("name", {(i, i): i for i in range(10)})
+        await persistence.drop_user_data_many(range(5))
+        await persistence.drop_chat_data_many(range(5))
+        assert len(writes) == 5
+        assert set(persistence.user_data) == set(range(5, 10))
+        assert set(persistence.chat_data) == set(range(5, 10))
+        assert persistence.conversations == {"name": {(i, i): i for i in range(10)}}
+
+        # no changes -> no writes
+        await persistence.update_user_data_many({i: {"i": i} for i in range(5, 10)})
+        await persistence.update_chat_data_many({i: {"i": i} for i in range(5, 10)})
+        await persistence.update_conversations_many("name", {(i, i): i for i in range(10)})
+        assert len(writes) == 5
+
+    @pytest.mark.parametrize("singlefile", [True, False])
+    async def test_update_callback_data_delta(self, singlefile):
+        persistence = PicklePersistence("pickletest", single_file=singlefile)
+        await persistence.update_callback_data_delta(
+            ([("a", 1.0, {"1": "a"}), ("b", 2.0, {"1": "b"})], {"x": "a", "y": "b"}), [], []
+        )
+        await persistence.update_callback_data_delta(
+            ([("c", 3.0, {"1": "c"}), ("a", 4.0, {"1": "a"})], {"z": "c"}), ["b"], ["y"]
+        )
+        expected = ([("c", 3.0, {"1": "c"}), ("a", 4.0, {"1": "a"})], {"x": "a", "z": "c"})
+        assert persistence.callback_data == expected
+
+        persistence = PicklePersistence("pickletest", single_file=singlefile)
+        assert await persistence.get_callback_data() == expected
@@ -30,10 +30,10 @@ from http import HTTPStatus
 
 import pytest
 
-from telegram import BotCommand, Chat, Message, User
+from telegram import BotCommand, Chat, Message, Update, User
 from telegram.constants import ParseMode
 from telegram.error import RetryAfter
-from telegram.ext import AIORateLimiter, BaseRateLimiter, Defaults, ExtBot
+from telegram.ext import AIORateLimiter, BaseRateLimiter, Defaults, EntityStore, ExtBot
 from telegram.request import BaseRequest, RequestData
 from tests.auxil.envvars import GITHUB_ACTION, TEST_WITH_OPT_DEPS
 
@@ -358,3 +358,28 @@ class TestAIORateLimiter:
         finally:
             TestAIORateLimiter.count = 0
             TestAIORateLimiter.call_times = []
+
+    async def test_entity_store(self, bot):
+        entity_store = EntityStore()
+        entity_store.process_update(
+            Update(
+                1,
+                channel_post=Message(
+                    1, datetime.now(), Chat(-100, Chat.CHANNEL, username="channel")
+                ),
+            )
+        )
+        try:
+            rl_bot = ExtBot(
+                token=bot.token,
+                request=self.CountRequest(retry_after=None),
+                rate_limiter=AIORateLimiter(entity_store=entity_store),
+            )
+            await rl_bot.send_message(chat_id="@channel", text="text")
+            await rl_bot.send_message(chat_id=-100, text="text")
+            await rl_bot.send_message(chat_id="@unknown", text="text")
+            # Requests addressing the channel by username and by id share the group limiter
+            assert set(rl_bot.rate_limiter._group_limiters) == {-100, "@unknown"}
+        finally:
+            TestAIORateLimiter.count = 0
+            TestAIORateLimiter.call_times = []
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import asyncio
+import json
+
+import pytest
+
+from telegram.error import BadRequest, Forbidden
+from telegram.ext import RequestCoalescer
+from tests.auxil.pytest_classes import make_bot
+from tests.auxil.slots import mro_slots
+
+
+class RequestRecorder:
+    """Answers like the Bot API: deleteMessage fails for messages in `missing`, deleteMessages
+    fails if the bot can't delete messages in the chat."""
+
+    def __init__(self, bot, monkeypatch):
+        self.requests = []
+        self.missing = set()
+        self.bulk_error = None
+        monkeypatch.setattr(bot.request, "do_request", self.do_request)
+
+    async def do_request(self, url, method, request_data=None, *args, **kwargs):
+        endpoint = url.rsplit("/", 1)[-1]
+        parameters = request_data.parameters
+        self.requests.append((endpoint, parameters))
+
+        if endpoint == "deleteMessages" and self.bulk_error:
+            description, code = self.bulk_error
+        elif endpoint == "deleteMessage" and parameters["message_id"] in self.missing:
+            description, code = "Bad Request: message to delete not found", 400
+        else:
+            return 200, b'{"ok": true, "result": true}'
+        return (
+            code,
+            json.dumps({"ok": False, "error_code": code, "description": description}).encode(),
+        )
+
+
+@pytest.fixture
+async def coalescing_bot(bot_info):
+    async with make_bot(bot_info, request_coalescer=RequestCoalescer(delay=0.05)) as _bot:
+        yield _bot
+
+
+class TestRequestCoalescer:
+    def test_slot_behaviour(self):
+        inst = RequestCoalescer()
+        for attr in inst.__slots__:
+            assert getattr(inst, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(inst)) == len(set(mro_slots(inst))), "duplicate slot"
+
+    def test_init(self, bot_info):
+        coalescer = RequestCoalescer()
+        assert coalescer.delay == 0.05
+        assert coalescer.max_batch_size == 100
+        with pytest.raises(ValueError, match="negative"):
+            RequestCoalescer(delay=-1)
+        with pytest.raises(ValueError, match="between 1 and 100"):
+            RequestCoalescer(max_batch_size=101)
+
+        assert make_bot(bot_info).request_coalescer is None
+        assert isinstance(
+            make_bot(bot_info, request_coalescer=True).request_coalescer, RequestCoalescer
+        )
+        assert make_bot(bot_info, request_coalescer=coalescer).request_coalescer is coalescer
+
+    @pytest.mark.parametrize(
+        ("endpoint", "data", "expected"),
+        [
+            ("deleteMessage", {"chat_id": 1, "message_id": 2}, True),
+            ("deleteMessage", {"chat_id": 1, "message_id": 2, "foo": "bar"}, False),
+            ("forwardMessage", {"chat_id": 1, "message_id": 2}, False),
+            ("deleteMessages", {"chat_id": 1, "message_ids": [2]}, False),
+        ],
+    )
+    def test_can_coalesce(self, endpoint, data, expected):
+        assert RequestCoalescer.can_coalesce(endpoint, data) is expected
+
+    async def test_coalesce(self, coalescing_bot, monkeypatch):
+        recorder = RequestRecorder(coalescing_bot, monkeypatch)
+        results = await asyncio.gather(
+            *(coalescing_bot.delete_message(1, message_id) for message_id in (3, 1, 2, 1)),
+            coalescing_bot.delete_message(2, 1),
+        )
+        assert results == [True] * 5
+        assert sorted(recorder.requests, key=lambda request: request[0]) == [
+            ("deleteMessage", {"chat_id": 2, "message_id": 1}),
+            ("deleteMessages", {"chat_id": 1, "message_ids": [1, 2, 3]}),
+        ]
+
+    async def test_max_batch_size(self, bot_info, monkeypatch):
+        coalescer = RequestCoalescer(delay=10, max_batch_size=2)
+        async with make_bot(bot_info, request_coalescer=coalescer) as bot:
+            recorder = RequestRecorder(bot, monkeypatch)
+            # Full batches are sent right away
+            assert await asyncio.wait_for(
+                asyncio.gather(bot.delete_message(1, 1), bot.delete_message(1, 2)), 1
+            ) == [True, True]
+            assert recorder.requests == [
+                ("deleteMessages", {"chat_id": 1, "message_ids": [1, 2]}),
+            ]
+
+            # Shutting down sends the buffered requests
+            task = asyncio.create_task(bot.delete_message(1, 3))
+            await asyncio.sleep(0.01)
+        assert await task is True
+        assert recorder.requests[-1] == ("deleteMessage", {"chat_id": 1, "message_id": 3})
+
+    async def test_bad_request_fallback(self, coalescing_bot, monkeypatch):
+        recorder = RequestRecorder(coalescing_bot, monkeypatch)
+        recorder.bulk_error = ("Bad Request: message can't be deleted", 400)
+        recorder.missing.add(2)
+        results = await asyncio.gather(
+            coalescing_bot.delete_message(1, 1),
+            coalescing_bot.delete_message(1, 2),
+            return_exceptions=True,
+        )
+        assert results[0] is True
+        assert isinstance(results[1], BadRequest)
+        assert [endpoint for endpoint, _ in recorder.requests] == [
+            "deleteMessages",
+            "deleteMessage",
+            "deleteMessage",
+        ]
+
+    async def test_other_errors(self, coalescing_bot, monkeypatch):
+        recorder = RequestRecorder(coalescing_bot, monkeypatch)
+        recorder.bulk_error = ("Forbidden: bot was kicked from the group chat", 403)
+        results = await asyncio.gather(
+            coalescing_bot.delete_message(1, 1),
+            coalescing_bot.delete_message(1, 2),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, Forbidden) for result in results)
+        assert len(recorder.requests) == 1
+
+    async def test_cancelled_caller(self, coalescing_bot, monkeypatch):
+        recorder = RequestRecorder(coalescing_bot, monkeypatch)
+        cancelled = asyncio.create_task(coalescing_bot.delete_message(1, 1))
+        other = asyncio.create_task(coalescing_bot.delete_message(1, 2))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        assert await other is True
+        assert recorder.requests == [("deleteMessage", {"chat_id": 1, "message_id": 2})]
+
+    async def test_not_coalesced(self, coalescing_bot, monkeypatch):
+        recorder = RequestRecorder(coalescing_bot, monkeypatch)
+        await asyncio.gather(
+            coalescing_bot.delete_message(1, 1, api_kwargs={"foo": "bar"}),
+            coalescing_bot.delete_message(1, 2, api_kwargs={"foo": "bar"}),
+        )
+        assert [endpoint for endpoint, _ in recorder.requests] == [
+            "deleteMessage",
+            "deleteMessage",
+        ]
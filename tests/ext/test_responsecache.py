@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import asyncio
+import datetime as dtm
+import json
+
+import pytest
+
+from telegram import (
+    BusinessConnection,
+    Chat,
+    ChatMemberMember,
+    ChatMemberUpdated,
+    Message,
+    Update,
+    User,
+)
+from telegram._utils.datetime import UTC
+from telegram.error import BadRequest
+from telegram.ext import ApplicationBuilder, ResponseCache, TypeHandler
+from tests.auxil.pytest_classes import make_bot
+from tests.auxil.slots import mro_slots
+
+
+class RequestRecorder:
+    """Answers like the Bot API. The title of a chat contains the number of the request, so
+    that tests can tell whether a result came from the cache."""
+
+    def __init__(self, bot, monkeypatch):
+        self.requests = []
+        self.delay = 0
+        self.error = None
+        monkeypatch.setattr(bot.request, "do_request", self.do_request)
+
+    async def do_request(self, url, method, request_data=None, *args, **kwargs):
+        endpoint = url.rsplit("/", 1)[-1]
+        parameters = request_data.json_parameters if request_data else {}
+        self.requests.append((endpoint, parameters))
+        await asyncio.sleep(self.delay)
+
+        if self.error:
+            return (
+                400,
+                json.dumps({"ok": False, "error_code": 400, "description": self.error}).encode(),
+            )
+
+        if endpoint == "getChat":
+            result = {
+                "id": int(parameters["chat_id"]),
+                "type": "group",
+                "title": f"title {len(self.requests)}",
+                "accent_color_id": 0,
+                "max_reaction_count": 1,
+            }
+        elif endpoint == "getChatMember":
+            result = {
+                "status": "member",
+                "user": {"id": int(parameters["user_id"]), "is_bot": False, "first_name": "u"},
+            }
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+@pytest.fixture
+async def cache_bot(bot_info):
+    async with make_bot(bot_info, response_cache=True) as _bot:
+        yield _bot
+
+
+def make_update(**kwargs):
+    return Update(1, **kwargs)
+
+
+def make_message(**kwargs):
+    return Message(1, dtm.datetime.now(tz=UTC), Chat(1, Chat.GROUP, username="group"), **kwargs)
+
+
+class TestResponseCache:
+    def test_slot_behaviour(self):
+        inst = ResponseCache()
+        for attr in inst.__slots__:
+            assert getattr(inst, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(inst)) == len(set(mro_slots(inst))), "duplicate slot"
+
+    def test_init(self, bot_info):
+        cache = ResponseCache()
+        assert cache.maxsize == 1024
+        assert cache.ttls == ResponseCache.DEFAULT_TTLS
+        # getFile results must be dropped before the file_path expires after one hour
+        assert cache.ttls["getFile"] < 3600
+
+        cache = ResponseCache(ttls={"getChat": 5, "getMe": None, "getFile": 0}, maxsize=42)
+        assert cache.maxsize == 42
+        assert cache.ttls["getChat"] == 5
+        assert "getMe" not in cache.ttls
+        assert "getFile" not in cache.ttls
+        with pytest.raises(TypeError):
+            cache.ttls["getMe"] = 5
+        with pytest.raises(ValueError, match="positive integer"):
+            ResponseCache(maxsize=0)
+
+        assert make_bot(bot_info).response_cache is None
+        assert isinstance(make_bot(bot_info, response_cache=True).response_cache, ResponseCache)
+        assert make_bot(bot_info, response_cache=cache).response_cache is cache
+
+    async def test_cached(self, cache_bot, monkeypatch):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        assert (await cache_bot.get_chat(1)).title == "title 1"
+        assert (await cache_bot.get_chat(1)).title == "title 1"
+        # Every call returns a new object
+        assert await cache_bot.get_chat(1) is not await cache_bot.get_chat(1)
+        # Different parameters are cached separately
+        assert (await cache_bot.get_chat(2)).title == "title 2"
+        assert (await cache_bot.get_chat(1, api_kwargs={"foo": "bar"})).title == "title 3"
+        await cache_bot.get_chat_member(1, 10)
+        await cache_bot.get_chat_member(1, 10)
+        await cache_bot.get_chat_member(1, 11)
+
+        assert [endpoint for endpoint, _ in recorder.requests] == [
+            "getChat",
+            "getChat",
+            "getChat",
+            "getChatMember",
+            "getChatMember",
+        ]
+        assert len(cache_bot.response_cache) == 5
+
+    async def test_not_cached(self, cache_bot, monkeypatch):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        await cache_bot.send_message(1, "text")
+        await cache_bot.send_message(1, "text")
+        assert len(recorder.requests) == 2
+        assert len(cache_bot.response_cache) == 0
+
+    async def test_ttl(self, bot_info, monkeypatch):
+        async with make_bot(
+            bot_info, response_cache=ResponseCache(ttls={"getChat": 0.1, "getChatMember": None})
+        ) as bot:
+            recorder = RequestRecorder(bot, monkeypatch)
+            assert (await bot.get_chat(1)).title == "title 1"
+            assert (await bot.get_chat(1)).title == "title 1"
+            await asyncio.sleep(0.15)
+            assert (await bot.get_chat(1)).title == "title 2"
+
+            # Disabled endpoints are not cached
+            await bot.get_chat_member(1, 10)
+            await bot.get_chat_member(1, 10)
+            assert len(recorder.requests) == 4
+
+    async def test_maxsize(self, bot_info, monkeypatch):
+        async with make_bot(bot_info, response_cache=ResponseCache(maxsize=2)) as bot:
+            recorder = RequestRecorder(bot, monkeypatch)
+            await bot.get_chat(1)
+            await bot.get_chat(2)
+            # chat 1 is used most recently, so chat 2 is dropped
+            await bot.get_chat(1)
+            await bot.get_chat(3)
+            assert len(bot.response_cache) == 2
+            assert (await bot.get_chat(1)).title == "title 1"
+            assert (await bot.get_chat(2)).title == "title 4"
+            assert len(recorder.requests) == 4
+
+    async def test_single_flight(self, cache_bot, monkeypatch):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        recorder.delay = 0.1
+        chats = await asyncio.gather(*(cache_bot.get_chat(1) for _ in range(10)))
+        assert {chat.title for chat in chats} == {"title 1"}
+        assert len(recorder.requests) == 1
+
+    async def test_single_flight_error(self, cache_bot, monkeypatch):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        recorder.delay = 0.1
+        recorder.error = "Bad Request: chat not found"
+        results = await asyncio.gather(
+            *(cache_bot.get_chat(1) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(result, BadRequest) for result in results)
+        assert len(recorder.requests) == 1
+
+        # Errors are not cached
+        recorder.error = None
+        assert (await cache_bot.get_chat(1)).title == "title 2"
+
+    async def test_single_flight_cancelled(self, cache_bot, monkeypatch):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        recorder.delay = 0.1
+        first = asyncio.create_task(cache_bot.get_chat(1))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(cache_bot.get_chat(1))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        # The second call makes the request itself
+        assert (await second).title == "title 2"
+        assert first.cancelled()
+
+    async def test_invalidated_while_in_flight(self, cache_bot, monkeypatch):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        recorder.delay = 0.1
+        task = asyncio.create_task(cache_bot.get_chat(1))
+        await asyncio.sleep(0.01)
+        cache_bot.response_cache.invalidate_chat(1)
+        # The result may be outdated, so it's not stored
+        assert (await task).title == "title 1"
+        assert len(cache_bot.response_cache) == 0
+
+    async def test_modifying_calls(self, cache_bot, monkeypatch):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        await cache_bot.get_chat(1)
+        await cache_bot.get_chat_member(1, 10)
+        await cache_bot.get_chat(2)
+        await cache_bot.set_chat_title(1, "new title")
+        # Only the entries of chat 1 are dropped
+        assert (await cache_bot.get_chat(1)).title == "title 5"
+        assert (await cache_bot.get_chat(2)).title == "title 3"
+        await cache_bot.get_chat_member(1, 10)
+        assert len(recorder.requests) == 6
+
+        # Failed calls don't change anything
+        recorder.error = "Bad Request: not enough rights"
+        with pytest.raises(BadRequest):
+            await cache_bot.ban_chat_member(1, 10)
+        assert len(cache_bot.response_cache) == 3
+
+    async def test_sticker_set_modifying_calls(self, cache_bot, monkeypatch):
+        recorder = RequestRecorder(cache_bot, monkeypatch)
+        cache = cache_bot.response_cache
+
+        async def callback():
+            return {"name": "set"}
+
+        await cache.process_request("getStickerSet", {"name": "set"}, callback)
+        await cache.process_request("getChat", {"chat_id": 1}, callback)
+        await cache_bot.set_sticker_set_title("set", "title")
+        assert len(recorder.requests) == 1
+        assert len(cache) == 1
+
+    def test_invalidate(self):
+        cache = ResponseCache()
+        cache._store(("getChat", (("chat_id", "1"),)), 60, {}, 1)
+        cache._store(("getChat", (("chat_id", "@group"),)), 60, {}, "@group")
+        cache._store(("getChatMember", (("chat_id", "1"), ("user_id", "2"))), 60, {}, 1)
+        cache._store(("getMe", ()), 60, {}, None)
+
+        cache.invalidate_chat("1")
+        assert len(cache) == 2
+        cache.invalidate_endpoint("getMe")
+        assert len(cache) == 1
+        cache.clear()
+        assert len(cache) == 0
+        assert cache._keys_by_chat == {}
+
+    @pytest.mark.parametrize(
+        ("update", "expected"),
+        [
+            (make_update(message=make_message(text="text")), {"1", "2", "@group"}),
+            (make_update(message=make_message(new_chat_title="title")), {"2"}),
+            (make_update(message=make_message(migrate_to_chat_id=2)), set()),
+            (make_update(edited_message=make_message(pinned_message=make_message())), {"2"}),
+            (
+                make_update(
+                    chat_member=ChatMemberUpdated(
+                        Chat(1, Chat.GROUP),
+                        User(1, "u", False),
+                        dtm.datetime.now(tz=UTC),
+                        ChatMemberMember(User(2, "u", False)),
+                        ChatMemberMember(User(2, "u", False)),
+                    )
+                ),
+                {"2", "@group"},
+            ),
+        ],
+    )
+    def test_process_update(self, update, expected):
+        cache = ResponseCache()
+        for chat_id in ("1", "2", "@group"):
+            cache._store(("getChat", (("chat_id", chat_id),)), 60, {}, chat_id)
+        cache.process_update(update)
+        assert set(cache._keys_by_chat) == expected
+
+    def test_process_update_business_connection(self):
+        cache = ResponseCache()
+        cache._store(("getBusinessConnection", (("business_connection_id", "1"),)), 60, {}, None)
+        cache._store(("getChat", (("chat_id", "1"),)), 60, {}, 1)
+        cache.process_update(
+            make_update(
+                business_connection=BusinessConnection(
+                    "1", User(1, "u", False), 1, dtm.datetime.now(tz=UTC), True, True
+                )
+            )
+        )
+        assert len(cache) == 1
+
+    async def test_application(self, bot_info, monkeypatch):
+        application = ApplicationBuilder().bot(make_bot(bot_info, response_cache=True)).build()
+        recorder = RequestRecorder(application.bot, monkeypatch)
+        titles = []
+
+        async def callback(update, context):
+            titles.append((await context.bot.get_chat(1)).title)
+
+        application.add_handler(TypeHandler(Update, callback))
+        async with application:
+            await application.process_update(make_update(message=make_message(text="text")))
+            await application.process_update(make_update(message=make_message(text="text")))
+            await application.process_update(
+                make_update(message=make_message(new_chat_title="title"))
+            )
+
+        assert titles == ["title 1", "title 1", "title 2"]
+        assert len(recorder.requests) == 2
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import asyncio
+import datetime as dtm
+import time
+
+import pytest
+
+from telegram import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import (
+    ApplicationBuilder,
+    CallbackDataCache,
+    DictPersistence,
+    InvalidCallbackData,
+    SQLiteCallbackDataStore,
+)
+from tests.auxil.pytest_classes import make_bot
+from tests.auxil.slots import mro_slots
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "callback_data.sqlite"
+
+
+@pytest.fixture
+def store(db_path, offline_bot):
+    store = SQLiteCallbackDataStore(db_path)
+    store.set_bot(offline_bot)
+    return store
+
+
+def make_query(query_id, reply_markup, row=0, column=0):
+    return CallbackQuery(
+        query_id,
+        from_user=None,
+        chat_instance=None,
+        data=reply_markup.inline_keyboard[row][column].callback_data,
+    )
+
+
+class TestSQLiteCallbackDataStore:
+    def test_slot_behaviour(self, store):
+        for attr in store.__slots__:
+            assert getattr(store, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(store)) == len(set(mro_slots(store))), "duplicate slot"
+
+    def test_init(self, db_path):
+        store = SQLiteCallbackDataStore(db_path)
+        assert store.filepath == db_path
+        assert store.maxsize is None
+        assert store.expiry is None
+        assert store.is_persistent
+
+        store = SQLiteCallbackDataStore(str(db_path), maxsize=10, expiry=60)
+        assert store.maxsize == 10
+        assert store.expiry == dtm.timedelta(seconds=60)
+
+        with pytest.raises(ValueError, match="`maxsize` must be positive"):
+            SQLiteCallbackDataStore(db_path, maxsize=0)
+        with pytest.raises(ValueError, match="`expiry` must be positive"):
+            SQLiteCallbackDataStore(db_path, expiry=dtm.timedelta(0))
+
+    def test_keyboards(self, store):
+        store.put_keyboard("a", {"1": "data", "2": {"nested": [1, 2]}})
+        store.put_keyboard("b", {"1": 2})
+        assert store.get_keyboard("a") == {"1": "data", "2": {"nested": [1, 2]}}
+        with pytest.raises(KeyError):
+            store.get_keyboard("c")
+
+        store.drop_keyboard("a")
+        store.drop_keyboard("c")
+        with pytest.raises(KeyError):
+            store.get_keyboard("a")
+        assert store.get_keyboard("b") == {"1": 2}
+
+        store.clear_keyboards()
+        assert store.persistence_data == ([], {})
+
+    def test_callback_queries(self, store):
+        store.put_callback_query("1", "a")
+        store.put_callback_query("2", "b")
+        assert store.pop_callback_query("1") == "a"
+        with pytest.raises(KeyError):
+            store.pop_callback_query("1")
+
+        store.clear_callback_queries()
+        with pytest.raises(KeyError):
+            store.pop_callback_query("2")
+
+    def test_bot_is_replaced(self, store, offline_bot, db_path):
+        store.put_keyboard("a", {"1": offline_bot})
+
+        other_store = SQLiteCallbackDataStore(db_path)
+        other_store.set_bot(offline_bot)
+        assert other_store.get_keyboard("a")["1"] is offline_bot
+
+    def test_data_survives_restart(self, db_path, offline_bot):
+        cache = CallbackDataCache(offline_bot, store=SQLiteCallbackDataStore(db_path))
+        out = cache.process_keyboard(
+            InlineKeyboardMarkup.from_row(
+                [
+                    InlineKeyboardButton("1", callback_data=("some", "data")),
+                    InlineKeyboardButton("2", callback_data=2),
+                ]
+            )
+        )
+        callback_query = make_query("id", out, column=1)
+        cache.process_callback_query(callback_query)
+        assert callback_query.data == 2
+
+        cache = CallbackDataCache(offline_bot, store=SQLiteCallbackDataStore(db_path))
+        assert cache.maxsize is None
+        callback_query = make_query("other_id", out)
+        cache.process_callback_query(callback_query)
+        assert callback_query.data == ("some", "data")
+
+        cache.drop_data(make_query("id", out))
+        callback_query = make_query("id", out)
+        cache.process_callback_query(callback_query)
+        assert isinstance(callback_query.data, InvalidCallbackData)
+
+    def test_maxsize(self, db_path, offline_bot):
+        store = SQLiteCallbackDataStore(db_path, maxsize=2)
+        store.set_bot(offline_bot)
+        store.put_keyboard("a", {})
+        time.sleep(0.01)
+        store.put_keyboard("b", {})
+        time.sleep(0.01)
+        # accessing the keyboard makes it the most recently used one
+        store.get_keyboard("a")
+        store.put_keyboard("c", {})
+        for i in range(3):
+            store.put_callback_query(str(i), "a")
+            time.sleep(0.01)
+
+        assert [entry[0] for entry in store.persistence_data[0]] == ["a", "c"]
+        assert store.persistence_data[1] == {"1": "a", "2": "a"}
+
+        # The number of entries is counted on initialization
+        store = SQLiteCallbackDataStore(db_path, maxsize=1)
+        store.set_bot(offline_bot)
+        store.put_keyboard("d", {})
+        assert [entry[0] for entry in store.persistence_data[0]] == ["d"]
+
+    async def test_expiry(self, db_path, offline_bot):
+        store = SQLiteCallbackDataStore(db_path, expiry=0.1)
+        store.set_bot(offline_bot)
+        store.put_keyboard("a", {})
+        store.put_callback_query("1", "a")
+        await asyncio.sleep(0.15)
+
+        with pytest.raises(KeyError):
+            store.get_keyboard("a")
+        with pytest.raises(KeyError):
+            store.pop_callback_query("1")
+
+        # Expired entries are deleted when new keyboards are stored
+        store.put_keyboard("b", {})
+        await asyncio.sleep(0)
+        rows = store._connection.execute("SELECT uuid FROM keyboards").fetchall()
+        assert rows == [("b",)]
+
+    def test_clear_keyboards_cutoff(self, store):
+        store.put_keyboard("a", {})
+        time.sleep(0.02)
+        cutoff = time.time()
+        time.sleep(0.02)
+        store.put_keyboard("b", {})
+        store.clear_keyboards(cutoff)
+        assert [entry[0] for entry in store.persistence_data[0]] == ["b"]
+
+    def test_load_persistence_data(self, store):
+        store.put_callback_query("1", "a")
+        store.load_persistence_data(([("a", 123.0, {"1": "data"}), ("b", 456.0, {})], {"1": "b"}))
+        assert store.persistence_data == (
+            [("a", 123.0, {"1": "data"}), ("b", 456.0, {})],
+            {"1": "b"},
+        )
+
+    async def test_commit_on_shutdown(self, store, db_path, offline_bot):
+        store.put_keyboard("a", {})
+        await store.shutdown()
+
+        other_store = SQLiteCallbackDataStore(db_path)
+        other_store.set_bot(offline_bot)
+        assert other_store.get_keyboard("a") == {}
+
+    async def test_not_stored_in_persistence(self, db_path, bot_info):
+        persistence = DictPersistence(callback_data_json='[[["a", 0, {"1": "data"}]], {}]')
+        app = (
+            ApplicationBuilder()
+            .bot(
+                make_bot(
+                    bot_info,
+                    offline=True,
+                    arbitrary_callback_data=SQLiteCallbackDataStore(db_path),
+                )
+            )
+            .persistence(persistence)
+            .build()
+        )
+        cache = app.bot.callback_data_cache
+        assert isinstance(cache.store, SQLiteCallbackDataStore)
+
+        async with app:
+            # The data of the persistence is not loaded
+            assert cache.persistence_data == ([], {})
+            cache.process_keyboard(
+                InlineKeyboardMarkup.from_button(InlineKeyboardButton("1", callback_data=1))
+            )
+            await app.update_persistence()
+            assert persistence.callback_data == ([("a", 0, {"1": "data"})], {})
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import asyncio
+import time
+import tracemalloc
+
+import pytest
+
+from telegram import InputFile
+from telegram.error import BadRequest, NetworkError, TimedOut
+from telegram.request import AiohttpRequest, HTTPXRequest, RequestData
+from telegram.request._requestparameter import RequestParameter
+from tests.auxil.envvars import TEST_WITH_OPT_DEPS
+from tests.auxil.networking import FakeBotAPIServer
+from tests.auxil.slots import mro_slots
+
+UPLOAD_DATA = RequestData(
+    [
+        RequestParameter("chat_id", 1, None),
+        RequestParameter("document", None, [InputFile(b"file content", filename="file.txt")]),
+    ]
+)
+TEXT_DATA = RequestData(
+    [RequestParameter("chat_id", 1, None), RequestParameter("text", "ü", None)]
+)
+
+
+@pytest.fixture
+async def aiohttp_request():
+    async with AiohttpRequest(connection_pool_size=8) as request:
+        yield request
+
+
+@pytest.mark.skipif(TEST_WITH_OPT_DEPS, reason="Optional dependencies are installed")
+class TestNoAiohttp:
+    def test_init(self):
+        with pytest.raises(RuntimeError, match=r"python-telegram-bot\[aiohttp\]"):
+            AiohttpRequest()
+
+
+@pytest.mark.skipif(not TEST_WITH_OPT_DEPS, reason="Optional dependencies not installed")
+class TestAiohttpRequest:
+    def test_slot_behaviour(self):
+        inst = AiohttpRequest()
+        for attr in inst.__slots__:
+            assert getattr(inst, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(inst)) == len(set(mro_slots(inst))), "duplicate slot"
+
+    def test_read_timeout(self):
+        assert AiohttpRequest().read_timeout == 5
+        assert AiohttpRequest(read_timeout=42).read_timeout == 42
+
+    async def test_not_initialized(self):
+        request = AiohttpRequest()
+        with pytest.raises(RuntimeError, match="not initialized"):
+            await request.do_request("https://python-telegram-bot.org", "GET")
+
+        await request.initialize()
+        await request.shutdown()
+        # shutting down twice does nothing
+        await request.shutdown()
+        with pytest.raises(RuntimeError, match="not initialized"):
+            await request.do_request("https://python-telegram-bot.org", "GET")
+
+    async def test_multiple_init_cycles(self):
+        request = AiohttpRequest()
+        async with FakeBotAPIServer() as server:
+            for _ in range(2):
+                async with request:
+                    assert await request.post(f"{server.url}/getMe") is True
+
+    async def test_post(self, aiohttp_request):
+        async with FakeBotAPIServer() as server:
+            assert await aiohttp_request.post(f"{server.url}/sendMessage", TEXT_DATA) is True
+
+        header, body = server.requests[0]
+        assert header.startswith("POST /bot123/sendMessage HTTP/1.1")
+        assert f"User-Agent: {AiohttpRequest.USER_AGENT}" in header
+        assert "application/x-www-form-urlencoded" in header
+        assert body == b"chat_id=1&text=%C3%BC"
+
+    async def test_upload(self, aiohttp_request):
+        async with FakeBotAPIServer() as server:
+            assert await aiohttp_request.post(f"{server.url}/sendDocument", UPLOAD_DATA) is True
+
+        header, body = server.requests[0]
+        assert "multipart/form-data" in header
+        assert b'name="chat_id"' in body
+        assert b'name="document"; filename="file.txt"' in body
+        assert b"file content" in body
+
+    @pytest.mark.parametrize("source", ["path", "async_iterable"])
+    async def test_upload_is_streamed(self, tmp_path, source):
+        """Uploading a large file must only need memory in the order of the chunk size."""
+        file_size = 32 * 1024 * 1024
+        file_path = tmp_path / "large_file"
+        with file_path.open("wb") as file:
+            file.truncate(file_size)
+
+        async def async_iterable():
+            for _ in range(file_size // 65536):
+                yield bytes(65536)
+
+        obj = file_path if source == "path" else async_iterable()
+        request_data = RequestData(
+            [RequestParameter.from_input("document", InputFile(obj, filename="large_file"))]
+        )
+
+        async with FakeBotAPIServer(keep_bodies=False) as server, AiohttpRequest() as request:
+            tracemalloc.start()
+            try:
+                assert await request.post(f"{server.url}/sendDocument", request_data) is True
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        header, body = server.requests[0]
+        assert b'name="document"; filename="large_file"' in body
+        if source == "path":
+            assert f"Content-Length: {server.body_sizes[0]}" in header
+        else:
+            assert "Transfer-Encoding: chunked" in header
+        assert server.body_sizes[0] > file_size
+        assert peak < file_size / 8
+
+    async def test_retrieve(self, aiohttp_request):
+        async with FakeBotAPIServer() as server:
+            assert await aiohttp_request.retrieve(f"{server.url}/file") == (
+                b'{"ok": true, "result": true}'
+            )
+        assert server.requests[0][0].startswith("GET /bot123/file HTTP/1.1")
+
+    @pytest.mark.parametrize("range_requests", [True, False])
+    async def test_retrieve_stream(self, aiohttp_request, range_requests):
+        content = bytes(range(256)) * 4096
+        async with FakeBotAPIServer(
+            download_content=content, range_requests=range_requests
+        ) as server:
+            url = server.file_url
+            chunks = [chunk async for chunk in aiohttp_request.retrieve_stream(url)]
+            assert b"".join(chunks) == content
+            assert len(chunks) > 1
+
+            # Works no matter whether the server respects the Range header
+            chunks = [
+                chunk async for chunk in aiohttp_request.retrieve_stream(url, offset=100_000)
+            ]
+            assert b"".join(chunks) == content[100_000:]
+            assert "Range: bytes=100000-" in server.requests[-1][0]
+
+            with pytest.raises(BadRequest, match="file is too big"):
+                await aiohttp_request.retrieve_stream(url + "_too_big").__anext__()
+
+        with pytest.raises(NetworkError, match="aiohttp.ClientConnectorError"):
+            await aiohttp_request.retrieve_stream(url).__anext__()
+
+        # All connections were released again
+        assert aiohttp_request._pool_semaphore._value == 8
+
+    async def test_retrieve_stream_not_initialized(self):
+        with pytest.raises(RuntimeError, match="not initialized"):
+            await AiohttpRequest().retrieve_stream("url").__anext__()
+
+    async def test_pool_timeout(self):
+        async with (
+            FakeBotAPIServer(upload_delay=0.5) as server,
+            AiohttpRequest(connection_pool_size=1, pool_timeout=0.1) as request,
+        ):
+            upload = asyncio.create_task(request.post(f"{server.url}/sendDocument", UPLOAD_DATA))
+            await asyncio.sleep(0.05)
+            with pytest.raises(TimedOut, match="Pool timeout"):
+                await request.post(f"{server.url}/sendMessage", TEXT_DATA)
+            assert await upload is True
+            # The connection is released again
+            assert await request.post(f"{server.url}/sendMessage", TEXT_DATA) is True
+
+    @pytest.mark.parametrize("pass_timeout", [True, False])
+    async def test_read_timeout_error(self, pass_timeout):
+        async with (
+            FakeBotAPIServer(get_updates_delay=0.5) as server,
+            AiohttpRequest(read_timeout=5 if pass_timeout else 0.1) as request,
+        ):
+            kwargs = {"read_timeout": 0.1} if pass_timeout else {}
+            with pytest.raises(TimedOut):
+                await request.post(f"{server.url}/getUpdates", TEXT_DATA, **kwargs)
+
+    async def test_media_write_timeout(self, monkeypatch, recwarn):
+        timeouts = []
+        async with AiohttpRequest(media_write_timeout=42) as aiohttp_request:
+            original_request = aiohttp_request._session.request
+
+            def request(*args, **kwargs):
+                timeouts.append(kwargs["timeout"])
+                return original_request(*args, **kwargs)
+
+            monkeypatch.setattr(aiohttp_request._session, "request", request)
+            async with FakeBotAPIServer() as server:
+                await aiohttp_request.post(f"{server.url}/sendMessage", TEXT_DATA)
+                await aiohttp_request.post(f"{server.url}/sendDocument", UPLOAD_DATA)
+                await aiohttp_request.post(
+                    f"{server.url}/sendMessage", TEXT_DATA, read_timeout=None
+                )
+
+        # connect + write + read timeout
+        assert [timeout.total for timeout in timeouts] == [15, 52, None]
+        assert timeouts[0].sock_read == 5
+        assert timeouts[0].sock_connect == 5
+        # No deprecation warning about the write timeout of uploads
+        assert len(recwarn) == 0
+
+    async def test_network_error(self, aiohttp_request):
+        async with FakeBotAPIServer() as server:
+            url = server.url
+        # The server is closed now
+        with pytest.raises(NetworkError, match="aiohttp.ClientConnectorError"):
+            await aiohttp_request.post(f"{url}/getMe")
+
+    async def test_proxy(self, monkeypatch):
+        proxies = []
+        async with AiohttpRequest(proxy="http://127.0.0.1:1") as request:
+            original_request = request._session.request
+
+            def session_request(*args, **kwargs):
+                proxies.append(kwargs["proxy"])
+                return original_request(*args, **kwargs)
+
+            monkeypatch.setattr(request._session, "request", session_request)
+            async with FakeBotAPIServer() as server:
+                with pytest.raises(NetworkError):
+                    await request.post(f"{server.url}/getMe")
+        assert proxies == ["http://127.0.0.1:1"]
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("backend", [HTTPXRequest, AiohttpRequest])
+    async def test_backend_benchmark(self, backend):
+        number_of_requests = 1000
+        async with (
+            FakeBotAPIServer(get_updates_delay=0.01) as server,
+            backend(connection_pool_size=64, pool_timeout=None) as request,
+        ):
+
+            async def run(endpoint, request_data, count):
+                start = time.perf_counter()
+                await asyncio.gather(
+                    *(request.post(f"{server.url}/{endpoint}", request_data) for _ in range(count))
+                )
+                return time.perf_counter() - start
+
+            small_posts = await run("sendMessage", TEXT_DATA, number_of_requests)
+            uploads = await run("sendDocument", UPLOAD_DATA, max(1, number_of_requests // 10))
+            long_polls = await run("getUpdates", TEXT_DATA, max(1, number_of_requests // 100))
+
+        print(
+            f"{backend.__name__}: {number_of_requests} small POSTs in {small_posts:.2f}s, "
+            f"{max(1, number_of_requests // 10)} uploads in {uploads:.2f}s, "
+            f"{max(1, number_of_requests // 100)} long polls in {long_polls:.2f}s"
+        )
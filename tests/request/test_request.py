@@ -21,10 +21,12 @@ implementations for BaseRequest and we want to test HTTPXRequest anyway."""
 import asyncio
 import json
 import logging
+import tracemalloc
 from collections import defaultdict
 from collections.abc import Coroutine
 from dataclasses import dataclass
 from http import HTTPStatus
+from pathlib import Path
 from typing import Any, Callable
 
 import httpx
@@ -33,6 +35,7 @@ from httpx import AsyncHTTPTransport
 
 from telegram import InputFile
 from telegram._utils.defaultvalue import DEFAULT_NONE
+from telegram._utils.files import parse_file_input
 from telegram._utils.strings import TextEncoding
 from telegram.error import (
     BadRequest,
@@ -51,7 +54,7 @@ from telegram.request._requestparameter import RequestParameter
 from telegram.warnings import PTBDeprecationWarning
 from tests.auxil.envvars import TEST_WITH_OPT_DEPS
 from tests.auxil.files import data_file
-from tests.auxil.networking import NonchalantHttpxRequest
+from tests.auxil.networking import FakeBotAPIServer, NonchalantHttpxRequest
 from tests.auxil.slots import mro_slots
 
 # We only need mixed_rqs fixture, but it uses the others, so pytest needs us to import them as well
@@ -370,6 +373,25 @@ class TestRequestWithoutRequest:
 
         assert await httpx_request.retrieve(None, None) == server_response
 
+    async def test_retrieve_stream_default(self, monkeypatch, httpx_request):
+        """Implementations that don't support streaming fall back to retrieve"""
+        server_response = b"file content"
+
+        async def retrieve(url, **kwargs):
+            self.test_flag = (url, kwargs)
+            return server_response
+
+        monkeypatch.setattr(httpx_request, "retrieve", retrieve)
+        chunks = [
+            chunk
+            async for chunk in BaseRequest.retrieve_stream(
+                httpx_request, "url", offset=5, read_timeout=42
+            )
+        ]
+        assert chunks == [b"content"]
+        assert self.test_flag[0] == "url"
+        assert self.test_flag[1]["read_timeout"] == 42
+
     async def test_timeout_propagation_to_do_request(self, monkeypatch, httpx_request):
         async def make_assertion(*args, **kwargs):
             self.test_flag = (
@@ -460,6 +482,46 @@ class TestRequestWithoutRequest:
         else:
             assert len(recwarn) == 0
 
+    @pytest.mark.parametrize("path_type", [str, Path], ids=["str", "Path"])
+    async def test_custom_request_multipart_data(self, tmp_path, path_type):
+        content = bytes(range(256)) * 100
+        file_path = tmp_path / "file.bin"
+        file_path.write_bytes(content)
+
+        class MultipartDataRequest(BaseRequest):
+            async def initialize(self_) -> None:
+                pass
+
+            async def shutdown(self_) -> None:
+                pass
+
+            async def do_request(self_, url, method, request_data=None, **kwargs):
+                # Custom backends may pass the files to their HTTP library as they are
+                self.test_flag = httpx.Request(
+                    method,
+                    url,
+                    data=request_data.json_parameters,
+                    files=request_data.multipart_data,
+                ).read()
+                return HTTPStatus.OK, b'{"ok": "True", "result": {}}'
+
+        input_file = parse_file_input(path_type(file_path), attach=True)
+        request_data = RequestData(
+            parameters=[
+                RequestParameter.from_input("chat_id", 1),
+                RequestParameter.from_input("document", input_file),
+            ]
+        )
+        await MultipartDataRequest().post("https://te.st", request_data)
+
+        assert b'filename="file.bin"' in self.test_flag
+        assert content in self.test_flag
+        # The body is the same as the one streamed by the built-in backends
+        boundary = self.test_flag.split(b"\r\n", 1)[0][2:].decode()
+        assert self.test_flag == b"".join(
+            [chunk async for chunk in request_data.multipart_stream(boundary)]
+        )
+
 
 @pytest.mark.skipif(not TEST_WITH_OPT_DEPS, reason="No need to run this twice")
 class TestHTTPXRequestWithoutRequest:
@@ -656,9 +718,19 @@ class TestHTTPXRequestWithoutRequest:
         async def make_assertion(self, **kwargs):
             method_assertion = kwargs.get("method") == "method"
             url_assertion = kwargs.get("url") == "url"
-            files_assertion = kwargs.get("files") == mixed_rqs.multipart_data
-            data_assertion = kwargs.get("data") == mixed_rqs.json_parameters
-            if method_assertion and url_assertion and files_assertion and data_assertion:
+            # The multipart body is streamed
+            content_type = kwargs["headers"]["Content-Type"]
+            boundary = content_type.split("boundary=")[1]
+            content = b"".join([chunk async for chunk in kwargs["content"]])
+            expected = b"".join([chunk async for chunk in mixed_rqs.multipart_stream(boundary)])
+            content_assertion = (
+                content_type.startswith("multipart/form-data")
+                and content == expected
+                and int(kwargs["headers"]["Content-Length"]) == len(content)
+                and "files" not in kwargs
+                and "data" not in kwargs
+            )
+            if method_assertion and url_assertion and content_assertion:
                 return httpx.Response(HTTPStatus.OK)
             return httpx.Response(HTTPStatus.BAD_REQUEST)
 
@@ -670,6 +742,68 @@ class TestHTTPXRequestWithoutRequest:
         )
         assert code == HTTPStatus.OK
 
+    @pytest.mark.parametrize("source", ["path", "async_iterable"])
+    async def test_upload_is_streamed(self, tmp_path, source):
+        """Uploading a large file must only need memory in the order of the chunk size."""
+        file_size = 32 * 1024 * 1024
+        file_path = tmp_path / "large_file"
+        with file_path.open("wb") as file:
+            file.truncate(file_size)
+
+        async def async_iterable():
+            for _ in range(file_size // 65536):
+                yield bytes(65536)
+
+        obj = file_path if source == "path" else async_iterable()
+        request_data = RequestData(
+            [RequestParameter.from_input("document", InputFile(obj, filename="large_file"))]
+        )
+
+        async with FakeBotAPIServer(keep_bodies=False) as server, HTTPXRequest() as request:
+            tracemalloc.start()
+            try:
+                assert await request.post(f"{server.url}/sendDocument", request_data) is True
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        header, body = server.requests[0]
+        assert b'name="document"; filename="large_file"' in body
+        if source == "path":
+            assert f"Content-Length: {server.body_sizes[0]}" in header
+        else:
+            assert "Transfer-Encoding: chunked" in header
+        assert server.body_sizes[0] > file_size
+        assert peak < file_size / 8
+
+    @pytest.mark.parametrize("range_requests", [True, False])
+    async def test_retrieve_stream(self, httpx_request, range_requests):
+        content = bytes(range(256)) * 4096
+        async with FakeBotAPIServer(
+            download_content=content, range_requests=range_requests
+        ) as server:
+            url = server.file_url
+            chunks = [chunk async for chunk in httpx_request.retrieve_stream(url)]
+            assert b"".join(chunks) == content
+            assert len(chunks) > 1
+
+            # Works no matter whether the server respects the Range header
+            chunks = [chunk async for chunk in httpx_request.retrieve_stream(url, offset=100_000)]
+            assert b"".join(chunks) == content[100_000:]
+            assert "Range: bytes=100000-" in server.requests[-1][0]
+
+            with pytest.raises(BadRequest, match="file is too big"):
+                await httpx_request.retrieve_stream(url + "_too_big").__anext__()
+
+        with pytest.raises(NetworkError, match="httpx.ConnectError"):
+            await httpx_request.retrieve_stream(url).__anext__()
+
+    async def test_retrieve_stream_not_initialized(self):
+        request = HTTPXRequest()
+        await request.shutdown()
+        with pytest.raises(RuntimeError, match="not initialized"):
+            await request.retrieve_stream("url").__anext__()
+
     async def test_do_request_return_value(self, monkeypatch, httpx_request):
         async def make_assertion(self, method, url, headers, timeout, files, data):
             return httpx.Response(123, content=b"content")
@@ -17,9 +17,11 @@
 # You should have received a copy of the GNU Lesser Public License
 # along with this program.  If not, see [http://www.gnu.org/licenses/].
 import json
+from io import BytesIO
 from typing import Any
 from urllib.parse import quote
 
+import httpx
 import pytest
 
 from telegram import InputFile, InputMediaPhoto, InputMediaVideo, MessageEntity
@@ -202,6 +204,65 @@ class TestRequestDataWithoutRequest:
         assert file_rqs.multipart_data == expected
         assert mixed_rqs.multipart_data == expected
 
+    async def test_multipart_stream(self, mixed_rqs):
+        boundary = "boundary"
+        body = b"".join([chunk async for chunk in mixed_rqs.multipart_stream(boundary)])
+
+        # The body is the same as encoded by httpx
+        expected = httpx.Request(
+            "POST",
+            "https://te.st",
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+            data=mixed_rqs.json_parameters,
+            files=mixed_rqs.multipart_data,
+        ).read()
+        assert body == expected
+        assert mixed_rqs.multipart_content_length(boundary) == len(body)
+
+    async def test_multipart_stream_escaping(self):
+        data = RequestData(
+            [RequestParameter.from_input("doc", InputFile(b"data", filename='a"b\r\nc.txt'))]
+        )
+        body = b"".join([chunk async for chunk in data.multipart_stream("boundary")])
+        assert b'name="doc"; filename="a%22b%0D%0Ac.txt"\r\n' in body
+
+    @pytest.mark.parametrize("source", ["path", "file_handle", "async_iterable"])
+    async def test_multipart_stream_lazy_sources(self, tmp_path, source):
+        content = bytes(range(256)) * 1000
+        file_path = tmp_path / "file.bin"
+        file_path.write_bytes(content)
+
+        async def async_iterable():
+            for i in range(0, len(content), 1000):
+                yield content[i : i + 1000]
+
+        file_handle = BytesIO(content)
+        # Was read partially before, but must be uploaded completely
+        file_handle.read(10)
+        obj = {
+            "path": file_path,
+            "file_handle": file_handle,
+            "async_iterable": async_iterable(),
+        }[source]
+        data = RequestData(
+            [
+                RequestParameter.from_input(
+                    "doc", InputFile(obj, filename="file.bin", read_file_handle=False)
+                )
+            ]
+        )
+        expected_data = RequestData(
+            [RequestParameter.from_input("doc", InputFile(content, filename="file.bin"))]
+        )
+
+        chunks = [chunk async for chunk in data.multipart_stream("boundary", chunk_size=4096)]
+        expected = b"".join([chunk async for chunk in expected_data.multipart_stream("boundary")])
+        assert b"".join(chunks) == expected
+        assert max(len(chunk) for chunk in chunks) <= 4096
+
+        expected_length = None if source == "async_iterable" else len(expected)
+        assert data.multipart_content_length("boundary") == expected_length
+
     def test_url_encoding(self):
         data = RequestData(
             [
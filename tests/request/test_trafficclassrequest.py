@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+#
+# A library that provides a Python interface to the Telegram Bot API
+# Copyright (C) 2015-2024
+# Leandro Toledo de Souza <devs@python-telegram-bot.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser Public License for more details.
+#
+# You should have received a copy of the GNU Lesser Public License
+# along with this program.  If not, see [http://www.gnu.org/licenses/].
+import asyncio
+
+import pytest
+
+from telegram import InputFile
+from telegram.request import BaseRequest, HTTPXRequest, RequestData, TrafficClassRequest
+from telegram.request._requestparameter import RequestParameter
+from tests.auxil.networking import FakeBotAPIServer
+from tests.auxil.slots import mro_slots
+
+UPLOAD_DATA = RequestData([RequestParameter("document", None, [InputFile(b"content")])])
+TEXT_DATA = RequestData([RequestParameter("text", "text", None)])
+
+
+class RecordingRequest(BaseRequest):
+    def __init__(self, read_timeout=None):
+        self.calls = []
+        self.initialized = 0
+        self.shut_down = 0
+        self._read_timeout = read_timeout
+
+    @property
+    def read_timeout(self):
+        return self._read_timeout
+
+    async def initialize(self):
+        self.initialized += 1
+
+    async def shutdown(self):
+        self.shut_down += 1
+
+    async def do_request(self, url, method, request_data=None, *args, **kwargs):
+        self.calls.append((url, method, request_data, kwargs))
+        return 200, b'{"ok": true, "result": true}'
+
+
+class TestTrafficClassRequest:
+    def test_slot_behaviour(self):
+        inst = TrafficClassRequest({TrafficClassRequest.INTERACTIVE: RecordingRequest()})
+        for attr in inst.__slots__:
+            assert getattr(inst, attr, "err") != "err", f"got extra slot '{attr}'"
+        assert len(mro_slots(inst)) == len(set(mro_slots(inst))), "duplicate slot"
+
+    def test_init(self):
+        interactive = RecordingRequest(read_timeout=42)
+        request = TrafficClassRequest({"interactive": interactive, "other": RecordingRequest()})
+        assert request.requests["interactive"] is interactive
+        assert request.read_timeout == 42
+
+        with pytest.raises(TypeError):
+            request.requests["new"] = interactive
+
+        with pytest.raises(ValueError, match="default class other"):
+            TrafficClassRequest({"interactive": interactive}, default_class="other")
+
+    @pytest.mark.parametrize(
+        ("url", "method", "request_data", "expected"),
+        [
+            ("https://api.telegram.org/file/bot123/path", "GET", None, "download"),
+            ("https://api.telegram.org/bot123/answerCallbackQuery", "POST", None, "interactive"),
+            ("https://api.telegram.org/bot123/sendMessage", "POST", TEXT_DATA, "interactive"),
+            ("https://api.telegram.org/bot123/sendDocument", "POST", UPLOAD_DATA, "media_upload"),
+            ("https://api.telegram.org/bot123/sendMediaGroup", "POST", TEXT_DATA, "bulk"),
+            (
+                "https://api.telegram.org/bot123/sendMediaGroup",
+                "POST",
+                UPLOAD_DATA,
+                "media_upload",
+            ),
+            ("https://api.telegram.org/bot123/forwardMessages", "POST", TEXT_DATA, "bulk"),
+            ("https://api.telegram.org/bot123/deleteMessage", "POST", TEXT_DATA, "bulk"),
+            # custom endpoint classes take precedence
+            ("https://api.telegram.org/bot123/copyMessage", "POST", TEXT_DATA, "custom"),
+            ("https://api.telegram.org/bot123/sendPhoto", "POST", UPLOAD_DATA, "custom"),
+        ],
+    )
+    def test_get_traffic_class(self, url, method, request_data, expected):
+        request = TrafficClassRequest(
+            {"interactive": RecordingRequest()},
+            endpoint_classes={"copyMessage": "custom", "sendPhoto": "custom"},
+        )
+        assert request.get_traffic_class(url, method, request_data) == expected
+
+    def test_default_class(self):
+        request = TrafficClassRequest({"other": RecordingRequest()}, default_class="other")
+        assert request.get_traffic_class("https://x/sendMessage", "POST") == "other"
+
+    async def test_do_request(self):
+        interactive = RecordingRequest()
+        upload = RecordingRequest()
+        request = TrafficClassRequest(
+            {
+                TrafficClassRequest.INTERACTIVE: interactive,
+                TrafficClassRequest.MEDIA_UPLOAD: upload,
+            }
+        )
+
+        assert await request.post("https://x/sendDocument", UPLOAD_DATA, read_timeout=3) is True
+        assert await request.post("https://x/sendMessage", TEXT_DATA) is True
+        # No request object for downloads, falls back to the default class
+        assert await request.retrieve("https://x/file/path") == b'{"ok": true, "result": true}'
+
+        assert [call[0] for call in upload.calls] == ["https://x/sendDocument"]
+        assert upload.calls[0][2] is UPLOAD_DATA
+        assert upload.calls[0][3]["read_timeout"] == 3
+        assert [(call[0], call[1]) for call in interactive.calls] == [
+            ("https://x/sendMessage", "POST"),
+            ("https://x/file/path", "GET"),
+        ]
+
+    async def test_retrieve_stream(self):
+        interactive = RecordingRequest()
+        download = RecordingRequest()
+
+        async def retrieve_stream(url, offset=0, **kwargs):
+            download.calls.append((url, offset, kwargs))
+            yield b"content"
+
+        download.retrieve_stream = retrieve_stream
+        request = TrafficClassRequest(
+            {
+                TrafficClassRequest.INTERACTIVE: interactive,
+                TrafficClassRequest.DOWNLOAD: download,
+            }
+        )
+
+        chunks = [
+            chunk async for chunk in request.retrieve_stream("https://x/file", 3, read_timeout=4)
+        ]
+        assert chunks == [b"content"]
+        assert download.calls[0][:2] == ("https://x/file", 3)
+        assert download.calls[0][2]["read_timeout"] == 4
+        assert interactive.calls == []
+
+    async def test_initialize_shutdown(self):
+        shared = RecordingRequest()
+        other = RecordingRequest()
+        async with TrafficClassRequest({"interactive": shared, "bulk": shared, "other": other}):
+            assert shared.initialized == 1
+            assert other.initialized == 1
+        assert shared.shut_down == 1
+        assert other.shut_down == 1
+
+    @pytest.mark.parametrize("use_traffic_classes", [True, False])
+    async def test_interactive_requests_under_upload_load(self, use_traffic_classes):
+        """Interactive requests must not wait for free connections while the pool for uploads is
+        busy."""
+
+        def make_request():
+            return HTTPXRequest(connection_pool_size=4, pool_timeout=None)
+
+        request = (
+            TrafficClassRequest(
+                {
+                    TrafficClassRequest.INTERACTIVE: make_request(),
+                    TrafficClassRequest.MEDIA_UPLOAD: make_request(),
+                }
+            )
+            if use_traffic_classes
+            else make_request()
+        )
+
+        async with FakeBotAPIServer(upload_delay=0.5) as server, request:
+            url = server.url
+            uploads = [
+                asyncio.create_task(request.post(f"{url}/sendDocument", UPLOAD_DATA))
+                for _ in range(4)
+            ]
+            # Give the uploads the chance to occupy all connections of their pool
+            await asyncio.sleep(0.05)
+
+            interactive = asyncio.create_task(
+                request.post(f"{url}/answerCallbackQuery", TEXT_DATA)
+            )
+            done, _ = await asyncio.wait(
+                [interactive, *uploads], return_when=asyncio.FIRST_COMPLETED
+            )
+            if use_traffic_classes:
+                # The interactive request has a pool of its own and finishes while all uploads are
+                # still pending
+                assert done == {interactive}
+            else:
+                # The interactive request has to wait until an upload frees a connection
+                assert interactive not in done
+            assert await interactive is True
+            await asyncio.gather(*uploads)
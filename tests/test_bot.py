@@ -509,7 +509,18 @@ class TestBotWithoutRequest:
         # Some methods of ext.ExtBot
         global_extra_args = {"rate_limit_args"}
         extra_args_per_method = defaultdict(
-            set, {"__init__": {"arbitrary_callback_data", "defaults", "rate_limiter"}}
+            set,
+            {
+                "__init__": {
+                    "arbitrary_callback_data",
+                    "defaults",
+                    "edit_coalescer",
+                    "file_id_cache",
+                    "rate_limiter",
+                    "request_coalescer",
+                    "response_cache",
+                }
+            },
         )
         different_hints_per_method = defaultdict(set, {"__setattr__": {"ext_bot"}})
 
@@ -1730,7 +1741,7 @@ class TestBotWithoutRequest:
                 inline_keyboard[0][0].callback_data[32:],
             )
             assertion_3 = (
-                offline_bot.callback_data_cache._keyboard_data[keyboard].button_data[button]
+                offline_bot.callback_data_cache.store._keyboard_data[keyboard].button_data[button]
                 == "replace_test"
             )
             assertion_4 = data["results"][1].reply_markup is None
@@ -3988,9 +3999,9 @@ class TestBotWithRequest:
 
             assert inline_keyboard[0][1] == no_replace_button
             assert inline_keyboard[0][0] == replace_button
-            keyboard = next(iter(bot.callback_data_cache._keyboard_data))
+            keyboard = next(iter(bot.callback_data_cache.store._keyboard_data))
             data = next(
-                iter(bot.callback_data_cache._keyboard_data[keyboard].button_data.values())
+                iter(bot.callback_data_cache.store._keyboard_data[keyboard].button_data.values())
             )
             assert data == "replace_test"
         finally:
@@ -4019,9 +4030,9 @@ class TestBotWithRequest:
 
             assert inline_keyboard[0][1] == no_replace_button
             assert inline_keyboard[0][0] == replace_button
-            keyboard = next(iter(bot.callback_data_cache._keyboard_data))
+            keyboard = next(iter(bot.callback_data_cache.store._keyboard_data))
             data = next(
-                iter(bot.callback_data_cache._keyboard_data[keyboard].button_data.values())
+                iter(bot.callback_data_cache.store._keyboard_data[keyboard].button_data.values())
             )
             assert data == "replace_test"
         finally:
@@ -4054,9 +4065,9 @@ class TestBotWithRequest:
 
             assert inline_keyboard[0][1] == no_replace_button
             assert inline_keyboard[0][0] == replace_button
-            keyboard = next(iter(bot.callback_data_cache._keyboard_data))
+            keyboard = next(iter(bot.callback_data_cache.store._keyboard_data))
             data = next(
-                iter(bot.callback_data_cache._keyboard_data[keyboard].button_data.values())
+                iter(bot.callback_data_cache.store._keyboard_data[keyboard].button_data.values())
             )
             assert data == "replace_test"
         finally:
@@ -4076,9 +4087,9 @@ class TestBotWithRequest:
             )
             await message.pin()
 
-            keyboard = next(iter(bot.callback_data_cache._keyboard_data))
+            keyboard = next(iter(bot.callback_data_cache.store._keyboard_data))
             data = next(
-                iter(bot.callback_data_cache._keyboard_data[keyboard].button_data.values())
+                iter(bot.callback_data_cache.store._keyboard_data[keyboard].button_data.values())
             )
             assert data == "callback_data"
 